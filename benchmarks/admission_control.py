@@ -0,0 +1,112 @@
+"""
+/chat latency under overload with and without admission control.
+
+Drives the FastAPI app in-process with an open-loop stream of chat turns at
+increasing arrival rates. The fake chat provider sits behind the LLM token
+bucket (``--llm-rate`` calls per second), which makes the model the
+bottleneck the way Groq's rate limits do. Without admission control every
+turn is accepted and waits on the bucket, so latency grows with the backlog;
+with it, excess turns are rejected quickly with 429/503 and the accepted
+turns keep a stable p99.
+
+Usage:
+    python -m benchmarks.admission_control [--rates 10 20 40 80] [--duration 5] [--llm-rate 20]
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+
+import httpx
+
+from benchmarks.common import make_travel_db, passenger_id, summarize
+from config.config import Config
+
+
+def make_config(llm_rate: float, llm_latency: float):
+    class BenchmarkConfig(Config):
+        LLM_PROVIDER = "fake"
+        INTENT_CLASSIFIER = "off"
+        FAST_PATH_ENABLED = False
+        FAKE_LLM_LATENCY = {"*": llm_latency}
+        LLM_CALLS_PER_SECOND = llm_rate
+        LLM_BURST = 1
+
+    return BenchmarkConfig
+
+
+async def offered_load(app, rate: float, duration: float, passengers: int) -> dict:
+    rng = random.Random(0)
+    ok, rejected, statuses = [], [], {}
+
+    async def send(client, index):
+        start = time.perf_counter()
+        response = await client.post("/chat", json={
+            "message": "Hello", "config": {"passenger_id": passenger_id(rng.randrange(passengers))},
+        })
+        elapsed = time.perf_counter() - start
+        (ok if response.status_code == 200 else rejected).append(elapsed)
+        statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        tasks = []
+        start = time.perf_counter()
+        for index in range(int(rate * duration)):
+            await asyncio.sleep(max(0.0, start + index / rate - time.perf_counter()))
+            tasks.append(asyncio.create_task(send(client, index)))
+        await asyncio.gather(*tasks)
+    return {"ok": summarize(ok) if ok else None, "rejected": summarize(rejected) if rejected else None,
+            "statuses": statuses}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rates", type=float, nargs="+", default=[10, 20, 40, 80], help="Turns per second")
+    parser.add_argument("--duration", type=float, default=5.0, help="Seconds of load per rate")
+    parser.add_argument("--llm-rate", type=float, default=20.0, help="LLM calls per second")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Simulated seconds per LLM call")
+    parser.add_argument("--passengers", type=int, default=200)
+    parser.add_argument("--max-in-flight", type=int, default=4)
+    parser.add_argument("--max-queued", type=int, default=8)
+    parser.add_argument("--queue-timeout", type=float, default=0.5)
+    args = parser.parse_args()
+
+    os.environ.setdefault("TAVILY_API_KEY", "benchmark")
+    from src import app as server
+    from src.chatbot import tools
+    from src.chatbot.flow import build_graph
+    from src.utils.admission import AdmissionController
+    from src.utils.db_init import prepare_database
+
+    config = make_config(args.llm_rate, args.llm_latency)
+    modes = {
+        "unbounded": lambda: AdmissionController(10 ** 6, 0, 0, 0),
+        "admission": lambda: AdmissionController(
+            args.max_in_flight, args.max_queued, Config.CHAT_MAX_PER_PASSENGER, args.queue_timeout
+        ),
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        tools.db = make_travel_db(os.path.join(tmp, "travel2.sqlite"))
+        prepare_database(tools.db)
+        graph = build_graph(config)
+        server.build_graph = lambda: graph
+
+        print(f"LLM budget {args.llm_rate:g} calls/s, {args.llm_latency * 1000:g} ms per call")
+        for rate in args.rates:
+            for mode, controller in modes.items():
+                server.admission = controller()
+                stats = asyncio.run(offered_load(server.app, rate, args.duration, args.passengers))
+                ok, rejected = stats["ok"], stats["rejected"]
+                line = f"{rate:5g} turns/s {mode:<10}"
+                if ok:
+                    line += f" | ok {ok['n']:4d} p50 {ok['p50']:7.0f} ms p99 {ok['p99']:7.0f} ms"
+                if rejected:
+                    line += f" | rejected {rejected['n']:4d} p99 {rejected['p99']:5.1f} ms"
+                print(f"{line} | {stats['statuses']}")
+
+
+if __name__ == "__main__":
+    main()
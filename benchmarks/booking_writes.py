@@ -0,0 +1,144 @@
+"""
+Concurrent ticket rebooking benchmark.
+
+Runs many writer threads that move their passengers' tickets to other flights,
+once with the original write path (separate autocommit queries on an
+unindexed, rollback-journal database) and once with ``src.chatbot.booking``
+(one ``BEGIN IMMEDIATE`` transaction with a combined check query on a WAL,
+indexed database). Reports throughput, latency percentiles and the number of
+writes that failed with a locked database. Finally compares rebooking a group
+of tickets with one call per ticket against one batch call.
+
+Usage:
+    python -m benchmarks.booking_writes [--writers 16] [--ops 200]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+import pytz
+
+from benchmarks.common import Timer, make_travel_db, summarize
+from src.chatbot import booking
+from src.flights.inventory import rebuild_inventory
+from src.utils.db_init import prepare_database
+
+
+def legacy_update_ticket(path: str, ticket_no: str, new_flight_id: int, passenger_id: str) -> str:
+    """The write path as it was before ``src.chatbot.booking``: four queries, no shared transaction."""
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    try:
+        cursor.execute("SELECT scheduled_departure FROM flights WHERE flight_id = ?", (new_flight_id,))
+        new_flight = cursor.fetchone()
+        if not new_flight:
+            return "Invalid new flight ID provided."
+        departure_time = datetime.strptime(new_flight[0], "%Y-%m-%d %H:%M:%S.%f%z")
+        if (departure_time - datetime.now(tz=pytz.timezone("Etc/GMT-3"))).total_seconds() < 3 * 3600:
+            return "Not permitted to reschedule."
+        cursor.execute("SELECT flight_id FROM ticket_flights WHERE ticket_no = ?", (ticket_no,))
+        if not cursor.fetchone():
+            return "No existing ticket found for the given ticket number."
+        cursor.execute("SELECT * FROM tickets WHERE ticket_no = ? AND passenger_id = ?", (ticket_no, passenger_id))
+        if not cursor.fetchone():
+            return "Not the owner."
+        cursor.execute("UPDATE ticket_flights SET flight_id = ? WHERE ticket_no = ?", (new_flight_id, ticket_no))
+        conn.commit()
+        return "Ticket successfully updated to new flight."
+    finally:
+        cursor.close()
+        conn.close()
+
+
+def new_update_ticket(path: str, ticket_no: str, new_flight_id: int, passenger_id: str) -> str:
+    return booking.update_ticket(path, ticket_no, new_flight_id, passenger_id).message
+
+
+def workload(path: str, n_ops: int, seed: int) -> list[tuple[str, int, str]]:
+    conn = sqlite3.connect(path)
+    tickets = conn.execute("SELECT ticket_no, passenger_id FROM tickets").fetchall()
+    cutoff = (datetime.now(pytz.utc) + timedelta(days=1)).isoformat(sep=" ")
+    flights = [row[0] for row in conn.execute(
+        "SELECT flight_id FROM flights WHERE scheduled_departure > ?", (cutoff,)
+    )]
+    conn.close()
+    rng = random.Random(seed)
+    return [(ticket_no, rng.choice(flights), passenger) for ticket_no, passenger in rng.choices(tickets, k=n_ops)]
+
+
+def run(update, path: str, writers: int, ops: int) -> dict:
+    jobs = [workload(path, ops, seed) for seed in range(writers)]
+    timers = [Timer() for _ in range(writers)]
+    errors = [0] * writers
+
+    def writer(index):
+        for ticket_no, flight_id, passenger in jobs[index]:
+            try:
+                with timers[index]:
+                    update(path, ticket_no, flight_id, passenger)
+            except sqlite3.OperationalError:
+                errors[index] += 1
+
+    threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    samples = [sample for timer in timers for sample in timer.samples]
+    return {"throughput": len(samples) / elapsed, "errors": sum(errors), **summarize(samples)}
+
+
+def group_rebooking(path: str, group: int, rounds: int) -> dict:
+    """Time rebooking ``group`` tickets of one passenger one by one and as one batch."""
+    conn = sqlite3.connect(path)
+    passenger = conn.execute("SELECT passenger_id FROM tickets LIMIT 1").fetchone()[0]
+    conn.executemany("INSERT INTO tickets VALUES (?, 'GROUP', ?)", [(f"G{i}", passenger) for i in range(group)])
+    conn.executemany("INSERT INTO ticket_flights VALUES (?, 1, 'Economy', 10000)", [(f"G{i}",) for i in range(group)])
+    rebuild_inventory(conn)
+    conn.commit()
+    conn.close()
+    tickets = [f"G{i}" for i in range(group)]
+    flights = [flight for _, flight, _ in workload(path, rounds, seed=0)]
+
+    single, batch = Timer(), Timer()
+    for flight_id in flights:
+        with single:
+            for ticket_no in tickets:
+                booking.update_ticket(path, ticket_no, flight_id, passenger)
+        with batch:
+            booking.update_tickets(path, tickets, flight_id, passenger)
+    return {"single": summarize(single.samples), "batch": summarize(batch.samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--ops", type=int, default=200, help="Rebookings per writer")
+    parser.add_argument("--flights", type=int, default=20000)
+    parser.add_argument("--passengers", type=int, default=50000)
+    parser.add_argument("--group", type=int, default=4, help="Tickets per group rebooking")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, update, prepare in (("legacy", legacy_update_ticket, False), ("single-tx", new_update_ticket, True)):
+            path = make_travel_db(os.path.join(tmp, f"{name}.sqlite"), args.flights, args.passengers)
+            if prepare:
+                prepare_database(path)
+            stats = run(update, path, args.writers, args.ops)
+            print(f"{name:<10} {stats['throughput']:8.1f} writes/s | p50 {stats['p50']:7.2f} ms "
+                  f"p99 {stats['p99']:8.2f} ms | locked errors {stats['errors']}")
+
+        stats = group_rebooking(path, args.group, args.ops)
+        print(f"\nrebooking {args.group} tickets: {args.group} tool calls p50 {stats['single']['p50']:.2f} ms, "
+              f"1 batch call p50 {stats['batch']['p50']:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
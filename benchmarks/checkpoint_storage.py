@@ -0,0 +1,105 @@
+"""
+Checkpoint bytes and write latency over long threads: default versus compact format.
+
+Runs the same long conversations (fake chat model, tool calls against a
+synthetic database) on a SQLite saver with LangGraph's default serializer
+and with ``CompactSerializer``. Reports the bytes stored per turn
+(checkpoints, pending writes, blobs and chains), the latency of each
+checkpoint write, and the latency of loading the latest checkpoint of a
+thread from a fresh saver (no caches).
+
+Usage:
+    python -m benchmarks.checkpoint_storage [--threads 4] [--turns 60]
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+
+from benchmarks.common import Timer, make_travel_db, passenger_id, summarize
+from config.config import Config
+from src.chatbot import tools
+from src.chatbot.flow import build_graph
+from src.chatbot.interaction import run_turn
+from src.chatbot.memory import _sqlite_saver
+from src.utils.db_init import prepare_database
+
+MESSAGES = [
+    "Show me my flights",
+    "Which hotels are there in Zurich?",
+    "Any car rentals in Zurich?",
+    "What is the baggage policy?",
+    "Any tours in Paris?",
+    "Thanks",
+]
+
+SIZE_QUERIES = {
+    "checkpoints": "SELECT SUM(LENGTH(checkpoint) + LENGTH(metadata)) FROM checkpoints",
+    "writes": "SELECT SUM(LENGTH(value)) FROM writes",
+    "blobs": "SELECT SUM(LENGTH(data)) FROM checkpoint_blobs",
+    "chains": "SELECT SUM(LENGTH(messages) + LENGTH(key) + IFNULL(LENGTH(parent), 0)) FROM checkpoint_chains",
+}
+
+
+class BenchConfig(Config):
+    LLM_PROVIDER = "fake"
+    INTENT_CLASSIFIER = "off"
+
+
+def stored_bytes(path: str) -> dict:
+    conn = sqlite3.connect(path)
+    try:
+        tables = {name for name, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        return {part: conn.execute(query).fetchone()[0] or 0 for part, query in SIZE_QUERIES.items()
+                if query.split(" FROM ")[1].split()[0] in tables}
+    finally:
+        conn.close()
+
+
+def run(path: str, checkpoint_format: str, threads: int, turns: int) -> None:
+    saver = _sqlite_saver.__wrapped__(path, 5.0, checkpoint_format)
+    timer = Timer()
+    put = saver.put
+
+    def timed_put(*args, **kwargs):
+        with timer:
+            return put(*args, **kwargs)
+
+    saver.put = timed_put
+    graph = build_graph(BenchConfig, saver)
+    configs = [{"configurable": {"passenger_id": passenger_id(t), "thread_id": f"t{t}"}} for t in range(threads)]
+    for turn in range(turns):
+        for config in configs:
+            run_turn(graph, config, MESSAGES[turn % len(MESSAGES)])
+
+    loads = Timer()
+    for config in configs:
+        fresh = _sqlite_saver.__wrapped__(path, 5.0, checkpoint_format)
+        with loads:
+            fresh.get_tuple(config)
+    sizes = stored_bytes(path)
+    total = sum(sizes.values())
+    puts, reads = summarize(timer.samples), summarize(loads.samples)
+    parts = "  ".join(f"{part} {size / 1024:.0f}" for part, size in sizes.items())
+    print(f"{checkpoint_format:<8} {total / 1024:8.0f} KiB ({parts}) | {total / (threads * turns) / 1024:6.1f} KiB/turn"
+          f" | put p50 {puts['p50']:6.3f} ms  p95 {puts['p95']:6.3f} ms | load latest {reads['mean']:6.2f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=4)
+    parser.add_argument("--turns", type=int, default=60, help="Turns per thread")
+    args = parser.parse_args()
+    os.environ.setdefault("TAVILY_API_KEY", "benchmark")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_travel_db(os.path.join(tmp, "travel2.sqlite"), 5000, 1000)
+        prepare_database(path)
+        tools.db = path
+        print(f"{args.threads} threads x {args.turns} turns")
+        for checkpoint_format in ("default", "compact"):
+            run(os.path.join(tmp, f"{checkpoint_format}.sqlite"), checkpoint_format, args.threads, args.turns)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Latency of the first /chat requests after a worker starts, with and without the warm-up.
+
+Each run starts a fresh interpreter on a synthetic travel database whose
+pages were just dropped from the OS page cache (as after a deploy or a
+reboot), imports the app and sends a few chat turns with the fake model:
+the passenger's flights, a policy question and a flight search. With the
+warm-up, ``WarmUp.run`` (what the startup hook runs before ``/readyz``
+reports ready) completes first. Reports the import time, the warm-up time
+and the latency of every turn; the second round repeats the turns for other
+passengers, i.e. warm latency.
+
+Usage:
+    python -m benchmarks.cold_start [--flights 200000] [--runs 3]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from benchmarks.common import make_travel_db
+from src.utils.db_init import prepare_database
+
+ROOT = Path(__file__).parent.parent
+
+MESSAGES = ["Show me my flights", "What is the baggage policy?", "Find flights from ZRH to CDG"]
+
+RUN_SNIPPET = """
+import json, sys, time
+from benchmarks.common import passenger_id
+t0 = time.perf_counter()
+from fastapi.testclient import TestClient
+import src.app as app_module
+t1 = time.perf_counter()
+if sys.argv[1] == "warm":
+    assert app_module.warmup.run(), app_module.warmup.status()
+t2 = time.perf_counter()
+# No context manager: the lifespan, and so a second warm-up, does not run
+client = TestClient(app_module.app)
+turns = []
+for round_ in range(2):
+    for i, message in enumerate(json.loads(sys.argv[2])):
+        start = time.perf_counter()
+        response = client.post("/chat", json={
+            "message": message, "config": {"passenger_id": passenger_id(round_ * 100 + i)},
+        })
+        response.raise_for_status()
+        turns.append(time.perf_counter() - start)
+print(json.dumps({"import": t1 - t0, "warmup": t2 - t1, "turns": turns}))
+"""
+
+
+def drop_page_cache(path: str) -> None:
+    """Evict a file's pages from the OS page cache (Linux; no-op elsewhere)."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(fd)
+
+
+def run(mode: str, db: str, env: dict) -> dict:
+    for path in (db, db + "-wal"):
+        if os.path.exists(path):
+            drop_page_cache(path)
+    proc = subprocess.run(
+        [sys.executable, "-c", RUN_SNIPPET, mode, json.dumps(MESSAGES)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return json.loads(proc.stdout.splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--flights", type=int, default=200000)
+    parser.add_argument("--runs", type=int, default=3, help="Fresh processes per mode (medians are reported)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = make_travel_db(os.path.join(tmp, "travel2.sqlite"), args.flights, 1000)
+        prepare_database(db)
+        env = {
+            **os.environ, "PYTHONPATH": str(ROOT), "DATABASE_PATH": db, "LLM_PROVIDER": "fake",
+            "MEMORY_TYPE": "simple", "TAVILY_API_KEY": os.getenv("TAVILY_API_KEY", "benchmark"),
+            "WARMUP_INIT_DB": "false",
+        }
+        print(f"database {os.path.getsize(db) / 2**20:.1f} MiB, {args.flights} flights, page cache dropped per run")
+        for mode in ("cold", "warm"):
+            results = [run(mode, db, env) for _ in range(args.runs)]
+            median = lambda values: statistics.median(values) * 1000
+            turns = [median([r["turns"][i] for r in results]) for i in range(2 * len(MESSAGES))]
+            print(f"\n{mode}: import {median([r['import'] for r in results]):8.1f} ms   "
+                  f"warm-up {median([r['warmup'] for r in results]):8.1f} ms")
+            for i, message in enumerate(MESSAGES):
+                print(f"  {message:<32} first {turns[i]:8.1f} ms   again {turns[len(MESSAGES) + i]:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Shared helpers for the benchmarks: timing statistics and a travel2-shaped database."""
+import random
+import sqlite3
+import statistics
+import time
+from datetime import datetime, timedelta, timezone
+
+from src.utils.synthetic_db import TRAVEL2_SCHEMA, passenger_id, timestamp  # noqa: F401
+
+AIRPORTS = [
+    "ZRH", "BSL", "GVA", "CDG", "AMS", "FRA", "MUC", "LHR", "FCO", "MAD",
+    "BCN", "VIE", "CPH", "OSL", "ARN", "HEL", "DUB", "LIS", "PRG", "WAW",
+]
+CITIES = ["Zurich", "Basel", "Geneva", "Paris", "Amsterdam", "Frankfurt", "Munich", "London", "Rome", "Madrid"]
+FARE_CONDITIONS = ["Economy", "Comfort", "Business"]
+
+
+def make_travel_db(path: str, n_flights: int = 2000, n_passengers: int = 500, seed: int = 0) -> str:
+    """
+    Create an SQLite database with the travel2 schema filled with uniform random rows.
+
+    A small fixture with exact row counts (one ticket per passenger
+    ``passenger_id(i)``, 200 hotels in ``CITIES``). Like the downloaded
+    travel2 database, the tables have no indexes. For realistic data at
+    scale, use ``src.utils.synthetic_db.generate_travel_db``.
+    """
+    rng = random.Random(seed)
+    tz = timezone(timedelta(hours=-4))
+    start = datetime.now(tz).replace(minute=0, second=0, microsecond=0) - timedelta(days=2)
+
+    conn = sqlite3.connect(path)
+    conn.executescript(TRAVEL2_SCHEMA)
+    conn.executemany("INSERT INTO aircrafts_data VALUES (?, ?, ?)", [
+        ("319", "Airbus A319-100", 6700), ("773", "Boeing 777-300", 11100),
+    ])
+    seats = []
+    for code, rows in (("319", 20), ("773", 40)):
+        for row in range(1, rows + 1):
+            fare = "Business" if row <= 3 else "Comfort" if row <= 6 else "Economy"
+            seats += [(code, f"{row}{letter}", fare) for letter in "ABCDEF"]
+    conn.executemany("INSERT INTO seats VALUES (?, ?, ?)", seats)
+    conn.executemany("INSERT INTO airports_data VALUES (?, ?, ?, ?, ?)", [
+        (code, f"{code} Airport", CITIES[i % len(CITIES)], "(0,0)", "Europe/Zurich")
+        for i, code in enumerate(AIRPORTS)
+    ])
+
+    flights = []
+    for flight_id in range(1, n_flights + 1):
+        departure_airport, arrival_airport = rng.sample(AIRPORTS, 2)
+        departure = start + timedelta(minutes=rng.randrange(0, 60 * 24 * 30), microseconds=rng.randrange(1, 10**6))
+        arrival = departure + timedelta(minutes=rng.randrange(45, 300))
+        flights.append((
+            flight_id, f"LX{flight_id % 9000:04d}", timestamp(departure), timestamp(arrival),
+            departure_airport, arrival_airport, "Scheduled", rng.choice(["319", "773"]), "\\N", "\\N",
+        ))
+    conn.executemany("INSERT INTO flights VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", flights)
+
+    bookings, tickets, ticket_flights, boarding_passes = [], [], [], []
+    for index in range(n_passengers):
+        book_ref = f"{index:06X}"
+        ticket_no = f"{7240005432000 + index:013d}"
+        flight_id = rng.randrange(1, n_flights + 1)
+        bookings.append((book_ref, timestamp(start), rng.randrange(10000, 200000)))
+        tickets.append((ticket_no, book_ref, passenger_id(index)))
+        ticket_flights.append((ticket_no, flight_id, rng.choice(FARE_CONDITIONS), rng.randrange(3000, 90000)))
+        boarding_passes.append((ticket_no, flight_id, index + 1, f"{rng.randrange(1, 20)}{rng.choice('ABCDEF')}"))
+    conn.executemany("INSERT INTO bookings VALUES (?, ?, ?)", bookings)
+    conn.executemany("INSERT INTO tickets VALUES (?, ?, ?)", tickets)
+    conn.executemany("INSERT INTO ticket_flights VALUES (?, ?, ?, ?)", ticket_flights)
+    conn.executemany("INSERT INTO boarding_passes VALUES (?, ?, ?, ?)", boarding_passes)
+
+    tiers = ["Economy", "Midscale", "Upscale", "Luxury"]
+    conn.executemany("INSERT INTO hotels VALUES (?, ?, ?, ?, ?, ?, 0)", [
+        (i, f"Hotel {i}", CITIES[i % len(CITIES)], tiers[i % len(tiers)], "2024-04-01", "2024-04-05")
+        for i in range(1, 201)
+    ])
+    conn.executemany("INSERT INTO car_rentals VALUES (?, ?, ?, ?, ?, ?, 0)", [
+        (i, f"Rental {i}", CITIES[i % len(CITIES)], tiers[i % len(tiers)], "2024-04-01", "2024-04-05")
+        for i in range(1, 201)
+    ])
+    conn.executemany("INSERT INTO trip_recommendations VALUES (?, ?, ?, ?, ?, 0)", [
+        (i, f"Tour {i}", CITIES[i % len(CITIES)], "history, art, food", f"Guided tour number {i}")
+        for i in range(1, 201)
+    ])
+    conn.commit()
+    conn.close()
+    return path
+
+
+class Timer:
+    """Collect wall-clock samples in seconds."""
+
+    def __init__(self):
+        self.samples = []
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.samples.append(time.perf_counter() - self._start)
+
+
+def percentile(samples: list[float], q: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def summarize(samples: list[float], unit: float = 1000.0) -> dict:
+    """Mean and percentiles of ``samples`` scaled by ``unit`` (milliseconds by default)."""
+    return {
+        "n": len(samples),
+        "mean": statistics.fmean(samples) * unit,
+        "p50": percentile(samples, 50) * unit,
+        "p95": percentile(samples, 95) * unit,
+        "p99": percentile(samples, 99) * unit,
+        "max": max(samples) * unit,
+    }
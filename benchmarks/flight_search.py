@@ -0,0 +1,113 @@
+"""
+Flight search benchmark: route + departure window queries.
+
+Compares the original ``search_flights`` query (text comparison, no index, no
+ORDER BY), the same search in SQL over the epoch columns and route index, and
+the in-memory ``FlightIndex``. By default a synthetic database the size of
+travel2's flights table is generated; ``--db`` benchmarks a copy of a real
+travel2 database instead.
+
+Usage:
+    python -m benchmarks.flight_search [--db data/travel2.sqlite] [--queries 2000]
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import Timer, make_travel_db, summarize
+from src.flights.index import FlightIndex
+from src.utils.db_init import prepare_database
+
+
+def legacy_search(conn, departure_airport, arrival_airport, start_time, end_time, limit=20):
+    query = "SELECT * FROM flights WHERE 1 = 1"
+    params = []
+    if departure_airport:
+        query += " AND departure_airport = ?"
+        params.append(departure_airport)
+    if arrival_airport:
+        query += " AND arrival_airport = ?"
+        params.append(arrival_airport)
+    if start_time:
+        query += " AND scheduled_departure >= ?"
+        params.append(start_time.isoformat(sep=" "))
+    if end_time:
+        query += " AND scheduled_departure <= ?"
+        params.append(end_time.isoformat(sep=" "))
+    query += " LIMIT ?"
+    params.append(limit)
+    return conn.execute(query, params).fetchall()
+
+
+def epoch_sql_search(conn, departure_airport, arrival_airport, start_time, end_time, limit=20):
+    return conn.execute(
+        "SELECT * FROM flights WHERE departure_airport = ? AND arrival_airport = ? "
+        "AND scheduled_departure_ts BETWEEN ? AND ? ORDER BY scheduled_departure_ts, flight_id LIMIT ?",
+        (departure_airport, arrival_airport, int(start_time.timestamp()), int(end_time.timestamp()), limit),
+    ).fetchall()
+
+
+def make_queries(conn, n: int, seed: int = 0) -> list[tuple]:
+    routes = conn.execute("SELECT DISTINCT departure_airport, arrival_airport FROM flights").fetchall()
+    first, last = conn.execute("SELECT MIN(scheduled_departure), MAX(scheduled_departure) FROM flights").fetchone()
+    first, last = datetime.fromisoformat(first), datetime.fromisoformat(last)
+    rng = random.Random(seed)
+    queries = []
+    for _ in range(n):
+        start = first + (last - first) * rng.random()
+        queries.append((*rng.choice(routes), start, start + timedelta(days=rng.choice([1, 3, 7]))))
+    return queries
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", help="travel2 database to copy instead of generating one")
+    parser.add_argument("--flights", type=int, default=33121)
+    parser.add_argument("--queries", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "travel2.sqlite")
+        if args.db:
+            shutil.copy(args.db, path)
+        else:
+            make_travel_db(path, n_flights=args.flights)
+
+        conn = sqlite3.connect(path)
+        queries = make_queries(conn, args.queries)
+        legacy = Timer()
+        for query in queries:
+            with legacy:
+                legacy_search(conn, *query)
+        conn.close()
+
+        prepare_database(path)
+        start = time.perf_counter()
+        index = FlightIndex.load(path)
+        load_ms = (time.perf_counter() - start) * 1000
+
+        conn = sqlite3.connect(path)
+        epoch_sql = Timer()
+        for query in queries:
+            with epoch_sql:
+                epoch_sql_search(conn, *query)
+        conn.close()
+
+        in_memory = Timer()
+        for query in queries:
+            with in_memory:
+                index.search(*query)
+
+        print(f"{len(index)} flights, {args.queries} route + window queries, index load {load_ms:.0f} ms")
+        for name, timer in (("legacy sql", legacy), ("epoch sql", epoch_sql), ("flight index", in_memory)):
+            stats = summarize(timer.samples)
+            print(f"  {name:<13} p50 {stats['p50']:8.3f} ms  p99 {stats['p99']:8.3f} ms  mean {stats['mean']:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Import-time benchmark for the chatbot modules.
+
+Runs ``python -X importtime`` in a fresh interpreter for each target module and
+reports the cumulative import cost, the slowest imports, and the time taken by
+the first and the cached ``build_graph()`` call.
+
+Usage:
+    python -m benchmarks.import_time [--top 15] [--module src.chatbot.flow ...]
+"""
+import argparse
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).parent.parent
+
+BUILD_SNIPPET = """
+import time
+t0 = time.perf_counter()
+from src.chatbot.flow import build_graph
+t1 = time.perf_counter()
+build_graph()
+t2 = time.perf_counter()
+build_graph()
+t3 = time.perf_counter()
+print(f"{t1 - t0:.6f} {t2 - t1:.6f} {t3 - t2:.6f}")
+"""
+
+
+def parse_importtime(stderr: str) -> list[tuple[int, int, str]]:
+    """Parse ``-X importtime`` output into (self_us, cumulative_us, module) rows."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append((int(self_us), int(cumulative_us), name.rstrip()))
+    return rows
+
+
+def measure_import(module: str, env: dict) -> list[tuple[int, int, str]]:
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    return parse_importtime(proc.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--module", action="append", help="Module to import (repeatable)")
+    parser.add_argument("--top", type=int, default=15, help="Number of slowest imports to show")
+    args = parser.parse_args()
+    modules = args.module or ["src.chatbot.flow", "src.app"]
+
+    env = {**os.environ, "GROQ_API_KEY": os.getenv("GROQ_API_KEY", "benchmark"),
+           "TAVILY_API_KEY": os.getenv("TAVILY_API_KEY", "benchmark")}
+
+    for module in modules:
+        rows = measure_import(module, env)
+        top_level = next(r for r in reversed(rows) if r[2].strip() == module)
+        print(f"\n{module}: {top_level[1] / 1000:.1f} ms cumulative, {len(rows)} modules")
+        heavy = {"langchain_groq", "langchain_community", "tkinter", "groq", "tavily"}
+        loaded = sorted(h for h in heavy if any(r[2].strip() == h for r in rows))
+        print(f"  heavy modules loaded: {', '.join(loaded) or 'none'}")
+        print(f"  top {args.top} by cumulative time:")
+        for self_us, cumulative_us, name in sorted(rows, key=lambda r: -r[1])[:args.top]:
+            print(f"    {cumulative_us / 1000:9.1f} ms  {self_us / 1000:7.1f} ms self  {name.strip()}")
+
+    proc = subprocess.run(
+        [sys.executable, "-c", BUILD_SNIPPET],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    )
+    import_s, first_s, cached_s = map(float, proc.stdout.split())
+    print("\nbuild_graph():")
+    print(f"  import flow     {import_s * 1000:9.1f} ms")
+    print(f"  first build     {first_s * 1000:9.1f} ms")
+    print(f"  cached build    {cached_s * 1000:9.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
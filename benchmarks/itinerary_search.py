@@ -0,0 +1,70 @@
+"""
+Connecting itinerary search benchmark over every airport pair.
+
+Loads the flight index of a synthetic travel2-sized database (or a copy of a
+real one with ``--db``) and runs ``ItinerarySearch`` for every ordered pair
+of airports with a one-day departure window, reporting latency percentiles
+and how many pairs had a direct, one-stop or two-stop best itinerary.
+
+Usage:
+    python -m benchmarks.itinerary_search [--db data/travel2.sqlite] [--max-stops 2]
+"""
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from itertools import permutations
+
+from benchmarks.common import Timer, make_travel_db, summarize
+from src.flights.index import FlightIndex
+from src.flights.itineraries import ItinerarySearch
+
+# p99 latency target in milliseconds
+TARGET_P99_MS = 50.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--db", help="travel2 database to copy instead of generating one")
+    parser.add_argument("--flights", type=int, default=33121)
+    parser.add_argument("--max-stops", type=int, default=2)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "travel2.sqlite")
+        if args.db:
+            shutil.copy(args.db, path)
+        else:
+            make_travel_db(path, n_flights=args.flights)
+        index = FlightIndex.load(path)
+
+    start = time.perf_counter()
+    search = ItinerarySearch(index, max_stops=args.max_stops)
+    airports = sorted(search.neighbours)
+    for airport in airports:
+        search.reachable(airport)
+    setup_ms = (time.perf_counter() - start) * 1000
+
+    window_start = datetime.fromtimestamp(index.departures[len(index) // 2], timezone.utc)
+    timer, best_stops, found = Timer(), Counter(), 0
+    for origin, destination in permutations(airports, 2):
+        with timer:
+            itineraries = search.search(origin, destination, window_start, None, args.limit)
+        found += len(itineraries)
+        best_stops[itineraries[0]["stops"] if itineraries else "none"] += 1
+
+    stats = summarize(timer.samples)
+    ok = stats["p99"] <= TARGET_P99_MS
+    print(f"{len(index)} flights, {len(airports)} airports, {stats['n']} pairs, setup {setup_ms:.0f} ms")
+    print(f"  latency p50 {stats['p50']:.2f} ms p95 {stats['p95']:.2f} ms p99 {stats['p99']:.2f} ms "
+          f"max {stats['max']:.2f} ms (target p99 <= {TARGET_P99_MS} ms: {'ok' if ok else 'MISSED'})")
+    print(f"  {found} itineraries; best itinerary stops per pair: {dict(best_stops)}")
+    raise SystemExit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,353 @@
+"""
+Load test of the API: concurrent conversation mixes against a booted server, reported as JSON.
+
+Generates a large travel2-compatible database (``generate_travel_db`` at
+``--scale`` times travel2's size), starts ``gunicorn -c
+deployment/gunicorn.conf.py src.app:app`` on it with the fake chat model and
+the fake web search (``LLM_PROVIDER=fake``, ``SEARCH_PROVIDER=fake``), waits
+for ``/readyz`` and has ``--clients`` simulated users play conversations
+back to back for ``--duration`` seconds. Each conversation is drawn from
+``--mix`` (scenario=weight):
+
+- flight_lookup: the passenger's flights, a policy question, a web search
+- rebooking: a flight change, moving a ticket to another flight, approving
+  the pending tool call
+- hotel_search: hotels in a city and a thank-you
+
+Everything runs offline on one machine and the draws are seeded, so runs are
+repeatable. The first ``--warmup`` seconds are not measured; server memory
+(RSS of the master and its workers, Linux ``/proc``) is sampled from the end
+of the warm-up on. The report has throughput, latency percentiles per
+scenario and turn, error rates (HTTP errors, and replies without the
+expected approval or booking) and memory growth.
+
+Usage:
+    python -m benchmarks.load_test [--clients 16] [--duration 60] [--warmup 10] \\
+        [--mix flight_lookup=5,rebooking=2,hotel_search=3] [--scale 5] [--workers 1] \\
+        [--llm-latency 0.05] [--search-latency 0.2] [--env CHAT_MAX_IN_FLIGHT=32] [--output report.json]
+"""
+import argparse
+import json
+import os
+import random
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.common import summarize
+from config.config import parse_mapping
+from src.utils.db_init import prepare_database
+from src.utils.synthetic_db import generate_travel_db
+
+ROOT = Path(__file__).parent.parent
+
+# Rebooking targets leave at least this long from now, clear of the 3-hour rule,
+# and have free seats in the ticket's fare
+REBOOK_MARGIN_SECONDS = 6 * 3600
+
+
+def flight_lookup(rng, data, passenger) -> list:
+    city = rng.choice(data["cities"])
+    return [
+        ("Show me my flights", None),
+        ("What is the baggage policy?", None),
+        (f"Any travel advisories for {city}?", None),
+    ]
+
+
+def rebooking(rng, data, passenger) -> list:
+    ticket_no, fare = data["tickets"][passenger]
+    flight_id = rng.choice(data["targets"][fare])
+    return [
+        ("I need to change my flight", None),
+        (f"Move ticket {ticket_no} to flight {flight_id}", lambda body: bool(body["pending_approval"])),
+        ("y", lambda body: any("successfully" in m["content"] for m in body["messages"])),
+        ("Thanks", None),
+    ]
+
+
+def hotel_search(rng, data, passenger) -> list:
+    return [(f"Which hotels are there in {rng.choice(data['cities'])}?", None), ("Thanks", None)]
+
+
+SCENARIOS = {"flight_lookup": flight_lookup, "rebooking": rebooking, "hotel_search": hotel_search}
+
+
+def load_data(db: str) -> dict:
+    """
+    Passengers with a single-leg ticket and its fare, future flights with
+    free seats per fare to rebook onto, and hotel cities.
+    """
+    conn = sqlite3.connect(db)
+    try:
+        tickets = {passenger: (ticket, fare) for passenger, ticket, fare in conn.execute("""
+            SELECT t.passenger_id, t.ticket_no, MAX(tf.fare_conditions) FROM tickets t
+            JOIN ticket_flights tf ON tf.ticket_no = t.ticket_no
+            GROUP BY t.ticket_no HAVING COUNT(*) = 1 ORDER BY t.ticket_no
+        """)}
+        targets = {}
+        for flight_id, fare in conn.execute("""
+            SELECT i.flight_id, i.fare_conditions FROM seat_inventory i JOIN flights f ON f.flight_id = i.flight_id
+            WHERE i.capacity - i.booked >= 5 AND f.scheduled_departure_ts > ? AND f.status != 'Cancelled'
+            ORDER BY i.flight_id
+        """, (int(time.time()) + REBOOK_MARGIN_SECONDS,)):
+            targets.setdefault(fare, []).append(flight_id)
+        cities = [row[0] for row in conn.execute("SELECT DISTINCT location FROM hotels ORDER BY location")]
+    finally:
+        conn.close()
+    return {"tickets": tickets, "passengers": list(tickets), "targets": targets, "cities": cities}
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def process_tree(pid: int) -> list[int]:
+    """``pid`` and its descendants (Linux)."""
+    pids, index = [pid], 0
+    while index < len(pids):
+        for path in Path(f"/proc/{pids[index]}/task").glob("*/children"):
+            try:
+                pids += [int(child) for child in path.read_text().split()]
+            except OSError:
+                pass
+        index += 1
+    return pids
+
+
+def rss_mb(pid: int) -> float:
+    """Resident memory of ``pid`` and its descendants in MiB; 0 where /proc is unavailable."""
+    total = 0
+    for child in process_tree(pid):
+        try:
+            for line in Path(f"/proc/{child}/status").read_text().splitlines():
+                if line.startswith("VmRSS:"):
+                    total += int(line.split()[1])
+        except OSError:
+            pass
+    return total / 1024
+
+
+def start_server(port: int, workers: int, env: dict) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "deployment/gunicorn.conf.py", "src.app:app"],
+        cwd=ROOT,
+        env={**os.environ, **env, "WEB_CONCURRENCY": str(workers), "BIND": f"127.0.0.1:{port}"},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 300
+    while time.monotonic() < deadline and server.poll() is None:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/readyz", timeout=1).status_code == 200:
+                return server
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("the server did not become ready")
+
+
+class Recorder:
+    """Latencies and outcomes of the measured turns and conversations, shared by the clients."""
+
+    def __init__(self, mix: dict):
+        self.lock = threading.Lock()
+        self.measuring = False
+        self.latencies = {scenario: {} for scenario in mix}
+        self.errors = {scenario: {} for scenario in mix}
+        self.conversations = {scenario: {"completed": 0, "failed": 0} for scenario in mix}
+
+    def turn(self, scenario: str, index: int, elapsed: float, outcome: str) -> None:
+        with self.lock:
+            if not self.measuring:
+                return
+            self.latencies[scenario].setdefault(f"turn_{index + 1}", []).append(elapsed)
+            if outcome != "ok":
+                errors = self.errors[scenario]
+                errors[outcome] = errors.get(outcome, 0) + 1
+
+    def conversation(self, scenario: str, ok: bool) -> None:
+        with self.lock:
+            if self.measuring:
+                self.conversations[scenario]["completed" if ok else "failed"] += 1
+
+    def scenario(self, scenario: str) -> dict:
+        by_turn = self.latencies[scenario]
+        samples = [s for values in by_turn.values() for s in values]
+        errors = self.errors[scenario]
+        return {
+            **self.conversations[scenario],
+            "turns": len(samples),
+            "latency_ms": summarize(samples) if samples else {},
+            "latency_ms_by_turn": {turn: summarize(values) for turn, values in sorted(by_turn.items())},
+            "errors": errors,
+            "error_rate": sum(errors.values()) / len(samples) if samples else 0.0,
+        }
+
+
+def client(url: str, data: dict, mix: dict, seed: int, deadline: float, next_passenger, recorder: Recorder) -> None:
+    rng = random.Random(seed)
+    names, weights = list(mix), list(mix.values())
+    with httpx.Client(base_url=url, timeout=120) as http:
+        while time.monotonic() < deadline:
+            scenario = rng.choices(names, weights)[0]
+            passenger = next_passenger()
+            config = {"passenger_id": passenger}
+            ok = True
+            for index, (message, check) in enumerate(SCENARIOS[scenario](rng, data, passenger)):
+                start = time.perf_counter()
+                try:
+                    response = http.post("/chat", json={"message": message, "config": config})
+                    outcome = "ok" if response.status_code == 200 else f"http_{response.status_code}"
+                except httpx.TransportError as e:
+                    response, outcome = None, type(e).__name__
+                if outcome == "ok":
+                    body = response.json()
+                    config["thread_id"] = body["thread_id"]
+                    if check is not None and not check(body):
+                        outcome = "unexpected_reply"
+                recorder.turn(scenario, index, time.perf_counter() - start, outcome)
+                if outcome != "ok":
+                    ok = False
+                    break
+            recorder.conversation(scenario, ok)
+
+
+def run(url: str, pid: int, data: dict, args, mix: dict) -> dict:
+    recorder = Recorder(mix)
+    counter = iter(range(10**9))
+    lock = threading.Lock()
+
+    def next_passenger() -> str:
+        # Round robin, so concurrent conversations belong to different passengers
+        with lock:
+            return data["passengers"][next(counter) % len(data["passengers"])]
+
+    deadline = time.monotonic() + args.warmup + args.duration
+    threads = [
+        threading.Thread(target=client, args=(url, data, mix, args.seed + i, deadline, next_passenger, recorder))
+        for i in range(args.clients)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.warmup)
+    with recorder.lock:
+        recorder.measuring = True
+    start = time.perf_counter()
+    memory = [rss_mb(pid)]
+    while any(thread.is_alive() for thread in threads):
+        time.sleep(args.sample_interval)
+        memory.append(rss_mb(pid))
+    elapsed = time.perf_counter() - start
+    for thread in threads:
+        thread.join()
+    with recorder.lock:
+        recorder.measuring = False
+
+    samples = [s for by_turn in recorder.latencies.values() for values in by_turn.values() for s in values]
+    errors = sum(sum(counts.values()) for counts in recorder.errors.values())
+    conversations = sum(sum(counts.values()) for counts in recorder.conversations.values())
+    growth = memory[-1] - memory[0]
+    return {
+        "elapsed_s": elapsed,
+        "throughput": {
+            "turns_per_s": len(samples) / elapsed,
+            "conversations_per_s": conversations / elapsed,
+        },
+        "turns": len(samples),
+        "conversations": conversations,
+        "latency_ms": summarize(samples) if samples else {},
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "scenarios": {scenario: recorder.scenario(scenario) for scenario in mix},
+        "memory_mb": {
+            "start": memory[0],
+            "peak": max(memory),
+            "end": memory[-1],
+            "growth": growth,
+            "growth_per_1k_conversations": growth * 1000 / conversations if conversations else 0.0,
+            "samples": len(memory),
+        },
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--clients", type=int, default=16, help="Simulated users, each playing one conversation at a time")
+    parser.add_argument("--duration", type=float, default=60, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=10, help="Seconds of load before measuring")
+    parser.add_argument("--mix", default="flight_lookup=5,rebooking=2,hotel_search=3",
+                        help=f"Scenario weights; scenarios: {', '.join(SCENARIOS)}")
+    parser.add_argument("--scale", type=float, default=5, help="Database size, 1 = travel2's row counts")
+    parser.add_argument("--workers", type=int, default=1, help="gunicorn worker processes")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Simulated seconds per LLM call")
+    parser.add_argument("--search-latency", type=float, default=0.2, help="Simulated seconds per web search")
+    parser.add_argument("--env", action="append", default=[], metavar="NAME=VALUE",
+                        help="Extra server setting, e.g. CHAT_MAX_IN_FLIGHT=32 (repeatable)")
+    parser.add_argument("--sample-interval", type=float, default=1.0, help="Seconds between memory samples")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the JSON report to this file")
+    args = parser.parse_args()
+
+    mix = {name: float(weight) for name, weight in parse_mapping(args.mix).items()}
+    unknown = set(mix) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        started = time.perf_counter()
+        db = generate_travel_db(os.path.join(tmp, "travel2.sqlite"), args.scale, args.seed)
+        prepare_database(db)
+        generated = time.perf_counter() - started
+        size_mb = os.path.getsize(db) / 2**20
+        data = load_data(db)
+        env = {
+            "DATABASE_PATH": db,
+            "CHECKPOINT_DB": os.path.join(tmp, "checkpoints.sqlite"),
+            "MEMORY_TYPE": "sqlite" if args.workers > 1 else "simple",
+            "LLM_PROVIDER": "fake",
+            "SEARCH_PROVIDER": "fake",
+            "FAKE_LLM_LATENCY": f"*={args.llm_latency}",
+            "FAKE_SEARCH_LATENCY": str(args.search_latency),
+            **dict(setting.split("=", 1) for setting in args.env),
+        }
+        port = free_port()
+        server = start_server(port, args.workers, env)
+        try:
+            results = run(f"http://127.0.0.1:{port}", server.pid, data, args, mix)
+            metrics = httpx.get(f"http://127.0.0.1:{port}/metrics", timeout=10).json()
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait()
+
+    report = {
+        "settings": {
+            "clients": args.clients, "duration_s": args.duration, "warmup_s": args.warmup, "mix": mix,
+            "scale": args.scale, "workers": args.workers,
+            "llm_latency_s": args.llm_latency, "search_latency_s": args.search_latency,
+            "seed": args.seed, "cpus": os.cpu_count(),
+            "server_env": {k: v for k, v in env.items() if k not in ("DATABASE_PATH", "CHECKPOINT_DB")},
+        },
+        "database": {"generated_s": generated, "size_mb": size_mb},
+        **results,
+        # Counters of the worker that answered (one of them with several workers)
+        "server_metrics": metrics["counters"],
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
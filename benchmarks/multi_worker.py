@@ -0,0 +1,118 @@
+"""
+Chat throughput of the API with one and several gunicorn worker processes.
+
+Starts ``gunicorn -c deployment/gunicorn.conf.py`` against a synthetic travel
+database with the fake chat provider and ``MEMORY_TYPE=sqlite``, then sends
+concurrent multi-turn conversations to ``/chat``. Every turn after the first
+reuses the conversation's thread_id, so turns of one conversation land on
+different workers and must find their checkpoints in the shared store.
+Reports throughput and latency per worker count.
+
+Usage:
+    python -m benchmarks.multi_worker [--workers 1 2 4] [--clients 16] [--conversations 64]
+"""
+import argparse
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import httpx
+
+from benchmarks.common import Timer, make_travel_db, passenger_id, summarize
+
+ROOT = Path(__file__).parent.parent
+TURNS = ["Hello", "What is the baggage policy?", "Thanks, that is all."]
+
+
+def start_server(workers: int, port: int, env: dict) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "deployment/gunicorn.conf.py", "src.app:app"],
+        cwd=ROOT,
+        env={**os.environ, **env, "WEB_CONCURRENCY": str(workers), "BIND": f"127.0.0.1:{port}"},
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"gunicorn with {workers} workers did not start")
+
+
+def run(url: str, clients: int, conversations: int) -> dict:
+    timer = Timer()
+    failures = [0]
+    lock = threading.Lock()
+    queue = list(range(conversations))
+
+    def client():
+        with httpx.Client(base_url=url, timeout=120) as http:
+            while True:
+                with lock:
+                    if not queue:
+                        return
+                    index = queue.pop()
+                config = {"passenger_id": passenger_id(index)}
+                for turn in TURNS:
+                    with timer:
+                        response = http.post("/chat", json={"message": turn, "config": config})
+                    if response.status_code != 200:
+                        with lock:
+                            failures[0] += 1
+                        break
+                    config["thread_id"] = response.json()["thread_id"]
+
+    threads = [threading.Thread(target=client) for _ in range(clients)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    return {"throughput": len(timer.samples) / elapsed, "failures": failures[0], **summarize(timer.samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--conversations", type=int, default=64)
+    parser.add_argument("--llm-latency", type=float, default=0.0, help="Simulated seconds per LLM call")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    print(f"{os.cpu_count()} CPUs, {args.clients} clients, {args.conversations} conversations of {len(TURNS)} turns")
+    with tempfile.TemporaryDirectory() as tmp:
+        db = make_travel_db(os.path.join(tmp, "travel.sqlite"), 2000, 500)
+        baseline = None
+        for workers in args.workers:
+            env = {
+                "DATABASE_PATH": db,
+                "CHECKPOINT_DB": os.path.join(tmp, f"checkpoints-{workers}.sqlite"),
+                "MEMORY_TYPE": "sqlite",
+                "LLM_PROVIDER": "fake",
+                "FAKE_LLM_LATENCY": f"*={args.llm_latency}",
+                "TAVILY_API_KEY": os.getenv("TAVILY_API_KEY", "benchmark"),
+            }
+            server = start_server(workers, args.port, env)
+            try:
+                stats = run(f"http://127.0.0.1:{args.port}", args.clients, args.conversations)
+            finally:
+                server.send_signal(signal.SIGTERM)
+                server.wait()
+            baseline = baseline or stats["throughput"]
+            print(f"{workers} workers {stats['throughput']:8.1f} turns/s ({stats['throughput'] / baseline:4.2f}x) | "
+                  f"p50 {stats['p50']:7.1f} ms p99 {stats['p99']:8.1f} ms | failures {stats['failures']}")
+
+
+if __name__ == "__main__":
+    main()
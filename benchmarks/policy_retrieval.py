@@ -0,0 +1,90 @@
+"""
+Policy retrieval benchmark on a synthetic corpus.
+
+Generates markdown policy documents with a Zipf-distributed vocabulary, builds
+the policy index (BM25 + embeddings), then measures open time and query
+latency for BM25 alone and for BM25 fused with the embedding index.
+
+Usage:
+    python -m benchmarks.policy_retrieval [--passages 2000 10000] [--queries 500]
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.common import Timer, summarize
+from src.retrieval.policy import PolicyIndex, load_passages
+
+# p99 query latency targets in milliseconds
+TARGETS = {"bm25": 5.0, "hybrid": 25.0}
+
+TOPICS = ["baggage", "refund", "pets", "check-in", "seats", "meals", "wifi", "minors", "visa", "upgrade"]
+
+
+def make_corpus(directory: str, n_passages: int, seed: int = 0, words_per_passage: int = 80) -> list[str]:
+    """Write ``n_passages`` sections into markdown files and return sample queries."""
+    rng = random.Random(seed)
+    vocabulary = [f"term{i}" for i in range(20000)]
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    queries = []
+    per_file = 500
+    for file_index in range(0, n_passages, per_file):
+        sections = []
+        for i in range(file_index, min(n_passages, file_index + per_file)):
+            topic = TOPICS[i % len(TOPICS)]
+            words = rng.choices(vocabulary, weights, k=words_per_passage)
+            words[rng.randrange(words_per_passage)] = topic
+            sections.append(f"## {topic.title()} rule {i}\n{' '.join(words)}\n")
+            if len(queries) < 2000:
+                queries.append(f"{topic} {' '.join(rng.sample(words, 3))}")
+        with open(os.path.join(directory, f"policies_{file_index // per_file}.md"), "w") as f:
+            f.write("# Policies\n" + "\n".join(sections))
+    return queries
+
+
+def directory_size(directory: str) -> int:
+    return sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--passages", type=int, nargs="+", default=[2000, 10000])
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("-k", type=int, default=3)
+    args = parser.parse_args()
+
+    failed = False
+    for n_passages in args.passages:
+        with tempfile.TemporaryDirectory() as tmp:
+            docs_dir, index_dir = os.path.join(tmp, "docs"), os.path.join(tmp, "index")
+            os.makedirs(docs_dir)
+            queries = make_corpus(docs_dir, n_passages)
+
+            start = time.perf_counter()
+            passages = load_passages(docs_dir)
+            PolicyIndex.build(passages, index_dir, embeddings=True)
+            build_s = time.perf_counter() - start
+
+            print(f"\n{len(passages)} passages: build {build_s:.2f}s, "
+                  f"index {directory_size(index_dir) / 1e6:.1f} MB")
+            for mode in ("bm25", "hybrid"):
+                start = time.perf_counter()
+                index = PolicyIndex(index_dir, use_embeddings=mode == "hybrid")
+                open_ms = (time.perf_counter() - start) * 1000
+                timer = Timer()
+                for query in (queries * (args.queries // len(queries) + 1))[:args.queries]:
+                    with timer:
+                        index.search(query, args.k)
+                stats = summarize(timer.samples)
+                ok = stats["p99"] <= TARGETS[mode]
+                failed |= not ok
+                print(f"  {mode:<7} open {open_ms:6.1f} ms | query p50 {stats['p50']:.3f} ms "
+                      f"p95 {stats['p95']:.3f} ms p99 {stats['p99']:.3f} ms "
+                      f"(target p99 <= {TARGETS[mode]} ms: {'ok' if ok else 'MISSED'})")
+    raise SystemExit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
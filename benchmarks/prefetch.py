@@ -0,0 +1,73 @@
+"""
+Database time left on the critical path of a rebooking turn, with and without prefetch.
+
+Plays the steps a flight change takes for many passengers of a synthetic
+database: read the passenger's flights (``fetch_user_info``), one model call,
+``search_flights`` on the passenger's route for the next days,
+``check_seat_availability`` on the first result, and a second model call.
+Model calls are sleeps of ``--llm-ms``. With ``--prefetch`` off the queries
+run in sequence with them; with it on, ``Prefetch`` starts when the request
+arrives, so the route query runs during the first model call. Reports the
+turn latency minus the model time, i.e. the database time the user waits for.
+
+Usage:
+    python -m benchmarks.prefetch [--flights 200000] [--turns 300] [--llm-ms 300]
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import Timer, make_travel_db, passenger_id, summarize
+from src.chatbot import tools
+from src.chatbot.prefetch import Prefetch
+from src.flights.index import get_flight_index
+from src.utils.db_init import prepare_database
+
+
+def turn(passenger: str, llm_seconds: float, prefetch: bool) -> None:
+    configurable = {"passenger_id": passenger, "thread_id": passenger}
+    if prefetch:
+        configurable["prefetch"] = Prefetch.start(passenger)
+    config = {"configurable": configurable}
+    flights = tools.passenger_flights(passenger, tools.request_prefetch(config))
+    time.sleep(llm_seconds)
+    found = tools.search_flights.invoke({
+        "departure_airport": flights[0]["departure_airport"],
+        "arrival_airport": flights[0]["arrival_airport"],
+        "start_time": datetime.now().date(),
+        "end_time": datetime.now().date() + timedelta(days=3),
+    }, config)
+    if found:
+        tools.check_seat_availability.invoke({"flight_id": found[0]["flight_id"]}, config)
+    time.sleep(llm_seconds)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--flights", type=int, default=200000)
+    parser.add_argument("--turns", type=int, default=300)
+    parser.add_argument("--llm-ms", type=float, default=300, help="Simulated latency of each model call")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_travel_db(os.path.join(tmp, "travel2.sqlite"), args.flights, args.turns * 2)
+        prepare_database(path)
+        tools.db = path
+        get_flight_index(path)
+        llm_seconds = args.llm_ms / 1000
+        for prefetch in (False, True):
+            timer = Timer()
+            for i in range(args.turns):
+                # Distinct passengers and a cold tool cache: every turn reads the database
+                tools.tool_cache.clear()
+                with timer:
+                    turn(passenger_id(i + (args.turns if prefetch else 0)), llm_seconds, prefetch)
+            stats = summarize([s - 2 * llm_seconds for s in timer.samples])
+            print(f"prefetch {'on ' if prefetch else 'off'} | database time on the critical path: "
+                  f"mean {stats['mean']:6.2f} ms  p50 {stats['p50']:6.2f} ms  p95 {stats['p95']:6.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
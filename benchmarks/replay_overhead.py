@@ -0,0 +1,81 @@
+"""
+Graph and database overhead of chat turns, measured by replaying recorded calls.
+
+Records a set of conversations with the fake chat model at a realistic
+latency (``REPLAY_MODE=record``), then replays the log
+(``REPLAY_MODE=replay``) with the recorded latencies and with none. The
+instant replay leaves only the graph, checkpointer and database work of each
+turn, so changes to them can be compared offline with the traffic shape of
+the recording. Reports per-turn latency for each run.
+
+Usage:
+    python -m benchmarks.replay_overhead [--conversations 40] [--latency 0.2]
+"""
+import argparse
+import os
+import tempfile
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from benchmarks.common import Timer, make_travel_db, passenger_id, summarize
+from config.config import Config
+from src.chatbot import tools
+from src.chatbot.flow import build_graph
+from src.chatbot.interaction import run_turn
+from src.chatbot.replay import log_parts
+from src.utils.db_init import prepare_database
+
+TURNS = [
+    ["Hello", "What is the baggage policy?", "Thanks, that is all."],
+    ["Which hotels are there in Zurich?", "Any car rentals in Zurich?"],
+    ["Show me my flights", "Any tours in Paris?", "Thanks"],
+]
+
+
+def run(config, conversations: int) -> dict:
+    graph = build_graph(config, MemorySaver())
+    timer = Timer()
+    for i in range(conversations):
+        run_config = {"configurable": {"passenger_id": passenger_id(i), "thread_id": f"c{i}"}}
+        for message in TURNS[i % len(TURNS)]:
+            with timer:
+                run_turn(graph, run_config, message)
+    return summarize(timer.samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--conversations", type=int, default=40)
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake model seconds per call while recording")
+    args = parser.parse_args()
+    os.environ.setdefault("TAVILY_API_KEY", "benchmark")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_travel_db(os.path.join(tmp, "travel2.sqlite"), 5000, 1000)
+        prepare_database(path)
+        tools.db = path
+
+        class Recording(Config):
+            LLM_PROVIDER = "fake"
+            INTENT_CLASSIFIER = "off"
+            FAKE_LLM_LATENCY = {"*": args.latency}
+            REPLAY_MODE = "record"
+            REPLAY_LOG = os.path.join(tmp, "replay.jsonl.gz")
+
+        class Replay(Recording):
+            REPLAY_MODE = "replay"
+            REPLAY_LATENCY = 1.0
+
+        class InstantReplay(Replay):
+            REPLAY_LATENCY = 0.0
+
+        for name, config in (("record", Recording), ("replay x1.0", Replay), ("replay instant", InstantReplay)):
+            stats = run(config, args.conversations)
+            print(f"{name:<15} turns {stats['n']:4d} | mean {stats['mean']:7.2f} ms  p50 {stats['p50']:7.2f} ms  "
+                  f"p95 {stats['p95']:7.2f} ms")
+        size = sum(os.path.getsize(part) for part in log_parts(Recording.REPLAY_LOG))
+        print(f"log size {size / 1024:.1f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""
+Availability search and booking throughput of the reservation store.
+
+Fills the hotel, excursion and car rental tables with a year of bookings,
+then times availability searches for random dates against the naive
+queries an interval table without helper structures needs: summing every
+overlapping hotel booking per night, and an overlap ``NOT EXISTS`` over an
+unindexed rental booking table. Finally many writer threads book the same
+hotel nights concurrently and the run checks that no night is overbooked.
+
+Usage:
+    python -m benchmarks.reservation_search [--bookings 20000] [--searches 300] [--writers 16]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from collections import Counter
+from datetime import date, timedelta
+
+from benchmarks.common import CITIES, Timer, make_travel_db, summarize
+from src.reservations import car_rentals, excursions, hotels
+from src.reservations.common import days_between
+from src.utils.db import connect, run_in_transaction
+from src.utils.db_init import prepare_database
+
+START = date(2025, 1, 1)
+
+
+def fill(path: str, n_bookings: int, seed: int) -> None:
+    """Random confirmed bookings over a year, through the store's own write path."""
+    rng = random.Random(seed)
+    conn = connect(path)
+    conn.execute("BEGIN")
+    for i in range(n_bookings):
+        day = START + timedelta(days=rng.randrange(365))
+        kind = i % 3
+        if kind == 0:
+            hotels.book(conn, rng.randrange(1, 201), f"P{i}", day, day + timedelta(days=rng.randrange(1, 6)),
+                        rng.randrange(1, 4))
+        elif kind == 1:
+            excursions.book(conn, rng.randrange(1, 201), f"P{i}", day, rng.randrange(1, 4))
+        else:
+            car_rentals.book(conn, rng.randrange(1, 201), f"P{i}", day, day + timedelta(days=rng.randrange(1, 8)))
+    conn.execute("COMMIT")
+    # The naive car search runs on a copy without the period index
+    conn.execute("CREATE TABLE plain_car_bookings AS SELECT * FROM car_rental_bookings")
+    conn.close()
+
+
+def naive_hotel_search(conn: sqlite3.Connection, location: str, check_in: date, check_out: date, rooms: int):
+    """Free rooms from the bookings alone: every overlapping stay, summed per night in Python."""
+    found = []
+    for hotel_id, capacity in conn.execute(
+        "SELECT h.id, r.rooms FROM hotels h JOIN hotel_rooms r ON r.hotel_id = h.id WHERE h.location LIKE ?",
+        (f"%{location}%",),
+    ).fetchall():
+        taken = Counter()
+        for start, end, booked in conn.execute(
+            """
+            SELECT check_in, check_out, rooms FROM hotel_bookings
+            WHERE hotel_id = ? AND status = 'confirmed' AND check_in < ? AND check_out > ?
+            """,
+            (hotel_id, check_out.isoformat(), check_in.isoformat()),
+        ):
+            overlap = max(date.fromisoformat(start), check_in), min(date.fromisoformat(end), check_out)
+            for night in days_between(*overlap):
+                taken[night] += booked
+        if capacity - max(taken.values(), default=0) >= rooms:
+            found.append(hotel_id)
+    return found
+
+
+def naive_car_search(conn: sqlite3.Connection, location: str, start: date, end: date):
+    return conn.execute(
+        """
+        SELECT c.id FROM car_rentals c WHERE c.location LIKE ? AND NOT EXISTS (
+            SELECT 1 FROM plain_car_bookings b
+            WHERE b.rental_id = c.id AND b.status = 'confirmed' AND b.start_date < ? AND b.end_date > ?
+        )
+        """,
+        (f"%{location}%", end.isoformat(), start.isoformat()),
+    ).fetchall()
+
+
+def time_searches(label: str, search, queries: list) -> None:
+    timer = Timer()
+    for query in queries:
+        with timer:
+            search(*query)
+    stats = summarize(timer.samples)
+    print(f"{label:<28} p50 {stats['p50']:7.3f} ms  p95 {stats['p95']:7.3f} ms  p99 {stats['p99']:7.3f} ms")
+
+
+def concurrent_bookings(path: str, writers: int, attempts: int) -> None:
+    """Writers race for the rooms of one hotel; the store must never sell more than it has."""
+    hotel_id = 1
+    conn = connect(path)
+    capacity = conn.execute("SELECT rooms FROM hotel_rooms WHERE hotel_id = ?", (hotel_id,)).fetchone()[0]
+    conn.close()
+    barrier = threading.Barrier(writers)
+    results = Counter()
+    lock = threading.Lock()
+
+    def worker(index):
+        rng = random.Random(index)
+        barrier.wait()
+        for i in range(attempts):
+            day = date(2026, 1, 1) + timedelta(days=rng.randrange(10))
+            result = run_in_transaction(
+                lambda c: hotels.book(c, hotel_id, f"W{index}-{i}", day, day + timedelta(days=2)), path
+            )
+            with lock:
+                results[result.ok] += 1
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(writers)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    conn = connect(path)
+    busiest = conn.execute(
+        "SELECT MAX(booked) FROM hotel_room_nights WHERE hotel_id = ? AND night >= '2026-01-01'", (hotel_id,)
+    ).fetchone()[0]
+    conn.close()
+    print(
+        f"concurrent bookings          {(results[True] + results[False]) / elapsed:7.0f} attempts/s | "
+        f"booked {results[True]} rejected {results[False]} | busiest night {busiest}/{capacity} rooms"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bookings", type=int, default=20000)
+    parser.add_argument("--searches", type=int, default=300)
+    parser.add_argument("--writers", type=int, default=16)
+    parser.add_argument("--attempts", type=int, default=20, help="Booking attempts per writer")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_travel_db(os.path.join(tmp, "travel2.sqlite"), 1000, 1000)
+        prepare_database(path)
+        fill(path, args.bookings, seed=0)
+
+        rng = random.Random(1)
+        stays = []
+        for _ in range(args.searches):
+            day = START + timedelta(days=rng.randrange(365))
+            stays.append((rng.choice(CITIES), day, day + timedelta(days=rng.randrange(1, 6))))
+
+        conn = connect(path)
+        time_searches("hotels: bookings scan", lambda c, s, e: naive_hotel_search(conn, c, s, e, 2), stays)
+        time_searches("hotels: night counts", lambda c, s, e: hotels.search(conn, c, None, None, s, e, 3), stays)
+        time_searches("cars: unindexed overlap", lambda c, s, e: naive_car_search(conn, c, s, e), stays)
+        time_searches("cars: period index", lambda c, s, e: car_rentals.search(conn, c, None, None, s, e), stays)
+        time_searches("excursions: day slots", lambda c, s, e: excursions.search(conn, c, None, None, s, 2), stays)
+        conn.close()
+
+        concurrent_bookings(path, args.writers, args.attempts)
+
+
+if __name__ == "__main__":
+    main()
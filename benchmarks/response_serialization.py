@@ -0,0 +1,73 @@
+"""
+Encoding cost of large /chat replies: validated model versus direct bytes.
+
+Builds replies with many tool calls and tool messages (as a multi-step
+booking turn produces) and times two ways of turning them into the response
+body: the former path, which validates a ``ChatResponse``, runs it through
+FastAPI's ``jsonable_encoder`` and renders a ``JSONResponse``, and
+``FastJSONResponse``, which encodes the message dicts once with orjson.
+Also checks that both bodies decode to the same JSON.
+
+Usage:
+    python -m benchmarks.response_serialization [--tool-messages 200] [--repeat 200]
+"""
+import argparse
+import json
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from langchain_core.messages import AIMessage, ToolMessage
+
+from benchmarks.common import Timer, summarize
+from src.app import ChatResponse
+from src.chatbot.interaction import reply_messages
+from src.utils.jsonutils import FastJSONResponse
+
+
+def make_reply(tool_messages: int, rows: int) -> dict:
+    new_messages = []
+    for i in range(tool_messages):
+        calls = [{
+            "id": f"call_{i}",
+            "type": "function",
+            "function": {"name": "search_hotels", "arguments": json.dumps({"location": "Basel", "page": i})},
+        }]
+        new_messages.append(AIMessage(content="", additional_kwargs={"tool_calls": calls}))
+        hotels = [{"id": j, "name": f"Hotel {j}", "location": "Basel", "price_tier": "Midscale", "booked": 0}
+                  for j in range(rows)]
+        new_messages.append(ToolMessage(content=str(hotels), tool_call_id=f"call_{i}"))
+    new_messages.append(AIMessage(content="Here are the hotels I found."))
+    return {"messages": reply_messages(new_messages, []), "thread_id": "thread", "pending_approval": []}
+
+
+def validated_body(reply: dict) -> bytes:
+    return JSONResponse(jsonable_encoder(ChatResponse(**reply))).body
+
+
+def direct_body(reply: dict) -> bytes:
+    return FastJSONResponse(reply).body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--tool-messages", type=int, default=200)
+    parser.add_argument("--rows", type=int, default=10, help="Result rows per tool message")
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    reply = make_reply(args.tool_messages, args.rows)
+    assert json.loads(validated_body(reply)) == json.loads(direct_body(reply))
+    print(f"{len(reply['messages'])} messages, {len(direct_body(reply)) / 1024:.1f} KiB body")
+    baseline = None
+    for name, encode in (("ChatResponse + jsonable_encoder", validated_body), ("FastJSONResponse", direct_body)):
+        timer = Timer()
+        for _ in range(args.repeat):
+            with timer:
+                encode(reply)
+        stats = summarize(timer.samples)
+        baseline = baseline or stats["p50"]
+        print(f"{name:<32} p50 {stats['p50']:8.3f} ms  p95 {stats['p95']:8.3f} ms  {baseline / stats['p50']:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""
+Seat availability benchmark: ad-hoc join versus the seat inventory.
+
+For databases with a growing number of sold tickets, checks the free seats
+per fare on random flights, once with the join over flights, seats and
+ticket_flights the tools would otherwise need and once with a primary-key
+lookup in ``seat_inventory``. The inventory lookup should stay flat as
+ticket_flights grows.
+
+Usage:
+    python -m benchmarks.seat_inventory [--passengers 10000 100000 300000] [--checks 2000]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+
+from benchmarks.common import Timer, make_travel_db, summarize
+from src.flights import inventory
+from src.utils.db_init import prepare_database
+
+JOIN_QUERY = """
+SELECT s.fare_conditions,
+       COUNT(*) - (
+           SELECT COUNT(*) FROM ticket_flights tf
+           WHERE tf.flight_id = f.flight_id AND tf.fare_conditions = s.fare_conditions
+       )
+FROM flights f JOIN seats s ON s.aircraft_code = f.aircraft_code
+WHERE f.flight_id = ?
+GROUP BY s.fare_conditions
+"""
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--flights", type=int, default=33121)
+    parser.add_argument("--passengers", type=int, nargs="+", default=[10000, 100000, 300000])
+    parser.add_argument("--checks", type=int, default=2000)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    for n_passengers in args.passengers:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = make_travel_db(os.path.join(tmp, "travel2.sqlite"), args.flights, n_passengers)
+            prepare_database(path)
+            conn = sqlite3.connect(path)
+            flight_ids = [rng.randrange(1, args.flights + 1) for _ in range(args.checks)]
+
+            join, lookup = Timer(), Timer()
+            for flight_id in flight_ids:
+                with join:
+                    expected = dict(conn.execute(JOIN_QUERY, (flight_id,)).fetchall())
+                with lookup:
+                    found = inventory.remaining(conn, flight_id)
+                assert all(found[fare] == left for fare, left in expected.items())
+            conn.close()
+
+        join_stats, lookup_stats = summarize(join.samples), summarize(lookup.samples)
+        print(f"{n_passengers:>7} tickets: join p50 {join_stats['p50']:.3f} ms p99 {join_stats['p99']:.3f} ms | "
+              f"inventory p50 {lookup_stats['p50']:.3f} ms p99 {lookup_stats['p99']:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
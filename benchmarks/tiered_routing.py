@@ -0,0 +1,108 @@
+"""
+End-to-end latency and cost per conversation with and without model tiering.
+
+Runs scripted conversations through the real graph with the fake chat provider
+standing in for Groq. Each model gets a latency profile and a price, so the
+modes differ only in which model (or the local classifier) handles each node:
+
+- single: every assistant node uses the large tool model
+- tiered: primary_assistant routes on the small router model, which passes
+  turns that need tools to the large model
+- tiered+keyword: tiered, plus the local keyword classifier for obvious handoffs
+
+Usage:
+    python -m benchmarks.tiered_routing [--repeat 3] [--time-scale 1.0]
+"""
+import argparse
+import os
+import tempfile
+import uuid
+
+from benchmarks.common import Timer, make_travel_db, passenger_id, summarize
+from config.config import Config
+
+SMALL, LARGE = "llama-3.1-8b-instant", "mixtral-8x7b-32768"
+
+# seconds per call, seconds per output token, $ per 1M input tokens, $ per 1M output tokens
+PROFILES = {
+    SMALL: (0.08, 0.0005, 0.05, 0.08),
+    LARGE: (0.35, 0.004, 0.24, 0.24),
+}
+
+CONVERSATIONS = [
+    ["What is the baggage policy?", "Thanks, that is all."],
+    ["I want to book a hotel in Zurich", "Something upscale please"],
+    ["I need a car rental in Basel"],
+    ["Are there any tours in Geneva?"],
+    ["What time is my flight?"],
+    ["Can I change my flight to next week?"],
+    ["Which flights leave from Basel?"],
+]
+
+MODES = {
+    "single": ({}, "off"),
+    "tiered": ({"primary_assistant": "router"}, "off"),
+    "tiered+keyword": ({"primary_assistant": "router"}, "keyword"),
+}
+
+
+def make_config(mode: str, time_scale: float):
+    tiers, classifier = MODES[mode]
+
+    class BenchmarkConfig(Config):
+        LLM_PROVIDER = "fake"
+        MODEL_TIER_MODELS = {"router": SMALL, "tool": LARGE}
+        MODEL_TIERS = tiers
+        INTENT_CLASSIFIER = classifier
+        FAKE_LLM_LATENCY = {m: p[0] * time_scale for m, p in PROFILES.items()}
+        FAKE_LLM_SECONDS_PER_TOKEN = {m: p[1] * time_scale for m, p in PROFILES.items()}
+        LLM_PRICES = {m: (p[2], p[3]) for m, p in PROFILES.items()}
+
+    BenchmarkConfig.__name__ = f"BenchmarkConfig[{mode}]"
+    return BenchmarkConfig
+
+
+def run_conversation(graph, turns: list[str]) -> dict:
+    """Play ``turns`` and return the thread's usage: every model call, including discarded router replies."""
+    config = {"configurable": {"passenger_id": passenger_id(0), "thread_id": str(uuid.uuid4())}}
+    for turn in turns:
+        graph.invoke({"messages": [("user", turn)]}, config)
+        # Approve every sensitive tool call
+        while graph.get_state(config).next:
+            graph.invoke(None, config)
+    return graph.get_state(config).values.get("usage", {})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=3, help="Runs of each conversation per mode")
+    parser.add_argument("--time-scale", type=float, default=1.0, help="Multiplier for simulated model latency")
+    args = parser.parse_args()
+
+    os.environ.setdefault("TAVILY_API_KEY", "benchmark")
+    from src.chatbot import tools
+    from src.chatbot.flow import build_graph
+    from src.utils.db_init import prepare_database
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tools.db = make_travel_db(os.path.join(tmp, "travel2.sqlite"))
+        prepare_database(tools.db)
+        print(f"{'mode':<16}{'latency mean':>14}{'p95':>10}{'LLM calls':>11}{'tokens':>9}{'cost/conv':>13}")
+        for mode in MODES:
+            graph = build_graph(make_config(mode, args.time_scale))
+            timer, costs, calls, tokens = Timer(), [], [], []
+            for _ in range(args.repeat):
+                for turns in CONVERSATIONS:
+                    with timer:
+                        usage = run_conversation(graph, turns)
+                    costs.append(usage.get("cost", 0.0))
+                    calls.append(usage.get("calls", 0))
+                    tokens.append(usage.get("input", 0) + usage.get("output", 0))
+            stats = summarize(timer.samples)
+            n = len(costs)
+            print(f"{mode:<16}{stats['mean']:>11.0f} ms{stats['p95']:>7.0f} ms{sum(calls) / n:>11.2f}"
+                  f"{sum(tokens) / n:>9.0f}{sum(costs) / n * 1000:>10.4f} m$")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Micro-benchmark of the departure-time check used by the rebooking tools.
+
+Times the 3-hour rule on many stored departures four ways: the original
+``strptime`` with a ``pytz.timezone`` looked up per call, ``fromisoformat``
+with a cached timezone, ``src.utils.timeutils.to_epoch`` on the text, and a
+plain integer comparison on the precomputed ``scheduled_departure_ts``
+column. Also reports how many of the timestamp variants pandas writes back
+(no fraction, ``+0300`` offsets) each parser accepts.
+
+Usage:
+    python -m benchmarks.timestamp_parsing [--n 200000]
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+import pytz
+
+from src.utils.timeutils import now_epoch, to_epoch
+
+VARIANTS = [
+    "2024-05-03 11:31:03.561731-04:00",
+    "2024-05-03 11:31:03-04:00",
+    "2024-05-03 18:31:03.561731+0300",
+    "2024-05-03T15:31:03.561731+00:00",
+]
+TZ = ZoneInfo("Etc/GMT-3")
+
+
+def legacy_too_soon(departure: str) -> bool:
+    current_time = datetime.now(tz=pytz.timezone("Etc/GMT-3"))
+    departure_time = datetime.strptime(departure, "%Y-%m-%d %H:%M:%S.%f%z")
+    return (departure_time - current_time).total_seconds() < 3 * 3600
+
+
+def isoformat_too_soon(departure: str) -> bool:
+    return (datetime.fromisoformat(departure) - datetime.now(TZ)).total_seconds() < 3 * 3600
+
+
+def epoch_text_too_soon(departure: str) -> bool:
+    return to_epoch(departure) - now_epoch() < 3 * 3600
+
+
+def accepted(check) -> int:
+    count = 0
+    for value in VARIANTS:
+        try:
+            check(value)
+            count += 1
+        except ValueError:
+            pass
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--n", type=int, default=200000, help="Departures checked per variant")
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    tz = timezone(timedelta(hours=-4))
+    now = datetime.now(tz)
+    moments = [now + timedelta(minutes=rng.randrange(-600, 6000), microseconds=rng.randrange(1, 10**6))
+               for _ in range(args.n)]
+    texts = [m.isoformat(sep=" ") for m in moments]
+    stamps = [int(m.timestamp()) for m in moments]
+
+    cases = [
+        ("strptime + pytz", legacy_too_soon, texts),
+        ("fromisoformat + cached tz", isoformat_too_soon, texts),
+        ("to_epoch(text)", epoch_text_too_soon, texts),
+        ("stored epoch", lambda ts: ts - now_epoch() < 3 * 3600, stamps),
+    ]
+    baseline = None
+    for name, check, values in cases:
+        start = time.perf_counter()
+        for value in values:
+            check(value)
+        per_call = (time.perf_counter() - start) / len(values) * 1e6
+        baseline = baseline or per_call
+        formats = "" if values is stamps else f" | accepts {accepted(check)}/{len(VARIANTS)} formats"
+        print(f"{name:<27} {per_call:7.3f} us/check  {baseline / per_call:5.1f}x{formats}")
+
+
+if __name__ == "__main__":
+    main()
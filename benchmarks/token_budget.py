@@ -0,0 +1,86 @@
+"""
+Tokens and cost of a long conversation with and without a conversation token budget.
+
+Plays the same scripted conversation on one thread with the fake chat model,
+once without a budget and once with ``CONVERSATION_TOKEN_BUDGET`` and the
+"summarize" action, and reports the prompt tokens of every few turns and the
+conversation's totals from the usage ``run_turn`` returns. Without a budget
+the prompt grows with every turn; with it, earlier turns are replaced by a
+summary whenever the budget is used up.
+
+Usage:
+    python -m benchmarks.token_budget [--turns 24] [--budget 20000]
+"""
+import argparse
+import os
+import tempfile
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from benchmarks.common import Timer, make_travel_db, passenger_id, summarize
+from config.config import Config
+from src.chatbot import tools
+from src.chatbot.flow import build_graph
+from src.chatbot.interaction import run_turn
+from src.utils.db_init import prepare_database
+
+MESSAGES = [
+    "Which hotels are there in Zurich?",
+    "What is the baggage policy?",
+    "Any car rentals in Basel?",
+    "Are there any tours in Paris?",
+    "Thanks",
+]
+
+
+def play(config, turns: int) -> tuple[list[dict], dict, dict]:
+    graph = build_graph(config, MemorySaver())
+    run_config = {"configurable": {"passenger_id": passenger_id(0), "thread_id": "long"}}
+    timer, usage, thread = Timer(), [], {}
+    for i in range(turns):
+        with timer:
+            turn = run_turn(graph, run_config, MESSAGES[i % len(MESSAGES)])
+        # Approve pending tool calls, as the user would
+        while turn.pending:
+            turn = run_turn(graph, run_config, "y")
+        usage.append(turn.usage)
+        thread = turn.thread_usage
+    return usage, thread, summarize(timer.samples)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--turns", type=int, default=24)
+    parser.add_argument("--budget", type=int, default=20000, help="CONVERSATION_TOKEN_BUDGET of the second run")
+    args = parser.parse_args()
+    os.environ.setdefault("TAVILY_API_KEY", "benchmark")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_travel_db(os.path.join(tmp, "travel2.sqlite"), 2000, 100)
+        prepare_database(path)
+        tools.db = path
+
+        class NoBudget(Config):
+            LLM_PROVIDER = "fake"
+            INTENT_CLASSIFIER = "off"
+            FAST_PATH_ENABLED = False
+            CONVERSATION_TOKEN_BUDGET = 0
+
+        class Summarize(NoBudget):
+            CONVERSATION_TOKEN_BUDGET = args.budget
+            CONVERSATION_BUDGET_ACTION = "summarize"
+
+        for name, config in (("no budget", NoBudget), (f"budget {args.budget}", Summarize)):
+            usage, thread, stats = play(config, args.turns)
+            every = max(1, args.turns // 6)
+            prompts = "  ".join(
+                f"t{i + 1}:{usage[i].get('input', 0)}" for i in range(0, args.turns, every)
+            )
+            summaries = thread.get("by_node", {}).get("summarize", {}).get("calls", 0)
+            print(f"{name:<14} prompt tokens per turn  {prompts}")
+            print(f"{'':<14} total {thread['input'] + thread['output']} tokens, {thread['calls']} calls, "
+                  f"${thread['cost']:.4f}, {summaries} summaries, turn p50 {stats['p50']:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Concurrent read-only tool calls with and without request coalescing.
+
+Many threads call ``search_flights``, ``search_car_rentals`` and
+``search_trip_recommendations`` with arguments drawn from a skewed
+(Zipf-like) popularity distribution, as many conversations asking about the
+same routes and cities would. Compares running every call, sharing identical
+concurrent calls only (``ttl=0``) and sharing plus the short-TTL cache.
+Reports throughput, latency, queries actually executed and the dedup ratio.
+
+Usage:
+    python -m benchmarks.tool_coalescing [--threads 16] [--calls 500] [--ttl 2]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import CITIES, Timer, make_travel_db, summarize
+from src.chatbot import tools
+from src.flights.index import get_flight_index
+from src.utils.coalescing import Coalescer
+from src.utils.db_init import prepare_database
+
+
+class Passthrough:
+    """Stand-in for ``tool_cache`` that runs every call."""
+
+    def call(self, namespace, key, fn):
+        return fn()
+
+    def invalidate(self, *namespaces):
+        pass
+
+
+def popular_calls(path: str, n: int, seed: int) -> list[tuple]:
+    conn = sqlite3.connect(path)
+    routes = conn.execute(
+        "SELECT departure_airport, arrival_airport FROM flights GROUP BY 1, 2 ORDER BY COUNT(*) DESC LIMIT 50"
+    ).fetchall()
+    conn.close()
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    rng = random.Random(seed)
+    weights = [1 / (rank + 1) for rank in range(len(routes))]
+    calls = []
+    for _ in range(n):
+        kind = rng.random()
+        if kind < 0.6:
+            origin, destination = rng.choices(routes, weights)[0]
+            day = today + timedelta(days=rng.choices(range(7), [1 / (d + 1) for d in range(7)])[0])
+            calls.append((tools.search_flights, {
+                "departure_airport": origin, "arrival_airport": destination,
+                "start_time": day, "end_time": day + timedelta(days=1),
+            }))
+        elif kind < 0.8:
+            city = rng.choices(CITIES, [1 / (rank + 1) for rank in range(len(CITIES))])[0]
+            calls.append((tools.search_car_rentals, {"location": rng.choice([city, city.lower()])}))
+        else:
+            city = rng.choices(CITIES, [1 / (rank + 1) for rank in range(len(CITIES))])[0]
+            calls.append((tools.search_trip_recommendations, {"location": city}))
+    return calls
+
+
+def run(cache, path: str, threads: int, calls: int) -> dict:
+    tools.tool_cache = cache
+    jobs = [popular_calls(path, calls, seed) for seed in range(threads)]
+    timers = [Timer() for _ in range(threads)]
+    barrier = threading.Barrier(threads)
+
+    def worker(index):
+        barrier.wait()
+        for tool, args in jobs[index]:
+            with timers[index]:
+                tool.invoke(args)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    samples = [sample for timer in timers for sample in timer.samples]
+    return {"throughput": len(samples) / elapsed, **summarize(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--calls", type=int, default=500, help="Tool calls per thread")
+    parser.add_argument("--ttl", type=float, default=2.0)
+    parser.add_argument("--flights", type=int, default=20000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = make_travel_db(os.path.join(tmp, "travel2.sqlite"), args.flights, 5000)
+        prepare_database(path)
+        tools.db = path
+        get_flight_index(path)
+        modes = {
+            "off": Passthrough(),
+            "coalesce": Coalescer(0, name="bench.coalesce"),
+            f"coalesce+ttl {args.ttl:g}s": Coalescer(args.ttl, name="bench.ttl"),
+        }
+        for mode, cache in modes.items():
+            stats = run(cache, path, args.threads, args.calls)
+            line = (f"{mode:<18} {stats['throughput']:8.0f} calls/s | p50 {stats['p50']:6.2f} ms "
+                    f"p99 {stats['p99']:7.2f} ms")
+            if isinstance(cache, Coalescer):
+                counts = cache.stats()
+                line += f" | executed {counts['executions']:6.0f} dedup {counts['dedup_ratio']:.1%}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
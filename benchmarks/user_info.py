@@ -0,0 +1,82 @@
+"""
+fetch_user_info node latency: per-request join versus passenger_itinerary.
+
+For random passengers on a synthetic database, times the 4-way join the node
+used to run (on the unindexed database and with the lookup indexes from
+``prepare_database``), the lookup in the materialized ``passenger_itinerary``
+table, and the whole ``fetch_user_info`` node.
+
+Usage:
+    python -m benchmarks.user_info [--passengers 100000] [--requests 500]
+"""
+import argparse
+import os
+import random
+import shutil
+import sqlite3
+import tempfile
+
+from benchmarks.common import Timer, make_travel_db, passenger_id, summarize
+from src.chatbot import tools
+from src.chatbot.flow import user_info
+from src.flights.passenger_itinerary import JOIN_QUERY, passenger_flights
+from src.utils.db_init import prepare_database
+
+
+def join_user_info(path: str, passenger: str) -> dict:
+    conn = sqlite3.connect(path)
+    try:
+        cursor = conn.execute(f"{JOIN_QUERY} WHERE t.passenger_id = ?", (passenger,))
+        columns = [column[0] for column in cursor.description][1:]
+        return {"user_info": [dict(zip(columns, row[1:])) for row in cursor]}
+    finally:
+        conn.close()
+
+
+def view_user_info(path: str, passenger: str) -> dict:
+    conn = sqlite3.connect(path)
+    try:
+        return {"user_info": passenger_flights(conn, passenger)}
+    finally:
+        conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--flights", type=int, default=33121)
+    parser.add_argument("--passengers", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    passengers = [passenger_id(rng.randrange(args.passengers)) for _ in range(args.requests)]
+    with tempfile.TemporaryDirectory() as tmp:
+        unindexed = make_travel_db(os.path.join(tmp, "unindexed.sqlite"), args.flights, args.passengers)
+        prepared = shutil.copy(unindexed, os.path.join(tmp, "travel2.sqlite"))
+        prepare_database(prepared)
+        tools.db = prepared
+
+        timers = {
+            "join (no indexes)": Timer(), "join (indexed)": Timer(), "passenger_itinerary": Timer(),
+            "fetch_user_info node": Timer(),
+        }
+        for passenger in passengers:
+            config = {"configurable": {"passenger_id": passenger}}
+            with timers["join (no indexes)"]:
+                expected = join_user_info(unindexed, passenger)
+            with timers["join (indexed)"]:
+                join_user_info(prepared, passenger)
+            with timers["passenger_itinerary"]:
+                view_user_info(prepared, passenger)
+            with timers["fetch_user_info node"]:
+                found = user_info({"messages": []}, config)
+            assert sorted(map(str, found["user_info"])) == sorted(map(str, expected["user_info"]))
+
+    print(f"fetch_user_info over {args.passengers} passengers, {args.requests} requests")
+    for name, timer in timers.items():
+        stats = summarize(timer.samples)
+        print(f"  {name:<20} p50 {stats['p50']:8.3f} ms  p99 {stats['p99']:8.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,17 +4,150 @@ from pathlib import Path
 
 load_dotenv()
 
+def parse_mapping(value: str) -> dict:
+    """Parse a ``key=value,key=value`` environment setting into a dict."""
+    return dict(item.split("=", 1) for item in value.split(",") if item)
+
 class Config:
     GROQ_API_KEY = os.getenv("GROQ_API_KEY")
     OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
     FLIGHT_API_KEY = os.getenv("FLIGHT_API_KEY")
     TAVILY_API_KEY = os.getenv("TAVILY_API_KEY")
     BASE_FLIGHT_API_URL = "https://api.example.com/flights"
-    MEMORY_TYPE = "simple"
+    # Conversation checkpoints: "simple" keeps them in process memory, "sqlite" in the
+    # CHECKPOINT_DB file shared by all workers (required with more than one worker)
+    MEMORY_TYPE = os.getenv("MEMORY_TYPE", "simple")
+
+    # Chat models: "groq", or "fake" for the offline model used by benchmarks and load tests
+    LLM_PROVIDER = os.getenv("LLM_PROVIDER", "groq")
+    LLM_MODEL = os.getenv("LLM_MODEL", "mixtral-8x7b-32768")
+    ROUTER_LLM_MODEL = os.getenv("ROUTER_LLM_MODEL", "llama-3.1-8b-instant")
+    LLM_TEMPERATURE = float(os.getenv("LLM_TEMPERATURE", "0.5"))
+    GROQ_BASE_URL = os.getenv("GROQ_BASE_URL", "https://api.groq.com")
+    # Keep-alive connections to the model provider, shared by all chat models of a process
+    LLM_HTTP_POOL = int(os.getenv("LLM_HTTP_POOL", "20"))
+
+    # Model per tier, and tier per assistant node; nodes not listed use the "tool" tier.
+    # A "router" node only answers or hands off and passes tool turns to the "tool" model
+    MODEL_TIER_MODELS = {"router": ROUTER_LLM_MODEL, "tool": LLM_MODEL}
+    MODEL_TIERS = parse_mapping(os.getenv("MODEL_TIERS", "primary_assistant=router"))
+    # Dollars per million input and output tokens of each model ("model=input:output,..."),
+    # for the cost reported with the token usage of every turn
+    LLM_PRICES = {
+        model: tuple(float(price) for price in prices.split(":"))
+        for model, prices in parse_mapping(
+            os.getenv("LLM_PRICES", "mixtral-8x7b-32768=0.24:0.24,llama-3.1-8b-instant=0.05:0.08")
+        ).items()
+    }
+    # Tokens a conversation may use before CONVERSATION_BUDGET_ACTION is taken (0 = no limit):
+    # "summarize" condenses all but the last CONVERSATION_KEEP_TURNS user turns with the
+    # router model and starts counting again, "stop" answers without calling the model
+    CONVERSATION_TOKEN_BUDGET = int(os.getenv("CONVERSATION_TOKEN_BUDGET", "0"))
+    CONVERSATION_BUDGET_ACTION = os.getenv("CONVERSATION_BUDGET_ACTION", "summarize")
+    CONVERSATION_KEEP_TURNS = int(os.getenv("CONVERSATION_KEEP_TURNS", "2"))
+
+    # Local classifier that answers obvious handoffs without an LLM call ("keyword" or "off")
+    INTENT_CLASSIFIER = os.getenv("INTENT_CLASSIFIER", "keyword")
+
+    # Fast path answering obvious single-tool questions before the primary assistant;
+    # FAST_PATH_ENABLED is the kill switch, FAST_PATH_ANSWER is "template" or "llm"
+    FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "true").lower() in ("1", "true", "yes")
+    FAST_PATH_ANSWER = os.getenv("FAST_PATH_ANSWER", "template")
+
+    # Web search tool: "tavily" or "fake" (offline canned results, for benchmarks and load
+    # tests), and the fake's simulated latency in seconds per search
+    SEARCH_PROVIDER = os.getenv("SEARCH_PROVIDER", "tavily")
+    FAKE_SEARCH_LATENCY = float(os.getenv("FAKE_SEARCH_LATENCY", "0"))
+
+    # Simulated latency of the fake provider in seconds per call and per output token,
+    # per model ("*" is the default)
+    FAKE_LLM_LATENCY = {
+        model: float(seconds) for model, seconds in parse_mapping(os.getenv("FAKE_LLM_LATENCY", "")).items()
+    }
+    FAKE_LLM_SECONDS_PER_TOKEN = {
+        model: float(seconds)
+        for model, seconds in parse_mapping(os.getenv("FAKE_LLM_SECONDS_PER_TOKEN", "")).items()
+    }
     
+    # Admission control for /chat: turns running at once, turns waiting for a slot and
+    # for how many seconds, and running plus waiting turns per passenger_id (0 = no limit)
+    CHAT_MAX_IN_FLIGHT = int(os.getenv("CHAT_MAX_IN_FLIGHT", "16"))
+    CHAT_MAX_QUEUED = int(os.getenv("CHAT_MAX_QUEUED", "32"))
+    CHAT_QUEUE_TIMEOUT = float(os.getenv("CHAT_QUEUE_TIMEOUT", "10"))
+    CHAT_MAX_PER_PASSENGER = int(os.getenv("CHAT_MAX_PER_PASSENGER", "2"))
+    # Token bucket shared by all chat model calls of a process: calls per second
+    # (0 = unlimited) and the largest burst
+    LLM_CALLS_PER_SECOND = float(os.getenv("LLM_CALLS_PER_SECOND", "0"))
+    LLM_BURST = float(os.getenv("LLM_BURST", "5"))
+    # Conversations a batch run works on at once, by default and at most
+    BATCH_PARALLELISM = int(os.getenv("BATCH_PARALLELISM", "4"))
+    BATCH_MAX_PARALLELISM = int(os.getenv("BATCH_MAX_PARALLELISM", "16"))
+    
+    # Seconds the results of the read-only tools are reused (0 only shares identical
+    # concurrent calls), and how many results are kept
+    TOOL_CACHE_TTL = float(os.getenv("TOOL_CACHE_TTL", "2"))
+    TOOL_CACHE_SIZE = int(os.getenv("TOOL_CACHE_SIZE", "1024"))
+    # Prefetch for /chat turns with a passenger_id: the passenger's flights, then the seats
+    # left on their routes over the next PREFETCH_DAYS, read in PREFETCH_WORKERS threads
+    # while the checkpoint loads and the first model call runs
+    PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "false").lower() in ("1", "true", "yes")
+    PREFETCH_DAYS = float(os.getenv("PREFETCH_DAYS", "7"))
+    PREFETCH_WORKERS = int(os.getenv("PREFETCH_WORKERS", "4"))
+
+    # Startup warm-up (src/chatbot/warmup.py), run in the background when the app starts;
+    # /readyz answers 503 until it is done. WARMUP_INIT_DB downloads and prepares the travel
+    # database first, WARMUP_TABLES (and their indexes) are read into the OS page cache, and
+    # WARMUP_LLM_CONNECT opens the pooled connection to the model provider
+    WARMUP_ENABLED = os.getenv("WARMUP_ENABLED", "true").lower() in ("1", "true", "yes")
+    WARMUP_INIT_DB = os.getenv("WARMUP_INIT_DB", "true").lower() in ("1", "true", "yes")
+    WARMUP_TABLES = os.getenv(
+        "WARMUP_TABLES", "flights,seat_inventory,passenger_itinerary,tickets,hotels,car_rentals,trip_recommendations"
+    ).split(",")
+    WARMUP_LLM_CONNECT = os.getenv("WARMUP_LLM_CONNECT", "true").lower() in ("1", "true", "yes")
+
+    # Rooms given to each hotel and guests per room, and places per excursion and
+    # day, when the reservation tables are first created
+    HOTEL_ROOMS = int(os.getenv("HOTEL_ROOMS", "10"))
+    HOTEL_GUESTS_PER_ROOM = int(os.getenv("HOTEL_GUESTS_PER_ROOM", "2"))
+    EXCURSION_CAPACITY = int(os.getenv("EXCURSION_CAPACITY", "20"))
+
     # Add database configuration
     BASE_DIR = Path(__file__).parent.parent
-    DATABASE_PATH = str(BASE_DIR / "data" / "travel2.sqlite")
+    DATABASE_PATH = os.getenv("DATABASE_PATH", str(BASE_DIR / "data" / "travel2.sqlite"))
+    # Where a missing DATABASE_PATH comes from: "download" (travel2) or "synthetic"
+    # (generated offline at SYNTHETIC_DB_SCALE times travel2's row counts)
+    DATABASE_SOURCE = os.getenv("DATABASE_SOURCE", "download")
+    SYNTHETIC_DB_SCALE = float(os.getenv("SYNTHETIC_DB_SCALE", "1"))
+    SYNTHETIC_DB_SEED = int(os.getenv("SYNTHETIC_DB_SEED", "0"))
+    CHECKPOINT_DB = os.getenv("CHECKPOINT_DB", str(BASE_DIR / "data" / "checkpoints.sqlite"))
+    # How the sqlite savers store checkpoints: "compact" keeps each message and value once
+    # per database (compressed, shared across checkpoints), "default" is LangGraph's format
+    CHECKPOINT_FORMAT = os.getenv("CHECKPOINT_FORMAT", "compact")
+    # Checkpoints of batch runs (POST /chat/batch), kept apart from live conversations
+    BATCH_CHECKPOINT_DB = os.getenv("BATCH_CHECKPOINT_DB", str(BASE_DIR / "data" / "batch_checkpoints.sqlite"))
+    # Record/replay of LLM and tool calls: "off", "record" (append every call to REPLAY_LOG)
+    # or "replay" (answer from REPLAY_LOG without calling the models or tools). Replay
+    # sleeps REPLAY_LATENCY times each recorded duration (0 answers at once).
+    REPLAY_MODE = os.getenv("REPLAY_MODE", "off")
+    REPLAY_LOG = os.getenv("REPLAY_LOG", str(BASE_DIR / "data" / "replay.jsonl.gz"))
+    REPLAY_LATENCY = float(os.getenv("REPLAY_LATENCY", "0"))
+    # Seconds a connection waits on a locked database, then transaction retries and
+    # the base backoff between them
+    DB_BUSY_TIMEOUT = float(os.getenv("DB_BUSY_TIMEOUT", "5"))
+    DB_WRITE_RETRIES = int(os.getenv("DB_WRITE_RETRIES", "5"))
+    DB_RETRY_BACKOFF = float(os.getenv("DB_RETRY_BACKOFF", "0.02"))
+
+    # Policy retrieval: markdown documents, the index built from them, and whether
+    # to fuse the local embedding index into the BM25 ranking
+    POLICY_DOCS_DIR = os.getenv("POLICY_DOCS_DIR", str(BASE_DIR / "data" / "policies"))
+    POLICY_INDEX_DIR = os.getenv("POLICY_INDEX_DIR", str(BASE_DIR / "data" / "policy_index"))
+    POLICY_EMBEDDINGS = os.getenv("POLICY_EMBEDDINGS", "false").lower() in ("1", "true", "yes")
+    POLICY_TOP_K = int(os.getenv("POLICY_TOP_K", "3"))
+
+    # Connecting itineraries: minimum and maximum time between legs, and the most stops
+    MIN_CONNECTION_MINUTES = int(os.getenv("MIN_CONNECTION_MINUTES", "45"))
+    MAX_LAYOVER_HOURS = float(os.getenv("MAX_LAYOVER_HOURS", "8"))
+    MAX_STOPS = int(os.getenv("MAX_STOPS", "2"))
 
     @staticmethod
     def validate():
@@ -0,0 +1,34 @@
+# Gunicorn settings for running the API with several uvicorn worker processes:
+#     gunicorn -c deployment/gunicorn.conf.py src.app:app
+import multiprocessing
+import os
+
+# Workers are separate processes, so conversations and pending approvals must
+# live in the shared SQLite checkpoint store rather than in process memory.
+os.environ.setdefault("MEMORY_TYPE", "sqlite")
+# on_starting prepares the database once; the workers' warm-up only validates and warms it
+os.environ.setdefault("WARMUP_INIT_DB", "false")
+
+bind = os.getenv("BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+worker_class = "uvicorn.workers.UvicornWorker"
+timeout = int(os.getenv("WORKER_TIMEOUT", "120"))
+# Each worker builds its own graph and opens its own database connections after the fork
+preload_app = False
+
+
+def on_starting(server):
+    # Download and prepare the travel database once, before any worker starts
+    from src.utils.db_init import initialize_database
+
+    initialize_database()
+
+    # Build the policy index once too, so the workers' warm-up only opens it
+    # instead of every worker finding it stale on a fresh deploy
+    from src.retrieval.policy import open_policy_index
+
+    try:
+        open_policy_index()
+    except Exception as e:
+        # Optional, like lookup_policy's warm-up step: a worker rebuilds it on first use
+        server.log.warning(f"Could not build the policy index: {e}")
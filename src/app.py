@@ -1,16 +1,41 @@
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from src.chatbot.flow import part_4_graph
+from fastapi.concurrency import iterate_in_threadpool, run_in_threadpool
+from config.config import Config
+from src.chatbot.flow import build_graph
+from src.chatbot.fast_path import fast_path_stats
+from src.chatbot.tools import tool_cache
 from src.utils.logger import logger
+from src.utils.metrics import metrics
+from src.utils.admission import AdmissionController, Rejected
 from pydantic import BaseModel
-from typing import List, Dict
-from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, ToolMessage
-from src.utils.db_init import initialize_database
+from typing import Awaitable, Callable, List, Dict
+from src.utils.jsonutils import FastJSONResponse, dumps
 import uuid
-from src.chatbot.interaction import handle_user_interaction
+from src.chatbot.batch import build_batch_graph, parse_conversations, run_batch
+from src.chatbot.interaction import reply_messages, run_turn
+from src.chatbot.prefetch import Prefetch
+from src.chatbot.warmup import WarmUp
+from src.utils.http import close_http_clients
+from contextlib import AsyncExitStack, asynccontextmanager
+import anyio
+import threading
 
-app = FastAPI()
+warmup = WarmUp(Config)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background: /healthz answers at once, /readyz once the worker is warm
+    if Config.WARMUP_ENABLED:
+        warmup.start()
+    else:
+        warmup.skip()
+    yield
+    close_http_clients()
+
+app = FastAPI(lifespan=lifespan)
+admission = AdmissionController.from_config(Config)
 
 # Enable CORS
 app.add_middleware(
@@ -27,79 +52,144 @@ class ChatRequest(BaseModel):
 
 class ChatResponse(BaseModel):
     messages: List[Dict]
-
-def serialize_message(message: BaseMessage) -> Dict:
-    """Convert a LangChain message object to a serializable dictionary."""
-    if not message.content and not message.additional_kwargs:
-        return None
-        
-    return {
-        "type": message.type,
-        "content": message.content or "",
-        "additional_kwargs": message.additional_kwargs or {}
-    }
+    thread_id: str
+    # Tool calls waiting for approval; answer with "y" (or a reason to deny) on the same thread_id
+    pending_approval: List[Dict] = []
+    # Tokens and cost of this turn ("turn") and of the thread so far ("thread")
+    usage: Dict = {}
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Travel Assistant Chatbot"}
 
-@app.post("/chat")
+@app.get("/healthz")
+def healthz():
+    # Liveness only: the process serves requests, warm or not
+    return {"status": "ok"}
+
+@app.get("/readyz")
+def readyz():
+    return JSONResponse(status_code=200 if warmup.ready else 503, content=warmup.status())
+
+@app.get("/metrics")
+def read_metrics():
+    return {**metrics.snapshot(), "fast_path": fast_path_stats(), "tool_coalescing": tool_cache.stats()}
+
+# ChatResponse documents the schema; the reply itself is a FastJSONResponse, so
+# the message dicts are encoded once instead of validated and re-encoded
+@app.post("/chat", response_model=ChatResponse)
 async def chat(request: ChatRequest):
+    # Admission runs on the event loop, so queued turns hold no worker thread;
+    # admitted turns run the blocking graph in the thread pool.
+    try:
+        async with admission.admit(request.config.get("passenger_id")):
+            return await run_in_threadpool(run_chat_turn, request)
+    except Rejected as e:
+        return rejected(e)
+
+def rejected(e: Rejected) -> JSONResponse:
+    return JSONResponse(
+        status_code=e.status_code,
+        content={"detail": e.reason},
+        headers={"Retry-After": str(int(e.retry_after))},
+    )
+
+def run_chat_turn(request: ChatRequest) -> FastJSONResponse:
+    # The thread lives in the checkpointer, so with MEMORY_TYPE=sqlite any worker can continue it
+    thread_id = request.config.get("thread_id") or str(uuid.uuid4())
     config = {
         "configurable": {
             "passenger_id": request.config.get("passenger_id", ""),
-            "thread_id": str(uuid.uuid4()),
+            "thread_id": thread_id,
         }
     }
-    
-    # Initialize state with just the user's message
-    initial_state = {
-        "messages": [
-            HumanMessage(content=request.message)
-        ]
-    }
-    
-    events = part_4_graph.stream(
-        initial_state, 
-        config, 
-        stream_mode="values"
+    if Config.PREFETCH_ENABLED and config["configurable"]["passenger_id"]:
+        # Passenger flights and route seats load while the checkpoint and first model call do
+        config["configurable"]["prefetch"] = Prefetch.start(config["configurable"]["passenger_id"])
+
+    part_4_graph = build_graph()
+    turn = run_turn(part_4_graph, config, request.message)
+    messages = reply_messages(turn.messages, turn.pending)
+
+    return FastJSONResponse({
+        "messages": messages,
+        "thread_id": thread_id,
+        "pending_approval": turn.pending,
+        "usage": {"turn": turn.usage, "thread": turn.thread_usage},
+    })
+
+@app.post("/chat/batch")
+async def chat_batch(request: Request, parallelism: int = Config.BATCH_PARALLELISM):
+    """
+    Run JSONL conversations (see ``parse_conversations``) and stream one JSONL
+    result per conversation as it finishes. Threads are written to the batch
+    checkpoint store.
+    """
+    try:
+        conversations = parse_conversations((await request.body()).decode("utf-8").splitlines())
+    except ValueError as e:
+        return JSONResponse(status_code=400, content={"detail": str(e)})
+    # The batch holds one admission slot per conversation it runs at once, at most
+    # CHAT_MAX_IN_FLIGHT so it never queues behind its own slots. A batch for a
+    # single passenger counts once against their limit.
+    parallelism = max(1, min(parallelism, Config.BATCH_MAX_PARALLELISM, len(conversations), admission.max_in_flight))
+    passengers = {c.get("config", {}).get("passenger_id") for c in conversations}
+    passenger_id = passengers.pop() if len(passengers) == 1 else None
+    slots = AsyncExitStack()
+    try:
+        for i in range(parallelism):
+            await slots.enter_async_context(admission.admit(passenger_id if i == 0 else None))
+        # The first call builds the graph, which must not block the event loop
+        graph = await run_in_threadpool(build_batch_graph)
+    except Rejected as e:
+        await slots.aclose()
+        return rejected(e)
+    except BaseException:
+        await slots.aclose()
+        raise
+    stop = threading.Event()
+    results = run_batch(conversations, graph, parallelism, stop)
+
+    async def release():
+        # Closing waits in a worker thread for the running conversations, so the
+        # slots are freed only once they have stopped, even if the client went away
+        stop.set()
+        with anyio.CancelScope(shield=True):
+            await run_in_threadpool(results.close)
+            await slots.aclose()
+
+    return BatchResponse(
+        (dumps(result) + b"\n" async for result in iterate_in_threadpool(results)),
+        stop,
+        release,
+        media_type="application/x-ndjson",
     )
-    
-    messages = []
-    for event in events:
-        if event.get("messages"):
-            # Only add new messages that aren't already in our list
-            new_messages = [
-                serialize_message(msg) 
-                for msg in event["messages"] 
-                if isinstance(msg, (AIMessage, ToolMessage))  # Only include AI and Tool messages
-            ]
-            if new_messages:
-                messages.extend(new_messages)
-            
-        # Check if we're at a sensitive tool
-        snapshot = part_4_graph.get_state(config)
-        if snapshot and snapshot.next == "sensitive_tools":
-            result = handle_user_interaction(part_4_graph, event, config)
-            if result and result.get("messages"):
-                messages.extend(
-                    serialize_message(msg) 
-                    for msg in result["messages"]
-                    if isinstance(msg, (AIMessage, ToolMessage))  # Only include AI and Tool messages
-                )
-    
-    # If no AI messages were generated, add an error message
-    if not any(msg["type"] == "ai" for msg in messages):
-        messages.append({
-            "type": "ai",
-            "content": "I apologize, but I'm having trouble processing your request. Could you please try again?",
-            "additional_kwargs": {}
-        })
-    
-    return ChatResponse(messages=messages)
+
+class BatchResponse(StreamingResponse):
+    """
+    A streaming batch that sets ``stop`` as soon as the client disconnects and
+    runs ``release`` however the response ends, even before its body starts.
+    """
+
+    def __init__(self, content, stop: threading.Event, release: Callable[[], Awaitable[None]], **kwargs):
+        super().__init__(content, **kwargs)
+        self.stop = stop
+        self.release = release
+
+    async def listen_for_disconnect(self, receive):
+        await super().listen_for_disconnect(receive)
+        self.stop.set()
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            await self.release()
 
 if __name__ == "__main__":
     import uvicorn
-    # Initialize database before starting the app
-    initialize_database()
+    if not (Config.WARMUP_ENABLED and Config.WARMUP_INIT_DB):
+        # Otherwise the warm-up initializes the database when the app starts
+        from src.utils.db_init import initialize_database
+        initialize_database()
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -17,4 +17,7 @@ class ToHotelBookingAssistant(BaseModel):
 
 class ToBookExcursion(BaseModel):
     location: str = Field(description="Excursion location")
-    request: str = Field(description="Additional excursion requests")
\ No newline at end of file
+    request: str = Field(description="Additional excursion requests")
+class UseTools(BaseModel):
+    """Hand this turn to the assistant that can look up flights, policies, hotels, cars and excursions or change bookings."""
+    request: str = Field(description="What the customer needs looked up or changed.")
@@ -0,0 +1,193 @@
+import argparse
+import json
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Iterable, Iterator, Optional
+
+from config.config import Config
+from src.chatbot.flow import build_graph
+from src.chatbot.interaction import reply_messages, run_turn
+from src.chatbot.memory import get_batch_checkpointer
+from src.utils.logger import logger
+from src.utils.metrics import metrics
+
+
+def build_batch_graph(config=None):
+    """The assistant graph writing to the batch checkpoint store."""
+    return build_graph(config, get_batch_checkpointer(config))
+
+
+def parse_conversations(lines: Iterable[str]) -> list[dict]:
+    """
+    Read JSONL conversations, one per line:
+    ``{"id": "c1", "messages": ["Hi", "y"], "config": {"passenger_id": "..."}}``.
+
+    ``messages`` are sent in order on one thread, so a "y" answers a pending
+    approval as it would on ``/chat``. ``id`` defaults to the line number.
+    Blank lines are skipped; a malformed line, including a ``config`` that is
+    not an object or a ``passenger_id`` that is not a string, raises ValueError.
+    """
+    conversations = []
+    for number, line in enumerate(lines, 1):
+        if not line.strip():
+            continue
+        try:
+            conversation = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {number}: invalid JSON ({e.msg})") from None
+        messages = conversation.get("messages") if isinstance(conversation, dict) else None
+        if not isinstance(messages, list) or not all(isinstance(m, str) for m in messages):
+            raise ValueError(f"Line {number}: expected an object with a list of string messages")
+        options = conversation.get("config", {})
+        if not isinstance(options, dict):
+            raise ValueError(f"Line {number}: config must be an object")
+        if not isinstance(options.get("passenger_id", ""), str):
+            raise ValueError(f"Line {number}: passenger_id must be a string")
+        conversation.setdefault("id", str(number))
+        conversations.append(conversation)
+    return conversations
+
+
+def run_conversation(graph, conversation: dict, run_id: str, stop: Optional[threading.Event] = None) -> dict:
+    """
+    Play one conversation on a fresh thread; failures are reported in the
+    result, not raised. Once ``stop`` is set, no further turn is started.
+    """
+    thread_id = f"batch-{run_id}-{conversation['id']}"
+    options = conversation.get("config", {})
+    config = {"configurable": {"passenger_id": options.get("passenger_id", ""), "thread_id": thread_id}}
+    result = {"id": conversation["id"], "thread_id": thread_id, "turns": [], "error": None}
+    start = time.perf_counter()
+    try:
+        for message in conversation["messages"]:
+            if stop is not None and stop.is_set():
+                result["error"] = "Cancelled: the batch was stopped"
+                break
+            turn_start = time.perf_counter()
+            turn = run_turn(graph, config, message)
+            seconds = time.perf_counter() - turn_start
+            metrics.observe("batch.turn", seconds)
+            result["turns"].append({
+                "message": message,
+                "messages": reply_messages(turn.messages, turn.pending),
+                "pending_approval": turn.pending,
+                "seconds": round(seconds, 4),
+                "usage": turn.usage,
+            })
+    except Exception as e:
+        logger.exception(f"Batch conversation {conversation['id']} failed")
+        metrics.incr("batch.errors")
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = round(time.perf_counter() - start, 4)
+    metrics.incr("batch.conversations")
+    return result
+
+
+def run_batch(
+    conversations: Iterable[dict],
+    graph=None,
+    parallelism: Optional[int] = None,
+    stop: Optional[threading.Event] = None,
+) -> Iterator[dict]:
+    """
+    Run conversations with at most ``parallelism`` at once and yield their
+    results as they finish.
+
+    Every conversation gets its own thread in the batch checkpoint store. The
+    LLM calls go through the same process-wide rate limiter as ``/chat``.
+    Setting ``stop`` (from any thread) or closing the generator cancels the
+    queued conversations and lets the running ones end after their current
+    turn; close() returns once they have. An exception (e.g. KeyboardInterrupt)
+    stops them without waiting.
+    """
+    graph = graph or build_batch_graph()
+    parallelism = max(1, min(parallelism or Config.BATCH_PARALLELISM, Config.BATCH_MAX_PARALLELISM))
+    run_id = uuid.uuid4().hex[:8]
+    stop = stop or threading.Event()
+    pool = ThreadPoolExecutor(max_workers=parallelism, thread_name_prefix="chat-batch")
+    running = set()
+    try:
+        for conversation in conversations:
+            if len(running) >= parallelism:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                yield from (future.result() for future in done)
+            if stop.is_set():
+                break
+            running.add(pool.submit(run_conversation, graph, conversation, run_id, stop))
+        while running:
+            done, running = wait(running, return_when=FIRST_COMPLETED)
+            yield from (future.result() for future in done)
+    except GeneratorExit:
+        # Closed early: running conversations stop after their current turn,
+        # and close() returns once they have, so the caller can free their capacity
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+        wait(running)
+        raise
+    finally:
+        # Never wait here (e.g. on Ctrl-C): queued conversations are dropped
+        stop.set()
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def summarize(results: list[dict], seconds: float) -> dict:
+    """Throughput and turn latency of a finished batch run."""
+    turns = sorted(turn["seconds"] for result in results for turn in result["turns"])
+    usage = [turn.get("usage", {}) for result in results for turn in result["turns"]]
+
+    def percentile(q):
+        return turns[min(len(turns) - 1, int(q * len(turns)))] if turns else 0.0
+
+    return {
+        "conversations": len(results),
+        "errors": sum(1 for result in results if result["error"]),
+        "turns": len(turns),
+        "seconds": round(seconds, 3),
+        "conversations_per_second": round(len(results) / seconds, 3) if seconds else 0.0,
+        "turn_p50_s": percentile(0.5),
+        "turn_p95_s": percentile(0.95),
+        "tokens": sum(u.get("input", 0) + u.get("output", 0) for u in usage),
+        "cost_usd": round(sum(u.get("cost", 0.0) for u in usage), 6),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run JSONL conversations through the assistant graph.")
+    parser.add_argument("input", help="JSONL conversations, or - for stdin")
+    parser.add_argument("-o", "--output", help="JSONL results (default: stdout)")
+    parser.add_argument("--parallelism", type=int, default=Config.BATCH_PARALLELISM)
+    args = parser.parse_args()
+
+    from src.utils.db_init import initialize_database
+    initialize_database()
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    with source:
+        conversations = parse_conversations(source)
+    out = open(args.output, "w", encoding="utf-8") if args.output else sys.stdout
+    results = []
+    stop = threading.Event()
+    interrupted = False
+    start = time.perf_counter()
+    try:
+        for result in run_batch(conversations, parallelism=args.parallelism, stop=stop):
+            results.append(result)
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+    except KeyboardInterrupt:
+        # Running conversations end after their current turn; queued ones never start
+        stop.set()
+        interrupted = True
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    summary = summarize(results, time.perf_counter() - start)
+    print(json.dumps(summary), file=sys.stderr)
+    raise SystemExit(130 if interrupted else 1 if summary["errors"] else 0)
+
+
+if __name__ == "__main__":
+    main()
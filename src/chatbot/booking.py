@@ -0,0 +1,244 @@
+import sqlite3
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+from src.flights import inventory, passenger_itinerary
+from src.utils.db import run_in_transaction
+from src.utils.timeutils import epoch, now_epoch, parse_timestamp, to_epoch
+
+MIN_RESCHEDULE_SECONDS = 3 * 3600
+
+TICKET_STATE_QUERY = """
+SELECT
+    EXISTS(SELECT 1 FROM ticket_flights WHERE ticket_no = :ticket_no) AS has_flight,
+    EXISTS(SELECT 1 FROM tickets WHERE ticket_no = :ticket_no AND passenger_id = :passenger_id) AS owned
+"""
+
+REBOOK_STATE_QUERY = """
+SELECT
+    (SELECT scheduled_departure FROM flights WHERE flight_id = :flight_id) AS scheduled_departure,
+    (SELECT scheduled_departure_ts FROM flights WHERE flight_id = :flight_id) AS scheduled_departure_ts,
+    EXISTS(SELECT 1 FROM ticket_flights WHERE ticket_no = :ticket_no) AS has_flight,
+    EXISTS(SELECT 1 FROM tickets WHERE ticket_no = :ticket_no AND passenger_id = :passenger_id) AS owned
+"""
+
+
+class BookingResult(NamedTuple):
+    ok: bool
+    message: str
+    rows: int = 0
+
+
+def not_owner_message(passenger_id: str, ticket_no: str) -> str:
+    return f"Current signed-in passenger with ID {passenger_id} not the owner of ticket {ticket_no}"
+
+
+def placeholders(values) -> str:
+    return ", ".join("?" * len(values))
+
+
+def check_departure(
+    departure: str, now: Optional[datetime] = None, departure_ts: Optional[int] = None
+) -> Optional[BookingResult]:
+    """
+    Return a failed result when a flight leaving at ``departure`` is too close to rebook onto.
+
+    The check compares epoch seconds: ``departure_ts`` is the stored
+    ``scheduled_departure_ts`` of the flight, and the text is only parsed
+    when it is missing or for the failure message.
+    """
+    current = now_epoch() if now is None else epoch(now)
+    departure_at = to_epoch(departure) if departure_ts is None else departure_ts
+    if departure_at - current < MIN_RESCHEDULE_SECONDS:
+        return BookingResult(
+            False,
+            f"Not permitted to reschedule to a flight that is less than 3 hours from the current time. Selected flight is at {parse_timestamp(departure)}.",
+        )
+    return None
+
+
+def rebook_ticket(
+    conn: sqlite3.Connection,
+    ticket_no: str,
+    new_flight_id: int,
+    passenger_id: str,
+    now: Optional[datetime] = None,
+) -> BookingResult:
+    """
+    Move a ticket to another flight on an open transaction.
+
+    One query checks that the new flight exists, that the ticket has a flight
+    and that the passenger owns it; then the seat inventory is checked for
+    the ticket's fare. The UPDATE follows only when all pass, and the seat
+    inventory and passenger_itinerary are updated in the same transaction.
+
+    Args:
+        conn (sqlite3.Connection): Connection inside a write transaction.
+        ticket_no (str): Ticket to move.
+        new_flight_id (int): Target flight.
+        passenger_id (str): Signed-in passenger, who must own the ticket.
+        now (datetime, optional): Current time, for the 3-hour rule.
+
+    Returns:
+        BookingResult: Outcome, user-facing message and the number of updated rows.
+    """
+    departure, departure_ts, has_flight, owned = conn.execute(
+        REBOOK_STATE_QUERY,
+        {"flight_id": new_flight_id, "ticket_no": ticket_no, "passenger_id": passenger_id},
+    ).fetchone()
+    if departure is None:
+        return BookingResult(False, "Invalid new flight ID provided.")
+
+    too_soon = check_departure(departure, now, departure_ts)
+    if too_soon:
+        return too_soon
+    if not has_flight:
+        return BookingResult(False, "No existing ticket found for the given ticket number.")
+    if not owned:
+        return BookingResult(False, not_owner_message(passenger_id, ticket_no))
+    legs = inventory.ticket_legs(conn, [ticket_no])
+    full = inventory.shortfall(conn, legs, new_flight_id)
+    if full:
+        return BookingResult(False, full)
+
+    rows = conn.execute(
+        "UPDATE ticket_flights SET flight_id = ? WHERE ticket_no = ?",
+        (new_flight_id, ticket_no),
+    ).rowcount
+    inventory.move(conn, legs, new_flight_id)
+    passenger_itinerary.refresh_tickets(conn, [ticket_no])
+    return BookingResult(True, "Ticket successfully updated to new flight.", rows)
+
+
+def cancel_ticket_flights(conn: sqlite3.Connection, ticket_no: str, passenger_id: str) -> BookingResult:
+    """Delete a ticket's flights on an open transaction after one combined ownership/existence check."""
+    has_flight, owned = conn.execute(
+        TICKET_STATE_QUERY, {"ticket_no": ticket_no, "passenger_id": passenger_id}
+    ).fetchone()
+    if not has_flight:
+        return BookingResult(False, "No existing ticket found for the given ticket number.")
+    if not owned:
+        return BookingResult(False, not_owner_message(passenger_id, ticket_no))
+
+    legs = inventory.ticket_legs(conn, [ticket_no])
+    rows = conn.execute("DELETE FROM ticket_flights WHERE ticket_no = ?", (ticket_no,)).rowcount
+    inventory.release(conn, legs)
+    passenger_itinerary.refresh_tickets(conn, [ticket_no])
+    return BookingResult(True, "Ticket successfully cancelled.", rows)
+
+
+def check_tickets(conn: sqlite3.Connection, ticket_nos: list[str], passenger_id: str) -> Optional[BookingResult]:
+    """
+    Check that every ticket exists and belongs to the passenger, with one query.
+
+    Returns:
+        Optional[BookingResult]: A failed result naming the offending tickets, or None when all pass.
+    """
+    if not ticket_nos:
+        return BookingResult(False, "No ticket numbers provided.")
+    owned = dict(conn.execute(
+        f"""
+        SELECT tf.ticket_no,
+               EXISTS(SELECT 1 FROM tickets t WHERE t.ticket_no = tf.ticket_no AND t.passenger_id = ?)
+        FROM ticket_flights tf
+        WHERE tf.ticket_no IN ({placeholders(ticket_nos)})
+        GROUP BY tf.ticket_no
+        """,
+        (passenger_id, *ticket_nos),
+    ).fetchall())
+    missing = [t for t in ticket_nos if t not in owned]
+    if missing:
+        return BookingResult(
+            False, f"No existing ticket found for ticket numbers {', '.join(missing)}. No tickets were changed."
+        )
+    foreign = [t for t in ticket_nos if not owned[t]]
+    if foreign:
+        return BookingResult(
+            False,
+            f"Current signed-in passenger with ID {passenger_id} not the owner of tickets {', '.join(foreign)}. "
+            "No tickets were changed.",
+        )
+    return None
+
+
+def rebook_tickets(
+    conn: sqlite3.Connection,
+    ticket_nos: list[str],
+    new_flight_id: int,
+    passenger_id: str,
+    now: Optional[datetime] = None,
+) -> BookingResult:
+    """
+    Move several tickets to the same flight on an open transaction, all or none.
+
+    Args:
+        conn (sqlite3.Connection): Connection inside a write transaction.
+        ticket_nos (list[str]): Tickets to move; duplicates are ignored.
+        new_flight_id (int): Target flight.
+        passenger_id (str): Signed-in passenger, who must own every ticket.
+        now (datetime, optional): Current time, for the 3-hour rule.
+
+    Returns:
+        BookingResult: Outcome, user-facing message and the number of updated rows.
+    """
+    ticket_nos = list(dict.fromkeys(ticket_nos))
+    row = conn.execute(
+        "SELECT scheduled_departure, scheduled_departure_ts FROM flights WHERE flight_id = ?", (new_flight_id,)
+    ).fetchone()
+    if row is None:
+        return BookingResult(False, "Invalid new flight ID provided.")
+    failed = check_departure(row[0], now, row[1]) or check_tickets(conn, ticket_nos, passenger_id)
+    if failed:
+        return failed
+    legs = inventory.ticket_legs(conn, ticket_nos)
+    full = inventory.shortfall(conn, legs, new_flight_id)
+    if full:
+        return BookingResult(False, f"{full} No tickets were changed.")
+
+    rows = conn.execute(
+        f"UPDATE ticket_flights SET flight_id = ? WHERE ticket_no IN ({placeholders(ticket_nos)})",
+        (new_flight_id, *ticket_nos),
+    ).rowcount
+    inventory.move(conn, legs, new_flight_id)
+    passenger_itinerary.refresh_tickets(conn, ticket_nos)
+    return BookingResult(True, f"{len(ticket_nos)} tickets successfully updated to new flight.", rows)
+
+
+def cancel_tickets_flights(conn: sqlite3.Connection, ticket_nos: list[str], passenger_id: str) -> BookingResult:
+    """Delete the flights of several tickets on an open transaction, all or none."""
+    ticket_nos = list(dict.fromkeys(ticket_nos))
+    failed = check_tickets(conn, ticket_nos, passenger_id)
+    if failed:
+        return failed
+
+    legs = inventory.ticket_legs(conn, ticket_nos)
+    rows = conn.execute(
+        f"DELETE FROM ticket_flights WHERE ticket_no IN ({placeholders(ticket_nos)})", ticket_nos
+    ).rowcount
+    inventory.release(conn, legs)
+    passenger_itinerary.refresh_tickets(conn, ticket_nos)
+    return BookingResult(True, f"{len(ticket_nos)} tickets successfully cancelled.", rows)
+
+
+def update_ticket(db_path: str, ticket_no: str, new_flight_id: int, passenger_id: str) -> BookingResult:
+    """Rebook a ticket in its own transaction."""
+    return run_in_transaction(
+        lambda conn: rebook_ticket(conn, ticket_no, new_flight_id, passenger_id), db_path
+    )
+
+
+def cancel(db_path: str, ticket_no: str, passenger_id: str) -> BookingResult:
+    """Cancel a ticket in its own transaction."""
+    return run_in_transaction(lambda conn: cancel_ticket_flights(conn, ticket_no, passenger_id), db_path)
+
+
+def update_tickets(db_path: str, ticket_nos: list[str], new_flight_id: int, passenger_id: str) -> BookingResult:
+    """Rebook several tickets in one transaction."""
+    return run_in_transaction(
+        lambda conn: rebook_tickets(conn, ticket_nos, new_flight_id, passenger_id), db_path
+    )
+
+
+def cancel_many(db_path: str, ticket_nos: list[str], passenger_id: str) -> BookingResult:
+    """Cancel several tickets in one transaction."""
+    return run_in_transaction(lambda conn: cancel_tickets_flights(conn, ticket_nos, passenger_id), db_path)
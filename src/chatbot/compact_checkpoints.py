@@ -0,0 +1,308 @@
+import hashlib
+import sqlite3
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Optional
+
+from langchain_core.messages import BaseMessage
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from src.utils.metrics import metrics
+
+COMPACT_TYPE = "compact"
+ZLIB_PREFIX = "zlib+"
+
+# Values encoded to fewer bytes than INLINE_BYTES stay inline in the checkpoint
+# header instead of becoming a blob; blobs under COMPRESS_BYTES are not compressed
+INLINE_BYTES = 128
+COMPRESS_BYTES = 256
+
+BLOB_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoint_blobs (key TEXT PRIMARY KEY, data BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS checkpoint_chains (key TEXT PRIMARY KEY, parent TEXT, messages TEXT NOT NULL);
+"""
+
+CHAIN_QUERY = """
+WITH RECURSIVE chain(key, parent, messages, depth) AS (
+    SELECT key, parent, messages, 0 FROM checkpoint_chains WHERE key = ?
+    UNION ALL
+    SELECT c.key, c.parent, c.messages, chain.depth + 1
+    FROM checkpoint_chains c JOIN chain ON c.key = chain.parent
+)
+SELECT messages FROM chain ORDER BY depth DESC
+"""
+
+
+def content_key(*parts: bytes) -> str:
+    return hashlib.blake2b(b"\0".join(parts), digest_size=12).hexdigest()
+
+
+def encode(type_: str, data: bytes) -> bytes:
+    return type_.encode() + b"\0" + data
+
+
+def compress(raw: bytes, level: int = 6) -> bytes:
+    """Encoded value, zlib-compressed (marked "z") when large enough to gain from it, else as is ("r")."""
+    return b"z" + zlib.compress(raw, level) if len(raw) >= COMPRESS_BYTES else b"r" + raw
+
+
+def decode(raw: bytes) -> tuple[str, bytes]:
+    type_, _, data = raw.partition(b"\0")
+    return type_.decode(), data
+
+
+def unpack(packed: bytes) -> tuple[str, bytes]:
+    return decode(zlib.decompress(packed[1:]) if packed[:1] == b"z" else packed[1:])
+
+
+class LRU(OrderedDict):
+    """Insertion-ordered dict that drops its oldest entries beyond ``size`` (callers hold the lock)."""
+
+    def __init__(self, size: int):
+        super().__init__()
+        self.size = size
+
+    def put(self, key, value) -> None:
+        self[key] = value
+        self.move_to_end(key)
+        while len(self) > self.size:
+            self.popitem(last=False)
+
+    def hit(self, key) -> Any:
+        value = self.get(key)
+        if value is not None:
+            self.move_to_end(key)
+        return value
+
+
+class BlobStore:
+    """
+    Content-addressed blobs and message chains in the checkpoint database.
+
+    Uses its own WAL connection: the saver deserializes while holding its
+    connection's lock, and blobs are committed before the checkpoint that
+    refers to them.
+    """
+
+    def __init__(self, path: str, timeout: float = 5.0):
+        self.conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # In WAL mode NORMAL still commits in order, so a crash never keeps a
+        # checkpoint whose blobs were lost; it only skips the fsync per commit
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(BLOB_SCHEMA)
+        self.lock = threading.Lock()
+
+    def existing(self, table: str, keys: list[str]) -> set[str]:
+        found = set()
+        with self.lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(k for k, in self.conn.execute(
+                    f"SELECT key FROM {table} WHERE key IN ({placeholders})", chunk
+                ))
+        return found
+
+    def write(self, blobs: list[tuple[str, bytes]], chains: list[tuple[str, Optional[str], str]]) -> None:
+        with self.lock, self.conn:
+            self.conn.executemany("INSERT OR IGNORE INTO checkpoint_blobs (key, data) VALUES (?, ?)", blobs)
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO checkpoint_chains (key, parent, messages) VALUES (?, ?, ?)", chains
+            )
+
+    def blobs(self, keys: list[str]) -> dict[str, bytes]:
+        found = {}
+        with self.lock:
+            for i in range(0, len(keys), 500):
+                chunk = keys[i:i + 500]
+                placeholders = ",".join("?" * len(chunk))
+                found.update(self.conn.execute(
+                    f"SELECT key, data FROM checkpoint_blobs WHERE key IN ({placeholders})", chunk
+                ))
+        return found
+
+    def chain(self, key: str) -> list[str]:
+        with self.lock:
+            rows = self.conn.execute(CHAIN_QUERY, (key,)).fetchall()
+        return [k for messages, in rows for k in messages.split(",") if k]
+
+
+class CompactSerializer:
+    """
+    Checkpoint serializer that stores each distinct value once.
+
+    A checkpoint's message list is stored as a chain: every message is a
+    compressed blob keyed by its content, and every checkpoint adds one chain
+    node holding only the keys of the messages appended since the longest
+    prefix already stored, so consecutive checkpoints of a thread share all
+    earlier messages. Other channel values (``user_info``, ``dialog_state``)
+    are blobs keyed by content, so an unchanged flight list is stored once
+    per thread, not once per checkpoint. The checkpoint row itself keeps only
+    the compressed header and the keys.
+
+    Pending writes are passed to ``inner`` and compressed when large.
+    Values written by other serializers (type not starting with "compact" or
+    "zlib+") are read by ``inner``, so existing checkpoint files keep working.
+    """
+
+    def __init__(self, store: BlobStore, inner=None, level: int = 6, cache_size: int = 4096):
+        self.store = store
+        self.inner = inner or JsonPlusSerializer()
+        self.level = level
+        self._lock = threading.Lock()
+        # Message object -> (message, key, encoded or None when already stored), so
+        # unchanged messages, including those of a loaded checkpoint, are not re-serialized
+        self._messages = LRU(cache_size)
+        # Keys known to be stored (blobs and chain nodes), so they are not written twice
+        self._stored = LRU(cache_size * 4)
+        # Blob key -> unpacked (type, data), and chain key -> message keys, for reads
+        self._blobs = LRU(cache_size)
+        self._chains = LRU(256)
+
+    # SerializerProtocol
+
+    def dumps(self, obj: Any) -> bytes:
+        return self.inner.dumps(obj)
+
+    def loads(self, data: bytes) -> Any:
+        return self.inner.loads(data)
+
+    def dumps_typed(self, obj: Any) -> tuple[str, bytes]:
+        if isinstance(obj, dict) and isinstance(obj.get("channel_values"), dict):
+            return COMPACT_TYPE, self._dump_checkpoint(obj)
+        type_, data = self.inner.dumps_typed(obj)
+        if len(data) >= COMPRESS_BYTES:
+            return ZLIB_PREFIX + type_, zlib.compress(data, self.level)
+        return type_, data
+
+    def loads_typed(self, data: tuple[str, bytes]) -> Any:
+        type_, payload = data
+        if type_ == COMPACT_TYPE:
+            return self._load_checkpoint(payload)
+        if type_.startswith(ZLIB_PREFIX):
+            return self.inner.loads_typed((type_[len(ZLIB_PREFIX):], zlib.decompress(payload)))
+        return self.inner.loads_typed(data)
+
+    # Writing
+
+    def _encode(self, obj: Any) -> bytes:
+        return encode(*self.inner.dumps_typed(obj))
+
+    def _message_key(self, message: BaseMessage, new_blobs: dict) -> str:
+        with self._lock:
+            cached = self._messages.hit(id(message))
+        if cached is not None and cached[0] is message:
+            key, raw = cached[1], cached[2]
+        else:
+            raw = self._encode(message)
+            key = content_key(raw)
+            with self._lock:
+                self._messages.put(id(message), (message, key, raw))
+        if raw is not None:
+            new_blobs[key] = raw
+        return key
+
+    def _dump_messages(self, messages: list, new_blobs: dict, new_chains: list) -> Optional[str]:
+        keys = [self._message_key(m, new_blobs) for m in messages]
+        prefixes, chain = [], None
+        for key in keys:
+            chain = content_key((chain or "").encode(), key.encode())
+            prefixes.append(chain)
+        if chain is None:
+            return None
+        with self._lock:
+            known = {p for p in prefixes if p in self._stored}
+        if chain not in known and not known:
+            known = self.store.existing("checkpoint_chains", prefixes)
+        if chain not in known:
+            base = max((i for i, p in enumerate(prefixes) if p in known), default=-1)
+            parent = prefixes[base] if base >= 0 else None
+            new_chains.append((chain, parent, ",".join(keys[base + 1:])))
+        with self._lock:
+            self._chains.put(chain, keys)
+        return chain
+
+    def _dump_checkpoint(self, checkpoint: dict) -> bytes:
+        new_blobs, new_chains, refs = {}, [], {}
+        for channel, value in checkpoint["channel_values"].items():
+            if isinstance(value, list) and value and all(isinstance(m, BaseMessage) for m in value):
+                refs[channel] = ["chain", self._dump_messages(value, new_blobs, new_chains)]
+                continue
+            raw = self._encode(value)
+            if len(raw) < INLINE_BYTES:
+                refs[channel] = ["inline", raw]
+            else:
+                key = content_key(raw)
+                new_blobs[key] = raw
+                refs[channel] = ["blob", key]
+
+        with self._lock:
+            unseen = [key for key in new_blobs if key not in self._stored]
+        # Values another worker already stored are ignored by the INSERT
+        blobs = [(key, compress(new_blobs[key], self.level)) for key in unseen]
+        if blobs or new_chains:
+            self.store.write(blobs, new_chains)
+            metrics.incr("checkpoints.blob_bytes", sum(len(packed) for _, packed in blobs))
+        with self._lock:
+            for key in unseen:
+                self._stored.put(key, True)
+            for chain, _, _ in new_chains:
+                self._stored.put(chain, True)
+
+        header = compress(self._encode({**checkpoint, "channel_values": refs}), self.level)
+        metrics.incr("checkpoints.header_bytes", len(header))
+        return header
+
+    # Reading
+
+    def _load_blobs(self, keys: list[str]) -> dict[str, tuple[str, bytes]]:
+        with self._lock:
+            found = {key: self._blobs.hit(key) for key in keys}
+        missing = [key for key, value in found.items() if value is None]
+        if missing:
+            loaded = self.store.blobs(missing)
+            if len(loaded) < len(missing):
+                raise KeyError(f"Checkpoint blobs missing: {sorted(set(missing) - set(loaded))[:5]}")
+            loaded = {key: unpack(packed) for key, packed in loaded.items()}
+            found.update(loaded)
+            with self._lock:
+                for key, value in loaded.items():
+                    self._blobs.put(key, value)
+                    self._stored.put(key, True)
+        return found
+
+    def _load_checkpoint(self, payload: bytes) -> dict:
+        checkpoint = self.inner.loads_typed(unpack(payload))
+        refs = checkpoint["channel_values"]
+        chains = {}
+        for kind, ref in refs.values():
+            if kind == "chain" and ref is not None:
+                with self._lock:
+                    keys = self._chains.hit(ref)
+                if keys is None:
+                    keys = self.store.chain(ref)
+                    with self._lock:
+                        self._chains.put(ref, keys)
+                chains[ref] = keys
+        wanted = [key for keys in chains.values() for key in keys]
+        wanted += [ref for kind, ref in refs.values() if kind == "blob"]
+        blobs = self._load_blobs(list(dict.fromkeys(wanted)))
+
+        values = {}
+        for channel, (kind, ref) in refs.items():
+            if kind == "chain":
+                keys = chains.get(ref, [])
+                values[channel] = [self.inner.loads_typed(blobs[key]) for key in keys]
+                with self._lock:
+                    for message, key in zip(values[channel], keys):
+                        self._messages.put(id(message), (message, key, None))
+                    if ref is not None:
+                        self._stored.put(ref, True)
+            elif kind == "blob":
+                values[channel] = self.inner.loads_typed(blobs[ref])
+            else:
+                values[channel] = self.inner.loads_typed(decode(ref))
+        checkpoint["channel_values"] = values
+        return checkpoint
@@ -0,0 +1,122 @@
+import json
+import re
+import time
+import uuid
+from typing import Any, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from src.chatbot.intents import KeywordIntentClassifier, workflow_intent_rules
+from src.chatbot.usage import estimate_tokens
+
+# Tool name -> patterns of user requests the fake model answers with that tool.
+# Handoff models come first so they win ties against the search tools.
+fake_tool_rules = {
+    "ToFlightBookingAssistant": workflow_intent_rules["update_flight"],
+    "ToHotelBookingAssistant": workflow_intent_rules["book_hotel"],
+    "ToBookCarRental": workflow_intent_rules["book_car_rental"],
+    "ToBookExcursion": workflow_intent_rules["book_excursion"],
+    "update_ticket_to_new_flight": [(r"\bticket \d+\b.*\bflight \d+\b", 1.0)],
+    "fetch_user_flight_information": [(r"\bmy (flight|ticket|booking)s?\b", 1.0)],
+    "lookup_policy": [(r"\b(polic(y|ies)|baggage|luggage|refunds?|pets?|check-in|meals?)\b", 1.0)],
+    "search_flights": [(r"\bflights?\b", 0.5)],
+    "search_hotels": [(r"\bhotels?\b", 1.0)],
+    "search_car_rentals": [(r"\b(cars?|rentals?)\b", 1.0)],
+    "search_trip_recommendations": [(r"\b(excursions?|tours?|activities|sightseeing)\b", 1.0)],
+    "tavily_search_results_json": [(r"\b(news|weather|advisor(y|ies)|search the web)\b", 1.0)],
+}
+
+fake_tool_classifier = KeywordIntentClassifier(fake_tool_rules)
+
+ENTRY_PREFIX = "The assistant is now"
+
+
+class FakeChatModel(BaseChatModel):
+    """
+    Deterministic, offline stand-in for the Groq chat model.
+
+    Picks a bound tool from keyword rules on the latest user message, answers
+    tool results with a short summary, reports ``usage_metadata`` and can
+    simulate latency. Used by benchmarks and load tests.
+    """
+
+    model_name: str = "fake"
+    latency: float = 0.0
+    seconds_per_token: float = 0.0
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-chat"
+
+    def bind_tools(self, tools: list, **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager=None,
+        tools: Optional[list[dict]] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tools = tools or []
+        message = self._respond(messages, {t["function"]["name"]: t["function"] for t in tools})
+        input_tokens = sum(estimate_tokens(str(m.content)) for m in messages)
+        input_tokens += estimate_tokens(json.dumps(tools)) if tools else 0
+        output_tokens = estimate_tokens(str(message.content) + json.dumps(message.tool_calls))
+        message.usage_metadata = {
+            "input_tokens": input_tokens,
+            "output_tokens": output_tokens,
+            "total_tokens": input_tokens + output_tokens,
+        }
+        message.response_metadata = {"model_name": self.model_name}
+        if self.latency or self.seconds_per_token:
+            time.sleep(self.latency + self.seconds_per_token * output_tokens)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _respond(self, messages: list[BaseMessage], functions: dict[str, dict]) -> AIMessage:
+        last = messages[-1]
+        if isinstance(last, ToolMessage) and not str(last.content).startswith(ENTRY_PREFIX):
+            return AIMessage(content=f"Here is what I found: {str(last.content)[:200]}")
+
+        text = next((m.content for m in reversed(messages) if isinstance(m, HumanMessage)), "")
+        scores = fake_tool_classifier.scores(text)
+        matched = [name for name in fake_tool_rules if name in scores]
+        candidates = [name for name in matched if name in functions]
+        # A router-tier model passes requests for tools it does not have on with UseTools
+        if "UseTools" in functions and matched and max(matched, key=lambda n: scores[n]) not in functions:
+            candidates = ["UseTools"]
+            scores = {"UseTools": 1.0}
+        if not candidates:
+            return AIMessage(content="How else can I help you with your trip?")
+
+        name = max(candidates, key=lambda n: scores[n])
+        return AIMessage(
+            content="",
+            tool_calls=[{"name": name, "args": self._arguments(functions[name], text), "id": f"call_{uuid.uuid4().hex[:24]}"}],
+        )
+
+    @staticmethod
+    def _arguments(function: dict, text: str) -> dict:
+        parameters = function.get("parameters", {})
+        location = re.search(r"\b(?:in|to|at) ([A-Z][a-z]+)", text)
+        # "ticket 7240005432000 ... flight 1234", as in a rebooking request
+        numbers = {
+            "ticket_no": re.search(r"\bticket (\d+)", text),
+            "new_flight_id": re.search(r"\bflight (\d+)", text),
+        }
+        args = {}
+        for name, spec in parameters.get("properties", {}).items():
+            if name in ("query", "request"):
+                args[name] = text
+            elif name == "location" and location:
+                args[name] = location.group(1)
+            elif numbers.get(name):
+                value = numbers[name].group(1)
+                args[name] = int(value) if spec.get("type") == "integer" else value
+            elif name in parameters.get("required", []):
+                args[name] = ""
+        return args
@@ -0,0 +1,43 @@
+import hashlib
+import time
+
+from langchain_core.tools import StructuredTool
+from pydantic import BaseModel, Field
+
+# Same name and description as TavilySearchResults, so prompts, schemas and
+# tool nodes see the tool they see in production
+SEARCH_TOOL_NAME = "tavily_search_results_json"
+SEARCH_TOOL_DESCRIPTION = (
+    "A search engine optimized for comprehensive, accurate, and trusted results. "
+    "Useful for when you need to answer questions about current events. "
+    "Input should be a search query."
+)
+
+
+class SearchInput(BaseModel):
+    query: str = Field(description="search query to look up")
+
+
+def fake_search_tool(max_results: int = 1, latency: float = 0.0) -> StructuredTool:
+    """
+    Deterministic, offline stand-in for the Tavily search tool.
+
+    Returns ``max_results`` canned results derived from the query, after
+    ``latency`` seconds. Used by benchmarks and load tests.
+    """
+
+    def search(query: str) -> list[dict]:
+        if latency:
+            time.sleep(latency)
+        digest = hashlib.sha1(query.encode()).hexdigest()[:8]
+        return [
+            {
+                "url": f"https://search.example/{digest}/{i}",
+                "content": f"Result {i + 1} for '{query}': travel information, advisories and local news.",
+            }
+            for i in range(max_results)
+        ]
+
+    return StructuredTool.from_function(
+        search, name=SEARCH_TOOL_NAME, description=SEARCH_TOOL_DESCRIPTION, args_schema=SearchInput
+    )
@@ -0,0 +1,169 @@
+import json
+import time
+import uuid
+from typing import Any, Callable, NamedTuple, Optional
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import END
+
+from src.chatbot.intents import KeywordIntentClassifier, workflow_intent_rules
+from src.chatbot.usage import add_usage, node_usage, tool_usage
+from src.utils.logger import logger
+from src.utils.metrics import metrics
+
+
+def render_flights(flights: list[dict]) -> str:
+    if not flights:
+        return "I couldn't find any flights booked under your passenger ID."
+    lines = [
+        f"Flight {f['flight_no']} from {f['departure_airport']} to {f['arrival_airport']} departs at "
+        f"{f['scheduled_departure']} and arrives at {f['scheduled_arrival']} "
+        f"(ticket {f['ticket_no']}, seat {f['seat_no']}, {f['fare_conditions']})."
+        for f in flights
+    ]
+    return "\n".join(["Here are your booked flights:"] + lines)
+
+
+def render_text(result: Any) -> str:
+    return str(result)
+
+
+class FastPathRule(NamedTuple):
+    tool: str
+    arguments: Callable[[str], dict]
+    render: Callable[[Any], str]
+    needs_passenger: bool = False
+
+
+# Intent -> patterns of questions answered by a single tool call
+fast_path_intent_rules = {
+    "flight_info": [
+        (r"\b(what time|when) (is|does|do) my (flight|plane)s?\b", 1.0),
+        (r"\bmy (flight|booking|ticket)s? (details|info|information|times?|schedule)\b", 1.0),
+        (r"\b(show|list|what are) my (flights|bookings|tickets)\b", 1.0),
+    ],
+    "policy": [
+        (r"\b(baggage|luggage|cancellation|refund|pets?|check-in|meals?|changes?) (policy|policies|rules?|allowance)\b", 1.0),
+        (r"\b(what is|what's|tell me) the [\w -]*polic(y|ies)\b", 1.0),
+    ],
+}
+
+fast_path_rules = {
+    "flight_info": FastPathRule("fetch_user_flight_information", lambda text: {}, render_flights, True),
+    "policy": FastPathRule("lookup_policy", lambda text: {"query": text}, render_text),
+}
+
+ANSWER_PROMPT = (
+    "You are a customer support assistant for Swiss Airlines. Answer the customer's question "
+    "in at most two sentences using only the tool result below.\n\nTool result:\n{result}"
+)
+
+
+class FastPath:
+    """
+    Graph node that answers obvious single-tool questions before ``primary_assistant``.
+
+    A confident intent runs its tool directly and answers with a template (or
+    one short call to the router-tier model when ``FAST_PATH_ANSWER=llm``);
+    anything else passes through untouched, including a question that also
+    asks for an action of a specialized workflow ("When is my flight? Move it
+    to next week."), whose action the canned answer would drop. Hits, misses and errors are counted
+    in ``metrics`` under ``fast_path.*``; ``FAST_PATH_ENABLED`` switches it off.
+
+    Args:
+        config: Settings object.
+        registry (ToolRegistry): Registry holding the tools named by the rules.
+        llm (optional): Model used for ``FAST_PATH_ANSWER=llm``.
+    """
+
+    def __init__(self, config, registry, llm=None):
+        self.config = config
+        self.registry = registry
+        self.llm = llm
+        self.classifier = KeywordIntentClassifier(fast_path_intent_rules)
+        self.workflows = KeywordIntentClassifier(workflow_intent_rules)
+        self.rules = fast_path_rules
+
+    def __call__(self, state: dict, config: RunnableConfig) -> Optional[dict]:
+        messages = state["messages"]
+        if not messages or not isinstance(messages[-1], HumanMessage):
+            return None
+        if not self.config.FAST_PATH_ENABLED:
+            metrics.incr("fast_path.disabled")
+            return None
+
+        metrics.incr("fast_path.requests")
+        text = messages[-1].content
+        intent = self.classifier.classify(text)
+        rule = self.rules.get(intent.name) if intent else None
+        passenger_id = config.get("configurable", {}).get("passenger_id")
+        if rule is None or (rule.needs_passenger and not passenger_id):
+            metrics.incr("fast_path.misses")
+            return None
+        if self.workflows.scores(text):
+            metrics.incr("fast_path.misses")
+            metrics.incr("fast_path.compound")
+            return None
+
+        start = time.perf_counter()
+        try:
+            args = rule.arguments(text)
+            result = self._run_tool(rule, args, state, config)
+            answer, responses = self._answer(rule, text, result)
+        except Exception as e:
+            logger.warning(f"Fast path {intent.name} failed, falling back to the assistant: {e!r}")
+            metrics.incr("fast_path.errors")
+            return None
+        metrics.incr("fast_path.hits")
+        metrics.incr(f"fast_path.hits.{intent.name}")
+        metrics.observe("fast_path.latency", time.perf_counter() - start)
+
+        tool_call_id = f"call_{uuid.uuid4().hex[:24]}"
+        content = result if isinstance(result, str) else json.dumps(result, default=str)
+        tool_message = ToolMessage(content=content, tool_call_id=tool_call_id, name=rule.tool)
+        return {
+            "messages": [
+                AIMessage(content="", tool_calls=[{"name": rule.tool, "args": args, "id": tool_call_id}]),
+                tool_message,
+                AIMessage(content=answer),
+            ],
+            "usage": add_usage(
+                tool_usage([tool_message]), node_usage("fast_path", responses, self.config.LLM_PRICES)
+            ),
+        }
+
+    def _run_tool(self, rule: FastPathRule, args: dict, state: dict, config: RunnableConfig) -> Any:
+        # fetch_user_info already loaded the passenger's flights for this turn
+        if rule.tool == "fetch_user_flight_information" and isinstance(state.get("user_info"), list):
+            return state["user_info"]
+        return self.registry.by_name[rule.tool].invoke(args, config)
+
+    def _answer(self, rule: FastPathRule, text: str, result: Any) -> tuple[str, list]:
+        """The answer, and the model responses it took (none for a template)."""
+        if self.config.FAST_PATH_ANSWER == "llm" and self.llm is not None:
+            response = self.llm.invoke([
+                SystemMessage(content=ANSWER_PROMPT.format(result=result)),
+                HumanMessage(content=text),
+            ])
+            return response.content, [response]
+        return rule.render(result), []
+
+
+def route_fast_path(state: dict) -> str:
+    """End the turn when the fast path answered, otherwise continue to the primary assistant."""
+    last = state["messages"][-1]
+    if isinstance(last, AIMessage) and not last.tool_calls:
+        return END
+    return "primary_assistant"
+
+
+def fast_path_stats() -> dict:
+    """Hit-rate summary of the fast path."""
+    return {
+        "enabled_requests": metrics.counter("fast_path.requests"),
+        "hits": metrics.counter("fast_path.hits"),
+        "misses": metrics.counter("fast_path.misses"),
+        "errors": metrics.counter("fast_path.errors"),
+        "hit_rate": metrics.ratio("fast_path.hits", "fast_path.requests"),
+    }
@@ -2,11 +2,26 @@ from typing import Callable, List, Literal
 from langchain_core.messages import ToolMessage
 from langgraph.graph import StateGraph, END
 from langgraph.prebuilt import tools_condition
-from src.chatbot.tools import create_tool_node_with_fallback, CompleteOrEscalate
+from src.chatbot.assistants import (
+    ToBookCarRental,
+    ToBookExcursion,
+    ToFlightBookingAssistant,
+    ToHotelBookingAssistant,
+)
+from src.chatbot.registry import ToolRegistry
+from src.chatbot.tools import CompleteOrEscalate
 from typing_extensions import TypedDict
 from langchain_core.runnables import Runnable
 from src.chatbot.flow import State, Assistant
 
+# Routing tool name -> entry node of the specialized workflow
+routing_map = {
+    ToFlightBookingAssistant.__name__: "enter_update_flight",
+    ToBookCarRental.__name__: "enter_book_car_rental",
+    ToHotelBookingAssistant.__name__: "enter_book_hotel",
+    ToBookExcursion.__name__: "enter_book_excursion",
+}
+
 def create_entry_node(assistant_name: str, new_dialog_state: str) -> Callable:
     """Creates an entry node for a specialized workflow."""
     def entry_node(state: State) -> dict:
@@ -41,33 +56,57 @@ def pop_dialog_state(state: State) -> dict:
         "messages": messages,
     }
 
-def create_routing_function(safe_tools: List, workflow_name: str) -> Callable:
+def create_routing_function(registry: ToolRegistry, workflow_name: str) -> Callable:
     """Creates a routing function for a specialized workflow."""
+    cancel_name = CompleteOrEscalate.__name__
+    safe_node = f"{workflow_name}_safe_tools"
+    sensitive_node = f"{workflow_name}_sensitive_tools"
+
     def route_workflow(state: State):
         route = tools_condition(state)
         if route == END:
             return END
         
         tool_calls = state["messages"][-1].tool_calls
-        did_cancel = any(tc["name"] == CompleteOrEscalate.__name__ for tc in tool_calls)
+        did_cancel = any(tc["name"] == cancel_name for tc in tool_calls)
         
         if did_cancel:
             return "leave_skill"
             
-        safe_toolnames = [t.name for t in safe_tools]
-        if all(tc["name"] in safe_toolnames for tc in tool_calls):
-            return f"{workflow_name}_safe_tools"
+        if registry.all_safe(tool_calls):
+            return safe_node
             
-        return f"{workflow_name}_sensitive_tools"
+        return sensitive_node
     
     return route_workflow
 
+def create_primary_routing_function(registry: ToolRegistry) -> Callable:
+    """Creates the routing function of the primary assistant."""
+    def route_primary_assistant(state: State):
+        route = tools_condition(state)
+        if route == END:
+            return END
+
+        tool_calls = state["messages"][-1].tool_calls
+        if not tool_calls:
+            return END
+
+        tool_name = tool_calls[0]["name"]
+        if tool_name in routing_map:
+            return routing_map[tool_name]
+
+        # Check if tool is sensitive or safe
+        if registry.is_sensitive(tool_name):
+            return "sensitive_tools"
+        return "safe_tools"
+
+    return route_primary_assistant
+
 def build_specialized_workflow(
     builder: StateGraph,
     name: str,
-    runnable: Runnable,
-    safe_tools: list,
-    sensitive_tools: list
+    assistant: Assistant,
+    registry: ToolRegistry,
 ):
     """Builds a specialized workflow with safe and sensitive tools."""
     
@@ -78,21 +117,15 @@ def build_specialized_workflow(
     )
     
     # Add main assistant node
-    builder.add_node(name, Assistant(runnable))
+    builder.add_node(name, assistant)
     builder.add_edge(f"enter_{name}", name)
     
-    # Add tool nodes
-    builder.add_node(
-        f"{name}_safe_tools",
-        create_tool_node_with_fallback(safe_tools)
-    )
-    builder.add_node(
-        f"{name}_sensitive_tools",
-        create_tool_node_with_fallback(sensitive_tools)
-    )
+    # Add tool nodes (shared with every other workflow)
+    builder.add_node(f"{name}_safe_tools", registry.safe_node)
+    builder.add_node(f"{name}_sensitive_tools", registry.sensitive_node)
     
     # Add routing logic
-    routing_function = create_routing_function(safe_tools, name)
+    routing_function = create_routing_function(registry, name)
     
     # Add edges
     builder.add_edge(f"{name}_sensitive_tools", name)
@@ -109,7 +142,7 @@ def build_specialized_workflow(
     )
 
 def route_to_workflow(state: State) -> Literal[
-    "primary_assistant",
+    "fast_path",
     "update_flight",
     "book_car_rental",
     "book_hotel",
@@ -118,28 +151,5 @@ def route_to_workflow(state: State) -> Literal[
     """Routes to the appropriate workflow based on dialog state."""
     dialog_state = state.get("dialog_state")
     if not dialog_state:
-        return "primary_assistant"
+        return "fast_path"
     return dialog_state[-1]
-
-def route_primary_assistant(state: State):
-    """Routes the primary assistant's actions."""
-    route = tools_condition(state)
-    if route == END:
-        return END
-        
-    tool_calls = state["messages"][-1].tool_calls
-    if tool_calls:
-        tool_name = tool_calls[0]["name"]
-        routing_map = {
-            "ToFlightBookingAssistant": "enter_update_flight",
-            "ToBookCarRental": "enter_book_car_rental",
-            "ToHotelBookingAssistant": "enter_book_hotel",
-            "ToBookExcursion": "enter_book_excursion"
-        }
-        
-        if tool_name in routing_map:
-            return routing_map[tool_name]
-            
-        return "primary_assistant_tools"
-        
-    raise ValueError("Invalid route")
\ No newline at end of file
@@ -0,0 +1,117 @@
+import re
+import uuid
+from typing import NamedTuple, Optional, Sequence
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.chatbot.tools import CompleteOrEscalate
+
+
+class Intent(NamedTuple):
+    name: str
+    score: float
+
+
+class KeywordIntentClassifier:
+    """
+    Score intents by the weighted regular expressions that match a text.
+
+    Args:
+        rules (dict): Intent name -> sequence of (pattern, weight) pairs.
+        threshold (float): Minimum score of a confident match.
+        margin (float): Minimum lead of the best intent over the runner-up.
+    """
+
+    def __init__(self, rules: dict[str, Sequence[tuple[str, float]]], threshold: float = 1.0, margin: float = 0.5):
+        self.rules = {
+            name: [(re.compile(pattern, re.IGNORECASE), weight) for pattern, weight in patterns]
+            for name, patterns in rules.items()
+        }
+        self.threshold = threshold
+        self.margin = margin
+
+    def scores(self, text: str) -> dict[str, float]:
+        """Score of every intent with at least one matching pattern."""
+        scores = {}
+        for name, patterns in self.rules.items():
+            score = sum(weight for pattern, weight in patterns if pattern.search(text))
+            if score:
+                scores[name] = score
+        return scores
+
+    def classify(self, text: str) -> Optional[Intent]:
+        """Return the confident intent of ``text``, or None when the match is weak or ambiguous."""
+        if not isinstance(text, str):
+            return None
+        ranked = sorted(self.scores(text).items(), key=lambda item: -item[1])
+        if not ranked or ranked[0][1] < self.threshold:
+            return None
+        if len(ranked) > 1 and ranked[0][1] - ranked[1][1] < self.margin:
+            return None
+        return Intent(*ranked[0])
+
+
+# Specialized workflow -> patterns of requests that belong to it
+workflow_intent_rules = {
+    "update_flight": [
+        (r"\b(change|update|rebook|reschedule|move|switch)\b.*\bflights?\b", 1.0),
+        (r"\bflights?\b.*\b(earlier|later|another day|next week|tomorrow)\b", 1.0),
+        (r"\bcancel\b.*\b(ticket|flight)s?\b", 1.0),
+    ],
+    "book_hotel": [
+        (r"\bhotels?\b", 1.0),
+        (r"\b(accommodation|place to stay|a room)\b", 1.0),
+    ],
+    "book_car_rental": [
+        (r"\b(car rentals?|rental cars?|rent(ing)? a car|hire a car)\b", 1.0),
+        (r"\bcars?\b", 0.25),
+    ],
+    "book_excursion": [
+        (r"\b(excursions?|tours?|sightseeing)\b", 1.0),
+        (r"\b(activities|things to do|trip recommendations?)\b", 1.0),
+    ],
+}
+
+
+class IntentRouter:
+    """
+    Answer obvious handoff turns locally and send everything else to ``runnable``.
+
+    On a new user message, a confident intent for another workflow becomes a
+    handoff tool call without calling the model: the matching ``To*`` model
+    from the primary assistant, or ``CompleteOrEscalate`` from a specialized one.
+
+    Args:
+        runnable: Model runnable used for every other turn.
+        classifier (KeywordIntentClassifier): Intent classifier.
+        handoffs (dict): Workflow name -> routing model the primary assistant calls.
+        workflow (str, optional): Workflow served by the wrapped assistant; None for the primary.
+    """
+
+    def __init__(self, runnable, classifier: KeywordIntentClassifier, handoffs: dict, workflow: Optional[str] = None):
+        self.runnable = runnable
+        self.classifier = classifier
+        self.handoffs = handoffs
+        self.workflow = workflow
+
+    def invoke(self, state, config=None):
+        messages = state["messages"]
+        if messages and isinstance(messages[-1], HumanMessage):
+            text = messages[-1].content
+            intent = self.classifier.classify(text)
+            if intent and intent.name != self.workflow and intent.name in self.handoffs:
+                return self._handoff(intent, text)
+        return self.runnable.invoke(state, config)
+
+    def _handoff(self, intent: Intent, text: str) -> AIMessage:
+        if self.workflow is None:
+            model = self.handoffs[intent.name]
+            args = {field: "" for field in model.model_fields}
+            args["request"] = text
+        else:
+            model = CompleteOrEscalate
+            args = {"cancel": True, "reason": f"User switched to {intent.name.replace('_', ' ')}: {text}"}
+        return AIMessage(
+            content="",
+            tool_calls=[{"name": model.__name__, "args": args, "id": f"call_{uuid.uuid4().hex[:24]}"}],
+        )
@@ -1,5 +1,8 @@
-from langchain_core.messages import ToolMessage
-from typing import Optional
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from typing import Dict, List, NamedTuple, Optional
+from src.chatbot.usage import subtract_usage
+
+FALLBACK_REPLY = "I apologize, but I'm having trouble processing your request. Could you please try again?"
 
 def handle_user_interaction(graph, event, config: dict) -> Optional[dict]:
     """Handle user interaction for tool approval."""
@@ -32,4 +35,91 @@ def handle_user_interaction(graph, event, config: dict) -> Optional[dict]:
         
         snapshot = graph.get_state(config)
         
-    return result
\ No newline at end of file
+    return result
+
+
+def pending_tool_calls(graph, config: dict) -> list[dict]:
+    """Tool calls of a thread that is waiting for approval, read from its checkpoint."""
+    snapshot = graph.get_state(config)
+    if not snapshot.next or not snapshot.values.get("messages"):
+        return []
+    return list(getattr(snapshot.values["messages"][-1], "tool_calls", []))
+
+
+def resume_pending(graph, config: dict, user_input: str) -> Optional[dict]:
+    """
+    Answer a pending approval without prompting: "y" runs the tools, anything
+    else denies every pending call with the user's input as the reason.
+    """
+    if user_input.strip().lower() == "y":
+        return graph.invoke(None, config)
+    return graph.invoke(
+        {
+            "messages": [
+                ToolMessage(
+                    tool_call_id=call["id"],
+                    content=f"API call denied by user. Reasoning: '{user_input}'. "
+                           f"Continue assisting, accounting for the user's input.",
+                )
+                for call in pending_tool_calls(graph, config)
+            ]
+        },
+        config,
+    )
+
+
+class Turn(NamedTuple):
+    messages: list[BaseMessage]
+    # Tool calls waiting for approval
+    pending: list[dict]
+    # Tokens and cost of this turn, and of the whole thread so far (see src/chatbot/usage.py)
+    usage: dict
+    thread_usage: dict
+
+
+def run_turn(graph, config: dict, message: str) -> Turn:
+    """
+    Send one user message on a thread: it answers a pending approval, or
+    starts a new turn. Returns the messages the turn added, the tool calls
+    now waiting for approval and the token usage.
+    """
+    before = graph.get_state(config).values
+    # By ID: a summary may have replaced earlier messages
+    seen = {m.id for m in before.get("messages", [])}
+    if pending_tool_calls(graph, config):
+        resume_pending(graph, config, message)
+    else:
+        graph.invoke({"messages": [HumanMessage(content=message)]}, config)
+    after = graph.get_state(config).values
+    new_messages = [m for m in after.get("messages", []) if m.id not in seen]
+    usage = after.get("usage") or {}
+    return Turn(new_messages, pending_tool_calls(graph, config), subtract_usage(usage, before.get("usage")), usage)
+
+
+def serialize_message(message: BaseMessage) -> Dict:
+    """Convert a LangChain message object to a serializable dictionary."""
+    if not message.content and not message.additional_kwargs:
+        return None
+        
+    return {
+        "type": message.type,
+        "content": message.content or "",
+        "additional_kwargs": message.additional_kwargs or {}
+    }
+
+
+def reply_messages(new_messages: list[BaseMessage], pending: list[dict]) -> List[Dict]:
+    """The AI and tool messages of a turn as dictionaries, with an apology when the turn produced no answer."""
+    messages = [
+        serialized
+        for serialized in (
+            serialize_message(msg)
+            for msg in new_messages
+            if isinstance(msg, (AIMessage, ToolMessage))  # Only include AI and Tool messages
+        )
+        if serialized
+    ]
+    # If no AI messages were generated, add an error message
+    if not pending and not any(msg["type"] == "ai" for msg in messages):
+        messages.append({"type": "ai", "content": FALLBACK_REPLY, "additional_kwargs": {}})
+    return messages
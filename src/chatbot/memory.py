@@ -1,3 +1,52 @@
+import os
+import sqlite3
+from functools import lru_cache
+
 from langgraph.checkpoint.memory import MemorySaver
 
+from config.config import Config
+from src.chatbot.compact_checkpoints import BlobStore, CompactSerializer
+
 memory = MemorySaver()
+
+
+def get_checkpointer(config=None):
+    """
+    Return the checkpoint saver selected by ``config.MEMORY_TYPE``.
+
+    "simple" is the in-process ``memory`` saver. "sqlite" stores checkpoints,
+    including threads waiting for a sensitive-tool approval, in the WAL-mode
+    ``config.CHECKPOINT_DB`` file, so any worker process can continue any
+    conversation. With ``config.CHECKPOINT_FORMAT`` "compact" the saver
+    writes through ``CompactSerializer``.
+    """
+    config = config or Config
+    if config.MEMORY_TYPE == "simple":
+        return memory
+    if config.MEMORY_TYPE == "sqlite":
+        return _sqlite_saver(config.CHECKPOINT_DB, config.DB_BUSY_TIMEOUT, config.CHECKPOINT_FORMAT)
+    raise ValueError(f"Unknown MEMORY_TYPE: {config.MEMORY_TYPE!r}")
+
+
+def get_batch_checkpointer(config=None):
+    """SQLite saver of ``config.BATCH_CHECKPOINT_DB``, so batch runs never touch live threads."""
+    config = config or Config
+    return _sqlite_saver(config.BATCH_CHECKPOINT_DB, config.DB_BUSY_TIMEOUT, config.CHECKPOINT_FORMAT)
+
+
+@lru_cache(maxsize=None)
+def _sqlite_saver(path: str, timeout: float, checkpoint_format: str = "compact"):
+    from langgraph.checkpoint.sqlite import SqliteSaver
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    if checkpoint_format == "compact":
+        serde = CompactSerializer(BlobStore(path, timeout))
+    elif checkpoint_format == "default":
+        serde = None
+    else:
+        raise ValueError(f"Unknown CHECKPOINT_FORMAT: {checkpoint_format!r}")
+    saver = SqliteSaver(conn, serde=serde)
+    saver.setup()
+    return saver
@@ -0,0 +1,158 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Optional
+
+from config.config import Config
+from src.chatbot import tools
+from src.flights import inventory
+from src.flights.index import get_flight_index
+from src.utils.db import connect
+from src.utils.logger import logger
+from src.utils.metrics import metrics
+from src.utils.timeutils import now_epoch
+
+_executor = None
+_executor_lock = threading.Lock()
+# Prefetch tasks submitted and not finished yet, across all requests
+_outstanding = 0
+
+
+def get_prefetch_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=Config.PREFETCH_WORKERS, thread_name_prefix="prefetch")
+        return _executor
+
+
+def outstanding() -> int:
+    with _executor_lock:
+        return _outstanding
+
+
+def _task_done(future: Future) -> None:
+    global _outstanding
+    with _executor_lock:
+        _outstanding -= 1
+
+
+def submit(executor: ThreadPoolExecutor, fn, *args) -> Future:
+    global _outstanding
+    with _executor_lock:
+        _outstanding += 1
+    future = executor.submit(fn, *args)
+    future.add_done_callback(_task_done)
+    return future
+
+
+class Prefetch:
+    """
+    Passenger data of one /chat request, read before the graph asks for it.
+
+    ``start`` submits the passenger's flights (the ``fetch_user_info``
+    query), which load with the thread's checkpoint. Once they are handed
+    over, the seats left on each of their routes from yesterday to ``days``
+    ahead load during the first model call. ``fetch_user_info``,
+    ``search_flights`` and ``check_seat_availability`` then take them from
+    here instead of the database (see ``tools.request_prefetch``).
+
+    Results are only used while no write to the flights namespace of
+    ``tools.tool_cache`` has happened since the prefetch started. ``start``
+    skips the prefetch while the pool has a task per worker outstanding, so
+    requests never queue behind other requests' prefetches.
+    """
+
+    def __init__(self, passenger_id: str, executor: ThreadPoolExecutor, days: float, max_routes: int = 4):
+        self.passenger_id = passenger_id
+        self.db = tools.db
+        self.days = days
+        self.max_routes = max_routes
+        self.executor = executor
+        # Capture the generation before reading, so a write that lands in between discards the results
+        self.generation = tools.tool_cache.generation("flights")
+        self._routes: Optional[dict[tuple[str, str], Future]] = None
+        self._lock = threading.Lock()
+        self.flights = submit(executor, self._fetch_flights)
+
+    @classmethod
+    def start(cls, passenger_id: str, config=None) -> Optional["Prefetch"]:
+        """Prefetch for ``passenger_id``, or None while the prefetch pool is busy."""
+        config = config or Config
+        if outstanding() >= config.PREFETCH_WORKERS:
+            metrics.incr("prefetch.skipped")
+            return None
+        metrics.incr("prefetch.started")
+        return cls(passenger_id, get_prefetch_executor(), config.PREFETCH_DAYS)
+
+    def usable(self, db: str) -> bool:
+        return db == self.db and tools.tool_cache.generation("flights") == self.generation
+
+    def _fetch_flights(self) -> list[dict]:
+        return tools.passenger_flights(self.passenger_id)
+
+    def _start_routes(self, flights: list[dict]) -> None:
+        # Started once the flights were handed over rather than from the flights task, so on
+        # a busy interpreter the route queries do not hold up the thread waiting for them
+        routes = list(dict.fromkeys((f["departure_airport"], f["arrival_airport"]) for f in flights))
+        with self._lock:
+            if self._routes is not None:
+                return
+            self._routes = {
+                route: submit(self.executor, self._fetch_route_seats, *route) for route in routes[:self.max_routes]
+            }
+
+    def _fetch_route_seats(self, departure_airport: str, arrival_airport: str) -> dict[int, dict[str, int]]:
+        index = get_flight_index(self.db)
+        # From a day back, so searches starting at today's date are covered too
+        start = now_epoch() - 86400
+        positions = index.window((departure_airport, arrival_airport), start, start + int((self.days + 1) * 86400))
+        flight_id = index.columns.index("flight_id")
+        conn = connect(self.db)
+        try:
+            return inventory.seats_left(conn, [index.rows[p][flight_id] for p in positions])
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _result(future: Future, name: str):
+        """The result of a prefetch task, waiting for it if it is still running; None if it failed."""
+        try:
+            result = future.result()
+        except Exception:
+            logger.exception(f"Prefetch of {name} failed")
+            metrics.incr("prefetch.errors")
+            return None
+        metrics.incr("prefetch.hits")
+        return result
+
+    def passenger_flights(self, passenger_id: str) -> Optional[list[dict]]:
+        if passenger_id != self.passenger_id:
+            return None
+        flights = self._result(self.flights, "passenger flights")
+        if flights is not None:
+            self._start_routes(flights)
+        return flights
+
+    def route_seats(self, departure_airport: Optional[str], arrival_airport: Optional[str]) -> Optional[dict]:
+        """Seats left per flight on a route of the passenger, or None if it was not prefetched."""
+        if self.flights.exception() is not None:
+            return None
+        self._start_routes(self.flights.result())
+        with self._lock:
+            future = self._routes.get((departure_airport, arrival_airport))
+        if future is None:
+            metrics.incr("prefetch.misses")
+            return None
+        return self._result(future, f"{departure_airport}-{arrival_airport} seats")
+
+    def flight_seats(self, flight_id: int) -> Optional[dict[str, int]]:
+        """Seats left per fare of a flight on a prefetched route that already finished loading."""
+        with self._lock:
+            futures = list((self._routes or {}).values())
+        for future in futures:
+            if future.done() and future.exception() is None:
+                seats = future.result().get(flight_id)
+                if seats is not None:
+                    metrics.incr("prefetch.hits")
+                    return seats
+        return None
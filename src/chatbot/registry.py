@@ -0,0 +1,142 @@
+from functools import lru_cache
+from typing import Sequence
+
+from langchain_core.runnables import Runnable
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from src.chatbot.tools import (
+    create_tool_node_with_fallback,
+    fetch_user_flight_information,
+    search_flights,
+    search_itineraries,
+    check_seat_availability,
+    update_ticket_to_new_flight,
+    update_tickets_to_new_flight,
+    cancel_ticket,
+    cancel_tickets,
+    lookup_policy,
+    search_car_rentals,
+    book_car_rental,
+    book_car_rentals,
+    update_car_rental,
+    cancel_car_rental,
+    search_hotels,
+    book_hotel,
+    update_hotel,
+    cancel_hotel,
+    search_trip_recommendations,
+    book_excursion,
+    update_excursion,
+    cancel_excursion
+)
+
+
+def tool_name(tool) -> str:
+    """Name the LLM uses to call ``tool`` (a BaseTool or a pydantic model)."""
+    return getattr(tool, "name", None) or tool.__name__
+
+
+class ToolRegistry:
+    """
+    Tool sets, lookup tables, schemas and tool nodes built once and shared by
+    every assistant, router and tool node of the graph.
+
+    Args:
+        safe_tools (Sequence): Read-only tools, run without approval.
+        sensitive_tools (Sequence): Data-modifying tools, run after approval.
+    """
+
+    def __init__(self, safe_tools: Sequence, sensitive_tools: Sequence):
+        self.safe_tools = tuple(safe_tools)
+        self.sensitive_tools = tuple(sensitive_tools)
+        self.tools = self.safe_tools + self.sensitive_tools
+        self.by_name = {tool_name(t): t for t in self.tools}
+        self.safe_names = frozenset(tool_name(t) for t in self.safe_tools)
+        self.sensitive_names = frozenset(tool_name(t) for t in self.sensitive_tools)
+        self.schemas = {tool_name(t): convert_to_openai_tool(t) for t in self.tools}
+        self.safe_node = create_tool_node_with_fallback(list(self.safe_tools))
+        self.sensitive_node = create_tool_node_with_fallback(list(self.sensitive_tools))
+        self._bound = {}
+
+    def schema(self, tool) -> dict:
+        """OpenAI tool schema for ``tool``, converted once."""
+        name = tool_name(tool)
+        if name not in self.schemas:
+            self.schemas[name] = convert_to_openai_tool(tool)
+        return self.schemas[name]
+
+    def is_sensitive(self, name: str) -> bool:
+        return name in self.sensitive_names
+
+    def all_safe(self, tool_calls: list[dict]) -> bool:
+        """True when every call in ``tool_calls`` targets a safe tool."""
+        return all(tc["name"] in self.safe_names for tc in tool_calls)
+
+    def bind(self, llm, extra: Sequence = (), registered: bool = True) -> Runnable:
+        """
+        Bind every registered tool plus ``extra`` (e.g. routing models) to ``llm``.
+
+        The precomputed schemas are passed to ``bind_tools`` and the bound model
+        is reused for the same ``llm`` and ``extra`` set. With ``registered``
+        false only ``extra`` is bound, as for a router-tier model that may only
+        hand off.
+        """
+        key = (id(llm), tuple(tool_name(t) for t in extra), registered)
+        bound = self._bound.get(key)
+        if bound is None:
+            schemas = [self.schemas[name] for name in self.by_name] if registered else []
+            schemas += [self.schema(t) for t in extra]
+            bound = self._bound[key] = llm.bind_tools(schemas)
+        return bound
+
+
+@lru_cache(maxsize=None)
+def get_search_tool(max_results: int = 1, provider: str = "tavily", latency: float = 0.0):
+    """
+    Return the shared web search tool: Tavily, importing langchain_community on
+    first use, or the offline fake (answering after ``latency`` seconds) with
+    ``provider="fake"``.
+    """
+    if provider == "fake":
+        from src.chatbot.fake_search import fake_search_tool
+
+        return fake_search_tool(max_results, latency)
+    from langchain_community.tools.tavily_search import TavilySearchResults
+
+    return TavilySearchResults(max_results=max_results)
+
+
+# Sensitive (data-modifying) tools
+sensitive_tools = [
+    update_ticket_to_new_flight,
+    update_tickets_to_new_flight,
+    cancel_ticket,
+    cancel_tickets,
+    book_car_rental,
+    book_car_rentals,
+    update_car_rental,
+    cancel_car_rental,
+    book_hotel,
+    update_hotel,
+    cancel_hotel,
+    book_excursion,
+    update_excursion,
+    cancel_excursion,
+]
+
+
+@lru_cache(maxsize=None)
+def get_tool_registry(search_provider: str = "tavily", search_latency: float = 0.0) -> ToolRegistry:
+    """Return the process-wide registry of the assistant tools for one web search setup."""
+    safe_tools = [
+        get_search_tool(provider=search_provider, latency=search_latency),
+        fetch_user_flight_information,
+        search_flights,
+        search_itineraries,
+        check_seat_availability,
+        lookup_policy,
+        search_car_rentals,
+        search_hotels,
+        search_trip_recommendations,
+    ]
+    return ToolRegistry(safe_tools, sensitive_tools)
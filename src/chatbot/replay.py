@@ -0,0 +1,350 @@
+import argparse
+import atexit
+import copy
+import glob
+import gzip
+import hashlib
+import json
+import os
+import re
+import sys
+import threading
+import time
+from collections import defaultdict
+from functools import lru_cache
+from typing import Any, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+    message_to_dict,
+    messages_from_dict,
+)
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langchain_core.utils.function_calling import convert_to_openai_tool
+
+from src.utils.logger import logger
+from src.utils.metrics import metrics
+
+# Timestamps in prompts ("Current time: ...") change between runs and must not change the key
+TIMESTAMP = re.compile(r"\d{4}-\d{2}-\d{2}[ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?([+-]\d{2}:?\d{2}|Z)?")
+
+DENIED_PREFIX = "API call denied by user. Reasoning: '"
+
+
+class ReplayMiss(KeyError):
+    """Replay found no recorded response for a request."""
+
+
+def request_key(*parts: Any) -> str:
+    blob = json.dumps(parts, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:20]
+
+
+def message_fingerprint(message: BaseMessage) -> list:
+    """The parts of a message that decide the answer: no IDs, and no timestamps in system prompts."""
+    content = message.content if isinstance(message.content, str) else json.dumps(message.content, default=str)
+    if isinstance(message, SystemMessage):
+        content = TIMESTAMP.sub("<time>", content)
+    calls = [[call["name"], call["args"]] for call in getattr(message, "tool_calls", None) or []]
+    return [message.type, content, calls]
+
+
+def tool_key(name: str, args: Any, config: Optional[RunnableConfig]) -> str:
+    passenger_id = (config or {}).get("configurable", {}).get("passenger_id")
+    return request_key(name, args, passenger_id)
+
+
+class Tape:
+    """
+    Append-only, gzip-compressed JSONL log of recorded calls.
+
+    Each recording process appends to its own part, ``<path>.<pid>``: gzip
+    members flushed by several processes into one file would interleave and
+    make it unreadable. Reading the log merges ``path`` and all its parts.
+
+    Each line holds the call kind ("llm", "tool" or "tool_result"), its
+    request key, the model or tool name, the thread, the recorded duration
+    and the response. Replay serves the responses of a key in recorded
+    order, wrapping around, and sleeps ``latency`` times the recorded
+    duration (0 answers at once).
+    """
+
+    def __init__(self, path: str, mode: str, latency: float = 0.0):
+        self.path = path
+        self.mode = mode
+        self.latency = latency
+        self._lock = threading.Lock()
+        self._entries = defaultdict(list)
+        self._cursors = defaultdict(int)
+        self._file = None
+        if mode == "replay":
+            for entry in read_entries(path):
+                self._entries[(entry["kind"], entry["key"])].append(entry)
+            logger.info(f"Loaded {sum(map(len, self._entries.values()))} recorded calls from {path}")
+        elif mode == "record":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+            self._file = gzip.open(f"{path}.{os.getpid()}", "at", encoding="utf-8")
+        else:
+            raise ValueError(f"Unknown REPLAY_MODE: {mode!r}")
+
+    def record(self, kind: str, key: str, name: str, seconds: float, response: Any, thread_id=None) -> None:
+        line = json.dumps({
+            "kind": kind, "key": key, "name": name, "thread_id": thread_id,
+            "seconds": round(seconds, 4), "response": response,
+        }, default=str)
+        with self._lock:
+            self._file.write(line + "\n")
+            # A sync flush keeps the log readable after a crash without restarting the compressor
+            self._file.flush()
+        metrics.incr(f"replay.recorded.{kind}")
+
+    def lookup(self, kind: str, key: str, name: str) -> dict:
+        """Next recorded entry of a request, without simulating its latency."""
+        with self._lock:
+            entries = self._entries.get((kind, key))
+            if not entries:
+                metrics.incr("replay.misses")
+                raise ReplayMiss(f"No recorded {kind} call to {name} with key {key} in {self.path}")
+            entry = entries[self._cursors[(kind, key)] % len(entries)]
+            self._cursors[(kind, key)] += 1
+        metrics.incr(f"replay.served.{kind}")
+        return entry
+
+    def wait(self, seconds: float) -> None:
+        if self.latency and seconds:
+            time.sleep(seconds * self.latency)
+
+    def replay(self, kind: str, key: str, name: str) -> Any:
+        entry = self.lookup(kind, key, name)
+        self.wait(entry["seconds"])
+        return entry["response"]
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+def log_parts(path: str) -> list[str]:
+    """The files of a log: ``path`` itself, if present, then the per-process parts ``<path>.<pid>``."""
+    parts = sorted(
+        (part for part in glob.glob(f"{glob.escape(path)}.*") if part.rsplit(".", 1)[1].isdigit()),
+        key=lambda part: int(part.rsplit(".", 1)[1]),
+    )
+    return ([path] if os.path.exists(path) else []) + parts
+
+
+def read_entries(path: str):
+    """
+    Entries of a log and its per-process parts, including parts still being
+    recorded (their streams have no end marker yet).
+    """
+    for part in log_parts(path):
+        with gzip.open(part, "rt", encoding="utf-8") as f:
+            try:
+                for line in f:
+                    if line.endswith("\n"):
+                        yield json.loads(line)
+            except EOFError:
+                continue
+
+
+@lru_cache(maxsize=None)
+def get_tape(path: str, mode: str, latency: float = 0.0) -> Tape:
+    tape = Tape(path, mode, latency)
+    atexit.register(tape.close)
+    return tape
+
+
+def tape_for(config) -> Tape:
+    return get_tape(config.REPLAY_LOG, config.REPLAY_MODE, config.REPLAY_LATENCY)
+
+
+class ReplayChatModel(BaseChatModel):
+    """
+    Chat model that records the answers of ``inner`` to the tape, or, without
+    ``inner``, answers from the tape (so no provider client or key is needed).
+    """
+
+    model_name: str
+    tape: Any
+    inner: Optional[BaseChatModel] = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "replay-chat"
+
+    def bind_tools(self, tools: list, **kwargs: Any):
+        return self.bind(tools=[convert_to_openai_tool(t) for t in tools], **kwargs)
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager=None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        tools = sorted(t["function"]["name"] for t in kwargs.get("tools") or [])
+        key = request_key(self.model_name, [message_fingerprint(m) for m in messages], tools, stop)
+        if self.inner is None:
+            message = messages_from_dict([self.tape.replay("llm", key, self.model_name)["message"]])[0]
+        else:
+            start = time.perf_counter()
+            message = self.inner.invoke(messages, stop=stop, **kwargs)
+            thread_id = run_manager.metadata.get("thread_id") if run_manager else None
+            self.tape.record("llm", key, self.model_name, time.perf_counter() - start, {
+                "message": message_to_dict(message),
+                "inputs": conversation_inputs(messages),
+            }, thread_id)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+_chat_models = {}
+
+
+def replay_chat_model(model_name: str, tape: Tape, inner: Optional[BaseChatModel] = None) -> ReplayChatModel:
+    """The replay model of ``model_name`` on ``tape`` (recording ``inner``), created once."""
+    key = (model_name, id(tape), id(inner))
+    if key not in _chat_models:
+        _chat_models[key] = ReplayChatModel(model_name=model_name, tape=tape, inner=inner)
+    return _chat_models[key]
+
+
+class ReplayTool:
+    """``invoke``-compatible stand-in for a tool called directly (the fast path)."""
+
+    def __init__(self, tool, tape: Tape):
+        self.tool = tool
+        self.name = tool.name
+        self.tape = tape
+
+    def invoke(self, args: dict, config: Optional[RunnableConfig] = None) -> Any:
+        key = tool_key(self.name, args, config)
+        if self.tape.mode == "replay":
+            return self.tape.replay("tool_result", key, self.name)
+        start = time.perf_counter()
+        result = self.tool.invoke(args, config)
+        thread_id = (config or {}).get("configurable", {}).get("thread_id")
+        self.tape.record("tool_result", key, self.name, time.perf_counter() - start, result, thread_id)
+        return result
+
+
+def replay_tool_node(node, tape: Tape):
+    """
+    Wrap a tool node: record the ToolMessage of every call, or answer every
+    call from the tape without running the tools. Calls of one node run
+    concurrently, so replay waits for the slowest recorded one.
+    """
+
+    def run(state: dict, config: RunnableConfig):
+        calls = state["messages"][-1].tool_calls
+        keys = {call["id"]: tool_key(call["name"], call["args"], config) for call in calls}
+        if tape.mode == "replay":
+            entries = [tape.lookup("tool", keys[call["id"]], call["name"]) for call in calls]
+            tape.wait(max((entry["seconds"] for entry in entries), default=0))
+            return {
+                "messages": [
+                    ToolMessage(content=entry["response"], tool_call_id=call["id"], name=call["name"])
+                    for call, entry in zip(calls, entries)
+                ]
+            }
+        start = time.perf_counter()
+        result = node.invoke(state, config)
+        seconds = time.perf_counter() - start
+        for message in result["messages"]:
+            if message.tool_call_id in keys:
+                name = getattr(message, "name", None) or ""
+                tape.record(
+                    "tool", keys[message.tool_call_id], name, seconds, message.content,
+                    config.get("configurable", {}).get("thread_id"),
+                )
+        return result
+
+    return RunnableLambda(run, name="replay_tools")
+
+
+def replay_registry(registry, tape: Tape):
+    """A copy of ``registry`` whose tool nodes and tools go through the tape."""
+    replayed = copy.copy(registry)
+    replayed.safe_node = replay_tool_node(registry.safe_node, tape)
+    replayed.sensitive_node = replay_tool_node(registry.sensitive_node, tape)
+    replayed.by_name = {name: ReplayTool(tool, tape) for name, tool in registry.by_name.items()}
+    replayed._bound = {}
+    return replayed
+
+
+def conversation_inputs(messages: list[BaseMessage]) -> list[list]:
+    """
+    What the user sent in a conversation so far: ``["human", text]`` per
+    message and ``["calls", tool names, denial reason or None]`` per AI tool
+    call batch, so approvals can be replayed.
+    """
+    answers = {m.tool_call_id: m.content for m in messages if isinstance(m, ToolMessage)}
+    inputs = []
+    for message in messages:
+        if isinstance(message, HumanMessage):
+            inputs.append(["human", message.content])
+        elif isinstance(message, AIMessage) and message.tool_calls:
+            answer = str(answers.get(message.tool_calls[0]["id"], ""))
+            denied = answer[len(DENIED_PREFIX):].split("'. Continue assisting")[0] if answer.startswith(
+                DENIED_PREFIX
+            ) else None
+            inputs.append(["calls", [call["name"] for call in message.tool_calls], denied])
+    return inputs
+
+
+def export_conversations(path: str, sensitive_names=frozenset()) -> list[dict]:
+    """
+    Conversations of a recorded log, as input for a batch run: per thread the
+    user messages of its longest recorded LLM request, with "y" (or the
+    denial reason) where a sensitive tool call was approved (or denied).
+    """
+    longest = {}
+    for entry in read_entries(path):
+        thread_id = entry.get("thread_id")
+        if entry["kind"] == "llm" and thread_id:
+            inputs = entry["response"]["inputs"]
+            if len(inputs) >= len(longest.get(thread_id, [])):
+                longest[thread_id] = inputs
+    conversations = []
+    for thread_id, inputs in longest.items():
+        messages = []
+        for kind, value, *denied in inputs:
+            if kind == "human":
+                messages.append(value)
+            elif any(name in sensitive_names for name in value):
+                messages.append(denied[0] or "y")
+        conversations.append({"id": thread_id, "messages": messages})
+    return conversations
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or export a recorded replay log.")
+    parser.add_argument("command", choices=["stats", "conversations"])
+    parser.add_argument("--log", default=None, help="Replay log (default: REPLAY_LOG)")
+    args = parser.parse_args()
+
+    from config.config import Config
+    path = args.log or Config.REPLAY_LOG
+    if args.command == "stats":
+        counts = defaultdict(lambda: [0, 0.0])
+        for entry in read_entries(path):
+            counts[(entry["kind"], entry["name"])][0] += 1
+            counts[(entry["kind"], entry["name"])][1] += entry["seconds"]
+        for (kind, name), (calls, seconds) in sorted(counts.items()):
+            print(f"{kind:<12} {name:<32} {calls:6d} calls {seconds:9.2f} s recorded")
+    else:
+        from src.chatbot.registry import get_tool_registry
+        for conversation in export_conversations(
+            path, get_tool_registry(Config.SEARCH_PROVIDER, Config.FAKE_SEARCH_LATENCY).sensitive_names
+        ):
+            sys.stdout.write(json.dumps(conversation) + "\n")
+
+
+if __name__ == "__main__":
+    main()
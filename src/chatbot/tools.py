@@ -6,13 +6,37 @@ from datetime import date, datetime
 from typing import Optional, Union
 from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
-import pytz
 from config.config import Config
-import uuid
+from src.chatbot import booking
+from src.flights import inventory, passenger_itinerary
+from src.flights.index import get_flight_index
+from src.flights.itineraries import get_itinerary_search
+from src.reservations import car_rentals, excursions, hotels
+from src.utils.coalescing import Coalescer, like_key, normalize
+from src.utils.db import connect, run_in_transaction
 from pydantic import BaseModel, Field
 
 db = Config.DATABASE_PATH
 
+# Shared results of the read-only tools, by the tables they read: "flights",
+# "car_rentals", "hotels", "trip_recommendations" and "policy". The write tools
+# invalidate the namespaces they change.
+tool_cache = Coalescer(Config.TOOL_CACHE_TTL, Config.TOOL_CACHE_SIZE)
+
+
+def request_prefetch(config: Optional[RunnableConfig]):
+    """The ``Prefetch`` /chat started for this request (src/chatbot/prefetch.py), if its results are still valid."""
+    prefetch = (config or {}).get("configurable", {}).get("prefetch")
+    return prefetch if prefetch is not None and prefetch.usable(db) else None
+
+
+def configured_passenger(config: RunnableConfig) -> str:
+    """The signed-in passenger_id of a tool call; raises when none is configured."""
+    passenger_id = config.get("configurable", {}).get("passenger_id", None)
+    if not passenger_id:
+        raise ValueError("No passenger ID configured.")
+    return passenger_id
+
 
 @tool
 def fetch_user_flight_information(config: RunnableConfig) -> list[dict]:
@@ -25,36 +49,25 @@ def fetch_user_flight_information(config: RunnableConfig) -> list[dict]:
     Returns:
         list[dict]: List of flight information dictionaries for the user.
     """
-    configuration = config.get("configurable", {})
-    passenger_id = configuration.get("passenger_id", None)
-    if not passenger_id:
-        raise ValueError("No passenger ID configured.")
+    passenger_id = configured_passenger(config)
 
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
+    return passenger_flights(passenger_id, request_prefetch(config))
 
-    query = """
-    SELECT
-        t.ticket_no, t.book_ref,
-        f.flight_id, f.flight_no, f.departure_airport, f.arrival_airport, f.scheduled_departure, f.scheduled_arrival,
-        bp.seat_no, tf.fare_conditions
-    FROM
-        tickets t
-        JOIN ticket_flights tf ON t.ticket_no = tf.ticket_no
-        JOIN flights f ON tf.flight_id = f.flight_id
-        JOIN boarding_passes bp ON bp.ticket_no = t.ticket_no AND bp.flight_id = f.flight_id
-    WHERE
-        t.passenger_id = ?
-    """
-    cursor.execute(query, (passenger_id,))
-    rows = cursor.fetchall()
-    column_names = [column[0] for column in cursor.description]
-    results = [dict(zip(column_names, row)) for row in rows]
 
-    cursor.close()
-    conn.close()
+def passenger_flights(passenger_id: str, prefetch=None) -> list[dict]:
+    """Flights of a passenger from the passenger_itinerary table, without the tool call overhead."""
+    flights = prefetch.passenger_flights(passenger_id) if prefetch is not None else None
+    if flights is not None:
+        return flights
 
-    return results
+    def run():
+        conn = connect(db)
+        try:
+            return passenger_itinerary.passenger_flights(conn, passenger_id)
+        finally:
+            conn.close()
+
+    return tool_cache.call("flights", (db, "passenger_flights", passenger_id), run)
 
 
 @tool
@@ -64,9 +77,13 @@ def search_flights(
     start_time: Optional[date | datetime] = None,
     end_time: Optional[date | datetime] = None,
     limit: int = 20,
+    fare_conditions: Optional[str] = None,
+    *,
+    config: RunnableConfig,
 ) -> list[dict]:
     """
-    Search for available flights based on specified criteria.
+    Search for available flights based on specified criteria. Only flights
+    with free seats are returned.
     
     Args:
         departure_airport (str, optional): Departure airport code
@@ -74,42 +91,97 @@ def search_flights(
         start_time (date | datetime, optional): Earliest departure time
         end_time (date | datetime, optional): Latest departure time
         limit (int, optional): Maximum number of results to return
+        fare_conditions (str, optional): Only flights with free seats in this fare (Economy, Comfort or Business)
+        config (RunnableConfig): Configuration object, may carry the request's prefetched seats
         
     Returns:
-        list[dict]: List of matching flight information
+        list[dict]: List of matching flight information, earliest departure first
+    """
+    prefetch = request_prefetch(config)
+
+    def run():
+        seats = prefetch.route_seats(departure_airport, arrival_airport) if prefetch is not None else None
+        conns = []
+
+        def bookable(flight_ids):
+            # Flights outside the prefetched window (or all, without a prefetch) are checked in the database
+            missing = flight_ids if seats is None else [f for f in flight_ids if f not in seats]
+            found = set() if seats is None else inventory.bookable_from(
+                seats, [f for f in flight_ids if f in seats], fare_conditions
+            )
+            if missing:
+                if not conns:
+                    conns.append(connect(db))
+                found |= inventory.bookable(conns[0], missing, fare_conditions)
+            return found
+
+        try:
+            return get_flight_index(db).search(
+                departure_airport, arrival_airport, start_time, end_time, limit, bookable=bookable,
+            )
+        finally:
+            for conn in conns:
+                conn.close()
+
+    key = (db, "search_flights", departure_airport, arrival_airport,
+           normalize(start_time), normalize(end_time), limit, fare_conditions)
+    return tool_cache.call("flights", key, run)
+
+
+@tool
+def check_seat_availability(flight_id: int, *, config: RunnableConfig) -> dict:
     """
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
+    Check how many seats are left on a flight.
 
-    query = "SELECT * FROM flights WHERE 1 = 1"
-    params = []
+    Args:
+        flight_id (int): The ID of the flight
+        config (RunnableConfig): Configuration object, may carry the request's prefetched seats
+
+    Returns:
+        dict: Number of free seats per fare condition (Economy, Comfort, Business)
+    """
+    prefetch = request_prefetch(config)
+    seats = prefetch.flight_seats(flight_id) if prefetch is not None else None
+    if seats is not None:
+        return {fare: max(left, 0) for fare, left in seats.items()}
 
-    if departure_airport:
-        query += " AND departure_airport = ?"
-        params.append(departure_airport)
+    def run():
+        conn = connect(db)
+        try:
+            return {fare: max(left, 0) for fare, left in inventory.remaining(conn, flight_id).items()}
+        finally:
+            conn.close()
 
-    if arrival_airport:
-        query += " AND arrival_airport = ?"
-        params.append(arrival_airport)
+    return tool_cache.call("flights", (db, "check_seat_availability", flight_id), run)
 
-    if start_time:
-        query += " AND scheduled_departure >= ?"
-        params.append(start_time)
 
-    if end_time:
-        query += " AND scheduled_departure <= ?"
-        params.append(end_time)
-    query += " LIMIT ?"
-    params.append(limit)
-    cursor.execute(query, params)
-    rows = cursor.fetchall()
-    column_names = [column[0] for column in cursor.description]
-    results = [dict(zip(column_names, row)) for row in rows]
+@tool
+def search_itineraries(
+    departure_airport: str,
+    arrival_airport: str,
+    start_time: Optional[date | datetime] = None,
+    end_time: Optional[date | datetime] = None,
+    limit: int = 10,
+) -> list[dict]:
+    """
+    Search for direct and connecting itineraries (up to two stops) between two
+    airports. Use this when there is no direct flight.
 
-    cursor.close()
-    conn.close()
+    Args:
+        departure_airport (str): Departure airport code
+        arrival_airport (str): Arrival airport code
+        start_time (date | datetime, optional): Earliest departure of the first flight, defaults to now
+        end_time (date | datetime, optional): Latest departure of the first flight, defaults to a day after start_time
+        limit (int, optional): Maximum number of itineraries to return
 
-    return results
+    Returns:
+        list[dict]: Itineraries with their stops, connection times and flights, earliest arrival first
+    """
+    key = (db, "search_itineraries", departure_airport, arrival_airport, normalize(start_time), normalize(end_time), limit)
+    return tool_cache.call(
+        "flights", key,
+        lambda: get_itinerary_search(db).search(departure_airport, arrival_airport, start_time, end_time, limit),
+    )
 
 
 @tool
@@ -127,63 +199,12 @@ def update_ticket_to_new_flight(
     Returns:
         str: Status message indicating success or failure
     """
-    configuration = config.get("configurable", {})
-    passenger_id = configuration.get("passenger_id", None)
-    if not passenger_id:
-        raise ValueError("No passenger ID configured.")
-
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
-
-    cursor.execute(
-        "SELECT departure_airport, arrival_airport, scheduled_departure FROM flights WHERE flight_id = ?",
-        (new_flight_id,),
-    )
-    new_flight = cursor.fetchone()
-    if not new_flight:
-        cursor.close()
-        conn.close()
-        return "Invalid new flight ID provided."
-    column_names = [column[0] for column in cursor.description]
-    new_flight_dict = dict(zip(column_names, new_flight))
-    timezone = pytz.timezone("Etc/GMT-3")
-    current_time = datetime.now(tz=timezone)
-    departure_time = datetime.strptime(
-        new_flight_dict["scheduled_departure"], "%Y-%m-%d %H:%M:%S.%f%z"
-    )
-    time_until = (departure_time - current_time).total_seconds()
-    if time_until < (3 * 3600):
-        return f"Not permitted to reschedule to a flight that is less than 3 hours from the current time. Selected flight is at {departure_time}."
+    passenger_id = configured_passenger(config)
 
-    cursor.execute(
-        "SELECT flight_id FROM ticket_flights WHERE ticket_no = ?", (
-            ticket_no,)
-    )
-    current_flight = cursor.fetchone()
-    if not current_flight:
-        cursor.close()
-        conn.close()
-        return "No existing ticket found for the given ticket number."
-
-    cursor.execute(
-        "SELECT * FROM tickets WHERE ticket_no = ? AND passenger_id = ?",
-        (ticket_no, passenger_id),
-    )
-    current_ticket = cursor.fetchone()
-    if not current_ticket:
-        cursor.close()
-        conn.close()
-        return f"Current signed-in passenger with ID {passenger_id} not the owner of ticket {ticket_no}"
-
-    cursor.execute(
-        "UPDATE ticket_flights SET flight_id = ? WHERE ticket_no = ?",
-        (new_flight_id, ticket_no),
-    )
-    conn.commit()
-
-    cursor.close()
-    conn.close()
-    return "Ticket successfully updated to new flight."
+    result = booking.update_ticket(db, ticket_no, new_flight_id, passenger_id)
+    if result.ok:
+        tool_cache.invalidate("flights")
+    return result.message
 
 
 @tool
@@ -198,40 +219,57 @@ def cancel_ticket(ticket_no: str, *, config: RunnableConfig) -> str:
     Returns:
         str: Status message indicating success or failure
     """
-    configuration = config.get("configurable", {})
-    passenger_id = configuration.get("passenger_id", None)
-    if not passenger_id:
-        raise ValueError("No passenger ID configured.")
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
+    passenger_id = configured_passenger(config)
 
-    cursor.execute(
-        "SELECT flight_id FROM ticket_flights WHERE ticket_no = ?", (
-            ticket_no,)
-    )
-    existing_ticket = cursor.fetchone()
-    if not existing_ticket:
-        cursor.close()
-        conn.close()
-        return "No existing ticket found for the given ticket number."
-
-    cursor.execute(
-        "SELECT flight_id FROM tickets WHERE ticket_no = ? AND passenger_id = ?",
-        (ticket_no, passenger_id),
-    )
-    current_ticket = cursor.fetchone()
-    if not current_ticket:
-        cursor.close()
-        conn.close()
-        return f"Current signed-in passenger with ID {passenger_id} not the owner of ticket {ticket_no}"
+    result = booking.cancel(db, ticket_no, passenger_id)
+    if result.ok:
+        tool_cache.invalidate("flights")
+    return result.message
 
-    cursor.execute(
-        "DELETE FROM ticket_flights WHERE ticket_no = ?", (ticket_no,))
-    conn.commit()
 
-    cursor.close()
-    conn.close()
-    return "Ticket successfully cancelled."
+@tool
+def update_tickets_to_new_flight(
+    ticket_nos: list[str], new_flight_id: int, *, config: RunnableConfig
+) -> str:
+    """
+    Move several tickets to the same new flight at once, e.g. everyone on a
+    family booking. Either all tickets are updated or none are.
+
+    Args:
+        ticket_nos (list[str]): The ticket numbers to update
+        new_flight_id (int): The ID of the new flight
+        config (RunnableConfig): Configuration object containing passenger_id
+
+    Returns:
+        str: Status message indicating success or failure
+    """
+    passenger_id = configured_passenger(config)
+
+    result = booking.update_tickets(db, ticket_nos, new_flight_id, passenger_id)
+    if result.ok:
+        tool_cache.invalidate("flights")
+    return result.message
+
+
+@tool
+def cancel_tickets(ticket_nos: list[str], *, config: RunnableConfig) -> str:
+    """
+    Cancel several flight tickets at once, e.g. every leg of a trip. Either all
+    tickets are cancelled or none are.
+
+    Args:
+        ticket_nos (list[str]): The ticket numbers to cancel
+        config (RunnableConfig): Configuration object containing passenger_id
+
+    Returns:
+        str: Status message indicating success or failure
+    """
+    passenger_id = configured_passenger(config)
+
+    result = booking.cancel_many(db, ticket_nos, passenger_id)
+    if result.ok:
+        tool_cache.invalidate("flights")
+    return result.message
 
 
 @tool
@@ -243,23 +281,17 @@ def lookup_policy(query: str) -> str:
         query (str): The policy-related question or keyword to search for
         
     Returns:
-        str: Relevant policy information
-    """
-    policies = {
-        "baggage": "Swiss Airlines allows one carry-on bag and one personal item for free. Checked baggage allowance varies by ticket class.",
-        "cancellation": "Tickets can be cancelled up to 24 hours before departure. Refund amount depends on fare type.",
-        "changes": "Flight changes are permitted up to 3 hours before departure, subject to fare difference and change fee.",
-        "pets": "Small pets in carriers are allowed in cabin. Larger animals must travel in cargo hold.",
-        "check-in": "Online check-in opens 24 hours before departure and closes 4 hours before flight time.",
-        "meals": "Complimentary meals and beverages are provided on most flights over 4 hours.",
-        "default": "Please specify what policy information you're looking for (e.g., baggage, cancellation, changes, pets, check-in, or meals)."
-    }
-    
-    query = query.lower()
-    for key, value in policies.items():
-        if key in query:
-            return value
-    return policies["default"]
+        str: The most relevant policy passages
+    """
+    from src.retrieval.policy import get_policy_index
+
+    hits = tool_cache.call(
+        "policy", ("lookup_policy", query, Config.POLICY_TOP_K),
+        lambda: get_policy_index().search(query, Config.POLICY_TOP_K),
+    )
+    if not hits:
+        return "No matching policy found. Please specify what policy information you're looking for (e.g., baggage, cancellation, changes, pets, check-in, or meals)."
+    return "\n\n".join(f"{hit['title']}:\n{hit['text']}" for hit in hits)
 
 
 @tool
@@ -270,169 +302,189 @@ def search_car_rentals(
     start_date: Optional[Union[datetime, date]] = None,
     end_date: Optional[Union[datetime, date]] = None,
 ) -> list[dict]:
-    """Search for car rentals based on location, name, price tier, and dates."""
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
+    """
+    Search for car rentals based on location, name, price tier, and dates.
 
-    query = "SELECT * FROM car_rentals WHERE 1=1"
-    params = []
+    Args:
+        location (str, optional): City of the rental
+        name (str, optional): Name of the rental company
+        price_tier (str, optional): Price tier (Economy, Midsize, Premium or Luxury)
+        start_date (date, optional): Pick-up date; with end_date, only cars free for the whole period are returned
+        end_date (date, optional): Return date
+
+    Returns:
+        list[dict]: Matching car rentals with their daily price
+    """
+    def run():
+        conn = connect(db)
+        try:
+            return car_rentals.search(conn, location, name, price_tier, start_date, end_date)
+        finally:
+            conn.close()
+
+    key = (db, "search_car_rentals", like_key(location), like_key(name), like_key(price_tier),
+           normalize(start_date), normalize(end_date))
+    return tool_cache.call("car_rentals", key, run)
 
-    if location:
-        query += " AND location LIKE ?"
-        params.append(f"%{location}%")
-    if name:
-        query += " AND name LIKE ?"
-        params.append(f"%{name}%")
 
-    cursor.execute(query, params)
-    results = cursor.fetchall()
-    conn.close()
+@tool
+def book_car_rental(
+    rental_id: int, start_date: Optional[str] = None, end_date: Optional[str] = None, *, config: RunnableConfig
+) -> str:
+    """
+    Book a car rental by its ID.
 
-    return [dict(zip([column[0] for column in cursor.description], row)) 
-            for row in results]
+    Args:
+        rental_id (int): ID of the car rental to book
+        start_date (str, optional): Pick-up date (YYYY-MM-DD format), defaults to the rental's listed start
+        end_date (str, optional): Return date (YYYY-MM-DD format), defaults to the rental's listed end
+        config (RunnableConfig): Configuration object containing passenger_id
+
+    Returns:
+        str: Status message with the booking ID on success
+    """
+    passenger_id = configured_passenger(config)
+    result = run_in_transaction(
+        lambda conn: car_rentals.book(conn, rental_id, passenger_id, start_date, end_date), db
+    )
+    if result.ok:
+        tool_cache.invalidate("car_rentals")
+    return result.message
 
 
 @tool
-def book_car_rental(rental_id: int) -> str:
-    """Book a car rental by its ID."""
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
-    cursor.execute("UPDATE car_rentals SET booked = 1 WHERE id = ?", (rental_id,))
-    conn.commit()
-    success = cursor.rowcount > 0
-    conn.close()
-    return f"Car rental {rental_id} {'successfully booked' if success else 'not found'}"
+def book_car_rentals(rental_ids: list[int], *, config: RunnableConfig) -> str:
+    """
+    Book several car rentals by their IDs at once, e.g. one car per leg of a
+    trip. Either all rentals are booked or none are.
+
+    Args:
+        rental_ids (list[int]): IDs of the car rentals to book, each for its listed dates
+        config (RunnableConfig): Configuration object containing passenger_id
+
+    Returns:
+        str: Status message with the booking IDs when every rental was booked, or the
+            rentals that were missing or already booked when none were
+    """
+    passenger_id = configured_passenger(config)
+    result = run_in_transaction(lambda conn: car_rentals.book_many(conn, rental_ids, passenger_id), db)
+    if result.ok:
+        tool_cache.invalidate("car_rentals")
+    return result.message
 
 
 @tool
-def search_hotels(
-    location: Optional[str] = None,
-    name: Optional[str] = None,
-    price_tier: Optional[str] = None,
-    checkin_date: Optional[Union[datetime, date]] = None,
-    checkout_date: Optional[Union[datetime, date]] = None,
-) -> list[dict]:
-    """Search for hotels based on criteria."""
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
-    query = "SELECT * FROM hotels WHERE 1=1"
-    params = []
-    if location:
-        query += " AND location LIKE ?"
-        params.append(f"%{location}%")
-    if name:
-        query += " AND name LIKE ?"
-        params.append(f"%{name}%")
-    cursor.execute(query, params)
-    results = cursor.fetchall()
-    conn.close()
-    return [dict(zip([column[0] for column in cursor.description], row)) 
-            for row in results]
+def update_car_rental(
+    booking_id: str, start_date: Optional[str] = None, end_date: Optional[str] = None, *, config: RunnableConfig
+) -> str:
+    """
+    Update an existing car rental booking.
+    
+    Args:
+        booking_id (str): ID of the booking to update
+        start_date (str, optional): New start date (YYYY-MM-DD format)
+        end_date (str, optional): New end date (YYYY-MM-DD format)
+        config (RunnableConfig): Configuration object containing passenger_id
+        
+    Returns:
+        str: Status message with the new period and price on success
+    """
+    passenger_id = configured_passenger(config)
+    result = run_in_transaction(
+        lambda conn: car_rentals.update(conn, booking_id, passenger_id, start_date, end_date), db
+    )
+    if result.ok:
+        tool_cache.invalidate("car_rentals")
+    return result.message
 
 
 @tool
-def search_trip_recommendations(
-    location: Optional[str] = None,
-    name: Optional[str] = None,
-    keywords: Optional[str] = None,
-) -> list[dict]:
-    """Search for trip recommendations."""
-    conn = sqlite3.connect(db)
-    cursor = conn.cursor()
-    query = "SELECT * FROM trip_recommendations WHERE 1=1"
-    params = []
-    if location:
-        query += " AND location LIKE ?"
-        params.append(f"%{location}%")
-    if name:
-        query += " AND name LIKE ?"
-        params.append(f"%{name}%")
-    if keywords:
-        keyword_list = keywords.split(",")
-        keyword_conditions = " OR ".join(["keywords LIKE ?" for _ in keyword_list])
-        query += f" AND ({keyword_conditions})"
-        params.extend([f"%{keyword.strip()}%" for keyword in keyword_list])
-    cursor.execute(query, params)
-    results = cursor.fetchall()
-    conn.close()
-    return [dict(zip([column[0] for column in cursor.description], row)) 
-            for row in results]
+def cancel_car_rental(booking_id: str, *, config: RunnableConfig) -> str:
+    """
+    Cancel a car rental booking.
+    
+    Args:
+        booking_id (str): ID of the booking to cancel
+        config (RunnableConfig): Configuration object containing passenger_id
+        
+    Returns:
+        str: Status message indicating success or failure
+    """
+    passenger_id = configured_passenger(config)
+    result = run_in_transaction(lambda conn: car_rentals.cancel(conn, booking_id, passenger_id), db)
+    if result.ok:
+        tool_cache.invalidate("car_rentals")
+    return result.message
 
 
 @tool
-def search_hotels(location: str, check_in: str, check_out: str, guests: int = 1) -> list:
+def search_hotels(
+    location: Optional[str] = None,
+    name: Optional[str] = None,
+    price_tier: Optional[str] = None,
+    check_in: Optional[Union[datetime, date]] = None,
+    check_out: Optional[Union[datetime, date]] = None,
+    guests: int = 1,
+) -> list[dict]:
     """
-    Search for available hotels in a specific location.
+    Search for hotels in a specific location.
     
     Args:
-        location (str): City or area to search for hotels
-        check_in (str): Check-in date (YYYY-MM-DD format)
-        check_out (str): Check-out date (YYYY-MM-DD format)
+        location (str, optional): City or area to search for hotels
+        name (str, optional): Name of the hotel
+        price_tier (str, optional): Price tier (Midscale, Upper Midscale, Upscale, Upper Upscale or Luxury)
+        check_in (date, optional): Check-in date; when given, only hotels with free rooms for the stay are returned
+        check_out (date, optional): Check-out date, defaults to the day after check_in
         guests (int): Number of guests
         
     Returns:
-        list: List of available hotels with details
-    """
-    # Simulated hotel data
-    hotels = [
-        {
-            "id": "HTL001",
-            "name": "Grand Hotel Central",
-            "location": location,
-            "price_per_night": 200,
-            "rating": 4.5,
-            "available_rooms": 5
-        },
-        {
-            "id": "HTL002",
-            "name": "Comfort Inn Express",
-            "location": location,
-            "price_per_night": 150,
-            "rating": 4.0,
-            "available_rooms": 8
-        },
-        {
-            "id": "HTL003",
-            "name": "Luxury Plaza Hotel",
-            "location": location,
-            "price_per_night": 300,
-            "rating": 4.8,
-            "available_rooms": 3
-        }
-    ]
-    return hotels
+        list[dict]: Matching hotels with their nightly price, free rooms and the total price of the stay
+    """
+    def run():
+        conn = connect(db)
+        try:
+            return hotels.search(conn, location, name, price_tier, check_in, check_out, guests)
+        finally:
+            conn.close()
+
+    key = (db, "search_hotels", like_key(location), like_key(name), like_key(price_tier),
+           normalize(check_in), normalize(check_out), guests)
+    return tool_cache.call("hotels", key, run)
 
 
 @tool
-def book_hotel(hotel_id: str, check_in: str, check_out: str, guests: int = 1) -> dict:
+def book_hotel(hotel_id: int, check_in: str, check_out: str, guests: int = 1, *, config: RunnableConfig) -> str:
     """
     Book a hotel room.
     
     Args:
-        hotel_id (str): ID of the hotel to book
+        hotel_id (int): ID of the hotel to book
         check_in (str): Check-in date (YYYY-MM-DD format)
         check_out (str): Check-out date (YYYY-MM-DD format)
         guests (int): Number of guests
+        config (RunnableConfig): Configuration object containing passenger_id
         
     Returns:
-        dict: Booking confirmation details
-    """
-    # Simulated booking confirmation
-    booking = {
-        "booking_id": f"BK{uuid.uuid4().hex[:8]}",
-        "hotel_id": hotel_id,
-        "check_in": check_in,
-        "check_out": check_out,
-        "guests": guests,
-        "status": "confirmed",
-        "total_price": 200 * ((datetime.strptime(check_out, "%Y-%m-%d") - 
-                              datetime.strptime(check_in, "%Y-%m-%d")).days)
-    }
-    return booking
+        str: Status message with the booking ID and total price on success
+    """
+    passenger_id = configured_passenger(config)
+    result = run_in_transaction(
+        lambda conn: hotels.book(conn, hotel_id, passenger_id, check_in, check_out, guests), db
+    )
+    if result.ok:
+        tool_cache.invalidate("hotels")
+    return result.message
 
 
 @tool
-def update_hotel(booking_id: str, check_in: str = None, check_out: str = None, guests: int = None) -> dict:
+def update_hotel(
+    booking_id: str,
+    check_in: Optional[str] = None,
+    check_out: Optional[str] = None,
+    guests: Optional[int] = None,
+    *,
+    config: RunnableConfig,
+) -> str:
     """
     Update an existing hotel booking.
     
@@ -441,156 +493,137 @@ def update_hotel(booking_id: str, check_in: str = None, check_out: str = None, g
         check_in (str, optional): New check-in date (YYYY-MM-DD format)
         check_out (str, optional): New check-out date (YYYY-MM-DD format)
         guests (int, optional): New number of guests
+        config (RunnableConfig): Configuration object containing passenger_id
         
     Returns:
-        dict: Updated booking details
-    """
-    # Simulated booking update
-    updated_booking = {
-        "booking_id": booking_id,
-        "status": "updated",
-        "check_in": check_in,
-        "check_out": check_out,
-        "guests": guests,
-        "update_fee": 50
-    }
-    return updated_booking
+        str: Status message with the new stay and price on success
+    """
+    passenger_id = configured_passenger(config)
+    result = run_in_transaction(
+        lambda conn: hotels.update(conn, booking_id, passenger_id, check_in, check_out, guests), db
+    )
+    if result.ok:
+        tool_cache.invalidate("hotels")
+    return result.message
 
 
 @tool
-def cancel_hotel(booking_id: str) -> dict:
+def cancel_hotel(booking_id: str, *, config: RunnableConfig) -> str:
     """
     Cancel a hotel booking.
     
     Args:
         booking_id (str): ID of the booking to cancel
+        config (RunnableConfig): Configuration object containing passenger_id
         
     Returns:
-        dict: Cancellation confirmation
-    """
-    # Simulated cancellation confirmation
-    cancellation = {
-        "booking_id": booking_id,
-        "status": "cancelled",
-        "refund_amount": 150,
-        "cancellation_fee": 50
-    }
-    return cancellation
+        str: Status message indicating success or failure
+    """
+    passenger_id = configured_passenger(config)
+    result = run_in_transaction(lambda conn: hotels.cancel(conn, booking_id, passenger_id), db)
+    if result.ok:
+        tool_cache.invalidate("hotels")
+    return result.message
 
 
 @tool
-def book_excursion(excursion_id: str, date: str, participants: int = 1) -> dict:
+def search_trip_recommendations(
+    location: Optional[str] = None,
+    name: Optional[str] = None,
+    keywords: Optional[str] = None,
+    day: Optional[Union[datetime, date]] = None,
+    participants: int = 1,
+) -> list[dict]:
     """
-    Book an excursion or activity.
-    
+    Search for trip recommendations (excursions).
+
     Args:
-        excursion_id (str): ID of the excursion to book
-        date (str): Date of the excursion (YYYY-MM-DD format)
+        location (str, optional): City of the excursion
+        name (str, optional): Name of the excursion
+        keywords (str, optional): Comma-separated keywords, e.g. "history, art"
+        day (date, optional): When given, only excursions with free places that day are returned
         participants (int): Number of participants
-        
-    Returns:
-        dict: Booking confirmation details
-    """
-    # Simulated booking confirmation
-    booking = {
-        "booking_id": f"EX{uuid.uuid4().hex[:8]}",
-        "excursion_id": excursion_id,
-        "date": date,
-        "participants": participants,
-        "status": "confirmed",
-        "total_price": 75 * participants
-    }
-    return booking
-
 
-@tool
-def update_excursion(booking_id: str, date: str = None, participants: int = None) -> dict:
-    """
-    Update an existing excursion booking.
-    
-    Args:
-        booking_id (str): ID of the booking to update
-        date (str, optional): New date (YYYY-MM-DD format)
-        participants (int, optional): New number of participants
-        
     Returns:
-        dict: Updated booking details
-    """
-    # Simulated booking update
-    updated_booking = {
-        "booking_id": booking_id,
-        "status": "updated",
-        "date": date,
-        "participants": participants,
-        "update_fee": 10
-    }
-    return updated_booking
+        list[dict]: Matching excursions with their price and free places
+    """
+    def run():
+        conn = connect(db)
+        try:
+            return excursions.search(conn, location, name, keywords, day, participants)
+        finally:
+            conn.close()
+
+    key = (db, "search_trip_recommendations", like_key(location), like_key(name), like_key(keywords),
+           normalize(day), participants)
+    return tool_cache.call("trip_recommendations", key, run)
 
 
 @tool
-def cancel_excursion(booking_id: str) -> dict:
+def book_excursion(excursion_id: int, date: str, participants: int = 1, *, config: RunnableConfig) -> str:
     """
-    Cancel an excursion booking.
+    Book an excursion or activity.
     
     Args:
-        booking_id (str): ID of the booking to cancel
+        excursion_id (int): ID of the excursion to book
+        date (str): Date of the excursion (YYYY-MM-DD format)
+        participants (int): Number of participants
+        config (RunnableConfig): Configuration object containing passenger_id
         
     Returns:
-        dict: Cancellation confirmation
-    """
-    # Simulated cancellation confirmation
-    cancellation = {
-        "booking_id": booking_id,
-        "status": "cancelled",
-        "refund_amount": 60,
-        "cancellation_fee": 15
-    }
-    return cancellation
+        str: Status message with the booking ID and total price on success
+    """
+    passenger_id = configured_passenger(config)
+    result = run_in_transaction(
+        lambda conn: excursions.book(conn, excursion_id, passenger_id, date, participants), db
+    )
+    if result.ok:
+        tool_cache.invalidate("trip_recommendations")
+    return result.message
 
 
 @tool
-def update_car_rental(booking_id: str, start_date: str = None, end_date: str = None) -> dict:
+def update_excursion(
+    booking_id: str, date: Optional[str] = None, participants: Optional[int] = None, *, config: RunnableConfig
+) -> str:
     """
-    Update an existing car rental booking.
+    Update an existing excursion booking.
     
     Args:
         booking_id (str): ID of the booking to update
-        start_date (str, optional): New start date (YYYY-MM-DD format)
-        end_date (str, optional): New end date (YYYY-MM-DD format)
+        date (str, optional): New date (YYYY-MM-DD format)
+        participants (int, optional): New number of participants
+        config (RunnableConfig): Configuration object containing passenger_id
         
     Returns:
-        dict: Updated booking details
-    """
-    # Simulated booking update
-    updated_booking = {
-        "booking_id": booking_id,
-        "status": "updated",
-        "start_date": start_date,
-        "end_date": end_date,
-        "update_fee": 25
-    }
-    return updated_booking
+        str: Status message with the new date and price on success
+    """
+    passenger_id = configured_passenger(config)
+    result = run_in_transaction(
+        lambda conn: excursions.update(conn, booking_id, passenger_id, date, participants), db
+    )
+    if result.ok:
+        tool_cache.invalidate("trip_recommendations")
+    return result.message
 
 
 @tool
-def cancel_car_rental(booking_id: str) -> dict:
+def cancel_excursion(booking_id: str, *, config: RunnableConfig) -> str:
     """
-    Cancel a car rental booking.
+    Cancel an excursion booking.
     
     Args:
         booking_id (str): ID of the booking to cancel
+        config (RunnableConfig): Configuration object containing passenger_id
         
     Returns:
-        dict: Cancellation confirmation
-    """
-    # Simulated cancellation confirmation
-    cancellation = {
-        "booking_id": booking_id,
-        "status": "cancelled",
-        "refund_amount": 100,
-        "cancellation_fee": 30
-    }
-    return cancellation
+        str: Status message indicating success or failure
+    """
+    passenger_id = configured_passenger(config)
+    result = run_in_transaction(lambda conn: excursions.cancel(conn, booking_id, passenger_id), db)
+    if result.ok:
+        tool_cache.invalidate("trip_recommendations")
+    return result.message
 
 
 def handle_tool_error(state) -> dict:
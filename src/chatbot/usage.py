@@ -0,0 +1,186 @@
+from typing import Optional
+
+from langchain_core.messages import (
+    AIMessage,
+    BaseMessage,
+    HumanMessage,
+    RemoveMessage,
+    SystemMessage,
+    ToolMessage,
+)
+
+from src.utils.logger import logger
+from src.utils.metrics import metrics
+
+BUDGET_REPLY = (
+    "This conversation has reached its usage limit, so I can't continue it. "
+    "Please start a new conversation for anything else."
+)
+
+SUMMARY_PROMPT = (
+    "Summarize the following conversation between a customer and a travel assistant for the assistant "
+    "that continues it. Keep names, dates, flight numbers, ticket numbers, bookings made or changed and "
+    "open requests; leave out small talk. Answer with the summary only."
+)
+
+SUMMARY_PREFIX = "Summary of the earlier conversation: "
+
+
+def add_usage(left: Optional[dict], right: Optional[dict]) -> dict:
+    """State reducer: add the counters of ``right`` to ``left``, nested dicts included."""
+    merged = dict(left or {})
+    for key, value in (right or {}).items():
+        if isinstance(value, dict):
+            merged[key] = add_usage(merged.get(key), value)
+        else:
+            merged[key] = merged.get(key, 0) + value
+    return merged
+
+
+def subtract_usage(after: Optional[dict], before: Optional[dict]) -> dict:
+    """What was added to ``before`` to get ``after``, without the counters ``before`` already had unchanged."""
+    delta = {}
+    for key, value in (after or {}).items():
+        previous = (before or {}).get(key)
+        if isinstance(value, dict):
+            nested = subtract_usage(value, previous)
+            if nested:
+                delta[key] = nested
+        elif previous is None or value != previous:
+            delta[key] = value - (previous or 0)
+    return delta
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (four characters per token), for text no model has counted."""
+    return len(text) // 4 + 1
+
+
+def call_usage(message: BaseMessage, prices: dict) -> Optional[dict]:
+    """
+    Prompt, completion and cached tokens, and cost in dollars, of one model
+    response; None for messages no model call produced (``usage_metadata`` unset).
+
+    Cached tokens are read from ``usage_metadata["input_token_details"]`` or,
+    for providers that only report them raw, from the ``token_usage`` of the
+    response metadata. ``prices`` maps model names to dollars per million
+    input and output tokens; unknown models cost 0.
+    """
+    usage = getattr(message, "usage_metadata", None)
+    if not usage:
+        return None
+    cached = (usage.get("input_token_details") or {}).get("cache_read")
+    if cached is None:
+        token_usage = (message.response_metadata or {}).get("token_usage") or {}
+        cached = (token_usage.get("prompt_tokens_details") or {}).get("cached_tokens", 0)
+    input_price, output_price = prices.get((message.response_metadata or {}).get("model_name"), (0.0, 0.0))
+    return {
+        "input": usage["input_tokens"],
+        "output": usage["output_tokens"],
+        "cached": cached or 0,
+        "calls": 1,
+        "cost": (usage["input_tokens"] * input_price + usage["output_tokens"] * output_price) / 1e6,
+    }
+
+
+def node_usage(node: str, responses: list[BaseMessage], prices: dict) -> dict:
+    """Usage update of the model calls a node made, in total and under ``by_node``."""
+    total = {}
+    for response in responses:
+        total = add_usage(total, call_usage(response, prices))
+    if not total:
+        return {}
+    tokens = total["input"] + total["output"]
+    metrics.incr("llm.tokens.input", total["input"])
+    metrics.incr("llm.tokens.output", total["output"])
+    metrics.incr("llm.tokens.cached", total["cached"])
+    metrics.incr(f"llm.tokens.{node}", tokens)
+    metrics.incr("llm.cost_usd", total["cost"])
+    return {**total, "since_summary": tokens, "by_node": {node: dict(total)}}
+
+
+def tool_usage(results: list[ToolMessage]) -> dict:
+    """Usage update of tool results: calls and the estimated tokens each adds to later prompts, per tool."""
+    by_tool = {}
+    for message in results:
+        if message.name:
+            by_tool = add_usage(by_tool, {
+                message.name: {"calls": 1, "result_tokens": estimate_tokens(str(message.content))},
+            })
+    return {"by_tool": by_tool} if by_tool else {}
+
+
+def new_tool_results(messages: list[BaseMessage]) -> list[ToolMessage]:
+    """The tool results at the end of ``messages``: those the next model call reads for the first time."""
+    results = []
+    for message in reversed(messages):
+        if not isinstance(message, ToolMessage):
+            break
+        results.append(message)
+    return results[::-1]
+
+
+class TokenBudget:
+    """
+    Tokens a conversation may use, checked before every assistant model call.
+
+    Once a thread has used ``tokens`` (prompt plus completion) since its last
+    summary, the action is taken: "summarize" replaces every message before
+    the last ``keep_turns`` user turns with a summary written by
+    ``summarizer`` and continues; "stop" answers with ``BUDGET_REPLY``
+    without calling the model. ``tokens`` 0 disables the budget.
+    """
+
+    def __init__(self, tokens: int, action: str = "summarize", keep_turns: int = 2, summarizer=None,
+                 prices: Optional[dict] = None):
+        if action not in ("summarize", "stop"):
+            raise ValueError(f"Unknown CONVERSATION_BUDGET_ACTION: {action!r}")
+        self.tokens = tokens
+        self.action = action
+        self.keep_turns = keep_turns
+        self.summarizer = summarizer
+        self.prices = prices or {}
+
+    @classmethod
+    def from_config(cls, config, summarizer=None) -> "TokenBudget":
+        return cls(
+            config.CONVERSATION_TOKEN_BUDGET,
+            config.CONVERSATION_BUDGET_ACTION,
+            config.CONVERSATION_KEEP_TURNS,
+            summarizer,
+            config.LLM_PRICES,
+        )
+
+    def exceeded(self, usage: Optional[dict]) -> bool:
+        return self.tokens > 0 and (usage or {}).get("since_summary", 0) >= self.tokens
+
+    def stop(self) -> dict:
+        metrics.incr("llm.budget.stopped")
+        return {"messages": AIMessage(content=BUDGET_REPLY)}
+
+    def summarize(self, state: dict) -> tuple[list[BaseMessage], list[BaseMessage], dict]:
+        """
+        Summarize the start of a conversation.
+
+        Returns the messages to send the model instead of ``state["messages"]``,
+        the message updates that make the same change in the state, and the
+        usage update (the summary call, and the reset of ``since_summary``).
+        The summary takes the ID of the first summarized message, so it keeps
+        its place. With fewer user turns than ``keep_turns`` nothing changes.
+        """
+        messages = state["messages"]
+        turns = [i for i, message in enumerate(messages) if isinstance(message, HumanMessage)]
+        if self.summarizer is None or len(turns) <= self.keep_turns:
+            return messages, [], {}
+        cut = turns[-self.keep_turns]
+        old = messages[:cut]
+        transcript = "\n".join(f"{message.type}: {message.content}" for message in old if message.content)
+        response = self.summarizer.invoke([SystemMessage(content=SUMMARY_PROMPT), HumanMessage(content=transcript)])
+        summary = SystemMessage(content=SUMMARY_PREFIX + str(response.content), id=old[0].id)
+        metrics.incr("llm.budget.summaries")
+        logger.debug(f"Summarized {len(old)} messages to stay within the token budget")
+        usage = node_usage("summarize", [response], self.prices)
+        # Start the next window at 0; the summary call itself does not count against it
+        usage["since_summary"] = -(state.get("usage") or {}).get("since_summary", 0)
+        updates = [summary] + [RemoveMessage(id=message.id) for message in old[1:]]
+        return [summary] + messages[cut:], updates, usage
@@ -0,0 +1,188 @@
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+from config.config import Config
+from src.chatbot import tools
+from src.utils.logger import logger
+from src.utils.metrics import metrics
+
+# Tables the tools read or write; a database missing one was not prepared (see prepare_database)
+REQUIRED_TABLES = (
+    "flights",
+    "tickets",
+    "ticket_flights",
+    "boarding_passes",
+    "seat_inventory",
+    "passenger_itinerary",
+    "hotels",
+    "hotel_rooms",
+    "car_rentals",
+    "car_rental_bookings",
+    "trip_recommendations",
+    "excursion_capacity",
+)
+
+
+def validate_database(conn: sqlite3.Connection) -> None:
+    """Raise RuntimeError if the travel database lacks a table the tools use."""
+    found = {name for name, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    missing = [table for table in REQUIRED_TABLES if table not in found]
+    if missing:
+        raise RuntimeError(f"Travel database is missing tables: {', '.join(missing)}")
+
+
+def warm_pages(conn: sqlite3.Connection, tables) -> int:
+    """
+    Read every page of ``tables`` and of their indexes once, so the first
+    queries after a start find them in the OS page cache instead of on disk.
+    Tables the database does not have are skipped.
+
+    Returns:
+        int: Number of b-trees (tables and indexes) read.
+    """
+    found = {name for name, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    scanned = 0
+    for table in tables:
+        if table not in found:
+            continue
+        # count(*) walks every leaf page of the b-tree it scans
+        conn.execute(f"SELECT count(*) FROM {table} NOT INDEXED").fetchone()
+        scanned += 1
+        for _, index, *_ in conn.execute(f"PRAGMA index_list({table})").fetchall():
+            column = conn.execute(f"PRAGMA index_info({index})").fetchone()
+            if column is None or column[2] is None:
+                continue
+            conn.execute(
+                f'SELECT count(*) FROM {table} INDEXED BY {index} WHERE "{column[2]}" IS NOT NULL'
+            ).fetchone()
+            scanned += 1
+    return scanned
+
+
+class WarmUp:
+    """
+    Work a worker does once before it takes traffic.
+
+    ``run`` prepares and validates the travel database, loads the hot tables
+    and indexes into the OS page cache, loads the flight, itinerary and
+    policy indexes, builds the graph (tool schemas, bound models, routers,
+    checkpointer) and opens the pooled connection to the model provider.
+    ``start`` runs it in a background thread, so the server answers
+    ``/healthz`` meanwhile; ``/readyz`` reports ``ready`` only once it is done.
+
+    A failed required step leaves the worker "failed" (never ready). The
+    policy index and the provider connection are optional: their failures
+    are logged and the worker still becomes ready.
+    """
+
+    def __init__(self, config=Config):
+        self.config = config
+        self.state = "pending"
+        self.steps: dict[str, float] = {}
+        self.errors: dict[str, str] = {}
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def ready(self) -> bool:
+        return self.state == "ready"
+
+    def status(self) -> dict:
+        return {
+            "status": self.state,
+            "steps_ms": {name: round(seconds * 1000, 1) for name, seconds in self.steps.items()},
+            "errors": dict(self.errors),
+        }
+
+    def start(self) -> threading.Thread:
+        self.state = "warming"
+        self._thread = threading.Thread(target=self.run, name="warmup", daemon=True)
+        self._thread.start()
+        return self._thread
+
+    def skip(self) -> None:
+        """Report ready without warming up (``WARMUP_ENABLED=false``)."""
+        self.state = "ready"
+
+    def run(self) -> bool:
+        self.state = "warming"
+        started = time.perf_counter()
+        steps = (
+            ("database", self._database, True),
+            ("page_cache", self._page_cache, True),
+            ("flight_index", self._flight_index, True),
+            ("policy_index", self._policy_index, False),
+            ("graph", self._graph, True),
+            ("llm_connection", self._llm_connection, False),
+        )
+        for name, step, required in steps:
+            step_started = time.perf_counter()
+            try:
+                step()
+            except Exception as e:
+                self.errors[name] = f"{type(e).__name__}: {e}"
+                metrics.incr("warmup.errors")
+                if required:
+                    logger.exception(f"Warm-up step {name} failed; this worker will not report ready")
+                    self.state = "failed"
+                    return False
+                logger.warning(f"Optional warm-up step {name} failed: {e}")
+            finally:
+                self.steps[name] = time.perf_counter() - step_started
+                metrics.observe(f"warmup.{name}", self.steps[name])
+        metrics.observe("warmup.total", time.perf_counter() - started)
+        logger.info(f"Warm-up finished in {time.perf_counter() - started:.2f}s: {self.status()['steps_ms']}")
+        self.state = "ready"
+        return True
+
+    # Steps
+
+    def _database(self) -> None:
+        if self.config.WARMUP_INIT_DB:
+            from src.utils.db_init import initialize_database
+
+            initialize_database()
+        conn = sqlite3.connect(tools.db)
+        try:
+            validate_database(conn)
+        finally:
+            conn.close()
+
+    def _page_cache(self) -> None:
+        conn = sqlite3.connect(tools.db)
+        try:
+            warm_pages(conn, self.config.WARMUP_TABLES)
+        finally:
+            conn.close()
+
+    def _flight_index(self) -> None:
+        from src.flights.itineraries import get_itinerary_search
+
+        get_itinerary_search(tools.db)
+
+    def _policy_index(self) -> None:
+        from src.retrieval.policy import get_policy_index
+
+        get_policy_index()
+
+    def _graph(self) -> None:
+        from src.chatbot.flow import build_graph
+
+        build_graph(self.config)
+
+    def _llm_connection(self) -> None:
+        # Only the Groq models talk to a provider; the fake and replayed models have nothing to open
+        if not self.config.WARMUP_LLM_CONNECT or self.config.LLM_PROVIDER != "groq" or (
+            self.config.REPLAY_MODE == "replay"
+        ):
+            return
+        from src.utils.http import get_http_client
+
+        # Listing the models costs no tokens; the TLS connection it opens stays in the pool
+        response = get_http_client(self.config.LLM_HTTP_POOL).get(
+            f"{self.config.GROQ_BASE_URL}/openai/v1/models",
+            headers={"Authorization": f"Bearer {self.config.GROQ_API_KEY}"},
+            timeout=10,
+        )
+        response.raise_for_status()
@@ -0,0 +1,196 @@
+import sqlite3
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from datetime import date, datetime, timezone, tzinfo
+from functools import lru_cache
+from typing import Callable, Optional, Union
+
+from src.utils.logger import logger
+from src.utils.timeutils import epoch, parse_timestamp, to_epoch
+
+# Text timestamp column -> integer epoch-seconds (UTC) column added next to it
+EPOCH_COLUMNS = {
+    "scheduled_departure": "scheduled_departure_ts",
+    "scheduled_arrival": "scheduled_arrival_ts",
+    "actual_departure": "actual_departure_ts",
+    "actual_arrival": "actual_arrival_ts",
+}
+
+TimeBound = Optional[Union[date, datetime, str]]
+
+
+def add_epoch_columns(conn: sqlite3.Connection) -> None:
+    """
+    Add integer epoch columns for the scheduled and actual flight times and
+    fill the rows that lack them, plus the route/departure-time indexes over
+    the scheduled ones.
+    """
+    existing = {row[1] for row in conn.execute("PRAGMA table_info(flights)")}
+    conn.create_function("to_epoch", 1, to_epoch, deterministic=True)
+    for text_column, epoch_column in EPOCH_COLUMNS.items():
+        if epoch_column not in existing:
+            conn.execute(f"ALTER TABLE flights ADD COLUMN {epoch_column} INTEGER")
+        conn.execute(
+            f"UPDATE flights SET {epoch_column} = to_epoch({text_column}) "
+            f"WHERE {epoch_column} IS NULL AND {text_column} NOT IN ('', '\\N')"
+        )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS idx_flights_route_departure "
+        "ON flights (departure_airport, arrival_airport, scheduled_departure_ts)"
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_flights_departure ON flights (scheduled_departure_ts)")
+
+
+class FlightIndex:
+    """
+    In-memory flight search over route and departure-time window.
+
+    Flights are held sorted by (departure time, flight ID). For every route,
+    origin and destination the index keeps the sorted departure times and the
+    matching row positions, so a window query is two bisections plus the
+    ``k`` rows it returns: O(log n + k). Results are ordered by departure
+    time, then flight ID.
+
+    Args:
+        columns (list[str]): Column names of ``rows``, as in the flights table.
+        rows (list[tuple]): Flight rows sorted by departure time and flight ID.
+        departures (list[int]): Epoch departure time of each row.
+        arrivals (list[Optional[int]]): Epoch arrival time of each row.
+        local_tz (tzinfo): Timezone applied to naive query bounds.
+    """
+
+    def __init__(
+        self,
+        columns: list[str],
+        rows: list[tuple],
+        departures: list[int],
+        arrivals: list[Optional[int]],
+        local_tz: tzinfo,
+    ):
+        self.columns = columns
+        self.rows = rows
+        self.departures = departures
+        self.arrivals = arrivals
+        self.local_tz = local_tz
+        self.origin_column = columns.index("departure_airport")
+        self.destination_column = columns.index("arrival_airport")
+
+        self.all = (departures, list(range(len(rows))))
+        self.by_route: dict[tuple, tuple[list[int], list[int]]] = {}
+        for position, (row, departure) in enumerate(zip(rows, departures)):
+            origin, destination = row[self.origin_column], row[self.destination_column]
+            for key in ((origin, destination), (origin, None), (None, destination)):
+                times, positions = self.by_route.setdefault(key, ([], []))
+                times.append(departure)
+                positions.append(position)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    @classmethod
+    def load(cls, path: str) -> "FlightIndex":
+        """Read the flights table of the database at ``path``, adding the epoch columns if needed."""
+        start = time.perf_counter()
+        conn = sqlite3.connect(path)
+        try:
+            with conn:
+                add_epoch_columns(conn)
+            cursor = conn.execute(
+                "SELECT * FROM flights WHERE scheduled_departure_ts IS NOT NULL "
+                "ORDER BY scheduled_departure_ts, flight_id"
+            )
+            names = [column[0] for column in cursor.description]
+            keep = [i for i, name in enumerate(names) if name not in EPOCH_COLUMNS.values()]
+            departure = names.index("scheduled_departure_ts")
+            arrival = names.index("scheduled_arrival_ts")
+            rows, departures, arrivals = [], [], []
+            for row in cursor:
+                rows.append(tuple(row[i] for i in keep))
+                departures.append(row[departure])
+                arrivals.append(row[arrival])
+        finally:
+            conn.close()
+        columns = [names[i] for i in keep]
+        index = cls(columns, rows, departures, arrivals, cls._data_timezone(columns, rows))
+        logger.debug(f"Loaded flight index: {len(rows)} flights in {time.perf_counter() - start:.3f}s")
+        return index
+
+    @staticmethod
+    def _data_timezone(columns: list[str], rows: list[tuple]) -> tzinfo:
+        """Most common UTC offset of the stored departure times."""
+        i = columns.index("scheduled_departure")
+        offsets = Counter(parse_timestamp(row[i]).utcoffset() for row in rows[:1000])
+        offset = offsets.most_common(1)[0][0] if offsets else None
+        return timezone(offset) if offset is not None else timezone.utc
+
+    def bound(self, value: TimeBound, end: bool = False) -> Optional[int]:
+        """
+        Epoch seconds of a query bound.
+
+        Naive values are taken to be in the timezone of the flight data. A
+        bare date covers the whole day, so as an end bound it includes every
+        flight on that date.
+        """
+        return epoch(value, self.local_tz, end)
+
+    def span(self, key: Optional[tuple], start: Optional[int], end: Optional[int]) -> tuple[list[int], int, int]:
+        """
+        Row positions on ``key`` and the [lo, hi) slice of them departing within [start, end] epoch seconds.
+
+        ``key`` is an (origin, destination) route, (origin, None),
+        (None, destination), or None for all flights.
+        """
+        times, positions = self.all if key is None else self.by_route.get(key, ([], []))
+        lo = 0 if start is None else bisect_left(times, start)
+        hi = len(times) if end is None else bisect_right(times, end)
+        return positions, lo, hi
+
+    def window(self, key: Optional[tuple], start: Optional[int], end: Optional[int]) -> list[int]:
+        """Row positions on ``key`` departing within [start, end] epoch seconds."""
+        positions, lo, hi = self.span(key, start, end)
+        return positions[lo:hi]
+
+    def flight(self, position: int) -> dict:
+        return dict(zip(self.columns, self.rows[position]))
+
+    def search(
+        self,
+        departure_airport: Optional[str] = None,
+        arrival_airport: Optional[str] = None,
+        start_time: TimeBound = None,
+        end_time: TimeBound = None,
+        limit: int = 20,
+        bookable: Optional[Callable[[list[int]], set]] = None,
+    ) -> list[dict]:
+        """
+        Flights matching the route and departure window, earliest first.
+
+        ``bookable`` receives batches of flight IDs and returns those that can
+        still be booked; the other flights are skipped.
+        """
+        if departure_airport or arrival_airport:
+            key = (departure_airport or None, arrival_airport or None)
+        else:
+            key = None
+        positions, lo, hi = self.span(key, self.bound(start_time), self.bound(end_time, end=True))
+        limit = max(limit, 0)
+        if bookable is None:
+            return [self.flight(p) for p in positions[lo:min(hi, lo + limit)]]
+
+        flight_id = self.columns.index("flight_id")
+        batch = max(limit * 2, 64)
+        results = []
+        for i in range(lo, hi, batch):
+            if len(results) >= limit:
+                break
+            chunk = positions[i:min(hi, i + batch)]
+            available = bookable([self.rows[p][flight_id] for p in chunk])
+            results.extend(self.flight(p) for p in chunk if self.rows[p][flight_id] in available)
+        return results[:limit]
+
+
+@lru_cache(maxsize=None)
+def get_flight_index(path: str) -> FlightIndex:
+    """Return the flight index of the database at ``path``, loading it on first use."""
+    return FlightIndex.load(path)
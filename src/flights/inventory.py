@@ -0,0 +1,200 @@
+import argparse
+import sqlite3
+from typing import Iterable, Optional
+
+from config.config import Config
+from src.utils.db import run_in_transaction
+
+INVENTORY_SCHEMA = """
+CREATE TABLE IF NOT EXISTS seat_inventory (
+    flight_id INTEGER NOT NULL,
+    fare_conditions TEXT NOT NULL,
+    capacity INTEGER NOT NULL,
+    booked INTEGER NOT NULL,
+    PRIMARY KEY (flight_id, fare_conditions)
+) WITHOUT ROWID
+"""
+
+# Seats per flight and fare from the aircraft's seat map, next to the
+# tickets already sold on it; fares sold without seats get capacity 0
+EXPECTED_QUERY = """
+SELECT flight_id, fare_conditions, SUM(capacity) AS capacity, SUM(booked) AS booked
+FROM (
+    SELECT f.flight_id, s.fare_conditions, COUNT(*) AS capacity, 0 AS booked
+    FROM flights f JOIN seats s ON s.aircraft_code = f.aircraft_code
+    GROUP BY f.flight_id, s.fare_conditions
+    UNION ALL
+    SELECT flight_id, fare_conditions, 0, COUNT(*)
+    FROM ticket_flights
+    GROUP BY flight_id, fare_conditions
+)
+GROUP BY flight_id, fare_conditions
+"""
+
+
+def rebuild_inventory(conn: sqlite3.Connection) -> int:
+    """Recompute the whole seat inventory from flights, seats and ticket_flights; returns its row count."""
+    conn.execute(INVENTORY_SCHEMA)
+    conn.execute("DELETE FROM seat_inventory")
+    return conn.execute(
+        f"INSERT INTO seat_inventory (flight_id, fare_conditions, capacity, booked) {EXPECTED_QUERY}"
+    ).rowcount
+
+
+def ensure_inventory(conn: sqlite3.Connection) -> None:
+    """Create and fill the seat inventory if the database does not have one yet."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'seat_inventory'"
+    ).fetchone()
+    if not exists:
+        rebuild_inventory(conn)
+
+
+def ticket_legs(conn: sqlite3.Connection, ticket_nos: list[str]) -> list[tuple[int, str, int]]:
+    """(flight_id, fare_conditions, count) of the flights held by ``ticket_nos``."""
+    return conn.execute(
+        f"""
+        SELECT flight_id, fare_conditions, COUNT(*) FROM ticket_flights
+        WHERE ticket_no IN ({", ".join("?" * len(ticket_nos))})
+        GROUP BY flight_id, fare_conditions
+        """,
+        ticket_nos,
+    ).fetchall()
+
+
+def adjust(conn: sqlite3.Connection, changes: Iterable[tuple[int, str, int]]) -> None:
+    """Add each (flight_id, fare_conditions, delta) to the booked count, creating missing rows."""
+    conn.executemany(
+        """
+        INSERT INTO seat_inventory (flight_id, fare_conditions, capacity, booked) VALUES (?, ?, 0, ?)
+        ON CONFLICT (flight_id, fare_conditions) DO UPDATE SET booked = booked + excluded.booked
+        """,
+        list(changes),
+    )
+
+
+def remaining(conn: sqlite3.Connection, flight_id: int) -> dict[str, int]:
+    """Seats left on a flight per fare condition (one primary-key range lookup)."""
+    return dict(conn.execute(
+        "SELECT fare_conditions, capacity - booked FROM seat_inventory WHERE flight_id = ?", (flight_id,)
+    ).fetchall())
+
+
+def shortfall(
+    conn: sqlite3.Connection, legs: list[tuple[int, str, int]], new_flight_id: int
+) -> Optional[str]:
+    """
+    Check that ``new_flight_id`` has room for the moved ``legs``.
+
+    Returns:
+        Optional[str]: A message naming the fare without enough seats, or None.
+    """
+    needed: dict[str, int] = {}
+    for flight_id, fare, count in legs:
+        if flight_id != new_flight_id:
+            needed[fare] = needed.get(fare, 0) + count
+    left = remaining(conn, new_flight_id) if needed else {}
+    for fare, count in needed.items():
+        if left.get(fare, 0) < count:
+            return f"Not enough {fare} seats left on flight {new_flight_id}: {max(left.get(fare, 0), 0)} available, {count} needed."
+    return None
+
+
+def move(conn: sqlite3.Connection, legs: list[tuple[int, str, int]], new_flight_id: int) -> None:
+    """Update the inventory after ``legs`` were moved to ``new_flight_id``."""
+    adjust(conn, [
+        change
+        for flight_id, fare, count in legs if flight_id != new_flight_id
+        for change in ((flight_id, fare, -count), (new_flight_id, fare, count))
+    ])
+
+
+def release(conn: sqlite3.Connection, legs: list[tuple[int, str, int]]) -> None:
+    """Update the inventory after ``legs`` were cancelled."""
+    adjust(conn, [(flight_id, fare, -count) for flight_id, fare, count in legs])
+
+
+def bookable(
+    conn: sqlite3.Connection, flight_ids: list[int], fare_conditions: Optional[str] = None, seats: int = 1
+) -> set[int]:
+    """The flights among ``flight_ids`` with at least ``seats`` free seats (in ``fare_conditions`` if given)."""
+    if not flight_ids:
+        return set()
+    query = (
+        "SELECT DISTINCT flight_id FROM seat_inventory "
+        f"WHERE flight_id IN ({', '.join('?' * len(flight_ids))}) AND capacity - booked >= ?"
+    )
+    params = [*flight_ids, seats]
+    if fare_conditions:
+        query += " AND fare_conditions = ?"
+        params.append(fare_conditions)
+    return {row[0] for row in conn.execute(query, params)}
+
+
+def seats_left(conn: sqlite3.Connection, flight_ids: list[int]) -> dict[int, dict[str, int]]:
+    """Seats left per fare condition of each of ``flight_ids``; flights without inventory map to {}."""
+    left = {flight_id: {} for flight_id in flight_ids}
+    for i in range(0, len(flight_ids), 500):
+        chunk = flight_ids[i:i + 500]
+        for flight_id, fare, seats in conn.execute(
+            "SELECT flight_id, fare_conditions, capacity - booked FROM seat_inventory "
+            f"WHERE flight_id IN ({', '.join('?' * len(chunk))})",
+            chunk,
+        ):
+            left[flight_id][fare] = seats
+    return left
+
+
+def bookable_from(
+    left: dict[int, dict[str, int]], flight_ids: list[int], fare_conditions: Optional[str] = None, seats: int = 1
+) -> set[int]:
+    """``bookable`` answered from a ``seats_left`` result that covers ``flight_ids``."""
+    if fare_conditions:
+        return {f for f in flight_ids if left[f].get(fare_conditions, 0) >= seats}
+    return {f for f in flight_ids if any(n >= seats for n in left[f].values())}
+
+
+def check_consistency(conn: sqlite3.Connection) -> list[tuple]:
+    """
+    Compare the stored inventory with a fresh rebuild.
+
+    Returns:
+        list[tuple]: (flight_id, fare_conditions, stored capacity, stored booked,
+        expected capacity, expected booked) for every row that differs.
+    """
+    return conn.execute(f"""
+        WITH expected AS ({EXPECTED_QUERY})
+        SELECT i.flight_id, i.fare_conditions, i.capacity, i.booked, e.capacity, e.booked
+        FROM seat_inventory i
+        LEFT JOIN expected e ON e.flight_id = i.flight_id AND e.fare_conditions = i.fare_conditions
+        WHERE (e.flight_id IS NULL AND (i.capacity != 0 OR i.booked != 0))
+           OR i.capacity != e.capacity OR i.booked != e.booked
+        UNION ALL
+        SELECT e.flight_id, e.fare_conditions, NULL, NULL, e.capacity, e.booked
+        FROM expected e
+        WHERE NOT EXISTS (
+            SELECT 1 FROM seat_inventory i WHERE i.flight_id = e.flight_id AND i.fare_conditions = e.fare_conditions
+        )
+        ORDER BY 1, 2
+    """).fetchall()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or check the seat inventory.")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--db", default=Config.DATABASE_PATH)
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        rows = run_in_transaction(rebuild_inventory, args.db)
+        print(f"Rebuilt seat inventory: {rows} flight/fare rows")
+    else:
+        mismatches = run_in_transaction(check_consistency, args.db)
+        for row in mismatches:
+            print("flight {} {}: stored capacity/booked {}/{}, expected {}/{}".format(*row))
+        print(f"{len(mismatches)} inconsistent rows")
+        raise SystemExit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+import heapq
+from datetime import timedelta
+from functools import lru_cache
+from typing import Optional
+
+from config.config import Config
+from src.flights.index import FlightIndex, TimeBound, get_flight_index
+from src.utils.timeutils import now_epoch
+
+ITINERARY_FLIGHT_FIELDS = (
+    "flight_id", "flight_no", "departure_airport", "arrival_airport", "scheduled_departure", "scheduled_arrival",
+)
+
+
+class ItinerarySearch:
+    """
+    Direct and connecting itineraries over the time-expanded flight graph.
+
+    Every flight is a node; a flight connects to the flights leaving its
+    arrival airport between ``min_connection`` and ``max_layover`` after it
+    lands. Those successors are found by bisection in the ``FlightIndex``
+    origin lists, so the graph is never materialized. The search is a
+    Dijkstra over partial itineraries keyed by arrival time and bounded by
+    ``max_stops``; hubs that cannot reach the destination in the remaining
+    hops are pruned up front. Itineraries come out earliest arrival first, and
+    the search stops after ``limit`` of them.
+
+    Args:
+        index (FlightIndex): Flights to search.
+        min_connection_minutes (int): Minimum time between landing and the next departure.
+        max_layover_hours (float): Maximum time between landing and the next departure.
+        max_stops (int): Maximum number of intermediate airports.
+    """
+
+    def __init__(
+        self,
+        index: FlightIndex,
+        min_connection_minutes: Optional[int] = None,
+        max_layover_hours: Optional[float] = None,
+        max_stops: Optional[int] = None,
+    ):
+        self.index = index
+        self.min_connection = 60 * (
+            Config.MIN_CONNECTION_MINUTES if min_connection_minutes is None else min_connection_minutes
+        )
+        self.max_layover = int(3600 * (Config.MAX_LAYOVER_HOURS if max_layover_hours is None else max_layover_hours))
+        self.max_stops = Config.MAX_STOPS if max_stops is None else max_stops
+        # Airport -> airports served directly from it
+        self.neighbours: dict[str, set] = {}
+        for origin, destination in index.by_route:
+            if origin is not None and destination is not None:
+                self.neighbours.setdefault(origin, set()).add(destination)
+        self._reachable: dict[str, list[set]] = {}
+
+    def reachable(self, destination: str) -> list[set]:
+        """``reachable(d)[h]`` is the set of airports that reach ``d`` in at most ``h`` flights."""
+        if destination not in self._reachable:
+            levels = [{destination}]
+            for _ in range(self.max_stops + 1):
+                previous = levels[-1]
+                levels.append(previous | {a for a, served in self.neighbours.items() if served & previous})
+            self._reachable[destination] = levels
+        return self._reachable[destination]
+
+    def search(
+        self,
+        departure_airport: str,
+        arrival_airport: str,
+        start_time: TimeBound = None,
+        end_time: TimeBound = None,
+        limit: int = 10,
+    ) -> list[dict]:
+        """
+        Itineraries whose first flight leaves in [start_time, end_time], earliest arrival first.
+
+        ``start_time`` defaults to now and ``end_time`` to a day after ``start_time``.
+        """
+        index = self.index
+        start = index.bound(start_time)
+        if start is None:
+            start = now_epoch()
+        end = index.bound(end_time, end=True)
+        if end is None:
+            end = start + int(timedelta(days=1).total_seconds())
+        if departure_airport == arrival_airport or limit <= 0:
+            return []
+
+        reach = self.reachable(arrival_airport)
+        max_legs = self.max_stops + 1
+        heap = []
+
+        def push(path: tuple, airports: frozenset):
+            last = path[-1]
+            arrival = index.arrivals[last]
+            if arrival is None:
+                return
+            airport = index.rows[last][index.destination_column]
+            if airport != arrival_airport and airport not in reach[max_legs - len(path)]:
+                return
+            heapq.heappush(heap, (arrival, len(path), -index.departures[path[0]], path, airports | {airport}))
+
+        for position in index.window((departure_airport, None), start, end):
+            push((position,), frozenset({departure_airport}))
+
+        results = []
+        while heap and len(results) < limit:
+            arrival, legs, _, path, airports = heapq.heappop(heap)
+            airport = index.rows[path[-1]][index.destination_column]
+            if airport == arrival_airport:
+                results.append(self._itinerary(path))
+                continue
+            if legs == max_legs:
+                continue
+            window = (arrival + self.min_connection, arrival + self.max_layover)
+            key = (airport, arrival_airport) if legs + 1 == max_legs else (airport, None)
+            for position in index.window(key, *window):
+                if index.rows[position][index.destination_column] not in airports:
+                    push(path + (position,), airports)
+        return results
+
+    def _itinerary(self, path: tuple) -> dict:
+        index = self.index
+        flights = []
+        for position in path:
+            flight = index.flight(position)
+            flights.append({field: flight[field] for field in ITINERARY_FLIGHT_FIELDS})
+        return {
+            "stops": len(path) - 1,
+            "departure": flights[0]["scheduled_departure"],
+            "arrival": flights[-1]["scheduled_arrival"],
+            "duration_minutes": (index.arrivals[path[-1]] - index.departures[path[0]]) // 60,
+            "connections": [
+                {"airport": leg["arrival_airport"], "minutes": (index.departures[b] - index.arrivals[a]) // 60}
+                for leg, a, b in zip(flights, path, path[1:])
+            ],
+            "flights": flights,
+        }
+
+
+@lru_cache(maxsize=None)
+def _itinerary_search(index: FlightIndex) -> ItinerarySearch:
+    return ItinerarySearch(index)
+
+
+def get_itinerary_search(path: str) -> ItinerarySearch:
+    """Return the itinerary search over the flight index of the database at ``path``."""
+    return _itinerary_search(get_flight_index(path))
@@ -0,0 +1,114 @@
+import argparse
+import sqlite3
+
+from config.config import Config
+from src.utils.db import run_in_transaction
+
+ITINERARY_COLUMNS = (
+    "ticket_no", "book_ref", "flight_id", "flight_no", "departure_airport", "arrival_airport",
+    "scheduled_departure", "scheduled_arrival", "seat_no", "fare_conditions",
+)
+
+ITINERARY_SCHEMA = ["""
+CREATE TABLE IF NOT EXISTS passenger_itinerary (
+    passenger_id TEXT NOT NULL,
+    ticket_no TEXT NOT NULL,
+    book_ref TEXT,
+    flight_id INTEGER,
+    flight_no TEXT,
+    departure_airport TEXT,
+    arrival_airport TEXT,
+    scheduled_departure TEXT,
+    scheduled_arrival TEXT,
+    seat_no TEXT,
+    fare_conditions TEXT
+)
+""",
+    "CREATE INDEX IF NOT EXISTS idx_passenger_itinerary_passenger ON passenger_itinerary (passenger_id)",
+    "CREATE INDEX IF NOT EXISTS idx_passenger_itinerary_ticket ON passenger_itinerary (ticket_no)",
+]
+
+# The join fetch_user_flight_information used to run on every request
+JOIN_QUERY = """
+SELECT
+    t.passenger_id, t.ticket_no, t.book_ref,
+    f.flight_id, f.flight_no, f.departure_airport, f.arrival_airport, f.scheduled_departure, f.scheduled_arrival,
+    bp.seat_no, tf.fare_conditions
+FROM
+    tickets t
+    JOIN ticket_flights tf ON t.ticket_no = tf.ticket_no
+    JOIN flights f ON tf.flight_id = f.flight_id
+    JOIN boarding_passes bp ON bp.ticket_no = t.ticket_no AND bp.flight_id = f.flight_id
+"""
+
+INSERT = f"INSERT INTO passenger_itinerary (passenger_id, {', '.join(ITINERARY_COLUMNS)})"
+
+
+def rebuild_itineraries(conn: sqlite3.Connection) -> int:
+    """Recompute the whole passenger_itinerary table; returns its row count."""
+    for statement in ITINERARY_SCHEMA:
+        conn.execute(statement)
+    conn.execute("DELETE FROM passenger_itinerary")
+    return conn.execute(f"{INSERT} {JOIN_QUERY}").rowcount
+
+
+def ensure_itineraries(conn: sqlite3.Connection) -> None:
+    """Create and fill passenger_itinerary if the database does not have it yet."""
+    exists = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'passenger_itinerary'"
+    ).fetchone()
+    if not exists:
+        rebuild_itineraries(conn)
+
+
+def refresh_tickets(conn: sqlite3.Connection, ticket_nos: list[str]) -> None:
+    """Recompute the itinerary rows of ``ticket_nos`` after their flights changed."""
+    marks = ", ".join("?" * len(ticket_nos))
+    conn.execute(f"DELETE FROM passenger_itinerary WHERE ticket_no IN ({marks})", ticket_nos)
+    conn.execute(f"{INSERT} {JOIN_QUERY} WHERE t.ticket_no IN ({marks})", ticket_nos)
+
+
+def passenger_flights(conn: sqlite3.Connection, passenger_id: str) -> list[dict]:
+    """The passenger's flights, as fetch_user_flight_information returns them (one indexed lookup)."""
+    cursor = conn.execute(
+        f"SELECT {', '.join(ITINERARY_COLUMNS)} FROM passenger_itinerary WHERE passenger_id = ? "
+        "ORDER BY scheduled_departure, ticket_no",
+        (passenger_id,),
+    )
+    return [dict(zip(ITINERARY_COLUMNS, row)) for row in cursor]
+
+
+def check_consistency(conn: sqlite3.Connection) -> list[tuple]:
+    """
+    Compare passenger_itinerary with the join it materializes.
+
+    Returns:
+        list[tuple]: ("missing" | "extra", row) for every row only in the join or only in the table.
+    """
+    columns = f"passenger_id, {', '.join(ITINERARY_COLUMNS)}"
+    missing = conn.execute(f"SELECT * FROM ({JOIN_QUERY}) EXCEPT SELECT {columns} FROM passenger_itinerary")
+    mismatches = [("missing", row) for row in missing]
+    extra = conn.execute(f"SELECT {columns} FROM passenger_itinerary EXCEPT SELECT * FROM ({JOIN_QUERY})")
+    mismatches += [("extra", row) for row in extra]
+    return mismatches
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild or check the passenger_itinerary table.")
+    parser.add_argument("command", choices=["rebuild", "check"])
+    parser.add_argument("--db", default=Config.DATABASE_PATH)
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        rows = run_in_transaction(rebuild_itineraries, args.db)
+        print(f"Rebuilt passenger_itinerary: {rows} rows")
+    else:
+        mismatches = run_in_transaction(check_consistency, args.db)
+        for kind, row in mismatches:
+            print(f"{kind}: {row}")
+        print(f"{len(mismatches)} inconsistent rows")
+        raise SystemExit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
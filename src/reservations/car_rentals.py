@@ -0,0 +1,249 @@
+import sqlite3
+from typing import Optional
+
+from src.chatbot.booking import BookingResult, placeholders
+from src.reservations.common import new_booking_id
+from src.utils.timeutils import Day, optional_day, to_day
+
+# Daily rate per car price tier; other tiers use DEFAULT_DAILY_RATE
+DAILY_RATES = {"Economy": 40, "Midsize": 60, "Premium": 90, "Luxury": 150}
+DEFAULT_DAILY_RATE = 60
+
+# Rental periods are half-open [start_date, end_date): a car returned on a day
+# can be picked up by the next renter that day
+RENTAL_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS car_rental_bookings (
+        booking_id TEXT PRIMARY KEY,
+        rental_id INTEGER NOT NULL,
+        passenger_id TEXT NOT NULL,
+        start_date TEXT NOT NULL,
+        end_date TEXT NOT NULL,
+        total_price INTEGER NOT NULL,
+        status TEXT NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_car_rental_periods
+    ON car_rental_bookings (rental_id, end_date, start_date) WHERE status = 'confirmed'
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_car_rental_bookings_passenger ON car_rental_bookings (passenger_id)",
+    "CREATE INDEX IF NOT EXISTS idx_car_rentals_id ON car_rentals (id)",
+]
+
+# The confirmed periods of one car never overlap, so they are ordered the same
+# by start and by end: only the first period ending after :start_date can
+# overlap [:start_date, :end_date). That makes the check one index seek.
+CLASH_QUERY = """
+SELECT booking_id, start_date, end_date FROM car_rental_bookings
+WHERE rental_id = :rental_id AND status = 'confirmed' AND end_date > :start_date AND booking_id != :exclude
+ORDER BY end_date LIMIT 1
+"""
+
+AVAILABLE = """
+NOT COALESCE((
+    SELECT b.start_date < :end_date FROM car_rental_bookings b
+    WHERE b.rental_id = c.id AND b.status = 'confirmed' AND b.end_date > :start_date
+    ORDER BY b.end_date LIMIT 1
+), 0)
+"""
+
+
+def ensure_rental_bookings(conn: sqlite3.Connection) -> None:
+    """Create the rental period table and its indexes."""
+    for statement in RENTAL_SCHEMA:
+        conn.execute(statement)
+
+
+def daily_rate(price_tier: Optional[str]) -> int:
+    return DAILY_RATES.get(price_tier, DEFAULT_DAILY_RATE)
+
+
+def period(start_date: Day, end_date: Day):
+    start, end = to_day(start_date), to_day(end_date)
+    if end <= start:
+        raise ValueError("end_date must be after start_date.")
+    return start, end
+
+
+def search(
+    conn: sqlite3.Connection,
+    location: Optional[str] = None,
+    name: Optional[str] = None,
+    price_tier: Optional[str] = None,
+    start_date: Optional[Day] = None,
+    end_date: Optional[Day] = None,
+) -> list[dict]:
+    """
+    Car rentals matching the filters, with their daily rate. With both dates,
+    only cars free for the whole period are returned.
+    """
+    query = "SELECT c.* FROM car_rentals c WHERE 1 = 1"
+    params = {}
+    if location:
+        query += " AND c.location LIKE :location"
+        params["location"] = f"%{location}%"
+    if name:
+        query += " AND c.name LIKE :name"
+        params["name"] = f"%{name}%"
+    if price_tier:
+        query += " AND c.price_tier LIKE :price_tier"
+        params["price_tier"] = price_tier
+    start, end = optional_day(start_date), optional_day(end_date)
+    if start and end:
+        start, end = period(start, end)
+        query += f" AND {AVAILABLE}"
+        params.update(start_date=start.isoformat(), end_date=end.isoformat())
+
+    cursor = conn.execute(query, params)
+    columns = [column[0] for column in cursor.description]
+    rentals = [dict(zip(columns, row)) for row in cursor.fetchall()]
+    for rental in rentals:
+        rental["price_per_day"] = daily_rate(rental.get("price_tier"))
+    return rentals
+
+
+def clash(
+    conn: sqlite3.Connection, rental_id: int, start: str, end: str, exclude: str = ""
+) -> Optional[tuple[str, str, str]]:
+    """(booking_id, start_date, end_date) of a confirmed booking overlapping [start, end), or None."""
+    row = conn.execute(
+        CLASH_QUERY, {"rental_id": rental_id, "start_date": start, "exclude": exclude}
+    ).fetchone()
+    return row if row is not None and row[1] < end else None
+
+
+def _reserve(conn, rental_id, passenger_id, start, end, price_tier) -> tuple[str, int]:
+    booking_id = new_booking_id("CR")
+    total = daily_rate(price_tier) * (end - start).days
+    conn.execute(
+        "INSERT INTO car_rental_bookings VALUES (?, ?, ?, ?, ?, ?, 'confirmed')",
+        (booking_id, rental_id, passenger_id, start.isoformat(), end.isoformat(), total),
+    )
+    return booking_id, total
+
+
+def _sync_booked(conn: sqlite3.Connection, rental_ids: list[int]) -> None:
+    """Keep the travel2 ``booked`` flag: set while a car has confirmed bookings."""
+    conn.execute(
+        f"""
+        UPDATE car_rentals SET booked = EXISTS(
+            SELECT 1 FROM car_rental_bookings b WHERE b.rental_id = car_rentals.id AND b.status = 'confirmed'
+        )
+        WHERE id IN ({placeholders(rental_ids)})
+        """,
+        rental_ids,
+    )
+
+
+def book(
+    conn: sqlite3.Connection,
+    rental_id: int,
+    passenger_id: str,
+    start_date: Optional[Day] = None,
+    end_date: Optional[Day] = None,
+) -> BookingResult:
+    """
+    Book a car for a period on an open transaction, if no confirmed booking
+    overlaps it. Without dates the rental's listed period is booked.
+    """
+    car = conn.execute(
+        "SELECT price_tier, start_date, end_date FROM car_rentals WHERE id = ?", (rental_id,)
+    ).fetchone()
+    if car is None:
+        return BookingResult(False, f"Car rental {rental_id} not found")
+    start, end = period(start_date or car[1], end_date or car[2])
+    taken = clash(conn, rental_id, start.isoformat(), end.isoformat())
+    if taken:
+        return BookingResult(False, f"Car rental {rental_id} is already booked from {taken[1]} to {taken[2]}.")
+
+    booking_id, total = _reserve(conn, rental_id, passenger_id, start, end, car[0])
+    _sync_booked(conn, [rental_id])
+    return BookingResult(
+        True,
+        f"Car rental {rental_id} successfully booked from {start} to {end}. "
+        f"Booking ID: {booking_id}. Total price: {total}.",
+        1,
+    )
+
+
+def book_many(conn: sqlite3.Connection, rental_ids: list[int], passenger_id: str) -> BookingResult:
+    """Book several cars for their listed periods on an open transaction, all or none."""
+    rental_ids = list(dict.fromkeys(rental_ids))
+    if not rental_ids:
+        return BookingResult(False, "No car rental IDs provided.")
+    cars = {row[0]: row[1:] for row in conn.execute(
+        f"SELECT id, price_tier, start_date, end_date FROM car_rentals WHERE id IN ({placeholders(rental_ids)})",
+        rental_ids,
+    )}
+    missing = [str(i) for i in rental_ids if i not in cars]
+    if missing:
+        return BookingResult(False, f"Car rentals {', '.join(missing)} not found. No rentals were booked.")
+    periods = {i: period(cars[i][1], cars[i][2]) for i in rental_ids}
+    taken = [str(i) for i in rental_ids if clash(conn, i, *(day.isoformat() for day in periods[i]))]
+    if taken:
+        return BookingResult(False, f"Car rentals {', '.join(taken)} are already booked. No rentals were booked.")
+
+    booking_ids = [_reserve(conn, i, passenger_id, *periods[i], cars[i][0])[0] for i in rental_ids]
+    _sync_booked(conn, rental_ids)
+    return BookingResult(
+        True,
+        f"Car rentals {', '.join(map(str, rental_ids))} successfully booked. "
+        f"Booking IDs: {', '.join(booking_ids)}.",
+        len(rental_ids),
+    )
+
+
+def _owned_booking(conn: sqlite3.Connection, booking_id: str, passenger_id: str):
+    row = conn.execute(
+        """
+        SELECT b.rental_id, b.passenger_id, b.start_date, b.end_date, c.price_tier
+        FROM car_rental_bookings b LEFT JOIN car_rentals c ON c.id = b.rental_id
+        WHERE b.booking_id = ? AND b.status = 'confirmed'
+        """,
+        (booking_id,),
+    ).fetchone()
+    if row is None:
+        return None, BookingResult(False, f"No confirmed car rental booking found with ID {booking_id}.")
+    if row[1] != passenger_id:
+        return None, BookingResult(
+            False, f"Current signed-in passenger with ID {passenger_id} not the owner of booking {booking_id}"
+        )
+    return row, None
+
+
+def update(
+    conn: sqlite3.Connection,
+    booking_id: str,
+    passenger_id: str,
+    start_date: Optional[Day] = None,
+    end_date: Optional[Day] = None,
+) -> BookingResult:
+    """Change the period of a booking on an open transaction, if no other booking overlaps it."""
+    row, failed = _owned_booking(conn, booking_id, passenger_id)
+    if failed:
+        return failed
+    rental_id, _, old_start, old_end, price_tier = row
+    start, end = period(start_date or old_start, end_date or old_end)
+    taken = clash(conn, rental_id, start.isoformat(), end.isoformat(), exclude=booking_id)
+    if taken:
+        return BookingResult(False, f"Car rental {rental_id} is already booked from {taken[1]} to {taken[2]}.")
+
+    total = daily_rate(price_tier) * (end - start).days
+    conn.execute(
+        "UPDATE car_rental_bookings SET start_date = ?, end_date = ?, total_price = ? WHERE booking_id = ?",
+        (start.isoformat(), end.isoformat(), total, booking_id),
+    )
+    return BookingResult(
+        True, f"Car rental booking {booking_id} updated: {start} to {end}. Total price: {total}.", 1
+    )
+
+
+def cancel(conn: sqlite3.Connection, booking_id: str, passenger_id: str) -> BookingResult:
+    """Cancel a booking on an open transaction, freeing its period."""
+    row, failed = _owned_booking(conn, booking_id, passenger_id)
+    if failed:
+        return failed
+    conn.execute("UPDATE car_rental_bookings SET status = 'cancelled' WHERE booking_id = ?", (booking_id,))
+    _sync_booked(conn, [row[0]])
+    return BookingResult(True, f"Car rental booking {booking_id} successfully cancelled.", 1)
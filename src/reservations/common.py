@@ -0,0 +1,11 @@
+import uuid
+from datetime import date, timedelta
+
+
+def days_between(start: date, end: date) -> list[str]:
+    """ISO dates of the days in ``[start, end)``, e.g. the nights of a hotel stay."""
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days)]
+
+
+def new_booking_id(prefix: str) -> str:
+    return f"{prefix}{uuid.uuid4().hex[:8].upper()}"
@@ -0,0 +1,236 @@
+import sqlite3
+from typing import Optional
+
+from config.config import Config
+from src.chatbot.booking import BookingResult
+from src.reservations.common import new_booking_id
+from src.utils.timeutils import Day, to_day
+
+# Price per participant of an excursion
+DEFAULT_PRICE = 75
+
+EXCURSION_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS excursion_capacity (
+        excursion_id INTEGER PRIMARY KEY,
+        capacity INTEGER NOT NULL,
+        price INTEGER NOT NULL
+    )
+    """,
+    # Places taken per excursion and day; a day without a row is fully free
+    """
+    CREATE TABLE IF NOT EXISTS excursion_slots (
+        excursion_id INTEGER NOT NULL,
+        day TEXT NOT NULL,
+        booked INTEGER NOT NULL,
+        PRIMARY KEY (excursion_id, day)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS excursion_bookings (
+        booking_id TEXT PRIMARY KEY,
+        excursion_id INTEGER NOT NULL,
+        passenger_id TEXT NOT NULL,
+        day TEXT NOT NULL,
+        participants INTEGER NOT NULL,
+        total_price INTEGER NOT NULL,
+        status TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_excursion_bookings_passenger ON excursion_bookings (passenger_id)",
+]
+
+FREE_PLACES = """
+c.capacity - COALESCE((
+    SELECT s.booked FROM excursion_slots s WHERE s.excursion_id = c.excursion_id AND s.day = :day
+), 0)
+"""
+
+
+def ensure_excursion_capacity(conn: sqlite3.Connection, capacity: Optional[int] = None) -> int:
+    """Create the excursion tables and give excursions without one a daily capacity; returns the rows added."""
+    for statement in EXCURSION_SCHEMA:
+        conn.execute(statement)
+    return conn.execute(
+        """
+        INSERT OR IGNORE INTO excursion_capacity (excursion_id, capacity, price)
+        SELECT id, ?, ? FROM trip_recommendations WHERE id IS NOT NULL
+        """,
+        (Config.EXCURSION_CAPACITY if capacity is None else capacity, DEFAULT_PRICE),
+    ).rowcount
+
+
+def check_participants(participants: int) -> int:
+    if participants < 1:
+        raise ValueError("participants must be at least 1.")
+    return participants
+
+
+def search(
+    conn: sqlite3.Connection,
+    location: Optional[str] = None,
+    name: Optional[str] = None,
+    keywords: Optional[str] = None,
+    day: Optional[Day] = None,
+    participants: int = 1,
+) -> list[dict]:
+    """
+    Excursions matching the filters. With ``day``, only excursions with at
+    least ``participants`` free places that day are returned, with the free
+    places and total price.
+    """
+    params = {"participants": check_participants(participants)}
+    filters = ""
+    if location:
+        filters += " AND t.location LIKE :location"
+        params["location"] = f"%{location}%"
+    if name:
+        filters += " AND t.name LIKE :name"
+        params["name"] = f"%{name}%"
+    if keywords:
+        keyword_list = [keyword.strip() for keyword in keywords.split(",")]
+        conditions = " OR ".join(f"t.keywords LIKE :keyword{i}" for i in range(len(keyword_list)))
+        filters += f" AND ({conditions})"
+        params.update({f"keyword{i}": f"%{keyword}%" for i, keyword in enumerate(keyword_list)})
+
+    if day is None:
+        query = f"""
+            SELECT t.id, t.name, t.location, t.keywords, t.details, c.price, c.capacity AS available_places
+            FROM trip_recommendations t JOIN excursion_capacity c ON c.excursion_id = t.id
+            WHERE 1 = 1 {filters}
+        """
+    else:
+        params["day"] = to_day(day).isoformat()
+        query = f"""
+            SELECT * FROM (
+                SELECT t.id, t.name, t.location, t.keywords, t.details, c.price,
+                       {FREE_PLACES} AS available_places, c.price * :participants AS total_price
+                FROM trip_recommendations t JOIN excursion_capacity c ON c.excursion_id = t.id
+                WHERE 1 = 1 {filters}
+            )
+            WHERE available_places >= :participants
+        """
+    cursor = conn.execute(query + " ORDER BY id", params)
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _adjust(conn: sqlite3.Connection, excursion_id: int, day: str, participants: int) -> None:
+    conn.execute(
+        """
+        INSERT INTO excursion_slots (excursion_id, day, booked) VALUES (?, ?, ?)
+        ON CONFLICT (excursion_id, day) DO UPDATE SET booked = booked + excluded.booked
+        """,
+        (excursion_id, day, participants),
+    )
+    if participants < 0:
+        conn.execute(
+            "DELETE FROM excursion_slots WHERE excursion_id = ? AND day = ? AND booked <= 0", (excursion_id, day)
+        )
+
+
+def _free_places(conn: sqlite3.Connection, excursion_id: int, day: str):
+    """(capacity left that day, price per participant), or None for an unknown excursion."""
+    return conn.execute(
+        f"SELECT {FREE_PLACES}, c.price FROM excursion_capacity c WHERE c.excursion_id = :excursion_id",
+        {"excursion_id": excursion_id, "day": day},
+    ).fetchone()
+
+
+def _owned_booking(conn: sqlite3.Connection, booking_id: str, passenger_id: str):
+    row = conn.execute(
+        """
+        SELECT excursion_id, passenger_id, day, participants
+        FROM excursion_bookings WHERE booking_id = ? AND status = 'confirmed'
+        """,
+        (booking_id,),
+    ).fetchone()
+    if row is None:
+        return None, BookingResult(False, f"No confirmed excursion booking found with ID {booking_id}.")
+    if row[1] != passenger_id:
+        return None, BookingResult(
+            False, f"Current signed-in passenger with ID {passenger_id} not the owner of booking {booking_id}"
+        )
+    return row, None
+
+
+def book(
+    conn: sqlite3.Connection, excursion_id: int, passenger_id: str, day: Day, participants: int = 1
+) -> BookingResult:
+    """Reserve places on an excursion for one day on an open transaction, if there is room."""
+    day = to_day(day).isoformat()
+    participants = check_participants(participants)
+    row = _free_places(conn, excursion_id, day)
+    if row is None:
+        return BookingResult(False, f"Excursion {excursion_id} not found.")
+    free, price = row
+    if free < participants:
+        return BookingResult(
+            False,
+            f"Not enough places left on excursion {excursion_id} on {day}: "
+            f"{max(free, 0)} available, {participants} needed.",
+        )
+
+    _adjust(conn, excursion_id, day, participants)
+    booking_id = new_booking_id("EX")
+    total = price * participants
+    conn.execute(
+        "INSERT INTO excursion_bookings VALUES (?, ?, ?, ?, ?, ?, 'confirmed')",
+        (booking_id, excursion_id, passenger_id, day, participants, total),
+    )
+    return BookingResult(
+        True,
+        f"Excursion {excursion_id} booked on {day} for {participants} participants. "
+        f"Booking ID: {booking_id}. Total price: {total}.",
+        1,
+    )
+
+
+def update(
+    conn: sqlite3.Connection,
+    booking_id: str,
+    passenger_id: str,
+    day: Optional[Day] = None,
+    participants: Optional[int] = None,
+) -> BookingResult:
+    """Move a booking to another day or change its participants on an open transaction, if there is room."""
+    row, failed = _owned_booking(conn, booking_id, passenger_id)
+    if failed:
+        return failed
+    excursion_id, _, old_day, old_participants = row
+    new_day = to_day(day).isoformat() if day else old_day
+    participants = check_participants(participants or old_participants)
+
+    free, price = _free_places(conn, excursion_id, new_day)
+    if new_day == old_day:
+        free += old_participants
+    if free < participants:
+        return BookingResult(
+            False,
+            f"Not enough places left on excursion {excursion_id} on {new_day}: "
+            f"{max(free, 0)} available, {participants} needed.",
+        )
+
+    _adjust(conn, excursion_id, old_day, -old_participants)
+    _adjust(conn, excursion_id, new_day, participants)
+    total = price * participants
+    conn.execute(
+        "UPDATE excursion_bookings SET day = ?, participants = ?, total_price = ? WHERE booking_id = ?",
+        (new_day, participants, total, booking_id),
+    )
+    return BookingResult(
+        True,
+        f"Excursion booking {booking_id} updated: {new_day} for {participants} participants. Total price: {total}.",
+        1,
+    )
+
+
+def cancel(conn: sqlite3.Connection, booking_id: str, passenger_id: str) -> BookingResult:
+    """Cancel a booking and free its places on an open transaction."""
+    row, failed = _owned_booking(conn, booking_id, passenger_id)
+    if failed:
+        return failed
+    excursion_id, _, day, participants = row
+    _adjust(conn, excursion_id, day, -participants)
+    conn.execute("UPDATE excursion_bookings SET status = 'cancelled' WHERE booking_id = ?", (booking_id,))
+    return BookingResult(True, f"Excursion booking {booking_id} successfully cancelled.", 1)
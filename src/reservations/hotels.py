@@ -0,0 +1,270 @@
+import math
+import sqlite3
+from datetime import timedelta
+from typing import Optional
+
+from config.config import Config
+from src.chatbot.booking import BookingResult
+from src.reservations.common import days_between, new_booking_id
+from src.utils.timeutils import Day, optional_day, to_day
+
+# Nightly room rate per hotel price tier; other tiers use DEFAULT_NIGHTLY_RATE
+NIGHTLY_RATES = {"Midscale": 120, "Upper Midscale": 160, "Upscale": 220, "Upper Upscale": 280, "Luxury": 400}
+DEFAULT_NIGHTLY_RATE = 150
+
+HOTEL_SCHEMA = [
+    """
+    CREATE TABLE IF NOT EXISTS hotel_rooms (
+        hotel_id INTEGER PRIMARY KEY,
+        rooms INTEGER NOT NULL,
+        price_per_night INTEGER NOT NULL
+    )
+    """,
+    # Rooms taken per hotel and night; a night without a row has every room free
+    """
+    CREATE TABLE IF NOT EXISTS hotel_room_nights (
+        hotel_id INTEGER NOT NULL,
+        night TEXT NOT NULL,
+        booked INTEGER NOT NULL,
+        PRIMARY KEY (hotel_id, night)
+    ) WITHOUT ROWID
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS hotel_bookings (
+        booking_id TEXT PRIMARY KEY,
+        hotel_id INTEGER NOT NULL,
+        passenger_id TEXT NOT NULL,
+        check_in TEXT NOT NULL,
+        check_out TEXT NOT NULL,
+        guests INTEGER NOT NULL,
+        rooms INTEGER NOT NULL,
+        total_price INTEGER NOT NULL,
+        status TEXT NOT NULL
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS idx_hotel_bookings_passenger ON hotel_bookings (passenger_id)",
+]
+
+# Free rooms of hotel ``r`` for a stay: the busiest night of [:check_in, :check_out)
+# decides, read with one primary-key range scan of hotel_room_nights
+FREE_ROOMS = """
+r.rooms - COALESCE((
+    SELECT MAX(n.booked) FROM hotel_room_nights n
+    WHERE n.hotel_id = r.hotel_id AND n.night >= :check_in AND n.night < :check_out
+), 0)
+"""
+
+
+def ensure_hotel_rooms(conn: sqlite3.Connection, rooms: Optional[int] = None) -> int:
+    """Create the hotel tables and give hotels without one a room count and rate; returns the rows added."""
+    for statement in HOTEL_SCHEMA:
+        conn.execute(statement)
+    cases = " ".join("WHEN ? THEN ?" for _ in NIGHTLY_RATES)
+    params = [value for item in NIGHTLY_RATES.items() for value in item]
+    return conn.execute(
+        f"""
+        INSERT OR IGNORE INTO hotel_rooms (hotel_id, rooms, price_per_night)
+        SELECT id, ?, CASE price_tier {cases} ELSE ? END FROM hotels WHERE id IS NOT NULL
+        """,
+        [Config.HOTEL_ROOMS if rooms is None else rooms, *params, DEFAULT_NIGHTLY_RATE],
+    ).rowcount
+
+
+def rooms_for(guests: int) -> int:
+    if guests < 1:
+        raise ValueError("guests must be at least 1.")
+    return math.ceil(guests / Config.HOTEL_GUESTS_PER_ROOM)
+
+
+def stay(check_in: Day, check_out: Optional[Day] = None):
+    """(check_in, check_out) dates of a stay; one night when check_out is not given."""
+    start = to_day(check_in)
+    end = optional_day(check_out) or start + timedelta(days=1)
+    if end <= start:
+        raise ValueError("check_out must be after check_in.")
+    return start, end
+
+
+def search(
+    conn: sqlite3.Connection,
+    location: Optional[str] = None,
+    name: Optional[str] = None,
+    price_tier: Optional[str] = None,
+    check_in: Optional[Day] = None,
+    check_out: Optional[Day] = None,
+    guests: int = 1,
+) -> list[dict]:
+    """
+    Hotels matching the filters. With ``check_in``, only hotels with enough
+    free rooms for ``guests`` on every night of the stay are returned, with
+    their free rooms and the total price of the stay.
+    """
+    params = {"rooms": rooms_for(guests)}
+    filters = ""
+    if location:
+        filters += " AND h.location LIKE :location"
+        params["location"] = f"%{location}%"
+    if name:
+        filters += " AND h.name LIKE :name"
+        params["name"] = f"%{name}%"
+    if price_tier:
+        filters += " AND h.price_tier LIKE :price_tier"
+        params["price_tier"] = price_tier
+
+    if check_in is None:
+        query = f"""
+            SELECT h.id, h.name, h.location, h.price_tier, r.price_per_night, r.rooms AS available_rooms
+            FROM hotels h JOIN hotel_rooms r ON r.hotel_id = h.id
+            WHERE 1 = 1 {filters}
+        """
+    else:
+        start, end = stay(check_in, check_out)
+        params.update(check_in=start.isoformat(), check_out=end.isoformat(), nights=(end - start).days)
+        query = f"""
+            SELECT * FROM (
+                SELECT h.id, h.name, h.location, h.price_tier, r.price_per_night,
+                       {FREE_ROOMS} AS available_rooms,
+                       r.price_per_night * :nights * :rooms AS total_price
+                FROM hotels h JOIN hotel_rooms r ON r.hotel_id = h.id
+                WHERE 1 = 1 {filters}
+            )
+            WHERE available_rooms >= :rooms
+        """
+    cursor = conn.execute(query + " ORDER BY id", params)
+    columns = [column[0] for column in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+def _adjust(conn: sqlite3.Connection, hotel_id: int, nights: list[str], rooms: int) -> None:
+    """Add ``rooms`` (negative to release) to the booked count of each night."""
+    conn.executemany(
+        """
+        INSERT INTO hotel_room_nights (hotel_id, night, booked) VALUES (?, ?, ?)
+        ON CONFLICT (hotel_id, night) DO UPDATE SET booked = booked + excluded.booked
+        """,
+        [(hotel_id, night, rooms) for night in nights],
+    )
+    if rooms < 0 and nights:
+        conn.execute(
+            "DELETE FROM hotel_room_nights WHERE hotel_id = ? AND night >= ? AND night <= ? AND booked <= 0",
+            (hotel_id, nights[0], nights[-1]),
+        )
+
+
+def _owned_booking(conn: sqlite3.Connection, booking_id: str, passenger_id: str):
+    """(row, None) for a confirmed booking of the passenger, else (None, failed result)."""
+    row = conn.execute(
+        """
+        SELECT hotel_id, passenger_id, check_in, check_out, guests, rooms
+        FROM hotel_bookings WHERE booking_id = ? AND status = 'confirmed'
+        """,
+        (booking_id,),
+    ).fetchone()
+    if row is None:
+        return None, BookingResult(False, f"No confirmed hotel booking found with ID {booking_id}.")
+    if row[1] != passenger_id:
+        return None, BookingResult(
+            False, f"Current signed-in passenger with ID {passenger_id} not the owner of booking {booking_id}"
+        )
+    return row, None
+
+
+def book(
+    conn: sqlite3.Connection, hotel_id: int, passenger_id: str, check_in: Day, check_out: Day, guests: int = 1
+) -> BookingResult:
+    """Reserve rooms for every night of a stay on an open transaction, if all nights have room."""
+    start, end = stay(check_in, check_out)
+    rooms = rooms_for(guests)
+    row = conn.execute(
+        f"SELECT r.price_per_night, {FREE_ROOMS} FROM hotel_rooms r WHERE r.hotel_id = :hotel_id",
+        {"hotel_id": hotel_id, "check_in": start.isoformat(), "check_out": end.isoformat()},
+    ).fetchone()
+    if row is None:
+        return BookingResult(False, f"Hotel {hotel_id} not found.")
+    price_per_night, free = row
+    if free < rooms:
+        return BookingResult(
+            False,
+            f"Not enough rooms left at hotel {hotel_id} from {start} to {end}: "
+            f"{max(free, 0)} available, {rooms} needed.",
+        )
+
+    nights = days_between(start, end)
+    _adjust(conn, hotel_id, nights, rooms)
+    booking_id = new_booking_id("HB")
+    total = price_per_night * len(nights) * rooms
+    conn.execute(
+        "INSERT INTO hotel_bookings VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'confirmed')",
+        (booking_id, hotel_id, passenger_id, start.isoformat(), end.isoformat(), guests, rooms, total),
+    )
+    return BookingResult(
+        True,
+        f"Hotel {hotel_id} booked from {start} to {end} for {guests} guests ({rooms} rooms). "
+        f"Booking ID: {booking_id}. Total price: {total}.",
+        1,
+    )
+
+
+def update(
+    conn: sqlite3.Connection,
+    booking_id: str,
+    passenger_id: str,
+    check_in: Optional[Day] = None,
+    check_out: Optional[Day] = None,
+    guests: Optional[int] = None,
+) -> BookingResult:
+    """Change the dates or guests of a booking on an open transaction, if the new nights have room."""
+    row, failed = _owned_booking(conn, booking_id, passenger_id)
+    if failed:
+        return failed
+    hotel_id, _, old_in, old_out, old_guests, old_rooms = row
+    start, end = stay(check_in or old_in, check_out or old_out)
+    guests = guests or old_guests
+    rooms = rooms_for(guests)
+
+    old_nights = days_between(to_day(old_in), to_day(old_out))
+    nights = days_between(start, end)
+    capacity, price_per_night = conn.execute(
+        "SELECT rooms, price_per_night FROM hotel_rooms WHERE hotel_id = ?", (hotel_id,)
+    ).fetchone()
+    taken = dict(conn.execute(
+        "SELECT night, booked FROM hotel_room_nights WHERE hotel_id = ? AND night >= ? AND night < ?",
+        (hotel_id, start.isoformat(), end.isoformat()),
+    ).fetchall())
+    # The booking's own rooms do not count against it
+    own = set(old_nights)
+    busiest = max((taken.get(night, 0) - (old_rooms if night in own else 0) for night in nights), default=0)
+    if busiest + rooms > capacity:
+        return BookingResult(
+            False,
+            f"Not enough rooms left at hotel {hotel_id} from {start} to {end}: "
+            f"{max(capacity - busiest, 0)} available, {rooms} needed.",
+        )
+
+    _adjust(conn, hotel_id, old_nights, -old_rooms)
+    _adjust(conn, hotel_id, nights, rooms)
+    total = price_per_night * len(nights) * rooms
+    conn.execute(
+        """
+        UPDATE hotel_bookings SET check_in = ?, check_out = ?, guests = ?, rooms = ?, total_price = ?
+        WHERE booking_id = ?
+        """,
+        (start.isoformat(), end.isoformat(), guests, rooms, total, booking_id),
+    )
+    return BookingResult(
+        True,
+        f"Hotel booking {booking_id} updated: {start} to {end} for {guests} guests ({rooms} rooms). "
+        f"Total price: {total}.",
+        1,
+    )
+
+
+def cancel(conn: sqlite3.Connection, booking_id: str, passenger_id: str) -> BookingResult:
+    """Cancel a booking and free its rooms on an open transaction."""
+    row, failed = _owned_booking(conn, booking_id, passenger_id)
+    if failed:
+        return failed
+    hotel_id, _, check_in, check_out, _, rooms = row
+    _adjust(conn, hotel_id, days_between(to_day(check_in), to_day(check_out)), -rooms)
+    conn.execute("UPDATE hotel_bookings SET status = 'cancelled' WHERE booking_id = ?", (booking_id,))
+    return BookingResult(True, f"Hotel booking {booking_id} successfully cancelled.", 1)
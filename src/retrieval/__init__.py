@@ -0,0 +1 @@
+# This file can be left empty or used to initialize the package
@@ -0,0 +1,92 @@
+import json
+import math
+import os
+from collections import Counter
+
+import numpy as np
+
+VOCAB_FILE = "bm25_vocab.json"
+DOCS_FILE = "bm25_postings_docs.npy"
+TFS_FILE = "bm25_postings_tfs.npy"
+LENGTHS_FILE = "bm25_doc_lengths.npy"
+
+
+class BM25Index:
+    """
+    Okapi BM25 inverted index stored as memory-mapped numpy arrays.
+
+    Postings of all terms are concatenated into one document-id array and one
+    term-frequency array; the vocabulary maps each term to its slice and IDF.
+
+    Args:
+        directory (str): Directory written by ``BM25Index.build``.
+        k1 (float): Term-frequency saturation.
+        b (float): Length normalization.
+    """
+
+    def __init__(self, directory: str, k1: float = 1.5, b: float = 0.75):
+        with open(os.path.join(directory, VOCAB_FILE), encoding="utf-8") as f:
+            self.vocab = json.load(f)
+        self.docs = np.load(os.path.join(directory, DOCS_FILE), mmap_mode="r")
+        self.tfs = np.load(os.path.join(directory, TFS_FILE), mmap_mode="r")
+        lengths = np.load(os.path.join(directory, LENGTHS_FILE), mmap_mode="r")
+        self.n_docs = len(lengths)
+        avgdl = float(lengths.mean()) if self.n_docs else 1.0
+        self.k1 = k1
+        # Per-document part of the BM25 denominator, computed once
+        self.norms = (k1 * (1 - b + b * lengths / max(avgdl, 1e-9))).astype(np.float32)
+
+    @staticmethod
+    def build(tokenized_docs: list[list[str]], directory: str) -> None:
+        """Write the index of ``tokenized_docs`` (one token list per document) to ``directory``."""
+        postings: dict[str, list[tuple[int, int]]] = {}
+        for doc_id, tokens in enumerate(tokenized_docs):
+            for term, tf in Counter(tokens).items():
+                postings.setdefault(term, []).append((doc_id, tf))
+
+        n_docs = len(tokenized_docs)
+        vocab, docs, tfs, offset = {}, [], [], 0
+        for term in sorted(postings):
+            entries = postings[term]
+            df = len(entries)
+            idf = math.log(1 + (n_docs - df + 0.5) / (df + 0.5))
+            vocab[term] = [offset, offset + df, idf]
+            docs.extend(doc_id for doc_id, _ in entries)
+            tfs.extend(tf for _, tf in entries)
+            offset += df
+
+        with open(os.path.join(directory, VOCAB_FILE), "w", encoding="utf-8") as f:
+            json.dump(vocab, f)
+        np.save(os.path.join(directory, DOCS_FILE), np.asarray(docs, dtype=np.int32))
+        np.save(os.path.join(directory, TFS_FILE), np.asarray(tfs, dtype=np.float32))
+        np.save(
+            os.path.join(directory, LENGTHS_FILE),
+            np.asarray([len(t) for t in tokenized_docs], dtype=np.float32),
+        )
+
+    def scores(self, query_tokens: list[str]) -> np.ndarray:
+        """BM25 score of every document for ``query_tokens``."""
+        scores = np.zeros(self.n_docs, dtype=np.float32)
+        for term in set(query_tokens):
+            entry = self.vocab.get(term)
+            if entry is None:
+                continue
+            start, end, idf = entry
+            docs = self.docs[start:end]
+            tfs = self.tfs[start:end]
+            scores[docs] += idf * tfs * (self.k1 + 1) / (tfs + self.norms[docs])
+        return scores
+
+    def search(self, query_tokens: list[str], k: int = 3) -> list[tuple[int, float]]:
+        """Top ``k`` (document id, score) pairs with a positive score, best first."""
+        return top_k(self.scores(query_tokens), k)
+
+
+def top_k(scores: np.ndarray, k: int) -> list[tuple[int, float]]:
+    """Indices and values of the ``k`` highest positive scores, best first."""
+    if k <= 0 or not len(scores):
+        return []
+    k = min(k, len(scores))
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    ranked = candidates[np.argsort(-scores[candidates], kind="stable")]
+    return [(int(i), float(scores[i])) for i in ranked if scores[i] > 0]
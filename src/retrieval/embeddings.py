@@ -0,0 +1,58 @@
+import os
+import zlib
+
+import numpy as np
+
+from src.retrieval.text import tokenize
+
+EMBEDDINGS_FILE = "embeddings.npy"
+
+
+class HashingEmbedder:
+    """
+    Local, dependency-free text embedder.
+
+    Hashes word unigrams and bigrams into ``dim`` signed buckets and
+    L2-normalizes the result, so similar wording gives similar vectors without
+    a model download.
+    """
+
+    def __init__(self, dim: int = 256):
+        self.dim = dim
+
+    def embed(self, texts: list[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dim), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            features = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+            for feature in features:
+                h = zlib.crc32(feature.encode("utf-8"))
+                vectors[row, h % self.dim] += 1.0 if h & 0x80000000 else -1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1, norms)
+
+
+class EmbeddingIndex:
+    """
+    Dense index of normalized passage embeddings, memory-mapped from disk.
+
+    Args:
+        directory (str): Directory written by ``EmbeddingIndex.build``.
+        embedder (HashingEmbedder): Embedder used for queries; must match the build.
+    """
+
+    def __init__(self, directory: str, embedder: HashingEmbedder):
+        self.embedder = embedder
+        self.vectors = np.load(os.path.join(directory, EMBEDDINGS_FILE), mmap_mode="r")
+
+    @staticmethod
+    def exists(directory: str) -> bool:
+        return os.path.exists(os.path.join(directory, EMBEDDINGS_FILE))
+
+    @staticmethod
+    def build(texts: list[str], directory: str, embedder: HashingEmbedder) -> None:
+        np.save(os.path.join(directory, EMBEDDINGS_FILE), embedder.embed(texts))
+
+    def scores(self, query: str) -> np.ndarray:
+        """Cosine similarity of every passage to ``query``."""
+        return self.vectors @ self.embedder.embed([query])[0]
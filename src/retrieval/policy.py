@@ -0,0 +1,239 @@
+import argparse
+import fcntl
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from config.config import Config
+from src.retrieval.bm25 import BM25Index, top_k
+from src.retrieval.embeddings import EmbeddingIndex, HashingEmbedder
+from src.retrieval.text import Passage, chunk_markdown, tokenize
+from src.utils.logger import logger
+
+META_FILE = "meta.json"
+PASSAGES_FILE = "passages.bin"
+OFFSETS_FILE = "passage_offsets.npy"
+INDEX_VERSION = 1
+EMBEDDING_DIM = 256
+
+
+def corpus_fingerprint(docs_dir: str) -> str:
+    """Hash of the names, sizes and modification times of the policy documents."""
+    digest = hashlib.sha256()
+    for path in sorted(Path(docs_dir).glob("**/*.md")):
+        stat = path.stat()
+        digest.update(f"{path.relative_to(docs_dir)}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+    return digest.hexdigest()
+
+
+def load_passages(docs_dir: str, max_words: int = 120) -> list[Passage]:
+    passages = []
+    for path in sorted(Path(docs_dir).glob("**/*.md")):
+        passages.extend(chunk_markdown(path.stem, path.read_text(encoding="utf-8"), max_words=max_words))
+    return passages
+
+
+@contextmanager
+def index_lock(directory: str, exclusive: bool):
+    """
+    Hold the lock of the index in ``directory``: exclusive while it is
+    replaced, shared while it is opened. The lock is a ``flock`` on the
+    sibling ``<directory>.lock`` file, so it also holds across processes.
+    """
+    path = f"{os.path.abspath(directory)}.lock"
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(f, fcntl.LOCK_UN)
+
+
+def read_meta(directory: str) -> dict:
+    path = os.path.join(directory, META_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class PolicyIndex:
+    """
+    Top-k passage retrieval over the policy documents.
+
+    The index directory holds the passage store (``passages.bin`` plus an
+    offsets array), the BM25 index and optionally a hashing-embedding index.
+    Everything is memory-mapped when the index is opened; only the passages
+    that are returned get decoded.
+
+    Args:
+        directory (str): Directory written by ``PolicyIndex.build``.
+        use_embeddings (bool): Fuse embedding similarity into the ranking when
+            the embedding index exists.
+    """
+
+    def __init__(self, directory: str, use_embeddings: bool = False):
+        with open(os.path.join(directory, META_FILE), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        self.offsets = np.load(os.path.join(directory, OFFSETS_FILE), mmap_mode="r")
+        with open(os.path.join(directory, PASSAGES_FILE), "rb") as f:
+            self._store = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) if self.meta["passages"] else b""
+        self.bm25 = BM25Index(directory)
+        self.embeddings = None
+        if use_embeddings and EmbeddingIndex.exists(directory):
+            self.embeddings = EmbeddingIndex(directory, HashingEmbedder(self.meta["embedding_dim"]))
+
+    def __len__(self) -> int:
+        return self.meta["passages"]
+
+    @staticmethod
+    def build(passages: list[Passage], directory: str, fingerprint: str = "",
+              embeddings: bool = True, embedding_dim: int = EMBEDDING_DIM) -> None:
+        """
+        Write an index of ``passages`` to ``directory``.
+
+        The index is written to a temporary sibling directory and swapped into
+        place under the exclusive index lock. ``load_or_build`` opens the index
+        under the shared lock, so its readers never see a missing or
+        half-written index, and concurrent builds run one after the other.
+        """
+        with index_lock(directory, exclusive=True):
+            PolicyIndex._write(passages, directory, fingerprint, embeddings, embedding_dim)
+
+    @staticmethod
+    def _write(passages: list[Passage], directory: str, fingerprint: str,
+               embeddings: bool, embedding_dim: int) -> None:
+        directory = os.path.abspath(directory)
+        staging = f"{directory}.tmp-{os.getpid()}"
+        shutil.rmtree(staging, ignore_errors=True)
+        os.makedirs(staging)
+
+        encoded = [json.dumps(p._asdict(), ensure_ascii=False).encode("utf-8") for p in passages]
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(e) for e in encoded], out=offsets[1:])
+        with open(os.path.join(staging, PASSAGES_FILE), "wb") as f:
+            f.write(b"".join(encoded))
+        np.save(os.path.join(staging, OFFSETS_FILE), offsets)
+
+        searchable = [f"{p.title} {p.text}" for p in passages]
+        BM25Index.build([tokenize(text) for text in searchable], staging)
+        if embeddings:
+            EmbeddingIndex.build(searchable, staging, HashingEmbedder(embedding_dim))
+
+        with open(os.path.join(staging, META_FILE), "w", encoding="utf-8") as f:
+            json.dump({
+                "version": INDEX_VERSION,
+                "fingerprint": fingerprint,
+                "passages": len(passages),
+                "embedding_dim": embedding_dim if embeddings else None,
+                "built_at": time.time(),
+            }, f)
+
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(staging, directory)
+
+    @classmethod
+    def load_or_build(cls, docs_dir: str, directory: str, use_embeddings: bool = False) -> "PolicyIndex":
+        """
+        Open the index in ``directory``, rebuilding it first when the documents changed.
+
+        When several processes find the index stale at once, the first to take
+        the exclusive lock rebuilds it; the others find it current once they
+        get the lock and only open it.
+        """
+        fingerprint = corpus_fingerprint(docs_dir)
+
+        def current(meta: dict) -> bool:
+            return meta.get("version") == INDEX_VERSION and meta.get("fingerprint") == fingerprint and (
+                not use_embeddings or bool(meta.get("embedding_dim"))
+            )
+
+        with index_lock(directory, exclusive=False):
+            if current(read_meta(directory)):
+                return cls(directory, use_embeddings=use_embeddings)
+        with index_lock(directory, exclusive=True):
+            if not current(read_meta(directory)):
+                start = time.perf_counter()
+                passages = load_passages(docs_dir)
+                cls._write(passages, directory, fingerprint, use_embeddings, EMBEDDING_DIM)
+                logger.info(
+                    f"Built policy index: {len(passages)} passages in {time.perf_counter() - start:.2f}s"
+                )
+            return cls(directory, use_embeddings=use_embeddings)
+
+    def passage(self, i: int) -> dict:
+        start, end = int(self.offsets[i]), int(self.offsets[i + 1])
+        return json.loads(self._store[start:end])
+
+    def search(self, query: str, k: int = 3) -> list[dict]:
+        """
+        Return the ``k`` best passages for ``query``.
+
+        BM25 ranks the passages; with embeddings enabled the BM25 and cosine
+        rankings are combined by reciprocal rank fusion.
+
+        Returns:
+            list[dict]: Passages (doc, title, text) with their ``score``, best first.
+        """
+        bm25_scores = self.bm25.scores(tokenize(query))
+        if self.embeddings is None:
+            ranked = top_k(bm25_scores, k)
+        else:
+            ranked = self._fuse(bm25_scores, self.embeddings.scores(query), k)
+        return [{**self.passage(i), "score": score} for i, score in ranked]
+
+    @staticmethod
+    def _fuse(bm25_scores: np.ndarray, cosine: np.ndarray, k: int, depth: int = 50, c: int = 60):
+        fused: dict[int, float] = {}
+        for scores in (bm25_scores, cosine):
+            for rank, (i, _) in enumerate(top_k(scores, depth)):
+                fused[i] = fused.get(i, 0.0) + 1.0 / (c + rank + 1)
+        return sorted(fused.items(), key=lambda item: -item[1])[:k]
+
+
+def open_policy_index(docs_dir: Optional[str] = None, index_dir: Optional[str] = None) -> PolicyIndex:
+    """Open the configured policy index, building it first if it is missing or stale."""
+    return PolicyIndex.load_or_build(
+        docs_dir or Config.POLICY_DOCS_DIR,
+        index_dir or Config.POLICY_INDEX_DIR,
+        use_embeddings=Config.POLICY_EMBEDDINGS,
+    )
+
+
+@lru_cache(maxsize=None)
+def get_policy_index(docs_dir: Optional[str] = None, index_dir: Optional[str] = None) -> PolicyIndex:
+    """Return the process-wide policy index, building it on first use if needed."""
+    return open_policy_index(docs_dir, index_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the policy index.")
+    parser.add_argument("command", choices=["build", "query"])
+    parser.add_argument("text", nargs="?", help="Query text for the query command")
+    parser.add_argument("-k", type=int, default=Config.POLICY_TOP_K)
+    args = parser.parse_args()
+
+    if args.command == "build":
+        passages = load_passages(Config.POLICY_DOCS_DIR)
+        PolicyIndex.build(
+            passages, Config.POLICY_INDEX_DIR, corpus_fingerprint(Config.POLICY_DOCS_DIR),
+            embeddings=Config.POLICY_EMBEDDINGS,
+        )
+        print(f"Indexed {len(passages)} passages into {Config.POLICY_INDEX_DIR}")
+    else:
+        for hit in get_policy_index().search(args.text or "", args.k):
+            print(f"[{hit['score']:.3f}] {hit['title']}\n    {hit['text']}\n")
+
+
+if __name__ == "__main__":
+    main()
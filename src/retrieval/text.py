@@ -0,0 +1,75 @@
+import re
+from typing import NamedTuple
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.*)$")
+
+STOPWORDS = frozenset(
+    "a an and are as at be by can do does for from how i if in is it my of on or the to up "
+    "what when where which who will with you your".split()
+)
+
+
+def normalize(token: str) -> str:
+    """Fold simple plural forms so that ``bags`` matches ``bag``."""
+    if len(token) > 4 and token.endswith("ies"):
+        return token[:-3] + "y"
+    if len(token) > 3 and token.endswith("s") and not token.endswith("ss"):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens with stopwords removed and plurals folded."""
+    return [normalize(t) for t in TOKEN_RE.findall(text.lower()) if t not in STOPWORDS]
+
+
+class Passage(NamedTuple):
+    doc: str
+    title: str
+    text: str
+
+
+def chunk_markdown(doc: str, text: str, max_words: int = 120, overlap: int = 20) -> list[Passage]:
+    """
+    Split a markdown document into passages.
+
+    Each section (text under a heading) becomes one or more passages of at most
+    ``max_words`` words, consecutive passages of a long section overlapping by
+    ``overlap`` words. A passage's title is the path of headings above it.
+
+    Args:
+        doc (str): Document name stored with each passage.
+        text (str): Markdown source.
+        max_words (int): Maximum words per passage.
+        overlap (int): Words repeated between consecutive passages of one section.
+
+    Returns:
+        list[Passage]: Passages in document order.
+    """
+    passages = []
+    headings: list[str] = []
+    body: list[str] = []
+
+    def flush():
+        words = " ".join(body).split()
+        title = " > ".join(h for h in headings if h)
+        step = max(1, max_words - overlap)
+        for start in range(0, len(words), step):
+            passages.append(Passage(doc, title, " ".join(words[start:start + max_words])))
+            if start + max_words >= len(words):
+                break
+        body.clear()
+
+    for line in text.splitlines():
+        match = HEADING_RE.match(line)
+        if match:
+            flush()
+            level = len(match.group(1))
+            del headings[level - 1:]
+            headings.extend([""] * (level - 1 - len(headings)))
+            headings.append(match.group(2).strip())
+        elif line.strip():
+            body.append(line.strip())
+    flush()
+    return passages
@@ -0,0 +1,153 @@
+import asyncio
+import time
+from collections import Counter, deque
+from contextlib import asynccontextmanager
+from functools import lru_cache
+from typing import Optional
+
+from langchain_core.rate_limiters import InMemoryRateLimiter
+
+from src.utils.metrics import metrics
+
+
+class Rejected(Exception):
+    """A request turned away by admission control, with the HTTP status to answer with."""
+
+    def __init__(self, status_code: int, reason: str, retry_after: float = 1.0):
+        super().__init__(reason)
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Bounded admission for chat turns.
+
+    At most ``max_in_flight`` turns run at once; later ones wait in a FIFO
+    queue of at most ``max_queued`` entries for up to ``queue_timeout``
+    seconds. A passenger may have ``per_passenger`` turns running or queued.
+    Excess requests are rejected immediately: 429 for a passenger over their
+    limit, 503 when the queue is full or the wait times out.
+
+    State is only touched from the event loop, so no locking is needed.
+
+    Args:
+        max_in_flight (int): Turns running concurrently.
+        max_queued (int): Turns waiting for a slot.
+        per_passenger (int): Running plus queued turns per passenger_id (0 disables the limit).
+        queue_timeout (float): Seconds a turn may wait for a slot.
+    """
+
+    def __init__(self, max_in_flight: int, max_queued: int, per_passenger: int, queue_timeout: float):
+        self.max_in_flight = max_in_flight
+        self.max_queued = max_queued
+        self.per_passenger = per_passenger
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self._waiters: deque[asyncio.Future] = deque()
+        self._passengers: Counter = Counter()
+
+    @classmethod
+    def from_config(cls, config) -> "AdmissionController":
+        return cls(
+            config.CHAT_MAX_IN_FLIGHT,
+            config.CHAT_MAX_QUEUED,
+            config.CHAT_MAX_PER_PASSENGER,
+            config.CHAT_QUEUE_TIMEOUT,
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(not waiter.done() for waiter in self._waiters)
+
+    @asynccontextmanager
+    async def admit(self, passenger_id: Optional[str] = None):
+        """Hold a slot for the body of the ``async with``; raises ``Rejected`` instead of waiting too long."""
+        if passenger_id and self.per_passenger and self._passengers[passenger_id] >= self.per_passenger:
+            metrics.incr("admission.rejected.passenger_limit")
+            raise Rejected(429, f"Too many concurrent requests for passenger {passenger_id}.")
+        if passenger_id:
+            self._passengers[passenger_id] += 1
+        try:
+            await self._acquire()
+            try:
+                yield
+            finally:
+                self._release()
+        finally:
+            if passenger_id:
+                self._passengers[passenger_id] -= 1
+                if not self._passengers[passenger_id]:
+                    del self._passengers[passenger_id]
+
+    async def _acquire(self) -> None:
+        if self.in_flight < self.max_in_flight and not self.queue_depth:
+            self.in_flight += 1
+            self._report(admitted=True)
+            return
+        if self.queue_depth >= self.max_queued:
+            metrics.incr("admission.rejected.queue_full")
+            raise Rejected(503, "Server is busy, try again shortly.")
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self._report()
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over as the wait ended; pass it on.
+                self._release()
+            self._report()
+            if isinstance(e, asyncio.TimeoutError):
+                metrics.incr("admission.rejected.timeout")
+                raise Rejected(503, "Server is busy, try again shortly.") from None
+            raise
+        metrics.observe("admission.queue_wait", time.perf_counter() - start)
+        self._report(admitted=True)
+
+    def _release(self) -> None:
+        # Hand the slot straight to the oldest live waiter, so it cannot be taken by a newcomer
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+        self._report()
+
+    def _report(self, admitted: bool = False) -> None:
+        if admitted:
+            metrics.incr("admission.admitted")
+        metrics.gauge("admission.in_flight", self.in_flight)
+        metrics.gauge("admission.queue_depth", self.queue_depth)
+
+
+class MeteredRateLimiter(InMemoryRateLimiter):
+    """``InMemoryRateLimiter`` that records how long LLM calls waited for a token."""
+
+    def acquire(self, *, blocking: bool = True) -> bool:
+        start = time.perf_counter()
+        acquired = super().acquire(blocking=blocking)
+        metrics.observe("llm.rate_limit_wait", time.perf_counter() - start)
+        return acquired
+
+    async def aacquire(self, *, blocking: bool = True) -> bool:
+        start = time.perf_counter()
+        acquired = await super().aacquire(blocking=blocking)
+        metrics.observe("llm.rate_limit_wait", time.perf_counter() - start)
+        return acquired
+
+
+@lru_cache(maxsize=None)
+def get_llm_rate_limiter(calls_per_second: float, burst: float) -> Optional[MeteredRateLimiter]:
+    """The process-wide token bucket shared by every chat model, or None when unlimited."""
+    if calls_per_second <= 0:
+        return None
+    return MeteredRateLimiter(
+        requests_per_second=calls_per_second,
+        check_every_n_seconds=min(0.01, 1 / calls_per_second),
+        max_bucket_size=max(burst, 1),
+    )
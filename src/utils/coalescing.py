@@ -0,0 +1,137 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from datetime import date, datetime
+from typing import Any, Callable, Hashable, Optional, TypeVar
+
+from src.utils.metrics import metrics
+
+T = TypeVar("T")
+
+
+def normalize(value: Any) -> Hashable:
+    """Hashable form of a tool argument: dates as ISO strings, lists as tuples, dicts as sorted tuples."""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = tuple(normalize(v) for v in value)
+        return tuple(sorted(items, key=repr)) if isinstance(value, (set, frozenset)) else items
+    if isinstance(value, dict):
+        return tuple(sorted((k, normalize(v)) for k, v in value.items()))
+    return value
+
+
+def like_key(value: Optional[str]) -> Optional[str]:
+    """Key for a value matched with SQL ``LIKE``, which ignores ASCII case."""
+    return value.lower() if value is not None and value.isascii() else value
+
+
+class _Flight:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error: Optional[BaseException] = None
+
+
+class Coalescer:
+    """
+    Singleflight execution with a short-lived result cache.
+
+    Concurrent ``call``s with the same namespace and key share one execution
+    of ``fn`` and its result (or exception). Successful results are then
+    served from the cache for ``ttl`` seconds. ``invalidate(namespace)``
+    drops the cached results of a namespace; executions that started before
+    it still answer their waiting callers but are not cached, and later
+    calls start a fresh execution.
+
+    Results are shared between callers and must not be mutated.
+
+    Args:
+        ttl (float): Seconds a result is reused (0 only coalesces concurrent calls).
+        max_entries (int): Cached results kept, least recently used evicted first.
+        name (str): Prefix of the metric counters.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1024, name: str = "tool_coalescing"):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.name = name
+        self._lock = threading.Lock()
+        self._generations: defaultdict = defaultdict(int)
+        self._cache: OrderedDict = OrderedDict()
+        self._in_flight: dict = {}
+
+    def call(self, namespace: str, key: Hashable, fn: Callable[[], T]) -> T:
+        """Return ``fn()``, shared with identical concurrent calls and cached for ``ttl`` seconds."""
+        metrics.incr(f"{self.name}.calls")
+        with self._lock:
+            generation = self._generations[namespace]
+            cached = self._cache.get((namespace, key))
+            if cached is not None and cached[0] > time.monotonic():
+                self._cache.move_to_end((namespace, key))
+                metrics.incr(f"{self.name}.cache_hits")
+                return cached[1]
+            flight_key = (namespace, generation, key)
+            flight = self._in_flight.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = self._in_flight[flight_key] = _Flight()
+
+        if not leader:
+            metrics.incr(f"{self.name}.joined")
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value
+
+        metrics.incr(f"{self.name}.executions")
+        try:
+            flight.value = fn()
+            return flight.value
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[flight_key]
+                if flight.error is None and self.ttl > 0 and self._generations[namespace] == generation:
+                    self._cache[(namespace, key)] = (time.monotonic() + self.ttl, flight.value)
+                    self._cache.move_to_end((namespace, key))
+                    while len(self._cache) > self.max_entries:
+                        self._cache.popitem(last=False)
+            flight.done.set()
+
+    def invalidate(self, *namespaces: str) -> None:
+        """Forget the results of ``namespaces``; call after committing a write to their data."""
+        with self._lock:
+            for namespace in namespaces:
+                self._generations[namespace] += 1
+            for cache_key in [k for k in self._cache if k[0] in namespaces]:
+                del self._cache[cache_key]
+        metrics.incr(f"{self.name}.invalidations", len(namespaces))
+
+    def generation(self, namespace: str) -> int:
+        """Counter of a namespace's invalidations: results read under an older generation may be stale."""
+        with self._lock:
+            return self._generations[namespace]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._cache.clear()
+            for namespace in list(self._generations):
+                self._generations[namespace] += 1
+
+    def stats(self) -> dict:
+        """Calls, executions and the share of calls answered without running the query."""
+        calls = metrics.counter(f"{self.name}.calls")
+        executions = metrics.counter(f"{self.name}.executions")
+        return {
+            "calls": calls,
+            "executions": executions,
+            "cache_hits": metrics.counter(f"{self.name}.cache_hits"),
+            "joined": metrics.counter(f"{self.name}.joined"),
+            "invalidations": metrics.counter(f"{self.name}.invalidations"),
+            "dedup_ratio": 1 - executions / calls if calls else 0.0,
+        }
@@ -0,0 +1,82 @@
+import random
+import sqlite3
+import time
+from typing import Callable, Optional, TypeVar
+
+from config.config import Config
+from src.utils.logger import logger
+
+T = TypeVar("T")
+
+BUSY_CODES = {getattr(sqlite3, "SQLITE_BUSY", 5), getattr(sqlite3, "SQLITE_LOCKED", 6)}
+
+
+def connect(path: Optional[str] = None, timeout: Optional[float] = None) -> sqlite3.Connection:
+    """
+    Open a connection in autocommit mode (transactions are started explicitly).
+
+    Args:
+        path (str, optional): Database file, defaults to ``Config.DATABASE_PATH``.
+        timeout (float, optional): Seconds to wait on a locked database before
+            raising, defaults to ``Config.DB_BUSY_TIMEOUT``.
+    """
+    return sqlite3.connect(
+        path or Config.DATABASE_PATH,
+        timeout=Config.DB_BUSY_TIMEOUT if timeout is None else timeout,
+        isolation_level=None,
+    )
+
+
+def is_busy(error: sqlite3.OperationalError) -> bool:
+    code = getattr(error, "sqlite_errorcode", None)
+    if code is not None:
+        return code & 0xFF in BUSY_CODES
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+def run_in_transaction(
+    work: Callable[[sqlite3.Connection], T],
+    path: Optional[str] = None,
+    retries: Optional[int] = None,
+) -> T:
+    """
+    Run ``work(conn)`` inside a single ``BEGIN IMMEDIATE`` transaction.
+
+    The write lock is taken up front, so reads made by ``work`` cannot be
+    invalidated by a concurrent writer before its own writes. The transaction
+    commits when ``work`` returns and rolls back when it raises; the connection
+    is always closed. ``SQLITE_BUSY``/``SQLITE_LOCKED`` errors are retried with
+    jittered exponential backoff.
+
+    Args:
+        work (Callable): Function receiving the connection; its return value is returned.
+        path (str, optional): Database file, defaults to ``Config.DATABASE_PATH``.
+        retries (int, optional): Retries on a busy database, defaults to ``Config.DB_WRITE_RETRIES``.
+
+    Returns:
+        The value returned by ``work``.
+    """
+    retries = Config.DB_WRITE_RETRIES if retries is None else retries
+    attempt = 0
+    while True:
+        conn = connect(path)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(conn)
+            except BaseException:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+        except sqlite3.OperationalError as e:
+            if not is_busy(e) or attempt >= retries:
+                raise
+            attempt += 1
+            delay = Config.DB_RETRY_BACKOFF * (2 ** (attempt - 1)) * (0.5 + random.random())
+            logger.debug(f"Database busy, retrying transaction in {delay:.3f}s ({attempt}/{retries})")
+            time.sleep(delay)
+        finally:
+            conn.close()
@@ -4,27 +4,77 @@ import sqlite3
 import pandas as pd
 import requests
 from config.config import Config
+from src.flights.index import add_epoch_columns
+from src.flights.inventory import ensure_inventory
+from src.flights.passenger_itinerary import ensure_itineraries
+from src.reservations.car_rentals import ensure_rental_bookings
+from src.reservations.excursions import ensure_excursion_capacity
+from src.reservations.hotels import ensure_hotel_rooms
+from src.utils.synthetic_db import generate_travel_db
+
+# travel2 ships without indexes; these cover the lookups made by the tools
+INDEXES = {
+    "idx_tickets_ticket_no": "tickets (ticket_no)",
+    "idx_tickets_passenger_id": "tickets (passenger_id)",
+    "idx_ticket_flights_ticket_no": "ticket_flights (ticket_no)",
+    "idx_flights_flight_id": "flights (flight_id)",
+    "idx_boarding_passes_ticket_flight": "boarding_passes (ticket_no, flight_id)",
+}
 
 def initialize_database():
-    db_url = "https://storage.googleapis.com/benchmarks-artifacts/travel-db/travel2.sqlite"
+    """
+    Create ``DATABASE_PATH`` when it is missing, by downloading travel2 or, with
+    ``DATABASE_SOURCE=synthetic``, by generating it offline, then prepare it.
+    """
     local_file = Config.DATABASE_PATH
-    backup_file = str(Config.BASE_DIR / "data" / "travel2.backup.sqlite")
-    
+
     if not os.path.exists(local_file):
         # Create data directory if it doesn't exist
         os.makedirs(os.path.dirname(local_file), exist_ok=True)
-        
-        # Download database
-        response = requests.get(db_url)
-        response.raise_for_status()
-        with open(local_file, "wb") as f:
-            f.write(response.content)
-        
-        # Create backup
-        shutil.copy(local_file, backup_file)
-        
-        # Update dates
-        update_dates(local_file)
+
+        if Config.DATABASE_SOURCE == "synthetic":
+            generate_travel_db(local_file, Config.SYNTHETIC_DB_SCALE, Config.SYNTHETIC_DB_SEED)
+        elif Config.DATABASE_SOURCE == "download":
+            download_database(local_file)
+        else:
+            raise ValueError(f"Unknown DATABASE_SOURCE: {Config.DATABASE_SOURCE!r}")
+
+    prepare_database(local_file)
+
+def download_database(local_file):
+    db_url = "https://storage.googleapis.com/benchmarks-artifacts/travel-db/travel2.sqlite"
+    backup_file = str(Config.BASE_DIR / "data" / "travel2.backup.sqlite")
+
+    # Download database
+    response = requests.get(db_url)
+    response.raise_for_status()
+    with open(local_file, "wb") as f:
+        f.write(response.content)
+
+    # Create backup
+    shutil.copy(local_file, backup_file)
+
+    # Update dates
+    update_dates(local_file)
+
+def prepare_database(file):
+    """
+    Switch the database to WAL mode, add the epoch time columns, the seat
+    inventory, the passenger_itinerary table, the hotel, excursion and car
+    rental reservation tables and the indexes used by the tools.
+    """
+    conn = sqlite3.connect(file)
+    conn.execute("PRAGMA journal_mode=WAL")
+    for name, target in INDEXES.items():
+        conn.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {target}")
+    add_epoch_columns(conn)
+    ensure_inventory(conn)
+    ensure_itineraries(conn)
+    ensure_hotel_rooms(conn)
+    ensure_excursion_capacity(conn)
+    ensure_rental_bookings(conn)
+    conn.commit()
+    conn.close()
 
 def update_dates(file):
     conn = sqlite3.connect(file)
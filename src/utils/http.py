@@ -0,0 +1,29 @@
+import threading
+
+import httpx
+
+_clients = {}
+_lock = threading.Lock()
+
+
+def get_http_client(pool_size: int) -> httpx.Client:
+    """
+    Keep-alive HTTP client shared by the chat models of a process.
+
+    Every model created for the same pool size sends its requests over this
+    client, so the connections (and their TLS sessions) opened by one call,
+    or by the startup warm-up, are reused by the next.
+    """
+    with _lock:
+        client = _clients.get(pool_size)
+        if client is None:
+            limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+            client = _clients[pool_size] = httpx.Client(limits=limits)
+        return client
+
+
+def close_http_clients() -> None:
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
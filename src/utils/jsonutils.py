@@ -0,0 +1,37 @@
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import Response
+
+
+def _default(value: Any) -> Any:
+    # Whatever orjson cannot encode natively: pydantic models (e.g. a tool's
+    # args schema) are dumped, anything else is written as text like json.dumps(default=str)
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    return str(value)
+
+
+def dumps(content: Any) -> bytes:
+    """
+    Encode ``content`` straight to JSON bytes with orjson.
+
+    Dicts and lists are walked in place, so large ``additional_kwargs`` and
+    tool call payloads are encoded without being copied first.
+    """
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+class FastJSONResponse(Response):
+    """
+    JSON response rendered with ``dumps``.
+
+    Returning it from an endpoint skips FastAPI's response validation and
+    ``jsonable_encoder`` pass, which rebuild every nested dict of the content.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,399 @@
+import argparse
+import math
+import os
+import random
+import sqlite3
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+
+from config.config import Config
+
+# Same tables and columns as the downloaded travel2 database, without indexes
+TRAVEL2_SCHEMA = """
+CREATE TABLE aircrafts_data (aircraft_code TEXT, model TEXT, range INTEGER);
+CREATE TABLE airports_data (airport_code TEXT, airport_name TEXT, city TEXT, coordinates TEXT, timezone TEXT);
+CREATE TABLE boarding_passes (ticket_no TEXT, flight_id INTEGER, boarding_no INTEGER, seat_no TEXT);
+CREATE TABLE bookings (book_ref TEXT, book_date TEXT, total_amount INTEGER);
+CREATE TABLE flights (
+    flight_id INTEGER, flight_no TEXT, scheduled_departure TEXT, scheduled_arrival TEXT,
+    departure_airport TEXT, arrival_airport TEXT, status TEXT, aircraft_code TEXT,
+    actual_departure TEXT, actual_arrival TEXT
+);
+CREATE TABLE seats (aircraft_code TEXT, seat_no TEXT, fare_conditions TEXT);
+CREATE TABLE ticket_flights (ticket_no TEXT, flight_id INTEGER, fare_conditions TEXT, amount INTEGER);
+CREATE TABLE tickets (ticket_no TEXT, book_ref TEXT, passenger_id TEXT);
+CREATE TABLE car_rentals (
+    id INTEGER, name TEXT, location TEXT, price_tier TEXT, start_date TEXT, end_date TEXT, booked INTEGER
+);
+CREATE TABLE hotels (
+    id INTEGER, name TEXT, location TEXT, price_tier TEXT, checkin_date TEXT, checkout_date TEXT, booked INTEGER
+);
+CREATE TABLE trip_recommendations (
+    id INTEGER, name TEXT, location TEXT, keywords TEXT, details TEXT, booked INTEGER
+);
+"""
+
+# Row counts of travel2 at scale 1
+SCALE_ROWS = {
+    "flights": 33121,
+    "bookings": 262788,
+    "hotels": 10,
+    "car_rentals": 10,
+    "trip_recommendations": 10,
+}
+
+# (code, city, latitude, longitude, timezone, weight): the weight is the
+# airport's share of traffic, so hubs get more routes and departures
+AIRPORTS = [
+    ("LHR", "London", 51.47, -0.45, "Europe/London", 10), ("CDG", "Paris", 49.01, 2.55, "Europe/Paris", 9),
+    ("FRA", "Frankfurt", 50.03, 8.57, "Europe/Berlin", 8), ("AMS", "Amsterdam", 52.31, 4.76, "Europe/Amsterdam", 8),
+    ("MAD", "Madrid", 40.47, -3.56, "Europe/Madrid", 7), ("MUC", "Munich", 48.35, 11.79, "Europe/Berlin", 6),
+    ("FCO", "Rome", 41.80, 12.25, "Europe/Rome", 6), ("BCN", "Barcelona", 41.30, 2.08, "Europe/Madrid", 6),
+    ("IST", "Istanbul", 41.26, 28.74, "Europe/Istanbul", 6), ("ZRH", "Zurich", 47.46, 8.55, "Europe/Zurich", 5),
+    ("CPH", "Copenhagen", 55.62, 12.66, "Europe/Copenhagen", 4), ("VIE", "Vienna", 48.11, 16.57, "Europe/Vienna", 4),
+    ("DUB", "Dublin", 53.42, -6.27, "Europe/Dublin", 4), ("LIS", "Lisbon", 38.77, -9.13, "Europe/Lisbon", 4),
+    ("OSL", "Oslo", 60.19, 11.10, "Europe/Oslo", 3), ("ARN", "Stockholm", 59.65, 17.92, "Europe/Stockholm", 3),
+    ("BRU", "Brussels", 50.90, 4.48, "Europe/Brussels", 3), ("GVA", "Geneva", 46.24, 6.11, "Europe/Zurich", 3),
+    ("HEL", "Helsinki", 60.32, 24.96, "Europe/Helsinki", 2), ("PRG", "Prague", 50.10, 14.26, "Europe/Prague", 2),
+    ("WAW", "Warsaw", 52.17, 20.97, "Europe/Warsaw", 2), ("ATH", "Athens", 37.94, 23.94, "Europe/Athens", 2),
+    ("BUD", "Budapest", 47.44, 19.26, "Europe/Budapest", 2), ("MXP", "Milan", 45.63, 8.72, "Europe/Rome", 2),
+    ("BSL", "Basel", 47.60, 7.53, "Europe/Zurich", 1), ("EDI", "Edinburgh", 55.95, -3.37, "Europe/London", 1),
+    ("NCE", "Nice", 43.66, 7.21, "Europe/Paris", 1), ("HAM", "Hamburg", 53.63, 9.99, "Europe/Berlin", 1),
+    ("OPO", "Porto", 41.24, -8.68, "Europe/Lisbon", 1), ("KRK", "Krakow", 50.08, 19.78, "Europe/Warsaw", 1),
+]
+
+# (code, model, range in km, business rows, comfort rows, economy rows, seats per row)
+AIRCRAFT = [
+    ("CR2", "Bombardier CRJ-200", 2700, 0, 0, 13, 4),
+    ("319", "Airbus A319-100", 6700, 2, 3, 20, 6),
+    ("321", "Airbus A321-200", 5600, 3, 4, 26, 6),
+    ("773", "Boeing 777-300", 11100, 6, 5, 40, 9),
+]
+FARES = ("Economy", "Comfort", "Business")
+FARE_WEIGHTS = (82, 8, 10)
+FARE_PRICE = {"Economy": 1.0, "Comfort": 1.8, "Business": 3.5}
+# Share of departures by local hour: morning and evening banks
+HOUR_WEIGHTS = [0, 0, 0, 0, 0, 1, 4, 9, 9, 7, 5, 4, 4, 4, 5, 6, 7, 9, 9, 7, 5, 3, 2, 1]
+PARTY_SIZES, PARTY_WEIGHTS = (1, 2, 3, 4), (72, 20, 6, 2)
+ROUND_TRIP_SHARE = 0.55
+# Share of tickets held by the 5% of passengers who fly most
+FREQUENT_FLYER_SHARE = 0.2
+CHECK_IN_HOURS = 24
+DAYS_BEFORE, DAYS_AFTER = 30, 30
+CHUNK = 20000
+
+HOTEL_BRANDS = ["Hilton", "Marriott", "Hyatt Regency", "Radisson Blu", "Novotel", "Sheraton", "Holiday Inn",
+                "Four Seasons", "Ibis", "Mövenpick", "InterContinental", "Best Western", "Mercure", "Kempinski"]
+HOTEL_TIERS, HOTEL_TIER_WEIGHTS = ["Midscale", "Upper Midscale", "Upscale", "Upper Upscale", "Luxury"], [30, 25, 20, 15, 10]
+RENTAL_COMPANIES = ["Europcar", "Avis", "Hertz", "Sixt", "Enterprise", "Budget", "Thrifty", "Alamo"]
+RENTAL_TIERS, RENTAL_TIER_WEIGHTS = ["Economy", "Midsize", "Premium", "Luxury"], [40, 30, 20, 10]
+SIGHTS = [
+    ("Old Town Walk", "history, architecture", "A guided walk through the historic centre."),
+    ("Cathedral", "landmark, history", "The city's cathedral and its towers."),
+    ("Art Museum", "art, museum", "Old masters and modern collections."),
+    ("Food Tour", "food, market", "Tastings at local markets and bakeries."),
+    ("River Cruise", "boat, sightseeing", "A cruise past the main sights."),
+    ("Zoo", "family, animals", "Animals from five continents."),
+    ("Wine Tasting", "wine, food", "Regional wines with a sommelier."),
+    ("Hiking Trip", "nature, hiking", "A half-day hike in the hills nearby."),
+]
+
+
+def timestamp(value: datetime) -> str:
+    """Format a datetime the way travel2 stores timestamps."""
+    return value.isoformat(sep=" ")
+
+
+def passenger_id(index: int) -> str:
+    """A travel2-style passenger ID ("NNNN NNNNNN") for a passenger number."""
+    return f"{1000 + index % 9000} {100000 + index:06d}"
+
+
+def ticket_no(index: int) -> str:
+    return f"{7240005432000 + index:013d}"
+
+
+def distance_km(a: tuple, b: tuple) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (a[2], a[3], b[2], b[3]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 12742 * math.asin(math.sqrt(h))
+
+
+def seat_map(aircraft: tuple) -> dict[str, list[str]]:
+    """Seat numbers of an aircraft per fare, front to back."""
+    _, _, _, business, comfort, economy, per_row = aircraft
+    seats, row = {fare: [] for fare in FARES}, 1
+    for fare, rows in (("Business", business), ("Comfort", comfort), ("Economy", economy)):
+        for _ in range(rows):
+            seats[fare] += [f"{row}{letter}" for letter in "ABCDEFGHK"[:per_row]]
+            row += 1
+    return seats
+
+
+def make_services(rng: random.Random, count: int) -> list[dict]:
+    """
+    ``count`` daily services (a flight number flying one route at one time
+    of day), in pairs: service ``i ^ 1`` flies the return route of ``i``.
+    Routes are drawn in proportion to the product of the airports' weights.
+    """
+    weights = [a[5] for a in AIRPORTS]
+    services = []
+    for pair in range((count + 1) // 2):
+        origin, destination = rng.choices(range(len(AIRPORTS)), weights, k=2)
+        while destination == origin:
+            destination = rng.choices(range(len(AIRPORTS)), weights)[0]
+        km = distance_km(AIRPORTS[origin], AIRPORTS[destination])
+        minutes = 5 * round((30 + km / 750 * 60) / 5)
+        # Regional jets on short routes, wide bodies only on the longest
+        aircraft = rng.choice((0, 1) if km < 800 else (1, 2) if km < 2000 else (2, 3))
+        for leg, (a, b) in enumerate(((origin, destination), (destination, origin))):
+            hour = rng.choices(range(24), HOUR_WEIGHTS)[0]
+            services.append({
+                "flight_no": f"{'LX' if pair % 3 else 'EU'}{(2 * pair + leg) % 10000:04d}",
+                "from": AIRPORTS[a][0],
+                "to": AIRPORTS[b][0],
+                "minute": hour * 60 + 5 * rng.randrange(12),
+                "duration": minutes,
+                "aircraft": aircraft,
+                "fare": round(1500 + km * 10, -2),
+            })
+    return services[:count]
+
+
+def flight_status(rng: random.Random, departure: datetime, arrival: datetime, now: datetime) -> tuple:
+    """(status, actual_departure, actual_arrival) of a flight at ``now``."""
+    if rng.random() < 0.01:
+        return "Cancelled", "\\N", "\\N"
+    delay = timedelta(minutes=rng.choices([rng.randrange(0, 10), rng.randrange(10, 60), rng.randrange(60, 240)],
+                                          [70, 25, 5])[0])
+    if arrival + delay <= now:
+        return "Arrived", timestamp(departure + delay), timestamp(arrival + delay)
+    if departure + delay <= now:
+        return "Departed", timestamp(departure + delay), "\\N"
+    if departure - now < timedelta(days=1):
+        return ("Delayed" if delay > timedelta(minutes=30) else "On Time"), "\\N", "\\N"
+    return "Scheduled", "\\N", "\\N"
+
+
+def generate_travel_db(
+    path: str,
+    scale: float = 1.0,
+    seed: int = 0,
+    n_passengers: int = 0,
+    now: datetime | None = None,
+) -> str:
+    """
+    Build a travel2-compatible SQLite database at ``path`` with synthetic data.
+
+    ``scale`` 1 gives travel2's row counts (about 33k flights and 263k
+    bookings); every table grows linearly with it. Flights follow daily
+    services between hub-weighted airports over the 30 days before and after
+    ``now``, with morning and evening departure banks, durations and aircraft
+    by distance, and statuses and actual times by the current time.
+    Bookings have one to four passengers, 55% are round trips, fares are
+    mostly Economy and no flight is sold beyond its seats; most passengers
+    of flights that left or leave within 24 hours have boarding passes.
+    ``n_passengers`` (default: 80% of the tickets) sets how many distinct
+    passenger IDs share the tickets; a fifth of the tickets go to the 5% of
+    them who fly most.
+
+    Rows are written with ``executemany`` in one transaction with the journal
+    off, to a temporary file renamed to ``path`` at the end, so an interrupted
+    build leaves no partial database. Like travel2, the tables have no
+    indexes; ``prepare_database`` adds them.
+    """
+    rng = random.Random(seed)
+    now = now or datetime.now(timezone(timedelta(hours=-4)))
+    first_day = (now - timedelta(days=DAYS_BEFORE)).replace(hour=0, minute=0, second=0, microsecond=0)
+    days = DAYS_BEFORE + DAYS_AFTER
+    n_flights = max(2 * days, round(SCALE_ROWS["flights"] * scale))
+    n_bookings = max(1, round(SCALE_ROWS["bookings"] * scale))
+    n_passengers = n_passengers or max(1, int(n_bookings * 1.4 * 0.8))
+
+    tmp = f"{path}.building"
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    conn = sqlite3.connect(tmp, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("BEGIN")
+        for statement in TRAVEL2_SCHEMA.split(";"):
+            if statement.strip():
+                conn.execute(statement)
+        _insert_reference_data(conn)
+        services = make_services(rng, max(2, n_flights // days))
+        _insert_flights(conn, rng, services, first_day, days, now)
+        _insert_bookings(conn, rng, services, first_day, days, now, n_bookings, n_passengers)
+        _insert_reservations(conn, rng, scale, now)
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.close()
+        os.remove(tmp)
+        raise
+    conn.close()
+    os.replace(tmp, path)
+    return path
+
+
+def _insert_reference_data(conn) -> None:
+    conn.executemany("INSERT INTO aircrafts_data VALUES (?, ?, ?)", [a[:3] for a in AIRCRAFT])
+    conn.executemany("INSERT INTO seats VALUES (?, ?, ?)", [
+        (aircraft[0], seat, fare) for aircraft in AIRCRAFT for fare, seats in seat_map(aircraft).items() for seat in seats
+    ])
+    conn.executemany("INSERT INTO airports_data VALUES (?, ?, ?, ?, ?)", [
+        (code, f"{city} Airport", city, f"({lon},{lat})", tz) for code, city, lat, lon, tz, _ in AIRPORTS
+    ])
+
+
+def _insert_flights(conn, rng, services, first_day, days, now) -> None:
+    rows = []
+    for index, service in enumerate(services):
+        for day in range(days):
+            departure = first_day + timedelta(days=day, minutes=service["minute"])
+            arrival = departure + timedelta(minutes=service["duration"])
+            status, actual_departure, actual_arrival = flight_status(rng, departure, arrival, now)
+            rows.append((
+                index * days + day + 1, service["flight_no"], timestamp(departure), timestamp(arrival),
+                service["from"], service["to"], status, AIRCRAFT[service["aircraft"]][0],
+                actual_departure, actual_arrival,
+            ))
+        if len(rows) >= CHUNK:
+            conn.executemany("INSERT INTO flights VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            rows = []
+    conn.executemany("INSERT INTO flights VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+
+def _insert_bookings(conn, rng, services, first_day, days, now, n_bookings, n_passengers) -> None:
+    """
+    Insert ``n_bookings`` bookings with their tickets, ticket flights and
+    boarding passes. Seats sold per flight and fare are counted, so a party
+    only books flights with room for all of its members, and the count gives
+    each checked-in passenger the next free seat.
+    """
+    seats = [seat_map(aircraft) for aircraft in AIRCRAFT]
+    n_flights = len(services) * days
+    sold = {fare: array("H", bytes(2 * n_flights)) for fare in FARES}
+    boarded = array("H", bytes(2 * n_flights))
+    check_in = now + timedelta(hours=CHECK_IN_HOURS)
+    rows = {"bookings": [], "tickets": [], "ticket_flights": [], "boarding_passes": []}
+    tickets = 0
+    frequent_flyers = max(1, n_passengers // 20)
+
+    def book(flight: int, fare: str, party: int) -> bool:
+        service = services[flight // days]
+        return sold[fare][flight] + party <= len(seats[service["aircraft"]][fare])
+
+    for booking in range(n_bookings):
+        party = rng.choices(PARTY_SIZES, PARTY_WEIGHTS)[0]
+        fare = rng.choices(FARES, FARE_WEIGHTS)[0]
+        for _ in range(5):
+            outbound = rng.randrange(n_flights)
+            if book(outbound, fare, party):
+                break
+        else:
+            continue
+        legs = [outbound]
+        service, day = divmod(outbound, days)
+        back_day = day + 1 + int(rng.expovariate(1 / 5))
+        if rng.random() < ROUND_TRIP_SHARE and back_day < days:
+            back = (service ^ 1) * days + back_day
+            if back < n_flights and book(back, fare, party):
+                legs.append(back)
+
+        departure = first_day + timedelta(days=day, minutes=services[service]["minute"])
+        lead = timedelta(days=min(120.0, rng.lognormvariate(math.log(14), 1.0)))
+        book_date = min(departure - lead, now - timedelta(minutes=rng.randrange(1, 600)))
+        book_ref = f"{booking:06X}"
+        total = 0
+        for _ in range(party):
+            if rng.random() < FREQUENT_FLYER_SHARE:
+                passenger = passenger_id(rng.randrange(frequent_flyers))
+            else:
+                passenger = passenger_id(rng.randrange(n_passengers))
+            number = ticket_no(tickets)
+            tickets += 1
+            rows["tickets"].append((number, book_ref, passenger))
+            for flight in legs:
+                flight_service, flight_day = divmod(flight, days)
+                amount = int(services[flight_service]["fare"] * FARE_PRICE[fare])
+                total += amount
+                rows["ticket_flights"].append((number, flight + 1, fare, amount))
+                seat = seats[services[flight_service]["aircraft"]][fare][sold[fare][flight]]
+                sold[fare][flight] += 1
+                flight_departure = first_day + timedelta(days=flight_day, minutes=services[flight_service]["minute"])
+                if flight_departure <= check_in and rng.random() < 0.95:
+                    boarded[flight] += 1
+                    rows["boarding_passes"].append((number, flight + 1, boarded[flight], seat))
+        rows["bookings"].append((book_ref, timestamp(book_date), total))
+
+        if len(rows["ticket_flights"]) >= CHUNK:
+            _flush(conn, rows)
+    _flush(conn, rows)
+
+
+def _flush(conn, rows: dict) -> None:
+    for table, values in rows.items():
+        if values:
+            conn.executemany(f"INSERT INTO {table} VALUES ({', '.join('?' * len(values[0]))})", values)
+            values.clear()
+
+
+def _insert_reservations(conn, rng, scale: float, now: datetime) -> None:
+    """Hotels, car rentals and excursions in the airports' cities, busier cities having more."""
+    cities, weights = [a[1] for a in AIRPORTS], [a[5] for a in AIRPORTS]
+    today = now.date()
+
+    def stay(nights: tuple) -> tuple[str, str]:
+        start = today + timedelta(days=rng.randrange(-DAYS_BEFORE, DAYS_AFTER))
+        return start.isoformat(), (start + timedelta(days=rng.randint(*nights))).isoformat()
+
+    def count(table: str) -> int:
+        return max(1, round(SCALE_ROWS[table] * scale))
+
+    hotels = []
+    for i in range(1, count("hotels") + 1):
+        city = rng.choices(cities, weights)[0]
+        hotels.append((i, f"{rng.choice(HOTEL_BRANDS)} {city}", city,
+                       rng.choices(HOTEL_TIERS, HOTEL_TIER_WEIGHTS)[0], *stay((1, 7)), int(rng.random() < 0.1)))
+    conn.executemany("INSERT INTO hotels VALUES (?, ?, ?, ?, ?, ?, ?)", hotels)
+
+    rentals = []
+    for i in range(1, count("car_rentals") + 1):
+        city = rng.choices(cities, weights)[0]
+        rentals.append((i, rng.choice(RENTAL_COMPANIES), city,
+                        rng.choices(RENTAL_TIERS, RENTAL_TIER_WEIGHTS)[0], *stay((1, 14)), int(rng.random() < 0.1)))
+    conn.executemany("INSERT INTO car_rentals VALUES (?, ?, ?, ?, ?, ?, ?)", rentals)
+
+    trips = []
+    for i in range(1, count("trip_recommendations") + 1):
+        city = rng.choices(cities, weights)[0]
+        name, keywords, details = rng.choice(SIGHTS)
+        trips.append((i, f"{city} {name}", city, keywords, details, int(rng.random() < 0.1)))
+    conn.executemany("INSERT INTO trip_recommendations VALUES (?, ?, ?, ?, ?, ?)", trips)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic travel2-compatible database.")
+    parser.add_argument("--db", default=Config.DATABASE_PATH)
+    parser.add_argument("--scale", type=float, default=Config.SYNTHETIC_DB_SCALE, help="1 = travel2's row counts")
+    parser.add_argument("--seed", type=int, default=Config.SYNTHETIC_DB_SEED)
+    args = parser.parse_args()
+
+    if os.path.exists(args.db):
+        raise SystemExit(f"{args.db} exists; remove it first")
+    start = time.perf_counter()
+    generate_travel_db(args.db, args.scale, args.seed)
+    conn = sqlite3.connect(args.db)
+    counts = {
+        table: conn.execute(f"SELECT count(*) FROM {table}").fetchone()[0]
+        for table in ("flights", "bookings", "tickets", "ticket_flights", "boarding_passes")
+    }
+    conn.close()
+    print(f"Generated {args.db} in {time.perf_counter() - start:.1f} s: "
+          + ", ".join(f"{count} {table}" for table, count in counts.items()))
+
+
+if __name__ == "__main__":
+    main()
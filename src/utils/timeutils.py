@@ -0,0 +1,63 @@
+import time
+from datetime import date, datetime, time as dt_time, timedelta, timezone, tzinfo
+from typing import Optional, Union
+
+Day = Union[str, date, datetime]
+TimeValue = Optional[Union[str, date, datetime]]
+
+# Text the travel2 dump and pandas use for a missing timestamp
+MISSING = ("", "\\N", "NaT")
+
+
+def parse_timestamp(value: str) -> datetime:
+    """
+    Parse a stored timestamp such as ``2024-05-03 11:31:03.561731-04:00``.
+
+    ``datetime.fromisoformat`` also accepts the variants pandas writes
+    (no fraction, ``+0300`` offsets), and is far cheaper than ``strptime``.
+    """
+    return datetime.fromisoformat(value)
+
+
+def to_epoch(value: Optional[str]) -> Optional[int]:
+    """Epoch seconds of a stored timestamp, None when it is missing."""
+    if value is None or value in MISSING:
+        return None
+    return int(datetime.fromisoformat(value).timestamp())
+
+
+def epoch(value: TimeValue, tz: tzinfo = timezone.utc, end: bool = False) -> Optional[int]:
+    """
+    Epoch seconds of a query bound.
+
+    Naive values are taken to be in ``tz``. A bare date (or ``YYYY-MM-DD``
+    string) covers the whole day, so as an ``end`` bound it includes every
+    second of that date.
+    """
+    if value is None or value == "":
+        return None
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value) if len(value) > 10 else date.fromisoformat(value)
+    if not isinstance(value, datetime):
+        day = value + timedelta(days=1) if end else value
+        return int(datetime.combine(day, dt_time(), tzinfo=tz).timestamp()) - (1 if end else 0)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=tz)
+    return int(value.timestamp())
+
+
+def now_epoch() -> int:
+    return int(time.time())
+
+
+def to_day(value: Day) -> date:
+    """Calendar day of a ``YYYY-MM-DD`` string (a time part is ignored), date or datetime."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value.strip()[:10])
+
+
+def optional_day(value: Optional[Day]) -> Optional[date]:
+    return None if value is None or value == "" else to_day(value)
@@ -6,4 +6,80 @@ from pathlib import Path
 project_root = str(Path(__file__).parent.parent)
 
 # Add the project root to Python path
-sys.path.append(project_root)
\ No newline at end of file
+sys.path.append(project_root)
+
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from benchmarks.common import TRAVEL2_SCHEMA, timestamp
+from config.config import Config
+from src.utils.db_init import prepare_database
+
+PASSENGER = "3442 587242"
+OTHER_PASSENGER = "8149 604011"
+
+
+@pytest.fixture
+def travel_db(tmp_path, monkeypatch):
+    """
+    Small travel2-shaped database wired into the tools.
+
+    Flights 1-3 leave in one hour, two days and three days; ticket
+    ``7240005432906569`` (on flight 2) belongs to ``PASSENGER`` and ticket
+    ``7240005432906570`` (on flight 3) to ``OTHER_PASSENGER``. Every flight
+    has one Business and three Economy seats; both tickets are Economy.
+    Basel has car rental 1, hotel 1 and excursion 1.
+    """
+    path = str(tmp_path / "travel2.sqlite")
+    now = datetime.now(timezone(timedelta(hours=-4))).replace(microsecond=123456)
+    conn = sqlite3.connect(path)
+    conn.executescript(TRAVEL2_SCHEMA)
+    conn.executemany("INSERT INTO flights VALUES (?, ?, ?, ?, ?, ?, 'Scheduled', '319', '\\N', '\\N')", [
+        (1, "LX0001", timestamp(now + timedelta(hours=1)), timestamp(now + timedelta(hours=2)), "ZRH", "CDG"),
+        (2, "LX0002", timestamp(now + timedelta(days=2)), timestamp(now + timedelta(days=2, hours=1)), "CDG", "BSL"),
+        (3, "LX0003", timestamp(now + timedelta(days=3)), timestamp(now + timedelta(days=3, hours=1)), "BSL", "ZRH"),
+    ])
+    conn.executemany("INSERT INTO tickets VALUES (?, ?, ?)", [
+        ("7240005432906569", "C46E9F", PASSENGER),
+        ("7240005432906570", "C46EA0", OTHER_PASSENGER),
+    ])
+    conn.executemany("INSERT INTO ticket_flights VALUES (?, ?, 'Economy', 12000)", [
+        ("7240005432906569", 2),
+        ("7240005432906570", 3),
+    ])
+    conn.executemany("INSERT INTO boarding_passes VALUES (?, ?, 1, '10A')", [
+        ("7240005432906569", 2),
+        ("7240005432906570", 3),
+    ])
+    conn.executemany("INSERT INTO seats VALUES ('319', ?, ?)", [
+        ("1A", "Business"), ("10A", "Economy"), ("10B", "Economy"), ("10C", "Economy"),
+    ])
+    conn.execute("INSERT INTO car_rentals VALUES (1, 'Europcar', 'Basel', 'Economy', '2024-04-01', '2024-04-05', 0)")
+    conn.execute("INSERT INTO hotels VALUES (1, 'Hilton Basel', 'Basel', 'Luxury', '2024-04-01', '2024-04-05', 0)")
+    conn.execute("INSERT INTO trip_recommendations VALUES (1, 'Basel Minster', 'Basel', 'history, architecture', '', 0)")
+    conn.commit()
+    conn.close()
+    prepare_database(path)
+
+    monkeypatch.setattr("config.config.Config.DATABASE_PATH", path)
+    monkeypatch.setattr("src.chatbot.tools.db", path)
+    return path
+
+
+@pytest.fixture
+def fake_config(travel_db, monkeypatch):
+    """
+    Settings for graphs on the offline fake chat model over ``travel_db``.
+
+    ``fake_config(**settings)`` returns a new ``Config`` subclass with
+    ``LLM_PROVIDER="fake"``, the keyword intent classifier off and
+    ``settings`` on top. The web search tool gets a dummy Tavily key.
+    """
+    monkeypatch.setenv("TAVILY_API_KEY", "test-key")
+
+    def make(**settings):
+        return type("FakeConfig", (Config,), {"LLM_PROVIDER": "fake", "INTENT_CLASSIFIER": "off", **settings})
+
+    return make
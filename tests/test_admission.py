@@ -0,0 +1,57 @@
+import asyncio
+
+from src.utils.admission import AdmissionController, Rejected, get_llm_rate_limiter
+from src.utils.metrics import metrics
+
+
+async def hold(controller, passenger_id, release, results):
+    try:
+        async with controller.admit(passenger_id):
+            results.append(("admitted", passenger_id))
+            await release.wait()
+    except Rejected as e:
+        results.append((e.status_code, passenger_id))
+
+
+def test_queue_bounds_and_passenger_limit():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queued=1, per_passenger=1, queue_timeout=5)
+        release, results = asyncio.Event(), []
+        tasks = [asyncio.create_task(hold(controller, pid, release, results)) for pid in ("a", "b", "c", "a")]
+        await asyncio.sleep(0.01)
+        # a runs, b waits, c finds the queue full, the second a is over its limit
+        assert results == [("admitted", "a"), (503, "c"), (429, "a")]
+        assert (controller.in_flight, controller.queue_depth) == (1, 1)
+        release.set()
+        await asyncio.gather(*tasks)
+        assert results[-1] == ("admitted", "b")
+        assert (controller.in_flight, controller.queue_depth) == (0, 0)
+
+    asyncio.run(scenario())
+    assert metrics.snapshot()["gauges"]["admission.queue_depth"] == 0
+
+
+def test_queue_timeout_frees_the_slot():
+    async def scenario():
+        controller = AdmissionController(max_in_flight=1, max_queued=4, per_passenger=0, queue_timeout=0.05)
+        release, results = asyncio.Event(), []
+        first = asyncio.create_task(hold(controller, None, release, results))
+        await asyncio.sleep(0)
+        await hold(controller, None, release, results)
+        assert results == [("admitted", None), (503, None)]
+        release.set()
+        await first
+        assert controller.in_flight == 0
+        async with controller.admit("z"):
+            assert controller.in_flight == 1
+
+    asyncio.run(scenario())
+
+
+def test_llm_rate_limiter():
+    assert get_llm_rate_limiter(0, 5) is None
+    limiter = get_llm_rate_limiter(100, 2)
+    assert get_llm_rate_limiter(100, 2) is limiter
+    count = metrics.snapshot()["timings"].get("llm.rate_limit_wait", {}).get("count", 0)
+    assert limiter.acquire()
+    assert metrics.snapshot()["timings"]["llm.rate_limit_wait"]["count"] == count + 1
@@ -1,3 +1,4 @@
+import json
 from fastapi.testclient import TestClient
 from src.app import app
 
@@ -7,3 +8,59 @@ def test_read_root():
     response = client.get("/")
     assert response.status_code == 200
     assert response.json() == {"message": "Welcome to the Travel Assistant Chatbot"}
+
+
+def test_chat_continues_thread(fake_config, monkeypatch):
+    from src.chatbot import flow
+
+    config = fake_config()
+    monkeypatch.setattr("src.app.build_graph", lambda: flow.build_graph(config))
+    first = client.post("/chat", json={"message": "Hello", "config": {"passenger_id": "3442 587242"}}).json()
+    assert [m["type"] for m in first["messages"]] == ["ai"] and first["pending_approval"] == []
+
+    second = client.post("/chat", json={
+        "message": "Thanks", "config": {"passenger_id": "3442 587242", "thread_id": first["thread_id"]},
+    }).json()
+    assert second["thread_id"] == first["thread_id"]
+    assert [m["type"] for m in second["messages"]] == ["ai"]
+
+
+def test_chat_response_encodes_tool_calls():
+    from langchain_core.messages import AIMessage, ToolMessage
+    from pydantic import BaseModel
+    from src.chatbot.interaction import reply_messages
+    from src.utils.jsonutils import FastJSONResponse
+
+    class Args(BaseModel):
+        city: str
+
+    calls = [{"id": "call_1", "type": "function", "function": {"name": "search_hotels", "arguments": '{"city": "Basel"}'}}]
+    messages = reply_messages([
+        AIMessage(content="", additional_kwargs={"tool_calls": calls, "args": Args(city="Basel"), 1: None}),
+        ToolMessage(content="[{'name': 'Hilton Basel'}]", tool_call_id="call_1"),
+        AIMessage(content="The Hilton Basel is available."),
+    ], [])
+    assert messages[0]["additional_kwargs"]["tool_calls"] is calls
+
+    body = json.loads(FastJSONResponse({"messages": messages, "thread_id": "t1", "pending_approval": []}).body)
+    assert body["messages"][0]["additional_kwargs"] == {"tool_calls": calls, "args": {"city": "Basel"}, "1": None}
+    assert [m["type"] for m in body["messages"]] == ["ai", "tool", "ai"]
+
+
+def test_readyz_waits_for_warm_up(fake_config, monkeypatch):
+    import time
+    from src.chatbot.warmup import WarmUp
+
+    warmup = WarmUp(fake_config(WARMUP_INIT_DB=False))
+    monkeypatch.setattr("src.app.warmup", warmup)
+    assert client.get("/readyz").status_code == 503
+
+    # The context manager runs the lifespan, which starts the warm-up
+    with TestClient(app) as started:
+        assert started.get("/healthz").json() == {"status": "ok"}
+        deadline = time.monotonic() + 30
+        while started.get("/readyz").status_code != 200 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        ready = started.get("/readyz")
+        assert ready.status_code == 200
+        assert ready.json()["status"] == "ready" and "graph" in ready.json()["steps_ms"]
@@ -0,0 +1,131 @@
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from src.chatbot import batch
+from src.chatbot.memory import get_batch_checkpointer, memory
+
+
+@pytest.fixture
+def batch_config(fake_config, tmp_path):
+    return fake_config(BATCH_CHECKPOINT_DB=str(tmp_path / "batch_checkpoints.sqlite"))
+
+
+def test_parse_conversations():
+    lines = ['{"messages": ["Hi"]}', "", '{"id": "x", "messages": ["Hi", "y"], "config": {"passenger_id": "1"}}']
+    assert [c["id"] for c in batch.parse_conversations(lines)] == ["1", "x"]
+    with pytest.raises(ValueError, match="Line 2: invalid JSON"):
+        batch.parse_conversations(['{"messages": []}', "{"])
+    with pytest.raises(ValueError, match="Line 1"):
+        batch.parse_conversations(['{"messages": "Hi"}'])
+    with pytest.raises(ValueError, match="Line 1: config must be an object"):
+        batch.parse_conversations(['{"messages": ["Hi"], "config": null}'])
+    with pytest.raises(ValueError, match="Line 1: passenger_id must be a string"):
+        batch.parse_conversations(['{"messages": ["Hi"], "config": {"passenger_id": 3442}}'])
+
+
+def test_batch_runs_conversations_on_their_own_threads(batch_config):
+    conversations = [{"id": str(i), "messages": ["Hello", "Thanks"]} for i in range(5)]
+    graph = batch.build_batch_graph(batch_config)
+    results = list(batch.run_batch(conversations, graph, parallelism=2))
+
+    assert sorted(r["id"] for r in results) == ["0", "1", "2", "3", "4"]
+    assert len({r["thread_id"] for r in results}) == 5
+    for result in results:
+        assert result["error"] is None
+        assert [[m["type"] for m in turn["messages"]] for turn in result["turns"]] == [["ai"], ["ai"]]
+
+    # Checkpoints go to the batch store, not the live one
+    config = {"configurable": {"thread_id": results[0]["thread_id"]}}
+    assert get_batch_checkpointer(batch_config).get_tuple(config) is not None
+    assert memory.get_tuple(config) is None
+    assert batch.summarize(results, 1.0)["turns"] == 10
+
+
+def test_closing_a_batch_stops_its_conversations(monkeypatch):
+    calls = []
+
+    def slow_turn(graph, config, message):
+        calls.append(config["configurable"]["thread_id"])
+        time.sleep(0.02)
+        return SimpleNamespace(messages=[], pending=[], usage={})
+
+    monkeypatch.setattr(batch, "run_turn", slow_turn)
+    conversations = [{"id": "quick", "messages": ["Hi"]}] + [
+        {"id": str(i), "messages": ["Hi"] * 50} for i in range(3)
+    ]
+    results = batch.run_batch(conversations, graph=object(), parallelism=2)
+    assert next(results)["id"] == "quick"
+    results.close()
+
+    # The running conversation finished its current turn; the queued ones never started
+    played = len(calls)
+    assert played < 10 and {thread.rsplit("-", 1)[1] for thread in calls} == {"quick", "0"}
+    time.sleep(0.1)
+    assert len(calls) == played
+
+
+def test_stop_cancels_the_rest_of_a_batch(monkeypatch):
+    def slow_turn(graph, config, message):
+        time.sleep(0.02)
+        return SimpleNamespace(messages=[], pending=[], usage={})
+
+    monkeypatch.setattr(batch, "run_turn", slow_turn)
+    conversations = [{"id": "quick", "messages": ["Hi"]}] + [
+        {"id": str(i), "messages": ["Hi"] * 50} for i in range(3)
+    ]
+    stop = threading.Event()
+    results = batch.run_batch(conversations, graph=object(), parallelism=2, stop=stop)
+    assert next(results)["error"] is None
+    stop.set()
+    start = time.perf_counter()
+    rest = list(results)
+    assert time.perf_counter() - start < 0.5
+    # Only the running conversation reports back, cut short; the queued ones are dropped
+    assert [(r["id"], r["error"]) for r in rest] == [("0", "Cancelled: the batch was stopped")]
+
+
+def test_batch_endpoint_streams_jsonl(batch_config, monkeypatch):
+    from fastapi.testclient import TestClient
+    from src.app import app
+
+    monkeypatch.setattr("src.app.build_batch_graph", lambda: batch.build_batch_graph(batch_config))
+    client = TestClient(app)
+    body = "\n".join(json.dumps({"id": f"c{i}", "messages": ["Hello"]}) for i in range(3))
+    response = client.post("/chat/batch?parallelism=3", content=body)
+    assert response.status_code == 200
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(r["id"] for r in results) == ["c0", "c1", "c2"]
+
+    assert client.post("/chat/batch", content="not json").status_code == 400
+    assert client.post("/chat/batch", content='{"messages": ["Hi"], "config": null}').status_code == 400
+
+
+def test_batch_endpoint_goes_through_admission(batch_config, monkeypatch):
+    from fastapi.testclient import TestClient
+    from src import app as app_module
+    from src.utils.admission import AdmissionController
+
+    admission = AdmissionController(max_in_flight=2, max_queued=0, per_passenger=1, queue_timeout=1.0)
+    monkeypatch.setattr(app_module, "admission", admission)
+    monkeypatch.setattr(app_module, "build_batch_graph", lambda: batch.build_batch_graph(batch_config))
+    client = TestClient(app_module.app)
+    body = "\n".join(
+        json.dumps({"id": f"c{i}", "messages": ["Hello"], "config": {"passenger_id": "3442 587242"}})
+        for i in range(3)
+    )
+
+    admission._passengers["3442 587242"] = 1
+    response = client.post("/chat/batch?parallelism=3", content=body)
+    assert response.status_code == 429
+    assert response.headers["Retry-After"] == "1"
+    assert admission.in_flight == 0
+
+    del admission._passengers["3442 587242"]
+    response = client.post("/chat/batch?parallelism=3", content=body)
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) == 3
+    assert admission.in_flight == 0 and not admission._passengers
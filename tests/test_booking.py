@@ -0,0 +1,137 @@
+import sqlite3
+import threading
+
+import pytest
+
+from src.chatbot import booking
+from src.chatbot.tools import (
+    book_car_rental,
+    book_car_rentals,
+    cancel_ticket,
+    cancel_tickets,
+    update_ticket_to_new_flight,
+    update_tickets_to_new_flight,
+)
+from src.utils.db import run_in_transaction
+from tests.conftest import OTHER_PASSENGER, PASSENGER
+
+TICKET = "7240005432906569"
+OTHER_TICKET = "7240005432906570"
+RUN_CONFIG = {"configurable": {"passenger_id": PASSENGER}}
+
+
+def flight_of(path, ticket_no):
+    conn = sqlite3.connect(path)
+    row = conn.execute("SELECT flight_id FROM ticket_flights WHERE ticket_no = ?", (ticket_no,)).fetchone()
+    conn.close()
+    return row[0] if row else None
+
+
+def test_update_ticket_checks_in_order(travel_db):
+    update = update_ticket_to_new_flight.invoke
+    assert update({"ticket_no": TICKET, "new_flight_id": 99}, RUN_CONFIG) == "Invalid new flight ID provided."
+    assert update({"ticket_no": TICKET, "new_flight_id": 1}, RUN_CONFIG).startswith("Not permitted to reschedule")
+    assert update({"ticket_no": "0000", "new_flight_id": 3}, RUN_CONFIG) == (
+        "No existing ticket found for the given ticket number."
+    )
+    assert update({"ticket_no": OTHER_TICKET, "new_flight_id": 2}, RUN_CONFIG) == (
+        f"Current signed-in passenger with ID {PASSENGER} not the owner of ticket {OTHER_TICKET}"
+    )
+    assert flight_of(travel_db, OTHER_TICKET) == 3
+
+    assert update({"ticket_no": TICKET, "new_flight_id": 3}, RUN_CONFIG) == "Ticket successfully updated to new flight."
+    assert flight_of(travel_db, TICKET) == 3
+
+
+def test_cancel_ticket(travel_db):
+    assert cancel_ticket.invoke({"ticket_no": OTHER_TICKET}, RUN_CONFIG).startswith("Current signed-in passenger")
+    assert cancel_ticket.invoke({"ticket_no": TICKET}, RUN_CONFIG) == "Ticket successfully cancelled."
+    assert flight_of(travel_db, TICKET) is None
+    assert cancel_ticket.invoke({"ticket_no": TICKET}, RUN_CONFIG) == (
+        "No existing ticket found for the given ticket number."
+    )
+
+
+def test_book_car_rental(travel_db):
+    assert book_car_rental.invoke({"rental_id": 1}, RUN_CONFIG).startswith(
+        "Car rental 1 successfully booked from 2024-04-01 to 2024-04-05."
+    )
+    assert book_car_rental.invoke({"rental_id": 2}, RUN_CONFIG) == "Car rental 2 not found"
+
+
+def test_failed_work_rolls_back(travel_db):
+    def work(conn):
+        conn.execute("DELETE FROM ticket_flights")
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        run_in_transaction(work, travel_db)
+    assert flight_of(travel_db, TICKET) == 2
+
+
+def test_busy_database_is_retried(travel_db, monkeypatch):
+    monkeypatch.setattr("config.config.Config.DB_BUSY_TIMEOUT", 0.05)
+    blocker = sqlite3.connect(travel_db, isolation_level=None, check_same_thread=False)
+    blocker.execute("BEGIN IMMEDIATE")
+    timer = threading.Timer(0.2, lambda: blocker.execute("ROLLBACK"))
+    timer.start()
+    try:
+        result = run_in_transaction(
+            lambda conn: booking.rebook_ticket(conn, OTHER_TICKET, 2, OTHER_PASSENGER), travel_db
+        )
+    finally:
+        timer.join()
+        blocker.close()
+    assert result.ok and result.rows == 1
+    assert flight_of(travel_db, OTHER_TICKET) == 2
+
+
+def test_database_is_prepared(travel_db):
+    conn = sqlite3.connect(travel_db)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    plan = conn.execute(
+        "EXPLAIN QUERY PLAN SELECT 1 FROM tickets WHERE ticket_no = ? AND passenger_id = ?", ("x", "y")
+    ).fetchall()
+    conn.close()
+    assert "USING INDEX" in " ".join(row[-1] for row in plan)
+
+
+def add_ticket(path, ticket_no, flight_id, passenger_id=PASSENGER):
+    conn = sqlite3.connect(path)
+    conn.execute("INSERT INTO tickets VALUES (?, 'C46EA1', ?)", (ticket_no, passenger_id))
+    conn.execute("INSERT INTO ticket_flights VALUES (?, ?, 'Economy', 12000)", (ticket_no, flight_id))
+    conn.commit()
+    conn.close()
+
+
+def test_batch_update_is_all_or_nothing(travel_db):
+    add_ticket(travel_db, "7240005432906571", 2)
+    update = update_tickets_to_new_flight.invoke
+
+    message = update({"ticket_nos": [TICKET, OTHER_TICKET], "new_flight_id": 3}, RUN_CONFIG)
+    assert message.endswith(f"not the owner of tickets {OTHER_TICKET}. No tickets were changed.")
+    message = update({"ticket_nos": [TICKET, "0000"], "new_flight_id": 3}, RUN_CONFIG)
+    assert message.startswith("No existing ticket found for ticket numbers 0000.")
+    assert update({"ticket_nos": [TICKET], "new_flight_id": 1}, RUN_CONFIG).startswith("Not permitted")
+    assert flight_of(travel_db, TICKET) == 2
+
+    message = update({"ticket_nos": [TICKET, "7240005432906571", TICKET], "new_flight_id": 3}, RUN_CONFIG)
+    assert message == "2 tickets successfully updated to new flight."
+    assert flight_of(travel_db, TICKET) == flight_of(travel_db, "7240005432906571") == 3
+
+
+def test_batch_cancel_and_rentals(travel_db):
+    add_ticket(travel_db, "7240005432906571", 3)
+    assert cancel_tickets.invoke({"ticket_nos": []}, RUN_CONFIG) == "No ticket numbers provided."
+    assert cancel_tickets.invoke({"ticket_nos": [TICKET, "7240005432906571"]}, RUN_CONFIG) == (
+        "2 tickets successfully cancelled."
+    )
+    assert flight_of(travel_db, TICKET) is None
+
+    assert book_car_rentals.invoke({"rental_ids": [1, 2]}, RUN_CONFIG) == (
+        "Car rentals 2 not found. No rentals were booked."
+    )
+    assert book_car_rentals.invoke({"rental_ids": [1]}, RUN_CONFIG).startswith("Car rentals 1 successfully booked.")
+    assert book_car_rentals.invoke({"rental_ids": [1]}, RUN_CONFIG) == (
+        "Car rentals 1 are already booked. No rentals were booked."
+    )
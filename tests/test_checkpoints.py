@@ -0,0 +1,90 @@
+import sqlite3
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from config.config import Config
+from src.chatbot import flow
+from src.chatbot.interaction import pending_tool_calls, resume_pending
+from src.chatbot.memory import _sqlite_saver, get_checkpointer, memory
+from tests.conftest import PASSENGER
+
+TICKET = "7240005432906569"
+
+
+@pytest.fixture
+def worker_graph(fake_config):
+    """Factory of graphs with their own saver and connection, as separate worker processes would have."""
+    config = fake_config(MEMORY_TYPE="sqlite")
+
+    def make(path, checkpoint_format="compact"):
+        return flow.build_graph(config, _sqlite_saver.__wrapped__(path, 5.0, checkpoint_format))
+
+    return make
+
+
+def test_get_checkpointer(fake_config, tmp_path):
+    assert get_checkpointer(Config) is memory
+
+    SqliteConfig = fake_config(MEMORY_TYPE="sqlite", CHECKPOINT_DB=str(tmp_path / "nested" / "checkpoints.sqlite"))
+    saver = get_checkpointer(SqliteConfig)
+    assert get_checkpointer(SqliteConfig) is saver
+    conn = sqlite3.connect(SqliteConfig.CHECKPOINT_DB)
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
+
+
+def test_workers_share_threads_and_approvals(worker_graph, tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    worker_a, worker_b = worker_graph(path), worker_graph(path)
+    config = {"configurable": {"passenger_id": PASSENGER, "thread_id": "shared"}}
+
+    worker_a.invoke({"messages": [HumanMessage(content="Hello")]}, config)
+    worker_a.update_state(
+        config,
+        {"messages": [AIMessage(content="", tool_calls=[
+            {"name": "cancel_ticket", "args": {"ticket_no": TICKET}, "id": "call-1"}
+        ])]},
+        as_node="primary_assistant",
+    )
+    assert [call["id"] for call in pending_tool_calls(worker_b, config)] == ["call-1"]
+
+    resume_pending(worker_b, config, "y")
+    messages = worker_a.get_state(config).values["messages"]
+    assert any(getattr(m, "content", None) == "Ticket successfully cancelled." for m in messages)
+    assert pending_tool_calls(worker_a, config) == []
+
+
+def test_compact_checkpoints_store_each_message_once(worker_graph, tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    graph = worker_graph(path)
+    config = {"configurable": {"passenger_id": PASSENGER, "thread_id": "long"}}
+    for message in ["Hello", "What is the baggage policy?", "Thanks"]:
+        graph.invoke({"messages": [HumanMessage(content=message)]}, config)
+    messages = graph.get_state(config).values["messages"]
+
+    # A fresh worker reads the thread back from the database alone
+    reread = worker_graph(path).get_state(config).values
+    assert [(m.type, m.content, m.id) for m in reread["messages"]] == [(m.type, m.content, m.id) for m in messages]
+    assert reread["user_info"] == graph.get_state(config).values["user_info"]
+
+    conn = sqlite3.connect(path)
+    checkpoints = conn.execute("SELECT COUNT(*) FROM checkpoints WHERE type = 'compact'").fetchone()[0]
+    chained = conn.execute("SELECT messages FROM checkpoint_chains").fetchall()
+    conn.close()
+    assert checkpoints > len(messages)
+    # Every message key appears in exactly one chain node across all checkpoints
+    keys = [key for row, in chained for key in row.split(",")]
+    assert len(keys) == len(set(keys)) == len(messages)
+
+
+def test_compact_format_reads_default_checkpoints(worker_graph, tmp_path):
+    path = str(tmp_path / "checkpoints.sqlite")
+    config = {"configurable": {"passenger_id": PASSENGER, "thread_id": "upgraded"}}
+    old = worker_graph(path, "default")
+    old.invoke({"messages": [HumanMessage(content="Hello")]}, config)
+
+    graph = worker_graph(path)
+    assert [m.content for m in graph.get_state(config).values["messages"]][0] == "Hello"
+    graph.invoke({"messages": [HumanMessage(content="Thanks")]}, config)
+    assert [m.type for m in worker_graph(path).get_state(config).values["messages"]] == ["human", "ai"] * 2
@@ -0,0 +1,85 @@
+import threading
+import time
+from datetime import date
+
+import pytest
+
+from src.chatbot.tools import book_car_rental, search_car_rentals, tool_cache
+from src.utils.coalescing import Coalescer, like_key, normalize
+from tests.conftest import PASSENGER
+
+
+def test_concurrent_calls_share_one_execution():
+    coalescer = Coalescer(ttl=0, name="test_coalescing.shared")
+    started, release = threading.Event(), threading.Event()
+    executions = []
+
+    def query():
+        executions.append(1)
+        started.set()
+        release.wait()
+        return ["row"]
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(coalescer.call("t", "k", query))) for _ in range(5)]
+    threads[0].start()
+    started.wait()
+    for thread in threads[1:]:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert len(executions) == 1 and results == [["row"]] * 5
+    stats = coalescer.stats()
+    assert stats["joined"] == 4 and stats["dedup_ratio"] == pytest.approx(0.8)
+    # Without a ttl, the next call runs the query again
+    coalescer.call("t", "k", query)
+    assert len(executions) == 2
+
+
+def test_errors_are_shared_and_not_cached():
+    coalescer = Coalescer(ttl=60, name="test_coalescing.errors")
+
+    def fail():
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        coalescer.call("t", "k", fail)
+    assert coalescer.call("t", "k", lambda: 1) == 1
+    assert coalescer.call("t", "k", lambda: 2) == 1
+
+
+def test_invalidation_skips_results_started_before_it():
+    coalescer = Coalescer(ttl=60, name="test_coalescing.invalidate")
+    started, release = threading.Event(), threading.Event()
+
+    def stale_query():
+        started.set()
+        release.wait()
+        return "stale"
+
+    thread = threading.Thread(target=lambda: coalescer.call("t", "k", stale_query))
+    thread.start()
+    started.wait()
+    coalescer.invalidate("t")
+    # A call after the write does not join the execution that started before it
+    assert coalescer.call("t", "k", lambda: "fresh") == "fresh"
+    release.set()
+    thread.join()
+    assert coalescer.call("t", "k", lambda: "again") == "fresh"
+    coalescer.invalidate("other")
+    assert coalescer.call("t", "k", lambda: "again") == "fresh"
+
+
+def test_normalized_keys():
+    assert normalize([date(2024, 5, 1), {"b": 1, "a": [2]}]) == ("2024-05-01", (("a", (2,)), ("b", 1)))
+    assert like_key("Zurich") == like_key("zurich") and like_key("Zürich") != like_key("zürich")
+
+
+def test_writes_invalidate_tool_results(travel_db):
+    assert search_car_rentals.invoke({"location": "Basel"})[0]["booked"] == 0
+    config = {"configurable": {"passenger_id": PASSENGER}}
+    assert book_car_rental.invoke({"rental_id": 1}, config).startswith("Car rental 1 successfully booked")
+    assert search_car_rentals.invoke({"location": "basel"})[0]["booked"] == 1
+    assert tool_cache.stats()["invalidations"] >= 1
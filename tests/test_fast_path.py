@@ -0,0 +1,72 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.graph import END
+
+from config.config import Config
+from src.chatbot.fast_path import FastPath, fast_path_stats, route_fast_path
+from src.chatbot.registry import ToolRegistry
+from src.chatbot.tools import fetch_user_flight_information, lookup_policy
+from src.utils.metrics import metrics
+
+FLIGHT = {
+    "ticket_no": "7240005432906569", "book_ref": "C46E9F", "flight_id": 19250, "flight_no": "LX0112",
+    "departure_airport": "CDG", "arrival_airport": "BSL", "scheduled_departure": "2024-05-01 12:09:03-04:00",
+    "scheduled_arrival": "2024-05-01 13:39:03-04:00", "seat_no": "18E", "fare_conditions": "Economy",
+}
+RUN_CONFIG = {"configurable": {"passenger_id": "3442 587242"}}
+
+
+def make_fast_path(enabled=True):
+    class FastPathConfig(Config):
+        FAST_PATH_ENABLED = enabled
+        FAST_PATH_ANSWER = "template"
+
+    registry = ToolRegistry([fetch_user_flight_information, lookup_policy], [])
+    return FastPath(FastPathConfig, registry)
+
+
+def test_flight_question_answered_from_user_info():
+    metrics.reset()
+    state = {"messages": [HumanMessage(content="Hi there, what time is my flight?")], "user_info": [FLIGHT]}
+    update = make_fast_path()(state, RUN_CONFIG)
+    call, result, answer = update["messages"]
+    assert call.tool_calls[0]["name"] == "fetch_user_flight_information"
+    assert isinstance(result, ToolMessage) and result.tool_call_id == call.tool_calls[0]["id"]
+    assert "LX0112 from CDG to BSL" in answer.content
+    assert route_fast_path({"messages": state["messages"] + update["messages"]}) == END
+    assert fast_path_stats()["hit_rate"] == 1.0
+
+
+def test_policy_question_runs_tool():
+    state = {"messages": [HumanMessage(content="What's the baggage policy?")]}
+    update = make_fast_path()(state, RUN_CONFIG)
+    assert "Baggage" in update["messages"][-1].content
+
+
+def test_miss_and_kill_switch_fall_through():
+    metrics.reset()
+    state = {"messages": [HumanMessage(content="Update my flight to next week")]}
+    assert make_fast_path()(state, RUN_CONFIG) is None
+    assert route_fast_path(state) == "primary_assistant"
+
+    policy_state = {"messages": [HumanMessage(content="What's the baggage policy?")]}
+    assert make_fast_path(enabled=False)(policy_state, RUN_CONFIG) is None
+    assert metrics.counter("fast_path.misses") == 1
+    assert metrics.counter("fast_path.disabled") == 1
+    assert fast_path_stats()["hit_rate"] == 0.0
+
+
+def test_questions_with_an_action_fall_through():
+    fast_path = make_fast_path()
+    for text in [
+        "When is my flight? I need to move it to next week.",
+        "What time is my flight, and please cancel my hotel",
+        "What's the cancellation policy? Cancel my ticket please.",
+    ]:
+        state = {"messages": [HumanMessage(content=text)], "user_info": [FLIGHT]}
+        assert fast_path(state, RUN_CONFIG) is None, text
+        assert route_fast_path(state) == "primary_assistant"
+
+
+def test_only_new_user_turns_are_considered():
+    state = {"messages": [HumanMessage(content="What's the baggage policy?"), AIMessage(content="...")]}
+    assert make_fast_path()(state, RUN_CONFIG) is None
@@ -0,0 +1,53 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+
+from benchmarks.common import make_travel_db
+from src.chatbot.tools import search_flights
+from src.flights.index import FlightIndex, to_epoch
+
+
+def test_epoch_columns_are_added(travel_db):
+    conn = sqlite3.connect(travel_db)
+    text, epoch = conn.execute(
+        "SELECT scheduled_departure, scheduled_departure_ts FROM flights WHERE flight_id = 2"
+    ).fetchone()
+    conn.close()
+    assert epoch == to_epoch(text)
+
+
+def test_search_flights_tool(travel_db):
+    flights = search_flights.invoke({"departure_airport": "CDG", "arrival_airport": "BSL"})
+    assert [f["flight_id"] for f in flights] == [2]
+    assert "scheduled_departure_ts" not in flights[0]
+    assert search_flights.invoke({"departure_airport": "CDG", "arrival_airport": "ZRH"}) == []
+    assert [f["flight_id"] for f in search_flights.invoke({"limit": 2})] == [1, 2]
+    assert [f["flight_id"] for f in search_flights.invoke({"arrival_airport": "ZRH"})] == [3]
+
+
+def test_time_window_matches_full_scan(tmp_path):
+    path = make_travel_db(str(tmp_path / "travel2.sqlite"), n_flights=3000, seed=1)
+    index = FlightIndex.load(path)
+    rows = index.search(limit=10**6)
+    assert len(rows) == 3000
+
+    tz = timezone(timedelta(hours=-4))
+    start = datetime.now(tz) + timedelta(days=3)
+    end = start + timedelta(days=2)
+    found = index.search("ZRH", None, start, end, limit=10**6)
+    expected = sorted(
+        (datetime.fromisoformat(r["scheduled_departure"]), r["flight_id"]) for r in rows
+        if r["departure_airport"] == "ZRH" and start <= datetime.fromisoformat(r["scheduled_departure"]) <= end
+    )
+    assert [r["flight_id"] for r in found] == [flight_id for _, flight_id in expected]
+    assert len(index.search("ZRH", None, start, end, limit=3)) == 3
+
+
+def test_date_and_naive_bounds(tmp_path):
+    path = make_travel_db(str(tmp_path / "travel2.sqlite"), n_flights=500, seed=2)
+    index = FlightIndex.load(path)
+    day = (datetime.now(timezone(timedelta(hours=-4))) + timedelta(days=5)).date()
+    found = index.search(start_time=day, end_time=day, limit=10**6)
+    assert found and {datetime.fromisoformat(r["scheduled_departure"]).date() for r in found} == {day}
+    assert index.search(start_time=day.isoformat(), end_time=str(day), limit=10**6) == found
+    naive = datetime.combine(day, datetime.min.time())
+    assert index.search(start_time=naive, end_time=naive + timedelta(days=1) - timedelta(seconds=1), limit=10**6) == found
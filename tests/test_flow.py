@@ -0,0 +1,30 @@
+import subprocess
+import sys
+from pathlib import Path
+
+from config.config import Config
+from src.chatbot import flow
+
+
+class DummyKeyConfig(Config):
+    GROQ_API_KEY = "test-key"
+
+
+def test_import_defers_heavy_modules():
+    code = (
+        "import sys, src.chatbot.flow;"
+        "print(any(m in sys.modules for m in ('langchain_groq', 'langchain_community', 'tkinter')))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parent.parent, capture_output=True, text=True, check=True,
+    )
+    assert result.stdout.strip() == "False"
+
+
+def test_build_graph_is_cached(monkeypatch):
+    monkeypatch.setenv("TAVILY_API_KEY", "test-key")
+    graph = flow.build_graph(DummyKeyConfig)
+    assert flow.build_graph(DummyKeyConfig) is graph
+    assert "primary_assistant" in graph.nodes
+    assert "update_flight_sensitive_tools" in graph.nodes
@@ -0,0 +1,78 @@
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from src.chatbot import flow
+from src.chatbot.assistants import ToBookCarRental, ToHotelBookingAssistant
+from src.chatbot.intents import IntentRouter, KeywordIntentClassifier, workflow_intent_rules
+
+
+class StubRunnable:
+    def __init__(self):
+        self.calls = 0
+
+    def invoke(self, state, config=None):
+        self.calls += 1
+        return AIMessage(content="from the model")
+
+
+def make_router(workflow=None):
+    runnable = StubRunnable()
+    handoffs = {"book_hotel": ToHotelBookingAssistant, "book_car_rental": ToBookCarRental}
+    return runnable, IntentRouter(runnable, KeywordIntentClassifier(workflow_intent_rules), handoffs, workflow)
+
+
+def test_classifier_requires_confident_unambiguous_match():
+    classifier = KeywordIntentClassifier(workflow_intent_rules)
+    assert classifier.classify("Book a hotel in Zurich").name == "book_hotel"
+    assert classifier.classify("I need to rent a car").name == "book_car_rental"
+    assert classifier.classify("Can I move my flight to tomorrow?").name == "update_flight"
+    assert classifier.classify("What is the weather like?") is None
+    assert classifier.classify("a hotel and a car rental") is None
+
+
+def test_primary_router_hands_off_without_model_call():
+    runnable, router = make_router()
+    result = router.invoke({"messages": [HumanMessage(content="Book a hotel in Zurich")]})
+    assert runnable.calls == 0
+    assert result.tool_calls[0]["name"] == "ToHotelBookingAssistant"
+    assert result.tool_calls[0]["args"]["request"] == "Book a hotel in Zurich"
+
+
+def test_specialized_router_escalates_on_topic_switch():
+    runnable, router = make_router(workflow="book_hotel")
+    result = router.invoke({"messages": [HumanMessage(content="Actually I need a car rental")]})
+    assert result.tool_calls[0]["name"] == "CompleteOrEscalate"
+
+    router.invoke({"messages": [HumanMessage(content="Is there a hotel with a pool?")]})
+    router.invoke({"messages": [ToolMessage(content="[]", tool_call_id="1")]})
+    assert runnable.calls == 2
+
+
+def test_node_tiers_select_models(fake_config):
+    config = fake_config(
+        MODEL_TIER_MODELS={"router": "small", "tool": "large"}, MODEL_TIERS={"primary_assistant": "router"}
+    )
+    assert flow.get_node_llm(config, "primary_assistant").model_name == "small"
+    assert flow.get_node_llm(config, "update_flight").model_name == "large"
+
+
+def test_router_tier_only_routes(fake_config):
+    graph = flow.build_graph(fake_config(
+        FAST_PATH_ENABLED=False,
+        MODEL_TIER_MODELS={"router": "small", "tool": "large"},
+        MODEL_TIERS={"primary_assistant": "router"},
+    ))
+
+    def turn(text, thread_id):
+        config = {"configurable": {"passenger_id": "3442 587242", "thread_id": thread_id}}
+        return graph.invoke({"messages": [("user", text)]}, config)["messages"][1:]
+
+    # The small model hands off by itself
+    [handoff, *_] = turn("I want to book a hotel in Basel", "tiers-1")
+    assert handoff.response_metadata["model_name"] == "small"
+    assert handoff.tool_calls[0]["name"] == "ToHotelBookingAssistant"
+
+    # A tool turn is passed on with UseTools: the large model calls the tool and reads its result
+    call, result, answer = turn("What is the baggage policy?", "tiers-2")
+    assert (call.response_metadata["model_name"], call.tool_calls[0]["name"]) == ("large", "lookup_policy")
+    assert isinstance(result, ToolMessage)
+    assert answer.response_metadata["model_name"] == "large"
@@ -0,0 +1,68 @@
+import sqlite3
+
+from src.chatbot.tools import (
+    cancel_tickets,
+    check_seat_availability,
+    search_flights,
+    update_ticket_to_new_flight,
+)
+from src.flights import inventory
+from tests.conftest import PASSENGER
+
+TICKET = "7240005432906569"
+RUN_CONFIG = {"configurable": {"passenger_id": PASSENGER}}
+
+
+def fill_flight(path, flight_id, seats, fare="Economy"):
+    conn = sqlite3.connect(path)
+    conn.executemany("INSERT INTO ticket_flights VALUES (?, ?, ?, 12000)", [
+        (f"FILL{flight_id}-{i}", flight_id, fare) for i in range(seats)
+    ])
+    with conn:
+        inventory.rebuild_inventory(conn)
+    conn.close()
+
+
+def consistency(path):
+    conn = sqlite3.connect(path)
+    try:
+        return inventory.check_consistency(conn)
+    finally:
+        conn.close()
+
+
+def test_writes_keep_inventory_in_step(travel_db):
+    assert check_seat_availability.invoke({"flight_id": 2}) == {"Business": 1, "Economy": 2}
+    assert update_ticket_to_new_flight.invoke({"ticket_no": TICKET, "new_flight_id": 3}, RUN_CONFIG).startswith(
+        "Ticket successfully updated"
+    )
+    assert check_seat_availability.invoke({"flight_id": 2}) == {"Business": 1, "Economy": 3}
+    assert check_seat_availability.invoke({"flight_id": 3}) == {"Business": 1, "Economy": 1}
+    assert consistency(travel_db) == []
+
+    cancel_tickets.invoke({"ticket_nos": [TICKET]}, RUN_CONFIG)
+    assert check_seat_availability.invoke({"flight_id": 3}) == {"Business": 1, "Economy": 2}
+    assert consistency(travel_db) == []
+
+
+def test_rebooking_onto_a_full_flight_is_refused(travel_db):
+    fill_flight(travel_db, 3, 2)
+    message = update_ticket_to_new_flight.invoke({"ticket_no": TICKET, "new_flight_id": 3}, RUN_CONFIG)
+    assert message == "Not enough Economy seats left on flight 3: 0 available, 1 needed."
+    assert check_seat_availability.invoke({"flight_id": 2}) == {"Business": 1, "Economy": 2}
+
+
+def test_search_skips_flights_without_seats(travel_db):
+    fill_flight(travel_db, 3, 2)
+    assert [f["flight_id"] for f in search_flights.invoke({"fare_conditions": "Economy"})] == [1, 2]
+    assert [f["flight_id"] for f in search_flights.invoke({})] == [1, 2, 3]
+    fill_flight(travel_db, 2, 1, fare="Business")
+    assert [f["flight_id"] for f in search_flights.invoke({"fare_conditions": "Business"})] == [1, 3]
+
+
+def test_consistency_check_reports_drift(travel_db):
+    conn = sqlite3.connect(travel_db)
+    conn.execute("UPDATE seat_inventory SET booked = 5 WHERE flight_id = 2 AND fare_conditions = 'Economy'")
+    conn.commit()
+    conn.close()
+    assert consistency(travel_db) == [(2, "Economy", 3, 5, 3, 1)]
@@ -0,0 +1,72 @@
+import sqlite3
+from datetime import datetime, timedelta, timezone
+from itertools import product
+
+from benchmarks.common import TRAVEL2_SCHEMA, make_travel_db, timestamp
+from src.flights.index import FlightIndex
+from src.flights.itineraries import ItinerarySearch
+
+DAY = datetime(2030, 5, 1, tzinfo=timezone(timedelta(hours=-4)))
+
+
+def make_db(path, flights):
+    conn = sqlite3.connect(path)
+    conn.executescript(TRAVEL2_SCHEMA)
+    conn.executemany("INSERT INTO flights VALUES (?, ?, ?, ?, ?, ?, 'Scheduled', '319', '\\N', '\\N')", [
+        (i, f"LX{i:04d}", timestamp(DAY + timedelta(hours=dep)), timestamp(DAY + timedelta(hours=arr)), origin, dest)
+        for i, (origin, dest, dep, arr) in enumerate(flights, start=1)
+    ])
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_connections_respect_minimum_connection_time(tmp_path):
+    path = make_db(str(tmp_path / "travel2.sqlite"), [
+        ("ZRH", "CDG", 8, 9),      # 1
+        ("CDG", "LIS", 9.5, 12),   # 2: only 30 minutes after flight 1 lands
+        ("CDG", "LIS", 10, 12.5),  # 3
+        ("ZRH", "LIS", 13, 16),    # 4: direct, arrives last
+        ("CDG", "MAD", 10, 11),    # 5
+        ("MAD", "LIS", 12, 13),    # 6
+    ])
+    search = ItinerarySearch(FlightIndex.load(path), min_connection_minutes=45, max_layover_hours=6, max_stops=2)
+    itineraries = search.search("ZRH", "LIS", DAY, DAY + timedelta(hours=23))
+    assert [[f["flight_id"] for f in i["flights"]] for i in itineraries] == [[1, 3], [1, 5, 6], [4]]
+    assert itineraries[0]["stops"] == 1 and itineraries[0]["connections"] == [{"airport": "CDG", "minutes": 60}]
+    assert itineraries[0]["duration_minutes"] == 270
+
+    one_stop = ItinerarySearch(search.index, min_connection_minutes=45, max_layover_hours=6, max_stops=1)
+    assert [i["stops"] for i in one_stop.search("ZRH", "LIS", DAY, DAY + timedelta(hours=23))] == [1, 0]
+    assert search.search("LIS", "ZRH", DAY, DAY + timedelta(hours=23)) == []
+
+
+def test_earliest_arrival_matches_brute_force(tmp_path):
+    path = make_travel_db(str(tmp_path / "travel2.sqlite"), n_flights=3000, seed=3)
+    index = FlightIndex.load(path)
+    search = ItinerarySearch(index, min_connection_minutes=45, max_layover_hours=8, max_stops=1)
+    start = index.departures[len(index) // 2]
+    end = start + 86400
+    legs = [
+        (row[index.origin_column], row[index.destination_column], index.departures[p], index.arrivals[p])
+        for p, row in enumerate(index.rows)
+    ]
+
+    total = 0
+    for origin, destination in product(["ZRH", "GVA", "CDG"], ["LIS", "OSL", "WAW"]):
+        arrivals = []
+        for a, hub, departure, arrival in legs:
+            if a != origin or not start <= departure <= end:
+                continue
+            if hub == destination:
+                arrivals.append(arrival)
+            arrivals += [
+                arrival2 for b, c, departure2, arrival2 in legs
+                if b == hub and c == destination and 45 * 60 <= departure2 - arrival <= 8 * 3600
+            ]
+        found = search.search(
+            origin, destination, datetime.fromtimestamp(start, timezone.utc), datetime.fromtimestamp(end, timezone.utc)
+        )
+        assert [int(datetime.fromisoformat(i["arrival"]).timestamp()) for i in found] == sorted(arrivals)[:10]
+        total += len(found)
+    assert total > 0
@@ -0,0 +1,45 @@
+import sqlite3
+
+from src.chatbot.flow import user_info
+from src.chatbot.tools import cancel_ticket, fetch_user_flight_information, update_ticket_to_new_flight
+from src.flights import passenger_itinerary
+from tests.conftest import OTHER_PASSENGER, PASSENGER
+
+TICKET = "7240005432906569"
+RUN_CONFIG = {"configurable": {"passenger_id": PASSENGER}}
+
+
+def check(path):
+    conn = sqlite3.connect(path)
+    try:
+        return passenger_itinerary.check_consistency(conn)
+    finally:
+        conn.close()
+
+
+def test_fetch_reads_the_materialized_itinerary(travel_db):
+    flights = fetch_user_flight_information.invoke({}, RUN_CONFIG)
+    assert [(f["ticket_no"], f["flight_id"], f["seat_no"]) for f in flights] == [(TICKET, 2, "10A")]
+    assert list(flights[0]) == list(passenger_itinerary.ITINERARY_COLUMNS)
+    assert user_info({"messages": []}, RUN_CONFIG) == {"user_info": flights}
+
+
+def test_writes_refresh_the_itinerary(travel_db):
+    update_ticket_to_new_flight.invoke({"ticket_no": TICKET, "new_flight_id": 3}, RUN_CONFIG)
+    assert check(travel_db) == []
+    cancel_ticket.invoke({"ticket_no": TICKET}, RUN_CONFIG)
+    assert fetch_user_flight_information.invoke({}, RUN_CONFIG) == []
+    assert check(travel_db) == []
+    other = fetch_user_flight_information.invoke({}, {"configurable": {"passenger_id": OTHER_PASSENGER}})
+    assert [f["flight_id"] for f in other] == [3]
+
+
+def test_check_and_rebuild(travel_db):
+    conn = sqlite3.connect(travel_db)
+    conn.execute("UPDATE passenger_itinerary SET seat_no = '99Z'")
+    conn.commit()
+    assert {kind for kind, _ in passenger_itinerary.check_consistency(conn)} == {"missing", "extra"}
+    with conn:
+        assert passenger_itinerary.rebuild_itineraries(conn) == 2
+    assert passenger_itinerary.check_consistency(conn) == []
+    conn.close()
@@ -0,0 +1,84 @@
+import os
+import threading
+
+from src.chatbot.tools import lookup_policy
+from src.retrieval import policy
+from src.retrieval.policy import PolicyIndex
+from src.retrieval.text import chunk_markdown, tokenize
+
+DOC = """# Policies
+## Baggage
+### Carry-on
+One hand bag and one personal item are free.
+## Pets
+Small dogs and cats may travel in the cabin in a carrier.
+"""
+
+
+def test_chunk_markdown_keeps_heading_path():
+    passages = chunk_markdown("faq", DOC)
+    assert [p.title for p in passages] == ["Policies > Baggage > Carry-on", "Policies > Pets"]
+
+    long_passages = chunk_markdown("faq", "## Long\n" + " ".join(f"w{i}" for i in range(250)), max_words=100, overlap=20)
+    assert len(long_passages) == 3
+    assert long_passages[1].text.split()[0] == "w80"
+
+
+def test_tokenize_folds_plurals_and_stopwords():
+    assert tokenize("What are the policies for bags?") == ["policy", "bag"]
+
+
+def test_index_roundtrip_and_rebuild_on_change(tmp_path):
+    docs_dir, index_dir = tmp_path / "docs", tmp_path / "index"
+    docs_dir.mkdir()
+    (docs_dir / "faq.md").write_text(DOC)
+
+    index = PolicyIndex.load_or_build(str(docs_dir), str(index_dir), use_embeddings=True)
+    hits = index.search("can my dog fly with me", k=1)
+    assert hits[0]["title"] == "Policies > Pets"
+    assert index.embeddings is not None
+    built_at = index.meta["built_at"]
+
+    assert PolicyIndex.load_or_build(str(docs_dir), str(index_dir)).meta["built_at"] == built_at
+
+    (docs_dir / "faq.md").write_text(DOC + "## Meals\nMeals are served on long flights.\n")
+    os.utime(docs_dir / "faq.md", ns=(0, 1))
+    rebuilt = PolicyIndex.load_or_build(str(docs_dir), str(index_dir))
+    assert len(rebuilt) == 3
+    assert rebuilt.search("meals")[0]["title"] == "Policies > Meals"
+
+
+def test_concurrent_load_or_build_builds_once(tmp_path, monkeypatch):
+    docs_dir, index_dir = tmp_path / "docs", tmp_path / "index"
+    docs_dir.mkdir()
+    (docs_dir / "faq.md").write_text(DOC)
+    writes = []
+    write = PolicyIndex._write
+
+    def counting_write(*args):
+        writes.append(args[1])
+        write(*args)
+
+    monkeypatch.setattr(PolicyIndex, "_write", staticmethod(counting_write))
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(len(PolicyIndex.load_or_build(str(docs_dir), str(index_dir)))))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [2, 2, 2, 2]
+    assert len(writes) == 1
+
+
+def test_lookup_policy_returns_top_passages(tmp_path, monkeypatch):
+    monkeypatch.setattr(policy.Config, "POLICY_INDEX_DIR", str(tmp_path / "index"))
+    policy.get_policy_index.cache_clear()
+    try:
+        answer = lookup_policy.invoke({"query": "How much checked baggage can I bring?"})
+        assert "Checked baggage" in answer
+        assert lookup_policy.invoke({"query": "zzz"}).startswith("No matching policy found")
+    finally:
+        policy.get_policy_index.cache_clear()
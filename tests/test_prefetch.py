@@ -0,0 +1,65 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import HumanMessage
+
+from config.config import Config
+from src.chatbot import flow
+from src.chatbot.prefetch import Prefetch, outstanding, submit
+from src.chatbot.tools import check_seat_availability, search_flights, tool_cache, update_ticket_to_new_flight
+from src.utils.metrics import metrics
+from tests.conftest import PASSENGER
+
+TICKET = "7240005432906569"
+
+
+def run_config(prefetch=None):
+    configurable = {"passenger_id": PASSENGER, "thread_id": "prefetch"}
+    if prefetch is not None:
+        configurable["prefetch"] = prefetch
+    return {"configurable": configurable}
+
+
+def test_prefetched_results_match_the_database(travel_db):
+    prefetch = Prefetch(PASSENGER, ThreadPoolExecutor(2), days=7)
+    assert [f["flight_id"] for f in prefetch.flights.result()] == [2]
+    # The passenger's CDG-BSL route was prefetched: its flights come from the prefetch
+    assert set(prefetch.route_seats("CDG", "BSL")) == {2}
+
+    hits = metrics.counter("prefetch.hits")
+    args = {"departure_airport": "CDG", "arrival_airport": "BSL", "fare_conditions": "Economy"}
+    prefetched = search_flights.invoke({**args, "limit": 5}, run_config(prefetch))
+    assert prefetched == search_flights.invoke({**args, "limit": 6}, run_config())
+    assert [f["flight_id"] for f in prefetched] == [2]
+    assert check_seat_availability.invoke({"flight_id": 2}, run_config(prefetch)) == {"Business": 1, "Economy": 2}
+    assert metrics.counter("prefetch.hits") > hits
+
+
+def test_writes_bypass_the_prefetch(travel_db):
+    prefetch = Prefetch(PASSENGER, ThreadPoolExecutor(2), days=7)
+    prefetch.route_seats("CDG", "BSL")
+    update_ticket_to_new_flight.invoke({"ticket_no": TICKET, "new_flight_id": 3}, run_config())
+    assert not prefetch.usable(travel_db)
+    assert check_seat_availability.invoke({"flight_id": 2}, run_config(prefetch)) == {"Business": 1, "Economy": 3}
+
+
+def test_busy_pool_skips_the_prefetch(travel_db):
+    release = threading.Event()
+    pool = ThreadPoolExecutor(Config.PREFETCH_WORKERS)
+    blocked = [submit(pool, release.wait) for _ in range(Config.PREFETCH_WORKERS)]
+    assert Prefetch.start(PASSENGER) is None
+    release.set()
+    for future in blocked:
+        future.result()
+    while outstanding():
+        time.sleep(0.001)
+    assert Prefetch.start(PASSENGER).passenger_flights(PASSENGER)[0]["flight_id"] == 2
+
+
+def test_graph_reads_user_info_from_the_prefetch(fake_config):
+    graph = flow.build_graph(fake_config(MEMORY_TYPE="simple"))
+    tool_cache.clear()
+    prefetch = Prefetch.start(PASSENGER)
+    graph.invoke({"messages": [HumanMessage(content="Hello")]}, run_config(prefetch))
+    assert graph.get_state(run_config()).values["user_info"] == prefetch.flights.result()
@@ -0,0 +1,67 @@
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from src.chatbot.fake_llm import FakeChatModel
+from src.chatbot.graph_builder import create_routing_function
+from src.chatbot.registry import ToolRegistry, get_search_tool
+from src.chatbot.tools import (
+    CompleteOrEscalate,
+    cancel_ticket,
+    lookup_policy,
+    search_flights,
+    update_ticket_to_new_flight,
+)
+
+
+class BindableFakeChatModel(FakeListChatModel):
+    def bind_tools(self, tools, **kwargs):
+        return self.bind(tools=tools, **kwargs)
+
+
+def make_registry():
+    return ToolRegistry([search_flights, lookup_policy], [cancel_ticket])
+
+
+def test_registry_tables():
+    registry = make_registry()
+    assert registry.safe_names == {"search_flights", "lookup_policy"}
+    assert registry.is_sensitive("cancel_ticket")
+    assert registry.by_name["lookup_policy"] is lookup_policy
+    assert registry.schemas["search_flights"]["function"]["name"] == "search_flights"
+
+
+def test_bind_reuses_bound_model_and_schemas():
+    registry = make_registry()
+    llm = BindableFakeChatModel(responses=["ok"])
+    bound = registry.bind(llm, [CompleteOrEscalate])
+    assert registry.bind(llm, [CompleteOrEscalate]) is bound
+    assert registry.bind(llm) is not bound
+    names = [t["function"]["name"] for t in bound.kwargs["tools"]]
+    assert names == ["search_flights", "lookup_policy", "cancel_ticket", "CompleteOrEscalate"]
+
+
+def test_routing_function_uses_registry_sets():
+    class Message:
+        def __init__(self, *names):
+            self.tool_calls = [{"name": n, "args": {}, "id": n} for n in names]
+
+    route = create_routing_function(make_registry(), "update_flight")
+    assert route({"messages": [Message("search_flights", "lookup_policy")]}) == "update_flight_safe_tools"
+    assert route({"messages": [Message("search_flights", "cancel_ticket")]}) == "update_flight_sensitive_tools"
+    assert route({"messages": [Message("CompleteOrEscalate")]}) == "leave_skill"
+
+
+def test_fake_search_tool_stands_in_for_tavily():
+    search = get_search_tool(max_results=2, provider="fake")
+    assert search.name == "tavily_search_results_json"
+    assert list(search.args) == ["query"]
+    results = search.invoke({"query": "weather in Basel"})
+    assert len(results) == 2 and "weather in Basel" in results[0]["content"]
+    assert search.invoke({"query": "weather in Basel"}) == results
+
+
+def test_fake_model_fills_rebooking_arguments():
+    llm = FakeChatModel().bind_tools([search_flights, update_ticket_to_new_flight])
+    response = llm.invoke("Move ticket 7240005432000 to flight 42")
+    assert [(tc["name"], tc["args"]) for tc in response.tool_calls] == [
+        ("update_ticket_to_new_flight", {"ticket_no": "7240005432000", "new_flight_id": 42}),
+    ]
@@ -0,0 +1,99 @@
+import json
+import os
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from src.chatbot import flow
+from src.chatbot.interaction import reply_messages, run_turn
+from src.chatbot.replay import Tape, conversation_inputs, export_conversations, read_entries
+from src.chatbot.registry import get_tool_registry
+from src.utils.metrics import metrics
+from tests.conftest import PASSENGER
+
+TURNS = ["Hello", "Which hotels are there in Basel?", "Any car rentals in Basel?", "Thanks"]
+
+
+def play(config, thread_id):
+    graph = flow.build_graph(config, MemorySaver())
+    run_config = {"configurable": {"passenger_id": PASSENGER, "thread_id": thread_id}}
+    replies = []
+    for message in TURNS:
+        turn = run_turn(graph, run_config, message)
+        replies.append((reply_messages(turn.messages, turn.pending), turn.pending))
+    return replies
+
+
+def test_record_then_replay(fake_config, tmp_path):
+    log = str(tmp_path / "replay.jsonl.gz")
+    Recording = fake_config(REPLAY_MODE="record", REPLAY_LOG=log)
+    recorded = play(Recording, "t1")
+    kinds = {entry["kind"] for entry in read_entries(log)}
+    assert "llm" in kinds and "tool" in kinds
+
+    # Replay needs no model provider, and answers the tools from the log
+    class Replaying(Recording):
+        LLM_PROVIDER = "groq"
+        GROQ_API_KEY = None
+        REPLAY_MODE = "replay"
+
+    served = metrics.counter("replay.served.tool")
+    replayed = play(Replaying, "t2")
+    assert metrics.counter("replay.served.tool") > served
+
+    def strip_ids(replies):
+        return json.loads(json.dumps(replies).replace(PASSENGER, ""), object_hook=lambda d: {
+            k: v for k, v in d.items() if k not in ("id", "tool_call_id")
+        })
+
+    assert strip_ids(replayed) == strip_ids(recorded)
+
+    [conversation] = export_conversations(log, get_tool_registry().sensitive_names)
+    assert conversation["id"] == "t1" and conversation["messages"] == TURNS
+
+
+def test_conversation_inputs_keep_approvals(tmp_path):
+    def calls(name, call_id):
+        return AIMessage(content="", tool_calls=[{"name": name, "args": {}, "id": call_id}])
+
+    messages = [
+        HumanMessage(content="Cancel my ticket"),
+        calls("cancel_ticket", "1"),
+        ToolMessage(content="API call denied by user. Reasoning: 'not yet'. Continue assisting, accounting for "
+                            "the user's input.", tool_call_id="1"),
+        calls("cancel_ticket", "2"),
+        ToolMessage(content="Ticket successfully cancelled.", tool_call_id="2"),
+        calls("search_flights", "3"),
+        ToolMessage(content="[]", tool_call_id="3"),
+    ]
+    assert conversation_inputs(messages) == [
+        ["human", "Cancel my ticket"],
+        ["calls", ["cancel_ticket"], "not yet"],
+        ["calls", ["cancel_ticket"], None],
+        ["calls", ["search_flights"], None],
+    ]
+
+    log = str(tmp_path / "replay.jsonl.gz")
+    tape = Tape(log, "record")
+    tape.record("llm", "k", "model", 0.1, {"message": {}, "inputs": conversation_inputs(messages)}, "t1")
+    tape.close()
+    assert export_conversations(log, frozenset({"cancel_ticket"})) == [
+        {"id": "t1", "messages": ["Cancel my ticket", "not yet", "y"]}
+    ]
+
+
+def test_each_process_records_its_own_part(tmp_path, monkeypatch):
+    log = str(tmp_path / "replay.jsonl.gz")
+    tapes = []
+    for pid in (4242, 917):
+        monkeypatch.setattr(os, "getpid", lambda pid=pid: pid)
+        tapes.append(Tape(log, "record"))
+    tapes[0].record("llm", "a", "fake", 0.1, {"content": "first"})
+    tapes[1].record("llm", "b", "fake", 0.1, {"content": "second"})
+    tapes[0].record("llm", "c", "fake", 0.1, {"content": "third"})
+
+    # Parts are readable while still open, and merged by pid
+    assert sorted(os.listdir(tmp_path)) == ["replay.jsonl.gz.4242", "replay.jsonl.gz.917"]
+    assert [entry["key"] for entry in read_entries(log)] == ["b", "a", "c"]
+    for tape in tapes:
+        tape.close()
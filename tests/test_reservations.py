@@ -0,0 +1,93 @@
+import re
+
+from src.chatbot.tools import (
+    book_car_rental,
+    book_excursion,
+    book_hotel,
+    cancel_car_rental,
+    cancel_excursion,
+    cancel_hotel,
+    search_car_rentals,
+    search_hotels,
+    search_trip_recommendations,
+    update_car_rental,
+    update_hotel,
+)
+from tests.conftest import OTHER_PASSENGER, PASSENGER
+
+RUN_CONFIG = {"configurable": {"passenger_id": PASSENGER}}
+OTHER_CONFIG = {"configurable": {"passenger_id": OTHER_PASSENGER}}
+
+
+def booking_id(message):
+    return re.search(r"Booking ID: (\w+)", message).group(1)
+
+
+def free_rooms(check_in, check_out):
+    hotels = search_hotels.invoke({"location": "Basel", "check_in": check_in, "check_out": check_out})
+    return hotels[0]["available_rooms"] if hotels else 0
+
+
+def test_hotel_rooms_are_not_overbooked(travel_db, monkeypatch):
+    monkeypatch.setattr("config.config.Config.HOTEL_GUESTS_PER_ROOM", 1)
+    stay = {"hotel_id": 1, "check_in": "2025-06-01", "check_out": "2025-06-04"}
+    first = book_hotel.invoke({**stay, "guests": 8}, RUN_CONFIG)
+    assert first.startswith("Hotel 1 booked from 2025-06-01 to 2025-06-04 for 8 guests (8 rooms).")
+    assert "Total price: 9600." in first
+    assert book_hotel.invoke({**stay, "check_in": "2025-06-03", "guests": 3}, RUN_CONFIG) == (
+        "Not enough rooms left at hotel 1 from 2025-06-03 to 2025-06-04: 2 available, 3 needed."
+    )
+    assert free_rooms("2025-06-01", "2025-06-04") == 2
+    assert free_rooms("2025-06-04", "2025-06-06") == 10
+
+    # Growing the booking counts its own rooms as free
+    hotel_booking = booking_id(first)
+    assert update_hotel.invoke({"booking_id": hotel_booking, "guests": 10}, RUN_CONFIG).startswith(
+        f"Hotel booking {hotel_booking} updated"
+    )
+    assert search_hotels.invoke({"location": "Basel", "check_in": "2025-06-02"}) == []
+
+    assert cancel_hotel.invoke({"booking_id": hotel_booking}, OTHER_CONFIG).startswith("Current signed-in passenger")
+    assert cancel_hotel.invoke({"booking_id": hotel_booking}, RUN_CONFIG) == (
+        f"Hotel booking {hotel_booking} successfully cancelled."
+    )
+    assert free_rooms("2025-06-01", "2025-06-04") == 10
+
+
+def test_excursion_capacity(travel_db, monkeypatch):
+    day = {"excursion_id": 1, "date": "2025-06-01"}
+    assert book_excursion.invoke({**day, "participants": 18}, RUN_CONFIG).startswith("Excursion 1 booked on 2025-06-01")
+    assert book_excursion.invoke({**day, "participants": 3}, RUN_CONFIG) == (
+        "Not enough places left on excursion 1 on 2025-06-01: 2 available, 3 needed."
+    )
+    assert search_trip_recommendations.invoke({"keywords": "history", "day": "2025-06-01", "participants": 3}) == []
+    other = book_excursion.invoke({**day, "participants": 2}, OTHER_CONFIG)
+    assert search_trip_recommendations.invoke({"location": "Basel", "day": "2025-06-01"}) == []
+
+    assert cancel_excursion.invoke({"booking_id": booking_id(other)}, OTHER_CONFIG).endswith("successfully cancelled.")
+    assert search_trip_recommendations.invoke({"location": "Basel", "day": "2025-06-01"})[0]["available_places"] == 2
+
+
+def test_car_rental_periods(travel_db):
+    first = book_car_rental.invoke({"rental_id": 1, "start_date": "2025-06-01", "end_date": "2025-06-05"}, RUN_CONFIG)
+    assert "Total price: 160." in first
+    assert book_car_rental.invoke(
+        {"rental_id": 1, "start_date": "2025-06-04", "end_date": "2025-06-08"}, OTHER_CONFIG
+    ) == "Car rental 1 is already booked from 2025-06-01 to 2025-06-05."
+    assert search_car_rentals.invoke({"location": "Basel", "start_date": "2025-06-03", "end_date": "2025-06-04"}) == []
+
+    # Periods are half-open: the car can be picked up the day it is returned
+    second = book_car_rental.invoke(
+        {"rental_id": 1, "start_date": "2025-06-05", "end_date": "2025-06-08"}, OTHER_CONFIG
+    )
+    assert second.startswith("Car rental 1 successfully booked from 2025-06-05 to 2025-06-08.")
+    assert update_car_rental.invoke(
+        {"booking_id": booking_id(first), "end_date": "2025-06-06"}, RUN_CONFIG
+    ) == "Car rental 1 is already booked from 2025-06-05 to 2025-06-08."
+    assert update_car_rental.invoke(
+        {"booking_id": booking_id(first), "start_date": "2025-05-30"}, RUN_CONFIG
+    ).startswith(f"Car rental booking {booking_id(first)} updated: 2025-05-30 to 2025-06-05.")
+
+    assert cancel_car_rental.invoke({"booking_id": booking_id(second)}, OTHER_CONFIG).endswith("cancelled.")
+    period = {"start_date": "2025-06-05", "end_date": "2025-06-08"}
+    assert len(search_car_rentals.invoke({"location": "Basel", **period})) == 1
@@ -0,0 +1,62 @@
+import sqlite3
+
+from config.config import Config
+from src.flights.inventory import check_consistency
+from src.utils import db_init
+from src.utils.synthetic_db import SCALE_ROWS, TRAVEL2_SCHEMA, generate_travel_db
+
+
+def columns(conn) -> dict:
+    tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' ORDER BY name")]
+    return {table: [row[1] for row in conn.execute(f"PRAGMA table_info({table})")] for table in tables}
+
+
+def test_generated_database_matches_travel2_and_is_consistent(tmp_path):
+    path = generate_travel_db(str(tmp_path / "travel2.sqlite"), scale=0.02, seed=1)
+    reference = sqlite3.connect(":memory:")
+    reference.executescript(TRAVEL2_SCHEMA)
+    conn = sqlite3.connect(path)
+    assert columns(conn) == columns(reference)
+    assert not (tmp_path / "travel2.sqlite.building").exists()
+
+    assert conn.execute("SELECT count(*) FROM bookings").fetchone()[0] == round(SCALE_ROWS["bookings"] * 0.02)
+    # Round trips fly the return route of the outbound leg
+    assert conn.execute("""
+        SELECT count(*) FROM ticket_flights a JOIN ticket_flights b ON a.ticket_no = b.ticket_no
+        JOIN flights fa ON fa.flight_id = a.flight_id JOIN flights fb ON fb.flight_id = b.flight_id
+        WHERE fa.arrival_airport = fb.departure_airport AND fa.departure_airport = fb.arrival_airport
+          AND fb.scheduled_departure > fa.scheduled_arrival
+    """).fetchone()[0] > 0
+    assert conn.execute(
+        "SELECT count(*) FROM (SELECT 1 FROM boarding_passes GROUP BY flight_id, seat_no HAVING count(*) > 1)"
+    ).fetchone()[0] == 0
+    conn.close()
+
+    db_init.prepare_database(path)
+    conn = sqlite3.connect(path)
+    assert check_consistency(conn) == []
+    assert conn.execute("SELECT count(*) FROM seat_inventory WHERE booked > capacity").fetchone()[0] == 0
+    conn.close()
+
+
+def test_generation_is_repeatable(tmp_path):
+    rows = []
+    for name in ("a.sqlite", "b.sqlite"):
+        conn = sqlite3.connect(generate_travel_db(str(tmp_path / name), scale=0.005, seed=3))
+        rows.append(conn.execute("SELECT * FROM ticket_flights ORDER BY ticket_no, flight_id").fetchall())
+        conn.close()
+    assert rows[0] == rows[1] and rows[0]
+
+
+def test_initialize_database_generates_offline(tmp_path, monkeypatch):
+    path = tmp_path / "data" / "travel2.sqlite"
+    monkeypatch.setattr(Config, "DATABASE_PATH", str(path))
+    monkeypatch.setattr(Config, "DATABASE_SOURCE", "synthetic")
+    monkeypatch.setattr(Config, "SYNTHETIC_DB_SCALE", 0.005)
+    monkeypatch.setattr(db_init, "download_database", None)
+
+    db_init.initialize_database()
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT count(*) FROM seat_inventory").fetchone()[0] > 0
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    conn.close()
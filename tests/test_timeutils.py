@@ -0,0 +1,34 @@
+from datetime import date, datetime, timedelta, timezone
+
+from src.chatbot.booking import check_departure
+from src.utils.timeutils import epoch, parse_timestamp, to_day, to_epoch
+
+TZ = timezone(timedelta(hours=-4))
+
+
+def test_stored_timestamp_variants():
+    # travel2 text and what pandas writes back after update_dates
+    assert parse_timestamp("2024-05-03 11:31:03.561731-04:00") == datetime(2024, 5, 3, 11, 31, 3, 561731, TZ)
+    assert to_epoch("2024-05-03 11:31:03-04:00") == to_epoch("2024-05-03 15:31:03.2+00:00")
+    assert to_epoch("2024-05-03 18:31:03+0300") == to_epoch("2024-05-03T15:31:03Z")
+    assert to_epoch("\\N") is None and to_epoch(None) is None
+
+
+def test_query_bounds():
+    day = date(2024, 5, 3)
+    start = int(datetime(2024, 5, 3, tzinfo=TZ).timestamp())
+    assert epoch(day, TZ) == epoch("2024-05-03", TZ) == start
+    assert epoch(day, TZ, end=True) == start + 86400 - 1
+    assert epoch(datetime(2024, 5, 3, 1), TZ) == start + 3600
+    assert epoch("", TZ) is None
+    assert to_day(" 2024-05-03 10:00") == day
+
+
+def test_check_departure_uses_stored_epoch():
+    now = datetime(2024, 5, 3, 8, tzinfo=TZ)
+    departure = "2024-05-03 10:00:00-04:00"
+    failed = check_departure(departure, now)
+    assert failed.message.endswith("Selected flight is at 2024-05-03 10:00:00-04:00.")
+    assert check_departure("2024-05-03 11:00:00.5-04:00", now) is None
+    # The stored epoch decides; the text is only shown
+    assert check_departure(departure, now, to_epoch(departure) + 3600) is None
@@ -0,0 +1,68 @@
+from langchain_core.messages import SystemMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from src.chatbot import flow
+from src.chatbot.interaction import run_turn
+from src.chatbot.usage import BUDGET_REPLY, SUMMARY_PREFIX, add_usage, subtract_usage
+from tests.conftest import PASSENGER
+
+
+def start(config):
+    graph = flow.build_graph(config, MemorySaver())
+    return graph, {"configurable": {"passenger_id": PASSENGER, "thread_id": "t1"}}
+
+
+def test_add_and_subtract_usage():
+    first = {"input": 10, "by_node": {"a": {"input": 10}}}
+    total = add_usage(first, {"input": 5, "by_node": {"a": {"input": 2}, "b": {"input": 3}}})
+    assert total == {"input": 15, "by_node": {"a": {"input": 12}, "b": {"input": 3}}}
+    assert subtract_usage(total, first) == {"input": 5, "by_node": {"a": {"input": 2}, "b": {"input": 3}}}
+
+
+def test_turns_report_tokens_by_node_and_tool(fake_config):
+    graph, run_config = start(fake_config(FAST_PATH_ENABLED=False))
+
+    first = run_turn(graph, run_config, "Which hotels are there in Basel?")
+    # The primary assistant hands off to book_hotel, which calls search_hotels and answers with its result
+    assert first.usage["calls"] == 3
+    assert {node: usage["calls"] for node, usage in first.usage["by_node"].items()} == {
+        "primary_assistant": 1, "book_hotel": 2,
+    }
+    assert first.usage["by_tool"]["search_hotels"]["calls"] == 1
+    assert first.usage["input"] > first.usage["output"] > 0 and first.usage["cost"] > 0
+    assert first.thread_usage == first.usage
+
+    second = run_turn(graph, run_config, "Thanks")
+    assert second.usage["calls"] == 1 and "by_tool" not in second.usage
+    assert second.thread_usage["calls"] == 4
+    assert second.thread_usage["input"] == first.usage["input"] + second.usage["input"]
+
+
+def test_budget_stops_the_conversation(fake_config):
+    config = fake_config(FAST_PATH_ENABLED=False, CONVERSATION_TOKEN_BUDGET=1, CONVERSATION_BUDGET_ACTION="stop")
+    graph, run_config = start(config)
+
+    assert run_turn(graph, run_config, "Hello").usage["calls"] == 1
+    stopped = run_turn(graph, run_config, "Which hotels are there in Basel?")
+    assert [m.content for m in stopped.messages[1:]] == [BUDGET_REPLY]
+    assert "calls" not in stopped.usage
+
+
+def test_budget_summarizes_earlier_turns(fake_config):
+    config = fake_config(FAST_PATH_ENABLED=False, CONVERSATION_TOKEN_BUDGET=1, CONVERSATION_KEEP_TURNS=1)
+    graph, run_config = start(config)
+
+    run_turn(graph, run_config, "Hello")
+    first_id = graph.get_state(run_config).values["messages"][0].id
+    turn = run_turn(graph, run_config, "Which hotels are there in Basel?")
+
+    messages = graph.get_state(run_config).values["messages"]
+    assert isinstance(messages[0], SystemMessage) and messages[0].content.startswith(SUMMARY_PREFIX)
+    assert messages[0].id == first_id
+    assert [m.content for m in messages[1:2]] == ["Which hotels are there in Basel?"]
+    # The summary replaced the first turn and is not part of the reply
+    assert all(m.id != first_id for m in turn.messages)
+    assert turn.usage["by_node"]["summarize"]["calls"] == 1
+    assert turn.thread_usage["since_summary"] == sum(
+        node["input"] + node["output"] for name, node in turn.usage["by_node"].items() if name != "summarize"
+    )
@@ -0,0 +1,37 @@
+import sqlite3
+
+from src.chatbot.warmup import WarmUp, warm_pages
+
+
+def test_warm_up_runs_every_step(fake_config):
+    warmup = WarmUp(fake_config(WARMUP_INIT_DB=False))
+    assert warmup.status()["status"] == "pending"
+
+    assert warmup.run()
+    status = warmup.status()
+    assert status["status"] == "ready" and status["errors"] == {}
+    assert list(status["steps_ms"]) == [
+        "database", "page_cache", "flight_index", "policy_index", "graph", "llm_connection",
+    ]
+
+
+def test_warm_pages_reads_tables_and_indexes(travel_db):
+    conn = sqlite3.connect(travel_db)
+    indexes = len(conn.execute("PRAGMA index_list(tickets)").fetchall())
+    # Unknown tables are skipped
+    assert warm_pages(conn, ["tickets", "no_such_table"]) == 1 + indexes
+    conn.close()
+
+
+def test_unprepared_database_never_becomes_ready(fake_config, travel_db):
+    conn = sqlite3.connect(travel_db)
+    conn.execute("DROP TABLE passenger_itinerary")
+    conn.commit()
+    conn.close()
+
+    warmup = WarmUp(fake_config(WARMUP_INIT_DB=False))
+    assert not warmup.run()
+    status = warmup.status()
+    assert status["status"] == "failed"
+    assert "passenger_itinerary" in status["errors"]["database"]
+    assert list(status["steps_ms"]) == ["database"]